@@ -39,8 +39,6 @@ setup(
         "Programming Language :: Python",
         "Programming Language :: Python :: 3",
         "Programming Language :: Python :: 3 :: Only",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
         "Programming Language :: Python :: 3.10",
         "Programming Language :: Python :: 3.11",
         "Programming Language :: Python :: 3.12",
@@ -60,10 +58,15 @@ setup(
     keywords=[
         # eg: "keyword1", "keyword2", "keyword3",
     ],
-    python_requires=">=3.8",
+    python_requires=">=3.10",
     install_requires=[
         # eg: "aspectlib==1.1.1", "six>=1.7",
     ],
+    entry_points={
+        "console_scripts": [
+            "keepice-lakehouse = keepice_lakehouse.cli:main",
+        ]
+    },
     extras_require={
         # eg:
         #   "rst": ["docutils>=0.11"],
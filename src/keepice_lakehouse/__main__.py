@@ -9,7 +9,9 @@ Why does this file exist, and why __main__? For more info, read:
 - https://docs.python.org/3/using/cmdline.html#cmdoption-m
 """
 
-from .application.iceberg_manager_factory import IcebergManagerFactory
+import sys
+
+from .cli import main
 
 if __name__ == "__main__":
-    IcebergManagerFactory()
+    sys.exit(main())
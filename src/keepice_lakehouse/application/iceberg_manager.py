@@ -1,12 +1,85 @@
+import copy
+import functools
+import inspect
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Tuple
 
+import pyarrow as pa
+from pyiceberg.table.refs import MAIN_BRANCH
+from pyspark.sql import Window
+from pyspark.sql import functions as F
+
+from ..connectors.athena_connector import AthenaConnector
 from ..connectors.base_connector import BaseConnector
+from ..connectors.pyiceberg_connector import PyIcebergConnector
+from ..exceptions.exceptions import BranchPublishError
+from ..exceptions.exceptions import CompactionError
 from ..exceptions.exceptions import DatabaseCreationError
+from ..exceptions.exceptions import DataDeletionError
 from ..exceptions.exceptions import InvalidTablePropertyError
 from ..exceptions.exceptions import MetadataRetrievalError
+from ..exceptions.exceptions import SnapshotExpirationError
+from ..exceptions.exceptions import SummaryRefreshError
 from ..exceptions.exceptions import TableCreationError
 from ..exceptions.exceptions import TableDropError
+from ..exceptions.exceptions import UnsupportedOperationError
+from ..models.models import CatalogExportReport
+from ..models.models import ClusteringReport
+from ..models.models import ColumnMetricsConfigModel
+from ..models.models import DeleteReport
+from ..models.models import MetricsWidthReport
+from ..models.models import ParquetBenchmarkResult
+from ..models.models import ParquetWriterConfigModel
+from ..models.models import RetentionPolicyModel
+from ..models.models import RetentionReport
+from ..models.models import SkippingReport
+from ..models.models import StreamingConfigModel
+from ..models.models import SummaryRefreshReport
+from ..models.models import SummaryTableModel
+from ..models.models import TableComparisonReport
+from ..models.models import TableMetadataModel
+from ..models.models import WriteModeAdvice
+from ..models.models import WriteModePolicyModel
+from ..utils.clustering import files_read_fraction
+from ..utils.metadata_cache import TableMetadataCache
+from ..utils.parquet_benchmark import benchmark_parquet
+from ..utils.spark_tuning import statement_settings
+from ..utils.sql_builder import SqlBuilder
+from ..utils.sql_builder import parse_describe
+from ..utils.sql_builder import parse_properties
+from ..utils.sql_builder import split_table_identifier
+from ..utils.time_travel import Timestamp
+from ..utils.time_travel import to_utc_datetime
+from ..utils.write_modes import advise_write_modes
+from .metadata_exporter import MetadataExporter
+from .pinned_session import PinnedSession
+from .retention_manager import RetentionManager
+from .stream_ingestion import StreamIngestion
+from .summary_tables import SummaryTables
+from .table_comparator import TableComparator
+
+
+def _operation(method):
+    """
+    Runs a manager method as an operation of the connector, e.g. in a Spark job group described by the method name and
+    the table it targets.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        arguments = signature.bind(self, *args, **kwargs).arguments
+        target = ".".join(str(arguments[name]) for name in ("database_name", "table_name") if arguments.get(name))
+        with self.connector.operation(method.__name__, f"{method.__name__} {target}".strip()):
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class IcebergManager:
@@ -19,18 +92,79 @@ class IcebergManager:
     Attributes:
         connector (BaseConnector): The connector used to interact with the database.
         connection: The database connection established through the connector.
+        sql_builder (SqlBuilder): Builds the canonical statements in the dialect of the connector.
+        catalog_name (Optional[str]): The catalog the statements target. Defaults to the catalog of the connector.
+        adaptive_tuning (bool): Whether writes tune the session settings when the connector is adaptive; see
+            ``untuned``.
     """
 
-    def __init__(self, connector: BaseConnector):
+    def __init__(self, connector: BaseConnector, catalog_name: Optional[str] = None):
         """
         Initializes the IcebergManager instance.
 
         Args:
             connector (BaseConnector): An instance of BaseConnector used for connecting to the database.
+            catalog_name (Optional[str]): The catalog the statements target. Defaults to the catalog of the connector.
         """
         self.connector = connector
         self.connection = self.connector.connect()
+        self.sql_builder = SqlBuilder(self.connector.dialect)
+        self.catalog_name = catalog_name or self.connector.catalog_name
+        self.metadata_cache = TableMetadataCache()
+        self.adaptive_tuning = True
+
+    def for_catalog(self, catalog_name: str) -> "IcebergManager":
+        """
+        Returns a manager targeting another catalog of the same connector, sharing its connection.
+
+        Args:
+            catalog_name (str): The catalog to target.
+
+        Returns:
+            IcebergManager: The manager bound to the catalog.
+        """
+        if catalog_name == self.catalog_name:
+            return self
+        manager = copy.copy(self)
+        manager.catalog_name = catalog_name
+        return manager
+
+    def untuned(self) -> "IcebergManager":
+        """
+        Returns a manager sharing the connection whose writes leave the session settings untouched.
+
+        Adaptive tuning sets the shuffle and broadcast settings of the whole Spark session for the duration of a write,
+        so any statement running concurrently on the session would be planned with them. Operations run concurrently
+        on one session, e.g. by a job manifest with several workers or in several scheduler pools, should use this
+        manager instead.
+
+        Returns:
+            IcebergManager: The manager without adaptive tuning.
+        """
+        if not self.adaptive_tuning:
+            return self
+        manager = copy.copy(self)
+        manager.adaptive_tuning = False
+        return manager
+
+    def resolve(self, identifier: str) -> Tuple["IcebergManager", str, str]:
+        """
+        Routes a ``catalog.database.table`` or ``database.table`` identifier to the manager of its catalog.
+
+        Args:
+            identifier (str): The table identifier.
+
+        Returns:
+            Tuple[IcebergManager, str, str]: The manager bound to the catalog, the database name and the table name.
+
+        Raises:
+            ValueError: If the identifier is not a two or three part name.
+        """
+        catalog_name, database_name, table_name = split_table_identifier(identifier)
+        manager = self.for_catalog(catalog_name) if catalog_name else self
+        return manager, database_name, table_name
 
+    @_operation
     def list_databases(self) -> List[str]:
         """
         Lists all databases available in the connected database system.
@@ -41,12 +175,11 @@ class IcebergManager:
         Raises:
             Exception: If the query execution fails.
         """
-        list_databases_query = """
-            SHOW DATABASES;
-        """
+        list_databases_query = self.sql_builder.show_databases()
         results = self.connector.query(query=list_databases_query)
         return results
 
+    @_operation
     def list_tables(self, database_name: str) -> List[str]:
         """
         Lists all tables within a specified database.
@@ -60,10 +193,11 @@ class IcebergManager:
         Raises:
             Exception: If the query execution fails.
         """
-        list_tables_query = f"SHOW TABLES IN {database_name};"
+        list_tables_query = self.sql_builder.show_tables(database_name)
         results = self.connector.query(query=list_tables_query)
         return results
 
+    @_operation
     def create_database(self, database_name: str):
         """
         Creates a new database if it does not already exist.
@@ -75,15 +209,19 @@ class IcebergManager:
             DatabaseCreationError: If the database creation query fails.
         """
         try:
-            create_database_query = f"""CREATE DATABASE IF NOT EXISTS {database_name};"""
+            create_database_query = self.sql_builder.create_database(database_name)
             self.connector.query(query=create_database_query)
         except Exception as e:
             raise DatabaseCreationError(str(e)) from e
 
+    @_operation
     def get_table_ddl(self, database_name: str, table_name: str):
         """
         Retrieves the DDL (Data Definition Language) statement for creating a specified table.
 
+        On Spark the result is cached with the location of the current metadata file of the table and served from the
+        cache until the location changes.
+
         Args:
             database_name (str): The name of the database containing the table.
             table_name (str): The name of the table to retrieve the DDL for.
@@ -94,46 +232,134 @@ class IcebergManager:
         Raises:
             Exception: If the query execution fails.
         """
-        get_ddl_query = f"SHOW CREATE TABLE {self.connector.catalog_name}.{database_name}.{table_name};"
+        key = ("ddl", self.catalog_name, database_name, table_name)
+        metadata_location = self._metadata_location(database_name, table_name)
+        if metadata_location is not None:
+            results = self.metadata_cache.get(key, metadata_location)
+            if results is not None:
+                return results
+        get_ddl_query = self.sql_builder.show_create_table(self.catalog_name, database_name, table_name)
         results = self.connector.query(query=get_ddl_query)
+        if metadata_location is not None:
+            self.metadata_cache.put(key, metadata_location, results)
         return results
 
+    @_operation
+    def get_table_metadata(self, database_name: str, table_name: str) -> TableMetadataModel:
+        """
+        Retrieves the columns, partition spec and properties of a table.
+
+        The result is cached with the location of the current metadata file of the table. Iceberg writes a new
+        metadata file for every commit and every schema, partition spec or property change, so checking the location,
+        a single-row metadata table query, tells whether the cached entry is still valid and the ``DESCRIBE`` and
+        ``SHOW TBLPROPERTIES`` statements run only after a change. Athena does not expose the location, so its
+        results are not cached.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+
+        Returns:
+            TableMetadataModel: The columns, partition spec and properties of the table.
+
+        Raises:
+            MetadataRetrievalError: If the metadata cannot be retrieved.
+        """
+        key = ("metadata", self.catalog_name, database_name, table_name)
+        try:
+            if isinstance(self.connector, PyIcebergConnector):
+                table = self.connector.load_table(database_name, table_name)
+                metadata = self.metadata_cache.get(key, table.metadata_location)
+                if metadata is None:
+                    metadata = TableMetadataModel(metadata_location=table.metadata_location, **self.connector.table_definition(table))
+                    self.metadata_cache.put(key, table.metadata_location, metadata)
+                return metadata
+            metadata_location = self._metadata_location(database_name, table_name)
+            if metadata_location is not None:
+                metadata = self.metadata_cache.get(key, metadata_location)
+                if metadata is not None:
+                    return metadata
+            names = (self.catalog_name, database_name, table_name)
+            columns, partition_spec = parse_describe(self._all_rows(self._query_fresh(self.sql_builder.describe_table(*names))))
+            properties = parse_properties(self._all_rows(self._query_fresh(self.sql_builder.show_table_properties(*names))))
+        except Exception as e:
+            raise MetadataRetrievalError(f"Failed to retrieve the metadata of {database_name}.{table_name}: {e}") from e
+        metadata = TableMetadataModel(
+            metadata_location=metadata_location, columns=columns, partition_spec=partition_spec, properties=properties
+        )
+        if metadata_location is not None:
+            self.metadata_cache.put(key, metadata_location, metadata)
+        return metadata
+
+    @_operation
     def create_table(
-        self, database_name: str, table_name: str, columns: dict, s3_folder_location: str, partition_column: Optional[str] = None
+        self,
+        database_name: str,
+        table_name: str,
+        columns: dict,
+        s3_folder_location: str,
+        partition_column: Optional[str] = None,
+        table_properties: Optional[Dict[str, str]] = None,
+        sort_order: Optional[List[str]] = None,
+        metrics: Optional[ColumnMetricsConfigModel] = None,
+        parquet: Optional[ParquetWriterConfigModel] = None,
     ):
         """
         Creates a new table in the specified database with the given columns and configuration.
 
+        When the connector has a retry policy, the table is created with the matching Iceberg ``commit.retry.*``
+        properties, so concurrent writers retry only the conflicting commit instead of re-running the whole write.
+
+        A write sort order clusters the rows of every write, which keeps the min/max statistics of the sort columns
+        tight so that filters on them, such as lookups on a high-cardinality ID, skip most data files.
+
         Args:
             database_name (str): The name of the database where the table will be created.
             table_name (str): The name of the table to create.
             columns (dict): A dictionary of column names and their types.
             s3_folder_location (str): The S3 location where table data will be stored.
             partition_column (Optional[str]): The column by which to partition the table. Must be one of the columns.
+            table_properties (Optional[Dict[str, str]]): Additional Iceberg table properties. They take precedence over
+                the properties derived from the retry policy, the metrics configuration and the Parquet settings.
+            sort_order (Optional[List[str]]): The columns the rows of every write are sorted by, most significant
+                first. Not supported on Athena.
+            metrics (Optional[ColumnMetricsConfigModel]): The metrics modes and bloom filters of the columns.
+            parquet (Optional[ParquetWriterConfigModel]): The Parquet writer settings of the data files.
 
         Raises:
             TableCreationError: If the table creation query fails.
         """
         try:
-            column_str = ", ".join([f"{column} {data_type}" for column, data_type in columns.items()])
-
-            create_table_query = f"""
-                CREATE TABLE IF NOT EXISTS {self.connector.catalog_name}.{database_name}.{table_name} (
-                    {column_str}
-                )
-                USING iceberg
-                LOCATION '{s3_folder_location}'
-            """
-
-            if partition_column is not None:
-                create_table_query += f"\n PARTITIONED BY ({partition_column})"
-            create_table_query += ";"
+            properties = {}
+            retry_policy = getattr(self.connector, "retry_policy", None)
+            if retry_policy is not None and retry_policy.configured:
+                properties.update(retry_policy.commit_properties())
+            if metrics is not None:
+                properties.update(metrics.table_properties())
+            if parquet is not None:
+                properties.update(parquet.table_properties())
+            properties.update(table_properties or {})
 
+            create_table_query = self.sql_builder.create_table(
+                self.catalog_name,
+                database_name,
+                table_name,
+                columns,
+                s3_folder_location,
+                partition_column=partition_column,
+                properties=properties,
+            )
             self.connector.query(create_table_query)
+            if sort_order:
+                if isinstance(self.connector, PyIcebergConnector):
+                    self.connector.set_sort_order(database_name, table_name, sort_order)
+                else:
+                    self.connector.query(self.sql_builder.write_ordered_by(self.catalog_name, database_name, table_name, sort_order))
 
         except Exception as e:
             raise TableCreationError(str(e)) from e
 
+    @_operation
     def drop_table(self, database_name: str, table_name: str):
         """
         Drops a specified table from the database.
@@ -146,13 +372,12 @@ class IcebergManager:
             TableDropError: If the table drop query fails.
         """
         try:
-            drop_table_query = f"""
-                DROP TABLE {self.connector.catalog_name}.{database_name}.{table_name};
-            """
+            drop_table_query = self.sql_builder.drop_table(self.catalog_name, database_name, table_name)
             self.connector.query(query=drop_table_query)
         except Exception as e:
             raise TableDropError(str(e)) from e
 
+    @_operation
     def get_property(self, database_name: str, table_name: str, table_property: str):
         """
         Retrieves a specific property of a table.
@@ -173,61 +398,992 @@ class IcebergManager:
         if table_property not in permitted_values:
             raise InvalidTablePropertyError(f"Invalid table_property: {table_property}. Allowed values are {', '.join(permitted_values)}.")
 
-        get_property_query = f"SELECT * FROM {self.connector.catalog_name}.{database_name}.{table_name}${table_property};"
-
         try:
+            if isinstance(self.connector, PyIcebergConnector):
+                return self.connector.metadata(database_name, table_name, table_property)
+            get_property_query = self.sql_builder.select_metadata(self.catalog_name, database_name, table_name, table_property)
             return self.connector.query(query=get_property_query)
         except Exception as e:
             raise MetadataRetrievalError(str(e)) from e
 
-    def insert_bulk_table_data(self, source_table, database_name: str, table_name: str):
+    @_operation
+    def cached_query(self, query: str, tables: List[Tuple[str, str]]):
+        """
+        Executes a read-only query through the connector local result cache.
+
+        The current snapshot ID of every table read by the query is resolved first and used as the cache version, so a
+        cached result is served for as long as none of the tables changes and is invalidated by their next commit.
+
+        Args:
+            query (str): The read-only query to execute.
+            tables (List[Tuple[str, str]]): The ``(database_name, table_name)`` pairs read by the query.
+
+        Returns:
+            CachedResult: The materialised query result.
+
+        Raises:
+            UnsupportedOperationError: If the connector has no local result cache configured.
+            MetadataRetrievalError: If the snapshot IDs cannot be retrieved.
+        """
+        if getattr(self.connector, "result_cache", None) is None:
+            raise UnsupportedOperationError("cached_query requires a connector with a local result cache.")
+
+        versions = []
+        for database_name, table_name in sorted(tables):
+            snapshot_query = self.sql_builder.select_current_snapshot(self.catalog_name, database_name, table_name)
+            try:
+                row = self.connector.query(snapshot_query, result_reuse=False).fetchone()
+            except Exception as e:
+                raise MetadataRetrievalError(str(e)) from e
+            versions.append(f"{database_name}.{table_name}@{row[0] if row else None}")
+
+        return self.connector.query(query, cache_version=",".join(versions))
+
+    @_operation
+    def read_table(
+        self,
+        database_name: str,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        predicate: Optional[str] = None,
+        limit: Optional[int] = None,
+        snapshot_id: Optional[int] = None,
+        as_of_timestamp: Optional[Timestamp] = None,
+        branch: Optional[str] = None,
+        tag: Optional[str] = None,
+    ):
+        """
+        Reads a table, optionally at a snapshot, point in time, branch or tag.
+
+        At most one of ``snapshot_id``, ``as_of_timestamp``, ``branch`` and ``tag`` can be given. On the PyIceberg
+        connector the table is scanned into Arrow; the other connectors run a time travel query.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            columns (Optional[List[str]]): The columns to read. Defaults to all columns.
+            predicate (Optional[str]): A filter on the rows to read.
+            limit (Optional[int]): The maximum number of rows to read.
+            snapshot_id (Optional[int]): The snapshot to read.
+            as_of_timestamp (Optional[Timestamp]): Read the snapshot current at this time. Naive values are read as UTC.
+            branch (Optional[str]): Read the head of a branch.
+            tag (Optional[str]): Read the snapshot of a tag.
+
+        Returns:
+            The rows read, as returned by the connector.
+
+        Raises:
+            ValueError: If more than one version selector is given.
+            UnsupportedOperationError: If the connector cannot read branches or tags.
+        """
+        if isinstance(self.connector, PyIcebergConnector):
+            selected_fields = tuple(columns) if columns else ("*",)
+            return self.connector.scan(
+                database_name,
+                table_name,
+                predicate,
+                selected_fields,
+                snapshot_id,
+                limit,
+                as_of_timestamp=as_of_timestamp,
+                branch=branch,
+                tag=tag,
+            )
+        read_table_query = self.sql_builder.select_table(
+            self.catalog_name,
+            database_name,
+            table_name,
+            columns,
+            predicate,
+            limit,
+            snapshot_id=snapshot_id,
+            as_of_timestamp=as_of_timestamp,
+            branch=branch,
+            tag=tag,
+        )
+        return self.connector.query(read_table_query)
+
+    @_operation
+    def current_snapshot_id(self, database_name: str, table_name: str, branch: Optional[str] = None) -> Optional[int]:
+        """
+        Retrieves the snapshot ID a branch of a table points to.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            branch (Optional[str]): The branch. Defaults to the ``main`` branch.
+
+        Returns:
+            Optional[int]: The snapshot ID, or None if the table or branch has no snapshot.
+
+        Raises:
+            MetadataRetrievalError: If the snapshot ID cannot be retrieved.
+        """
+        try:
+            if isinstance(self.connector, PyIcebergConnector):
+                table = self.connector.load_table(database_name, table_name)
+                snapshot = table.snapshot_by_name(branch or MAIN_BRANCH)
+                return snapshot.snapshot_id if snapshot else None
+            snapshot_query = self.sql_builder.select_current_snapshot(self.catalog_name, database_name, table_name, branch or MAIN_BRANCH)
+            row = self._first_row(self._query_fresh(snapshot_query))
+        except Exception as e:
+            raise MetadataRetrievalError(str(e)) from e
+        return row[0] if row else None
+
+    @_operation
+    def delete_where(self, database_name: str, table_name: str, predicate: str, branch: Optional[str] = None) -> DeleteReport:
+        """
+        Deletes the rows of a table matching a predicate and reports how the delete was carried out.
+
+        Data files entirely covered by the predicate, for instance because it selects whole partitions, are dropped as a
+        metadata-only operation. Files that only partially match are handled according to the ``write.delete.mode``
+        table property: ``merge-on-read`` writes delete files and ``copy-on-write`` rewrites the files. The PyIceberg
+        connector cannot write delete files and always rewrites partially matching files. The report is derived from
+        the summary of the snapshots the delete committed, found by walking the lineage of the table back to the
+        snapshot current before the delete, so snapshots committed concurrently by other writers are not reported.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            predicate (str): The rows to delete, as an SQL boolean expression. The PyIceberg connector also accepts a
+                PyIceberg ``BooleanExpression``.
+            branch (Optional[str]): The branch to delete from. Defaults to the main branch.
+
+        Returns:
+            DeleteReport: The mode used and the number of data files removed, rewritten and delete files added.
+
+        Raises:
+            DataDeletionError: If the delete fails.
+            MetadataRetrievalError: If the snapshot summaries cannot be retrieved.
+        """
+        if isinstance(self.connector, PyIcebergConnector):
+            try:
+                return self.connector.delete_where(database_name, table_name, predicate, branch=branch or MAIN_BRANCH)
+            except Exception as e:
+                raise DataDeletionError(str(e)) from e
+
+        delete_query = self.sql_builder.delete_from(self.catalog_name, database_name, table_name, predicate, branch=branch)
+        before = self.current_snapshot_id(database_name, table_name, branch)
+        try:
+            self.connector.query(delete_query)
+        except Exception as e:
+            raise DataDeletionError(str(e)) from e
+        after = self.current_snapshot_id(database_name, table_name, branch)
+        if after is None or after == before:
+            return DeleteReport(mode="noop", rows_deleted=0)
+
+        lineage_query = self.sql_builder.select_snapshot_lineage(self.catalog_name, database_name, table_name)
+        try:
+            lineage = {row[0]: (row[1], row[2]) for row in self._all_rows(self._query_fresh(lineage_query))}
+        except Exception as e:
+            raise MetadataRetrievalError(str(e)) from e
+        snapshot_id = after
+        while snapshot_id in lineage and lineage[snapshot_id][0] != before:
+            snapshot_id = lineage[snapshot_id][0]
+        if snapshot_id not in lineage or lineage[snapshot_id][1] not in ("delete", "overwrite"):
+            return DeleteReport(mode="noop", rows_deleted=0)
+
+        summary_query = self.sql_builder.select_snapshot_summary(self.catalog_name, database_name, table_name, snapshot_id)
+        try:
+            row = self._first_row(self._query_fresh(summary_query))
+        except Exception as e:
+            raise MetadataRetrievalError(str(e)) from e
+        return DeleteReport.from_snapshot_summaries([parse_summary(row[0]) if row else {}])
+
+    @_operation
+    def expire_snapshots(self, database_name: str, table_name: str, older_than: Timestamp) -> Optional[int]:
+        """
+        Expires the snapshots of a table committed before a point in time, keeping the current snapshot.
+
+        Expiring the snapshots that still reference deleted data files lets the files be reclaimed. On Athena the
+        statement is ``VACUUM``, which expires snapshots according to the ``vacuum_max_snapshot_age_seconds`` table
+        property rather than ``older_than``.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            older_than (Timestamp): Snapshots committed before this instant are expired. Naive values are read as UTC.
+
+        Returns:
+            Optional[int]: The number of snapshots expired, or None if the connector does not report it.
+
+        Raises:
+            SnapshotExpirationError: If the snapshots cannot be expired.
+        """
+        try:
+            if isinstance(self.connector, PyIcebergConnector):
+                return self.connector.expire_snapshots(database_name, table_name, to_utc_datetime(older_than))
+            expire_snapshots_query = self.sql_builder.expire_snapshots(self.catalog_name, database_name, table_name, older_than)
+            self.connector.query(expire_snapshots_query)
+        except Exception as e:
+            raise SnapshotExpirationError(str(e)) from e
+        return None
+
+    @_operation
+    def set_table_properties(self, database_name: str, table_name: str, properties: Dict[str, str]):
+        """
+        Sets properties of an existing table.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            properties (Dict[str, str]): The properties to set.
+
+        Raises:
+            InvalidTablePropertyError: If the properties cannot be set.
+        """
+        try:
+            if isinstance(self.connector, PyIcebergConnector):
+                self.connector.set_properties(database_name, table_name, properties)
+            else:
+                self.connector.query(self.sql_builder.set_table_properties(self.catalog_name, database_name, table_name, properties))
+        except Exception as e:
+            raise InvalidTablePropertyError(str(e)) from e
+
+    @_operation
+    def configure_metrics(self, database_name: str, table_name: str, metrics: ColumnMetricsConfigModel):
+        """
+        Configures the metrics modes and bloom filters of the columns of an existing table.
+
+        Manifests keep full statistics for every column by default, which bloats the manifests of wide tables and slows
+        down planning; lowering the mode of the columns never filtered on, e.g. ``default_mode="counts"`` with
+        ``full`` for the filter columns, keeps them small. Bloom filters let point lookups on high-cardinality columns
+        skip row groups whose min/max range contains the value. Only files written afterwards are affected, and PyIceberg
+        writers honour the metrics modes but do not write bloom filters yet.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            metrics (ColumnMetricsConfigModel): The metrics modes and bloom filters.
+
+        Raises:
+            InvalidTablePropertyError: If the properties cannot be set.
+        """
+        properties = metrics.table_properties()
+        if properties:
+            self.set_table_properties(database_name, table_name, properties)
+
+    @_operation
+    def configure_parquet(self, database_name: str, table_name: str, parquet: ParquetWriterConfigModel):
+        """
+        Configures the Parquet writer settings of an existing table: codec, compression level, page, row group and
+        dictionary sizes. Only files written afterwards, including by compactions, are affected.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            parquet (ParquetWriterConfigModel): The writer settings.
+
+        Raises:
+            InvalidTablePropertyError: If the properties cannot be set.
+        """
+        properties = parquet.table_properties()
+        if properties:
+            self.set_table_properties(database_name, table_name, properties)
+
+    @contextmanager
+    def parquet_writes(self, parquet: ParquetWriterConfigModel):
+        """
+        Applies Parquet writer settings to the writes of the calling thread within the block, over those of the tables.
+
+        Spark applies only the codec and compression level per write, through the ``spark.sql.iceberg.compression-*``
+        session settings, which are shared by the statements running concurrently on the session. PyIceberg writes
+        apply every setting but ``row_group_size_bytes``, and ``row_group_rows`` instead.
+
+        Args:
+            parquet (ParquetWriterConfigModel): The writer settings.
+
+        Yields:
+            None
+
+        Raises:
+            UnsupportedOperationError: If the connector cannot apply one of the settings per write.
+        """
+        settings = parquet.model_dump(exclude_none=True)
+        if isinstance(self.connector, AthenaConnector):
+            raise UnsupportedOperationError("Athena writes follow the table properties only.")
+        if isinstance(self.connector, PyIcebergConnector):
+            unsupported = sorted(set(settings) & {"row_group_size_bytes"})
+        else:
+            unsupported = sorted(set(settings) - {"codec", "compression_level"})
+        if unsupported:
+            raise UnsupportedOperationError(f"{type(self.connector).__name__} cannot apply {', '.join(unsupported)} per write.")
+
+        if isinstance(self.connector, PyIcebergConnector):
+            with self.connector.writer_properties(parquet.table_properties()):
+                yield
+            return
+        session_settings = {
+            key: str(value)
+            for key, value in (
+                ("spark.sql.iceberg.compression-codec", parquet.codec),
+                ("spark.sql.iceberg.compression-level", parquet.compression_level),
+            )
+            if value is not None
+        }
+        with self.connector.tuned(session_settings):
+            yield
+
+    @_operation
+    def benchmark_parquet(
+        self,
+        database_name: str,
+        table_name: str,
+        candidates: Dict[str, ParquetWriterConfigModel],
+        sample_rows: int = 1_000_000,
+        predicate: Optional[str] = None,
+        repeats: int = 1,
+        directory: Optional[str] = None,
+    ) -> List[ParquetBenchmarkResult]:
+        """
+        Compares Parquet writer settings on a sample of a table; see ``benchmark_parquet`` in ``utils.parquet_benchmark``.
+
+        The sample is read into Arrow, through an ``UNLOAD`` on Athena, and written locally with the Arrow Parquet
+        writer under every candidate, reporting the file size, the write throughput and the scan throughput of each.
+        Spark writes through parquet-java, so absolute figures differ from those of the cluster, but codecs, levels
+        and sizes rank the same way.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            candidates (Dict[str, ParquetWriterConfigModel]): The settings compared, by name.
+            sample_rows (int): The maximum number of rows sampled.
+            predicate (Optional[str]): A filter on the rows sampled, e.g. a recent partition.
+            repeats (int): The number of times every candidate is written and scanned; the fastest run is kept.
+            directory (Optional[str]): The local directory the files are written in.
+
+        Returns:
+            List[ParquetBenchmarkResult]: The result of every candidate, in the order given.
+
+        Raises:
+            MetadataRetrievalError: If the sample cannot be read.
+        """
+        try:
+            if isinstance(self.connector, AthenaConnector):
+                sample_query = self.sql_builder.select_table(self.catalog_name, database_name, table_name, None, predicate, sample_rows)
+                sample = self.connector.export(sample_query).to_table()
+            else:
+                sample = self.read_table(database_name, table_name, predicate=predicate, limit=sample_rows)
+                if hasattr(sample, "toArrow"):
+                    sample = sample.toArrow()
+                elif not isinstance(sample, pa.Table):
+                    # DataFrame.toArrow needs Spark 4; the sample is small enough to go through rows on Spark 3.
+                    sample = pa.Table.from_pylist([row.asDict(recursive=True) for row in sample.collect()])
+        except Exception as e:
+            raise MetadataRetrievalError(str(e)) from e
+        return benchmark_parquet(sample, candidates, directory=directory, repeats=repeats)
+
+    @_operation
+    def metrics_width_report(self, database_name: str, table_name: str) -> MetricsWidthReport:
+        """
+        Measures how much column statistics the manifests of a table carry.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+
+        Returns:
+            MetricsWidthReport: The number and size of the manifests and the width of the data file statistics.
+
+        Raises:
+            MetadataRetrievalError: If the statistics cannot be retrieved.
+        """
+        try:
+            if isinstance(self.connector, PyIcebergConnector):
+                return self.connector.metrics_width(database_name, table_name)
+            files, value_counts, bounds, bounds_bytes = self._first_row(
+                self.connector.query(self.sql_builder.select_metrics_width(self.catalog_name, database_name, table_name))
+            )
+            manifests, manifest_bytes = self._first_row(
+                self.connector.query(self.sql_builder.select_manifest_sizes(self.catalog_name, database_name, table_name))
+            )
+        except Exception as e:
+            raise MetadataRetrievalError(str(e)) from e
+        return MetricsWidthReport(
+            files=files,
+            manifests=manifests,
+            manifest_bytes=manifest_bytes,
+            value_count_columns=value_counts / max(files, 1),
+            bounds_columns=bounds / max(files, 1),
+            bounds_bytes=bounds_bytes,
+        )
+
+    @_operation
+    def skipping_report(self, database_name: str, table_name: str, columns: List[str]) -> SkippingReport:
+        """
+        Estimates how well the min/max statistics of some columns let queries skip the data files of a table.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            columns (List[str]): The columns.
+
+        Returns:
+            SkippingReport: The number of data files and, per column, the mean fraction of files a lookup reads.
+
+        Raises:
+            MetadataRetrievalError: If the file statistics cannot be retrieved.
+        """
+        try:
+            if isinstance(self.connector, PyIcebergConnector):
+                rows = self.connector.column_bounds(database_name, table_name, columns)
+            else:
+                bounds_query = self.sql_builder.select_column_bounds(self.catalog_name, database_name, table_name, columns)
+                rows = self._all_rows(self.connector.query(bounds_query))
+        except Exception as e:
+            raise MetadataRetrievalError(str(e)) from e
+        return SkippingReport(
+            files=len(rows),
+            files_read_fraction={
+                column: files_read_fraction([(row[2 * index + 1], row[2 * index + 2]) for row in rows])
+                for index, column in enumerate(columns)
+            },
+        )
+
+    @_operation
+    def compact_table(
+        self,
+        database_name: str,
+        table_name: str,
+        strategy: str = "binpack",
+        columns: Optional[List[str]] = None,
+        predicate: Optional[str] = None,
+    ) -> ClusteringReport:
+        """
+        Compacts the data files of a table, optionally clustering the rows by sort or Z-order.
+
+        The ``sort`` strategy sorts by ``columns``, or by the table sort order when no columns are given, and suits
+        filters on the leading column. ``zorder`` interleaves ``columns`` and suits filters on any of them. Both make the
+        min/max statistics of the clustered columns tight, so filters on them skip files even when they are not
+        partition columns. The report measures the file skipping effectiveness of ``columns`` before and after; it is
+        not available on Athena, which only supports ``binpack``.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            strategy (str): ``binpack``, ``sort`` or ``zorder``.
+            columns (Optional[List[str]]): The clustering columns of the ``sort`` and ``zorder`` strategies.
+            predicate (Optional[str]): Restricts the compaction to the files holding matching rows, e.g. a partition.
+
+        Returns:
+            ClusteringReport: The strategy, the columns and the skipping reports before and after the compaction.
+
+        Raises:
+            CompactionError: If the compaction fails.
+            MetadataRetrievalError: If the file statistics cannot be retrieved.
+            UnsupportedOperationError: If the connector does not support the strategy.
+        """
+        columns = columns or []
+        reported = not isinstance(self.connector, AthenaConnector)
+        before = self.skipping_report(database_name, table_name, columns) if reported else None
+        compaction_query = None
+        if not isinstance(self.connector, PyIcebergConnector):
+            compaction_query = self.sql_builder.rewrite_data_files(
+                self.catalog_name, database_name, table_name, strategy, columns, predicate
+            )
+        try:
+            if compaction_query is None:
+                self.connector.rewrite_data_files(database_name, table_name, strategy, columns, predicate)
+            else:
+                self.connector.query(compaction_query)
+        except Exception as e:
+            raise CompactionError(str(e)) from e
+        after = self.skipping_report(database_name, table_name, columns) if reported else None
+        return ClusteringReport(strategy=strategy, columns=columns, before=before, after=after)
+
+    @_operation
+    def advise_write_modes(
+        self,
+        database_name: str,
+        table_name: str,
+        policy: Optional[WriteModePolicyModel] = None,
+        reads_per_write: Optional[float] = None,
+        apply: bool = False,
+    ) -> WriteModeAdvice:
+        """
+        Recommends copy-on-write or merge-on-read for the row-level writes of a table, and a compaction cadence, from
+        its recent snapshot history; see ``advise_write_modes`` in ``utils.write_modes``.
+
+        Tables whose merges rewrite a large share of their files, or merge very often, are better served by
+        merge-on-read; tables mostly read, or rarely merged, by copy-on-write, which keeps scans free of delete files.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            policy (Optional[WriteModePolicyModel]): The thresholds of the advice. Defaults to the model defaults.
+            reads_per_write (Optional[float]): The number of scans of the table per row-level commit, when known from
+                query logs.
+            apply (bool): Whether to set the recommended ``write.*.mode`` properties when they differ from the current ones.
+
+        Returns:
+            WriteModeAdvice: The telemetry, the current and recommended modes and the compaction cadence.
+
+        Raises:
+            MetadataRetrievalError: If the snapshot history or the table properties cannot be retrieved.
+            InvalidTablePropertyError: If the recommended properties cannot be set.
+        """
+        try:
+            if isinstance(self.connector, PyIcebergConnector):
+                table = self.connector.load_table(database_name, table_name)
+                snapshots = [
+                    (
+                        datetime.fromtimestamp(snapshot.timestamp_ms / 1000, timezone.utc),
+                        snapshot.summary.operation.value if snapshot.summary else "",
+                        snapshot.summary.additional_properties if snapshot.summary else {},
+                    )
+                    for snapshot in sorted(table.metadata.snapshots, key=lambda snapshot: snapshot.timestamp_ms)
+                ]
+                properties = dict(table.properties)
+            else:
+                history_query = self.sql_builder.select_snapshot_history(self.catalog_name, database_name, table_name)
+                snapshots = [
+                    (to_utc_datetime(row[0]), row[1], parse_summary(row[2])) for row in self._all_rows(self._query_fresh(history_query))
+                ]
+                properties = self.get_table_metadata(database_name, table_name).properties
+        except Exception as e:
+            raise MetadataRetrievalError(str(e)) from e
+        advice = advise_write_modes(database_name, table_name, snapshots, properties, policy or WriteModePolicyModel(), reads_per_write)
+        if apply and advice.recommended != advice.current:
+            self.set_table_properties(database_name, table_name, advice.recommended)
+            advice.applied = True
+        return advice
+
+    @_operation
+    def apply_retention(
+        self, policies: List[RetentionPolicyModel], now: Optional[datetime] = None, max_workers: int = 4
+    ) -> List[RetentionReport]:
+        """
+        Applies a batch of partition retention policies; see RetentionManager.
+
+        Args:
+            policies (List[RetentionPolicyModel]): The retention policies.
+            now (Optional[datetime]): The reference time shared by every policy. Defaults to the current time.
+            max_workers (int): The number of tables processed concurrently.
+
+        Returns:
+            List[RetentionReport]: One report per policy, in the order of ``policies``.
+        """
+        return RetentionManager(self, max_workers).apply_retention(policies, now)
+
+    @_operation
+    def compare_tables(
+        self,
+        source: Tuple[str, str],
+        target: Tuple[str, str],
+        keys: List[str],
+        columns: Optional[List[str]] = None,
+        partition_columns: Optional[List[str]] = None,
+        sample_size: int = 20,
+    ) -> TableComparisonReport:
+        """
+        Compares the rows of two tables, e.g. a load target against its source; see TableComparator.
+
+        Per-group row counts and hash digests are compared first, and only the mismatching groups are compared key by
+        key, which is much cheaper than a full outer join of the tables.
+
+        Args:
+            source (Tuple[str, str]): The ``(database_name, table_name)`` of the source table.
+            target (Tuple[str, str]): The ``(database_name, table_name)`` of the target table.
+            keys (List[str]): The columns identifying a row in both tables.
+            columns (Optional[List[str]]): The columns compared. Defaults to every column; required on Athena.
+            partition_columns (Optional[List[str]]): The columns grouping the first pass. Defaults to buckets of the key
+                hash.
+            sample_size (int): The maximum number of differing keys reported.
+
+        Returns:
+            TableComparisonReport: The row counts, the mismatching groups and the differing keys found in them.
+
+        Raises:
+            MetadataRetrievalError: If a table cannot be read.
+        """
+        try:
+            return TableComparator(self, sample_size=sample_size).compare(source, target, keys, columns, partition_columns)
+        except Exception as e:
+            raise MetadataRetrievalError(str(e)) from e
+
+    @_operation
+    def create_summary_table(
+        self,
+        database_name: str,
+        table_name: str,
+        summary: SummaryTableModel,
+        s3_folder_location: str,
+        partition_column: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Creates a summary table aggregating a source table, refreshed incrementally by ``refresh_summary_table``; see
+        SummaryTables.
+
+        Args:
+            database_name (str): The name of the database where the summary table will be created.
+            table_name (str): The name of the summary table.
+            summary (SummaryTableModel): The source table, grouping columns and aggregates of the summary.
+            s3_folder_location (str): The S3 location where the summary table data will be stored.
+            partition_column (Optional[str]): A grouping column or partition transform partitioning the summary.
+
+        Returns:
+            Optional[int]: The source snapshot aggregated, None when the source has no snapshot yet.
+
+        Raises:
+            UnsupportedOperationError: If the connector cannot read the rows appended by a range of snapshots.
+            TableCreationError: If the summary table cannot be created.
+        """
+        self._check_summary_tables()
+        try:
+            return SummaryTables(self).create(database_name, table_name, summary, s3_folder_location, partition_column)
+        except Exception as e:
+            raise TableCreationError(str(e)) from e
+
+    @_operation
+    def refresh_summary_table(self, database_name: str, table_name: str, full: bool = False) -> SummaryRefreshReport:
+        """
+        Brings a summary table up to date with its source; see SummaryTables.
+
+        Only the rows appended since the last refresh are aggregated and merged into the summary, instead of rebuilding
+        it from months of history. Snapshots deleting or overwriting source rows trigger a full recomputation.
+
+        Args:
+            database_name (str): The name of the database containing the summary table.
+            table_name (str): The name of the summary table.
+            full (bool): Recompute the summary from the whole source table.
+
+        Returns:
+            SummaryRefreshReport: How the summary was refreshed and the source snapshots it covers.
+
+        Raises:
+            UnsupportedOperationError: If the connector cannot read the rows appended by a range of snapshots.
+            SummaryRefreshError: If the table is not a summary table or the refresh fails.
+        """
+        self._check_summary_tables()
+        try:
+            return SummaryTables(self).refresh(database_name, table_name, full)
+        except Exception as e:
+            raise SummaryRefreshError(str(e)) from e
+
+    @_operation
+    def export_catalog_metadata(self, path: str, databases: Optional[List[str]] = None, max_workers: int = 8) -> CatalogExportReport:
+        """
+        Exports the snapshots, file counts, sizes, partition counts, schema and properties of every table of the catalog
+        to one Parquet file; see MetadataExporter.
+
+        Later runs refresh the same file, summarising again only the tables whose metadata location changed, so
+        catalog-wide health checks become a single query over the export.
+
+        Args:
+            path (str): The Parquet file, a local path or a filesystem URI such as ``s3://bucket/catalog.parquet``.
+            databases (Optional[List[str]]): The databases exported. Defaults to every database.
+            max_workers (int): The number of tables summarised concurrently.
+
+        Returns:
+            CatalogExportReport: The number of tables exported, refreshed, unchanged and removed, and the tables whose
+            metadata could not be collected.
+
+        Raises:
+            UnsupportedOperationError: On Athena, which does not expose the metadata location of a table.
+            MetadataRetrievalError: If the catalog cannot be listed or the export cannot be written.
+        """
+        if isinstance(self.connector, AthenaConnector):
+            raise UnsupportedOperationError("Athena does not expose the metadata location of a table.")
+        try:
+            return MetadataExporter(self, max_workers).export(path, databases)
+        except Exception as e:
+            raise MetadataRetrievalError(str(e)) from e
+
+    def running_operations(self) -> Dict[str, str]:
+        """
+        Lists the operations of the managers sharing the Spark session that are still running.
+
+        Returns:
+            Dict[str, str]: The description of every running operation, such as ``insert_bulk_table_data db.orders``,
+            by Spark job group.
+
+        Raises:
+            UnsupportedOperationError: If the connector does not track its operations.
+        """
+        self._check_operations()
+        return self.connector.running_operations()
+
+    def cancel_operation(self, group_id: str) -> bool:
+        """
+        Cancels a running operation, typically from another thread; the operation fails with an
+        ``OperationCancelledError``.
+
+        Args:
+            group_id (str): The Spark job group of the operation, from ``running_operations``.
+
+        Returns:
+            bool: Whether the operation was running.
+
+        Raises:
+            UnsupportedOperationError: If the connector cannot cancel its operations.
+        """
+        self._check_operations()
+        return self.connector.cancel(group_id)
+
+    @contextmanager
+    def pinned_session(self, tables: List[Tuple[str, str]]):
+        """
+        Opens a session reading every given table at the snapshot it has now.
+
+        Snapshots are resolved once, when the session opens, so multi-table reads through the session are consistent
+        and do not resolve the current table metadata on every statement.
+
+        Args:
+            tables (List[Tuple[str, str]]): The ``(database_name, table_name)`` pairs to pin.
+
+        Yields:
+            PinnedSession: The session.
+
+        Raises:
+            MetadataRetrievalError: If a snapshot ID cannot be retrieved.
+        """
+        snapshots = {}
+        loaded_tables = {}
+        for database_name, table_name in tables:
+            if isinstance(self.connector, PyIcebergConnector):
+                try:
+                    table = self.connector.load_table(database_name, table_name)
+                    snapshots[(database_name, table_name)] = self.connector.resolve_snapshot_id(table)
+                except Exception as e:
+                    raise MetadataRetrievalError(str(e)) from e
+                loaded_tables[(database_name, table_name)] = table
+            else:
+                snapshots[(database_name, table_name)] = self.current_snapshot_id(database_name, table_name)
+        yield PinnedSession(self, snapshots, loaded_tables)
+
+    @_operation
+    def create_branch(self, database_name: str, table_name: str, branch: str, snapshot_id: Optional[int] = None):
+        """
+        Creates a branch of a table, unless it already exists.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            branch (str): The name of the branch.
+            snapshot_id (Optional[int]): The snapshot the branch starts from. Defaults to the current snapshot.
+
+        Raises:
+            UnsupportedOperationError: If the connector cannot manage branches.
+        """
+        if isinstance(self.connector, PyIcebergConnector):
+            self.connector.create_branch(database_name, table_name, branch, snapshot_id)
+            return
+        self.connector.query(self.sql_builder.create_branch(self.catalog_name, database_name, table_name, branch, snapshot_id))
+
+    @_operation
+    def drop_branch(self, database_name: str, table_name: str, branch: str):
+        """
+        Drops a branch of a table, if it exists. Its snapshots are removed by the next snapshot expiration.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            branch (str): The name of the branch.
+
+        Raises:
+            UnsupportedOperationError: If the connector cannot manage branches.
+        """
+        if isinstance(self.connector, PyIcebergConnector):
+            self.connector.drop_branch(database_name, table_name, branch)
+            return
+        self.connector.query(self.sql_builder.drop_branch(self.catalog_name, database_name, table_name, branch))
+
+    @_operation
+    def create_tag(self, database_name: str, table_name: str, tag: str, snapshot_id: Optional[int] = None):
+        """
+        Tags a snapshot of a table, unless the tag already exists.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            tag (str): The name of the tag.
+            snapshot_id (Optional[int]): The snapshot to tag. Defaults to the current snapshot.
+
+        Raises:
+            UnsupportedOperationError: If the connector cannot manage tags.
+        """
+        if isinstance(self.connector, PyIcebergConnector):
+            self.connector.create_tag(database_name, table_name, tag, snapshot_id)
+            return
+        self.connector.query(self.sql_builder.create_tag(self.catalog_name, database_name, table_name, tag, snapshot_id))
+
+    @_operation
+    def publish_branch(self, database_name: str, table_name: str, branch: str):
+        """
+        Fast-forwards the ``main`` branch of a table to the head of another branch.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            branch (str): The branch to publish.
+
+        Raises:
+            UnsupportedOperationError: If the connector cannot manage branches.
+            BranchPublishError: If ``main`` has diverged from the branch or the publish fails.
+        """
+        if isinstance(self.connector, PyIcebergConnector):
+            self.connector.fast_forward(database_name, table_name, branch)
+            return
+        fast_forward_query = self.sql_builder.fast_forward(self.catalog_name, database_name, table_name, branch)
+        try:
+            self.connector.query(fast_forward_query)
+        except Exception as e:
+            raise BranchPublishError(str(e)) from e
+
+    @contextmanager
+    def write_audit_publish(self, database_name: str, table_name: str, branch: Optional[str] = None):
+        """
+        Stages writes on a branch and publishes them to ``main`` only if the block completes.
+
+        Inside the block, pass the yielded branch name to the write methods and validate the result with
+        ``read_table(..., branch=branch)``; readers of ``main`` see none of it. When the block exits normally ``main`` is
+        fast-forwarded to the branch. The branch is dropped in every case, so raising inside the block discards the
+        staged writes.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            branch (Optional[str]): The name of the audit branch. Defaults to a unique name.
+
+        Yields:
+            str: The name of the audit branch.
+
+        Raises:
+            UnsupportedOperationError: If the connector cannot manage branches.
+            BranchPublishError: If ``main`` has diverged from the branch or the publish fails.
+        """
+        branch = branch or f"audit_{uuid.uuid4().hex[:12]}"
+        self.create_branch(database_name, table_name, branch)
+        try:
+            yield branch
+            self.publish_branch(database_name, table_name, branch)
+        finally:
+            self.drop_branch(database_name, table_name, branch)
+
+    @_operation
+    def insert_bulk_table_data(
+        self, source_table, database_name: str, table_name: str, persist: bool = False, branch: Optional[str] = None
+    ):
         """
         Inserts data from a source table into a specified table, deleting existing data first.
 
+        A Spark DataFrame or Arrow table source replaces the table contents through ``DataFrameWriterV2.overwrite`` in a
+        single commit, so the source is evaluated only once. On the PyIceberg connector, Arrow tables and record batch
+        streams are written natively.
+
         Args:
-            source_table: The source table to copy data from.
+            source_table: The source table name, Spark DataFrame or Arrow table to copy data from.
             database_name (str): The name of the database containing the target table.
             table_name (str): The name of the target table.
+            persist (bool): Whether to persist a DataFrame source for the duration of the write.
+            branch (Optional[str]): The branch to write to. Defaults to the main branch.
         """
-        truncate_table_query = f"""DELETE FROM {self.connector.catalog_name}.{database_name}.{table_name};"""
+        if isinstance(source_table, str):
+            truncate_table_query = self.sql_builder.delete_from(self.catalog_name, database_name, table_name, branch=branch)
+            insert_table_query = self.sql_builder.insert_select(self.catalog_name, database_name, table_name, source_table, branch=branch)
+
+            with self._tuned_write(source_table, database_name, table_name):
+                self.connector.query(truncate_table_query)
+                self.connector.query(insert_table_query)
+            return
 
-        insert_table_query = f"""
-            INSERT INTO {self.connector.catalog_name}.{database_name}.{table_name}
-            SELECT * FROM {source_table}
-            """
+        if isinstance(self.connector, PyIcebergConnector):
+            self.connector.overwrite(database_name, table_name, source_table, branch=branch or MAIN_BRANCH)
+            return
 
-        self.connector.query(truncate_table_query)
-        self.connector.query(insert_table_query)
+        with self._dataframe_source(source_table, persist) as source, self._tuned_write(source, database_name, table_name):
+            writer = source.writeTo(self._table_identifier(database_name, table_name, branch))
+            self._call_with_retry(writer.overwrite, F.lit(True))
 
-    def insert_incremental_table_data(self, source_table, database_name: str, table_name: str):
+    @_operation
+    def insert_incremental_table_data(
+        self, source_table, database_name: str, table_name: str, persist: bool = False, branch: Optional[str] = None
+    ):
         """
         Inserts new data from a source table into a specified table without deleting existing data.
 
+        A Spark DataFrame or Arrow table source is written through ``DataFrameWriterV2.append``. On the PyIceberg
+        connector, Arrow tables and record batch streams are appended natively in bounded-memory chunks.
+
         Args:
-            source_table: The source table to copy data from.
+            source_table: The source table name, Spark DataFrame or Arrow table to copy data from.
             database_name (str): The name of the database containing the target table.
             table_name (str): The name of the target table.
+            persist (bool): Whether to persist a DataFrame source for the duration of the write.
+            branch (Optional[str]): The branch to write to. Defaults to the main branch.
         """
-        insert_table_query = f"""
-            INSERT INTO {self.connector.catalog_name}.{database_name}.{table_name}
-            SELECT * FROM {source_table}
-            """
+        if isinstance(source_table, str):
+            insert_table_query = self.sql_builder.insert_select(self.catalog_name, database_name, table_name, source_table, branch=branch)
 
-        self.connector.query(insert_table_query)
+            with self._tuned_write(source_table, database_name, table_name):
+                self.connector.query(insert_table_query)
+            return
 
+        if isinstance(self.connector, PyIcebergConnector):
+            self.connector.append(database_name, table_name, source_table, branch=branch or MAIN_BRANCH)
+            return
+
+        with self._dataframe_source(source_table, persist) as source, self._tuned_write(source, database_name, table_name):
+            writer = source.writeTo(self._table_identifier(database_name, table_name, branch))
+            self._call_with_retry(writer.append)
+
+    @_operation
+    def overwrite_partitions_table_data(
+        self, source_table, database_name: str, table_name: str, persist: bool = False, branch: Optional[str] = None
+    ):
+        """
+        Replaces the partitions present in a DataFrame source, leaving the other partitions of the table untouched.
+
+        The source is written through ``DataFrameWriterV2.overwritePartitions`` in a single commit, or through a dynamic
+        partition overwrite on the PyIceberg connector.
+
+        Args:
+            source_table: The Spark DataFrame or Arrow table to write.
+            database_name (str): The name of the database containing the target table.
+            table_name (str): The name of the target table.
+            persist (bool): Whether to persist the source for the duration of the write.
+            branch (Optional[str]): The branch to write to. Defaults to the main branch.
+
+        Raises:
+            UnsupportedOperationError: If the connector cannot write DataFrames.
+        """
+        if isinstance(self.connector, PyIcebergConnector):
+            self.connector.overwrite_partitions(database_name, table_name, source_table, branch=branch or MAIN_BRANCH)
+            return
+
+        with self._dataframe_source(source_table, persist) as source, self._tuned_write(source, database_name, table_name):
+            writer = source.writeTo(self._table_identifier(database_name, table_name, branch))
+            self._call_with_retry(writer.overwritePartitions)
+
+    @_operation
     def upsert_delta_table_data(
-        self, source_table, database_name: str, table_name: str, primary_key: str, order_col: str, source_table_pk: Optional[str] = None
+        self,
+        source_table,
+        database_name: str,
+        table_name: str,
+        primary_key: str,
+        order_col: str,
+        source_table_pk: Optional[str] = None,
+        persist: bool = False,
+        branch: Optional[str] = None,
     ):
         """
         Performs an upsert operation to merge data from a source table into a specified table.
 
+        A Spark DataFrame or Arrow table source is merged through ``DataFrame.mergeInto`` (Spark 4 and later), or on
+        older Spark versions through a private temporary view registered for the duration of the merge, so callers do
+        not need to manage views themselves. On the PyIceberg connector, an Arrow delta is merged natively, rewriting
+        only the data files whose key statistics may match the delta.
+
         Args:
-            source_table: The source table to merge data from.
+            source_table: The source table name, Spark DataFrame or Arrow table to merge data from.
             database_name (str): The name of the database containing the target table.
             table_name (str): The name of the target table.
             primary_key (str): The primary key column used for matching rows.
             order_col (str): The column used for ordering rows.
             source_table_pk (Optional[str]): The primary key column in the source table. Defaults to `primary_key` if not provided.
+            persist (bool): Whether to persist a DataFrame source for the duration of the merge.
+            branch (Optional[str]): The branch to merge into. Defaults to the main branch.
 
         Raises:
             Exception: If the merge query execution fails.
@@ -235,25 +1391,262 @@ class IcebergManager:
         if source_table_pk is None or source_table_pk == "":
             source_table_pk = primary_key
 
-        merge_delta_query = f"""MERGE INTO {self.connector.catalog_name}.{database_name}.{table_name} AS iceberg_table
-                USING (
-                    SELECT *
-                        FROM (
-                            SELECT
-                                *,
-                                ROW_NUMBER() OVER (PARTITION BY {primary_key} ORDER BY {order_col} DESC ) AS row_rank
-                            FROM
-                                {source_table}
-                        )
-                    WHERE row_rank = 1
-                ) AS temp_table
-                ON iceberg_table.{primary_key} = temp_table.{source_table_pk}
-                WHEN MATCHED AND avro_table.__action = 'd' THEN DELETE
-                WHEN MATCHED AND avro_table.__action = 'u' THEN UPDATE SET *
-                WHEN NOT MATCHED AND avro_table.__action != 'd' THEN INSERT *"""
-
-        self.connector.query(merge_delta_query)
+        if isinstance(source_table, str):
+            merge_delta_query = self.sql_builder.merge_delta(
+                self.catalog_name, database_name, table_name, source_table, primary_key, order_col, source_table_pk, branch=branch
+            )
+            with self._tuned_write(source_table, database_name, table_name):
+                self.connector.query(merge_delta_query)
+            return
+
+        if isinstance(self.connector, PyIcebergConnector):
+            self.connector.upsert(
+                database_name, table_name, source_table, primary_key, order_col, source_table_pk, branch=branch or MAIN_BRANCH
+            )
+            return
+
+        with self._dataframe_source(source_table, persist) as source:
+            if hasattr(source, "mergeInto"):
+                writer = self._merge_delta_writer(source, database_name, table_name, primary_key, order_col, source_table_pk, branch)
+                with self._tuned_write(source, database_name, table_name):
+                    self._call_with_retry(writer.merge)
+                return
+
+            view_name = f"keepice_source_{uuid.uuid4().hex}"
+            source.createOrReplaceTempView(view_name)
+            try:
+                merge_delta_query = self.sql_builder.merge_delta(
+                    self.catalog_name,
+                    database_name,
+                    table_name,
+                    view_name,
+                    primary_key,
+                    order_col,
+                    source_table_pk,
+                    branch=branch,
+                )
+                with self._tuned_write(source, database_name, table_name):
+                    self.connector.query(merge_delta_query)
+            finally:
+                self.connection.catalog.dropTempView(view_name)
+
+    def stream_incremental_table_data(self, source_stream, database_name: str, table_name: str, streaming: StreamingConfigModel):
+        """
+        Appends the micro-batches of a Spark streaming DataFrame to a table; see StreamIngestion.
+
+        Every micro-batch is committed with the stream and micro-batch IDs in its snapshot properties, so a micro-batch
+        replayed from the checkpoint after a failure is not appended twice.
+
+        Args:
+            source_stream (pyspark.sql.DataFrame): The streaming DataFrame.
+            database_name (str): The name of the database containing the target table.
+            table_name (str): The name of the target table.
+            streaming (StreamingConfigModel): The checkpoint, trigger and compaction settings.
+
+        Returns:
+            pyspark.sql.streaming.StreamingQuery: The running query.
+
+        Raises:
+            UnsupportedOperationError: If the connector has no Spark session.
+        """
+        self._check_streaming(source_stream)
+        return StreamIngestion(self, database_name, table_name, streaming).start(source_stream)
+
+    def stream_upsert_delta_table_data(
+        self,
+        source_stream,
+        database_name: str,
+        table_name: str,
+        primary_key: str,
+        order_col: str,
+        streaming: StreamingConfigModel,
+        source_table_pk: Optional[str] = None,
+    ):
+        """
+        Merges the CDC changes of a Spark streaming DataFrame into a table, one micro-batch at a time; see
+        StreamIngestion.
+
+        Changes are applied as soon as a micro-batch is read, like ``upsert_delta_table_data`` does for a batch source,
+        without landing them in a staging table first.
+
+        Args:
+            source_stream (pyspark.sql.DataFrame): The streaming DataFrame, with an ``__action`` column.
+            database_name (str): The name of the database containing the target table.
+            table_name (str): The name of the target table.
+            primary_key (str): The primary key column used for matching rows.
+            order_col (str): The column ordering the changes of a key.
+            streaming (StreamingConfigModel): The checkpoint, trigger and compaction settings.
+            source_table_pk (Optional[str]): The primary key column of the stream. Defaults to ``primary_key``.
+
+        Returns:
+            pyspark.sql.streaming.StreamingQuery: The running query.
+
+        Raises:
+            UnsupportedOperationError: If the connector has no Spark session.
+        """
+        self._check_streaming(source_stream)
+        ingestion = StreamIngestion(self, database_name, table_name, streaming, primary_key, order_col, source_table_pk)
+        return ingestion.start(source_stream)
+
+    def _check_summary_tables(self):
+        if isinstance(self.connector, (AthenaConnector, PyIcebergConnector)):
+            raise UnsupportedOperationError(f"{type(self.connector).__name__} cannot read the rows appended by a range of snapshots.")
+
+    def _check_operations(self):
+        if isinstance(self.connector, (AthenaConnector, PyIcebergConnector)):
+            raise UnsupportedOperationError(f"{type(self.connector).__name__} cannot track or cancel its operations.")
+
+    def _check_streaming(self, source_stream):
+        if not hasattr(self.connection, "readStream") or not hasattr(source_stream, "writeStream"):
+            raise UnsupportedOperationError(f"{type(self.connector).__name__} cannot write {type(source_stream).__name__} streams.")
+
+    def _merge_delta_writer(
+        self, source, database_name: str, table_name: str, primary_key: str, order_col: str, source_table_pk: str, branch: Optional[str]
+    ):
+        """Builds the ``DataFrame.mergeInto`` equivalent of ``SqlBuilder.merge_delta``."""
+        quote = self.sql_builder.quote
+        latest_first = Window.partitionBy(F.col(quote(source_table_pk))).orderBy(F.col(quote(order_col)).desc())
+        delta = source.withColumn("row_rank", F.row_number().over(latest_first)).where(F.col("row_rank") == 1).alias("temp_table")
+        target = quote(self.sql_builder.branch_identifier(branch) or table_name)
+        action = F.col(f"temp_table.{quote('__action')}")
+        condition = F.col(f"{target}.{quote(primary_key)}") == F.col(f"temp_table.{quote(source_table_pk)}")
+        return (
+            delta.mergeInto(self._table_identifier(database_name, table_name, branch), condition)
+            .whenMatched(action == "d")
+            .delete()
+            .whenMatched(action == "u")
+            .updateAll()
+            .whenNotMatched(action != "d")
+            .insertAll()
+        )
+
+    def _table_identifier(self, database_name: str, table_name: str, branch: Optional[str] = None) -> str:
+        return self.sql_builder.qualified_name(self.catalog_name, database_name, table_name, self.sql_builder.branch_identifier(branch))
+
+    @contextmanager
+    def _tuned_write(self, source, database_name: str, table_name: str):
+        """
+        Tunes the Spark settings of a write from the sizes of its source and target, when the connector is adaptive.
+
+        Table sizes are read from the summary of their current snapshot; DataFrame sizes from the Spark plan estimate.
+        When the size of the source is unknown, e.g. for Spark Connect DataFrames, the write runs untuned.
+
+        The settings are session wide, so the connector runs the tuned writes of a session one at a time: concurrent
+        writes through managers sharing the session wait for each other for their whole duration. Concurrent writers
+        use the managers returned by ``untuned``, which skip the tuning and the wait.
+
+        Args:
+            source: The source table name, Spark DataFrame or Arrow table.
+            database_name (str): The name of the database containing the target table.
+            table_name (str): The name of the target table.
+        """
+        adaptive = getattr(self.connector, "adaptive", None)
+        source_size = self._source_size(source) if adaptive is not None and self.adaptive_tuning else None
+        if source_size is None:
+            yield
+            return
+        settings = statement_settings(source_size, self._table_size(self.catalog_name, database_name, table_name), adaptive)
+        with self.connector.tuned(settings):
+            yield
+
+    def _source_size(self, source) -> Optional[int]:
+        if isinstance(source, str):
+            try:
+                catalog_name, database_name, table_name = split_table_identifier(source)
+                size = self._table_size(catalog_name or self.catalog_name, database_name, table_name)
+            except ValueError:
+                size = None
+            if size is not None:
+                return size
+            try:
+                source = self.connection.table(source)
+            except Exception:
+                return None
+        if hasattr(source, "nbytes"):
+            return source.nbytes
+        return self.connector.estimated_size(source)
+
+    def _table_size(self, catalog_name: Optional[str], database_name: str, table_name: str) -> Optional[int]:
+        try:
+            row = self._first_row(self._query_fresh(self.sql_builder.select_table_size(catalog_name, database_name, table_name)))
+        except Exception:
+            return None
+        return int(row[0]) if row and row[0] is not None else 0
+
+    def _metadata_location(self, database_name: str, table_name: str) -> Optional[str]:
+        if isinstance(self.connector, (AthenaConnector, PyIcebergConnector)):
+            return None
+        row = self._first_row(self._query_fresh(self.sql_builder.select_metadata_location(self.catalog_name, database_name, table_name)))
+        return row[0] if row else None
+
+    def _query_fresh(self, query: str):
+        if isinstance(self.connector, AthenaConnector):
+            return self.connector.query(query, result_reuse=False)
+        return self.connector.query(query)
+
+    @staticmethod
+    def _first_row(result):
+        return result.first() if hasattr(result, "first") else result.fetchone()
+
+    @staticmethod
+    def _all_rows(result) -> list:
+        return result.collect() if hasattr(result, "collect") else result.fetchall()
+
+    def _call_with_retry(self, func, *args):
+        """
+        Runs a single-statement write, such as a DataFrame append or merge, rerunning it only after a commit conflict.
+
+        A conflicting commit leaves the table unchanged, so the write is rerun as a whole. Other errors are raised; see
+        ``RetryPolicy.call_write``.
+        """
+        retry_policy = getattr(self.connector, "retry_policy", None)
+        if retry_policy is None:
+            return func(*args)
+        return retry_policy.call_write(func, *args)
+
+    @contextmanager
+    def _dataframe_source(self, source, persist: bool):
+        """
+        Yields a write source as a Spark DataFrame, converting Arrow tables and optionally persisting it.
+
+        Args:
+            source: A Spark DataFrame or Arrow table.
+            persist (bool): Whether to persist the DataFrame until the context exits.
+
+        Raises:
+            UnsupportedOperationError: If the connector has no Spark session to write DataFrames with.
+        """
+        if not hasattr(self.connection, "createDataFrame"):
+            raise UnsupportedOperationError(f"{type(self.connector).__name__} cannot write {type(source).__name__} sources.")
+        if not hasattr(source, "writeTo"):
+            source = self.connection.createDataFrame(source)
+        if persist:
+            source.persist()
+        try:
+            yield source
+        finally:
+            if persist:
+                source.unpersist()
 
     def close(self):
         if hasattr(self.connection, "stop"):
             self.connection.stop()
+        self.connector.close()
+
+
+def parse_summary(summary) -> Dict[str, str]:
+    """
+    Normalises an Iceberg snapshot summary read through SQL.
+
+    Args:
+        summary: The summary as a mapping, or as the ``{key=value, ...}`` string some drivers return for map columns.
+
+    Returns:
+        Dict[str, str]: The summary.
+    """
+    if summary is None:
+        return {}
+    if isinstance(summary, str):
+        entries = (entry.partition("=") for entry in summary.strip().strip("{}").split(","))
+        return {key.strip(): value.strip() for key, _, value in entries if key.strip()}
+    return dict(summary)
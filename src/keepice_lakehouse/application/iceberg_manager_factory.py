@@ -1,13 +1,17 @@
 from pathlib import Path
+from typing import Tuple
 
 import yaml
 from pydantic import ValidationError
 
 from ..containers.containers import ConnectorsContainer
 from ..containers.wiring import create_iceberg_manager
+from ..containers.wiring import create_named_iceberg_manager
 from ..models.models import ConfigModel
 from ..utils.enums import ConnectorType
+from ..utils.sql_builder import split_table_identifier
 from ..utils.utils import find_config_folder
+from .iceberg_manager import IcebergManager
 
 
 class IcebergManagerFactory:
@@ -17,6 +21,11 @@ class IcebergManagerFactory:
     This class sets up a container with configuration loaded from a YAML file
     and provides a method to retrieve an Iceberg manager based on the connector name.
 
+    Besides one connector per type, the configuration can declare named connector ``instances``. The manager of an
+    instance is created once and shared, so every catalog of a Spark instance is served by a single Spark session, and
+    ``route`` picks the instance serving the catalog of a ``catalog.database.table`` identifier. Shared managers are
+    owned by the factory and released by ``close``; the managers of connector types are owned by their caller.
+
     Attributes:
         container (ConnectorsContainer): The container used for managing dependencies and configurations.
     """
@@ -28,6 +37,7 @@ class IcebergManagerFactory:
         Sets up the container and loads configuration from the default YAML file.
         """
         self.container = ConnectorsContainer()
+        self._managers = {}
         self._setup_container()
 
     def _setup_container(self):
@@ -57,16 +67,63 @@ class IcebergManagerFactory:
         Retrieves an Iceberg manager based on the provided connector name.
 
         Args:
-            connector_name (str): The name of the connector for which the manager is to be created.
+            connector_name (str): The name of a connector instance, or of a connector type.
 
         Returns:
-            IcebergManager: An instance of the Iceberg manager corresponding to the specified connector type.
+            IcebergManager: The shared manager of the named instance, or a new instance of the Iceberg manager
+                corresponding to the specified connector type.
 
         Raises:
             ValueError: If the connector name is unknown or not recognized.
         """
+        if self.is_shared(connector_name):
+            if connector_name not in self._managers:
+                self._managers[connector_name] = create_named_iceberg_manager(connector_name, container=self.container)
+            return self._managers[connector_name]
+
         try:
             connector_type = ConnectorType[connector_name.upper()]
             return create_iceberg_manager(connector_type, container=self.container)
         except KeyError as e:
             raise ValueError(f"Unknown connector type: {connector_name}") from e
+
+    def is_shared(self, connector_name: str) -> bool:
+        """
+        Tells whether the manager of a connector is shared by the factory rather than owned by its caller.
+
+        Args:
+            connector_name (str): The name of a connector instance, or of a connector type.
+
+        Returns:
+            bool: Whether ``get_manager`` returns the shared manager of a named instance.
+        """
+        return connector_name in self.container.named_connectors()
+
+    def close(self):
+        """
+        Closes the shared managers of the named instances. Later calls to ``get_manager`` create new ones.
+        """
+        managers, self._managers = self._managers, {}
+        for manager in managers.values():
+            manager.close()
+
+    def route(self, identifier: str) -> Tuple[IcebergManager, str, str]:
+        """
+        Routes a ``catalog.database.table`` identifier to the manager of the first instance serving the catalog.
+
+        Args:
+            identifier (str): The catalog-qualified table identifier.
+
+        Returns:
+            Tuple[IcebergManager, str, str]: The manager bound to the catalog, the database name and the table name.
+
+        Raises:
+            ValueError: If the identifier is not catalog-qualified or no instance serves its catalog.
+        """
+        catalog_name, database_name, table_name = split_table_identifier(identifier)
+        if catalog_name is None:
+            raise ValueError(f"Cannot route {identifier}: the identifier has no catalog")
+        for instance_name, connector in self.container.named_connectors().items():
+            if catalog_name in connector.catalog_names:
+                return self.get_manager(instance_name).for_catalog(catalog_name), database_name, table_name
+        raise ValueError(f"No connector instance serves catalog {catalog_name}")
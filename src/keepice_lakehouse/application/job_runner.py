@@ -0,0 +1,197 @@
+import inspect
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import get_type_hints
+
+from pydantic import BaseModel
+from pydantic import TypeAdapter
+
+from ..models.models import JobManifestModel
+from ..models.models import JobStepModel
+from ..models.models import StepResult
+from .iceberg_manager import IcebergManager
+
+ACTIONS = {
+    "create_database": "create_database",
+    "create_table": "create_table",
+    "drop_table": "drop_table",
+    "insert_bulk": "insert_bulk_table_data",
+    "insert_incremental": "insert_incremental_table_data",
+    "overwrite_partitions": "overwrite_partitions_table_data",
+    "upsert": "upsert_delta_table_data",
+    "delete_where": "delete_where",
+    "compact": "compact_table",
+    "expire_snapshots": "expire_snapshots",
+    "apply_retention": "apply_retention",
+    "set_table_properties": "set_table_properties",
+    "configure_metrics": "configure_metrics",
+    "create_branch": "create_branch",
+    "create_tag": "create_tag",
+    "publish_branch": "publish_branch",
+    "drop_branch": "drop_branch",
+    "current_snapshot_id": "current_snapshot_id",
+    "list_tables": "list_tables",
+    "skipping_report": "skipping_report",
+    "metrics_width_report": "metrics_width_report",
+    "compare_tables": "compare_tables",
+    "create_summary_table": "create_summary_table",
+    "refresh_summary_table": "refresh_summary_table",
+    "advise_write_modes": "advise_write_modes",
+}
+
+
+class JobRunner:
+    """
+    Runs the steps of a job manifest.
+
+    One manager is created per connector before any step runs and shared by every step using that connector, so a
+    whole manifest is served by a single Spark session or catalog client. Steps whose dependencies have succeeded run
+    concurrently, up to ``max_workers`` at a time; the dependents of a failed step are skipped while the other steps
+    carry on. The managers of named instances are shared by the factory and left open for their owner to close.
+
+    Adaptive tuning changes the settings of the whole Spark session, so steps run concurrently, with ``max_workers``
+    above one, run without it; see ``IcebergManager.untuned``.
+
+    Attributes:
+        factory (IcebergManagerFactory): The factory the managers are created by.
+        on_result (Optional[Callable[[StepResult], None]]): Called with the result of every step as soon as it is known.
+    """
+
+    def __init__(self, factory, on_result: Optional[Callable[[StepResult], None]] = None):
+        """
+        Initializes the JobRunner instance.
+
+        Args:
+            factory (IcebergManagerFactory): The factory the managers are created by.
+            on_result (Optional[Callable[[StepResult], None]]): Called with the result of every step as soon as it is
+                known.
+        """
+        self.factory = factory
+        self.on_result = on_result
+
+    def run(self, manifest: JobManifestModel) -> List[StepResult]:
+        """
+        Runs every step of a manifest, then closes the managers created for it, leaving the shared managers open.
+
+        Args:
+            manifest (JobManifestModel): The job manifest.
+
+        Returns:
+            List[StepResult]: One result per step, in the order of the manifest.
+
+        Raises:
+            ValueError: If step names are duplicated, a dependency is unknown or the dependencies form a cycle.
+        """
+        self.validate(manifest)
+        connectors = {step.name: step.connector or manifest.connector for step in manifest.steps}
+        managers = {}
+        try:
+            for connector_name in dict.fromkeys(connectors.values()):
+                managers[connector_name] = self.factory.get_manager(connector_name)
+            step_managers = {
+                connector_name: manager.untuned() if manifest.max_workers > 1 else manager for connector_name, manager in managers.items()
+            }
+            return self._schedule(manifest, {name: step_managers[connector_name] for name, connector_name in connectors.items()})
+        finally:
+            for connector_name, manager in managers.items():
+                if not self.factory.is_shared(connector_name):
+                    manager.close()
+
+    @staticmethod
+    def validate(manifest: JobManifestModel):
+        """
+        Checks the steps of a manifest can all be scheduled.
+
+        Args:
+            manifest (JobManifestModel): The job manifest.
+
+        Raises:
+            ValueError: If step names are duplicated, a dependency is unknown or the dependencies form a cycle.
+        """
+        steps = {}
+        for step in manifest.steps:
+            if step.name in steps:
+                raise ValueError(f"Duplicate step name: {step.name}")
+            steps[step.name] = step
+        for step in manifest.steps:
+            unknown = [name for name in step.depends_on if name not in steps]
+            if unknown:
+                raise ValueError(f"Step {step.name} depends on unknown steps: {', '.join(unknown)}")
+
+        ordered = set()
+        remaining = dict(steps)
+        while remaining:
+            ready = [name for name, step in remaining.items() if all(dependency in ordered for dependency in step.depends_on)]
+            if not ready:
+                raise ValueError(f"Circular dependencies between steps: {', '.join(remaining)}")
+            ordered.update(ready)
+            for name in ready:
+                del remaining[name]
+
+    def _schedule(self, manifest: JobManifestModel, managers: Dict[str, IcebergManager]) -> List[StepResult]:
+        results = {}
+        pending = {step.name: step for step in manifest.steps}
+        running = {}
+        with ThreadPoolExecutor(max_workers=manifest.max_workers) as executor:
+            while pending or running:
+                for name, step in list(pending.items()):
+                    dependencies = [results.get(dependency) for dependency in step.depends_on]
+                    if any(result is not None and result.status != "succeeded" for result in dependencies):
+                        del pending[name]
+                        self._record(results, StepResult(name=name, action=step.action, status="skipped"))
+                    elif all(result is not None for result in dependencies):
+                        del pending[name]
+                        running[executor.submit(self._run_step, managers[name], step)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    self._record(results, future.result())
+        return [results[step.name] for step in manifest.steps]
+
+    def _record(self, results: Dict[str, StepResult], result: StepResult):
+        results[result.name] = result
+        if self.on_result is not None:
+            self.on_result(result)
+
+    def _run_step(self, manager: IcebergManager, step: JobStepModel) -> StepResult:
+        start = time.perf_counter()
+        try:
+            method_name = ACTIONS[step.action]
+            value = getattr(manager, method_name)(**self._arguments(method_name, step.params))
+            return StepResult(
+                name=step.name, action=step.action, status="succeeded", seconds=time.perf_counter() - start, result=_to_json(value)
+            )
+        except Exception as e:
+            return StepResult(
+                name=step.name, action=step.action, status="failed", seconds=time.perf_counter() - start, error=f"{type(e).__name__}: {e}"
+            )
+
+    @staticmethod
+    def _arguments(method_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        # Parameters come from JSON or YAML: check them against the signature of the manager method and validate them
+        # against its annotations, so configurations become models and table pairs become tuples.
+        method = getattr(IcebergManager, method_name)
+        inspect.signature(method).bind(None, **params)
+        hints = get_type_hints(method)
+        return {name: TypeAdapter(hints[name]).validate_python(value) if name in hints else value for name, value in params.items()}
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (list, tuple)):
+        return [_to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_json(item) for key, item in value.items()}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return None
@@ -0,0 +1,184 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+from ..connectors.pyiceberg_connector import PyIcebergConnector
+from ..models.models import CatalogExportReport
+from ..utils.sql_builder import parse_describe
+from ..utils.sql_builder import parse_properties
+from ..utils.time_travel import to_utc_datetime
+
+METADATA_SCHEMA = pa.schema(
+    [
+        pa.field("database_name", pa.string(), nullable=False),
+        pa.field("table_name", pa.string(), nullable=False),
+        pa.field("metadata_location", pa.string()),
+        pa.field("format_version", pa.int32()),
+        pa.field("current_snapshot_id", pa.int64()),
+        pa.field("snapshot_count", pa.int32()),
+        pa.field("last_updated", pa.timestamp("ms", tz="UTC")),
+        pa.field("data_files", pa.int64()),
+        pa.field("delete_files", pa.int64()),
+        pa.field("total_bytes", pa.int64()),
+        pa.field("total_records", pa.int64()),
+        pa.field("partition_count", pa.int64()),
+        pa.field("schema", pa.string()),
+        pa.field("properties", pa.map_(pa.string(), pa.string())),
+        pa.field("error", pa.string()),
+    ]
+)
+
+
+class MetadataExporter:
+    """
+    Exports the metadata of every table of a catalog to a single Parquet file, one row per table.
+
+    Tables are listed and summarised concurrently. On later runs the previous export is read back and only the tables
+    whose metadata location changed are summarised again: any commit, schema or property change writes a new metadata
+    file, so the rows of the other tables are still accurate. The file is replaced atomically where the filesystem
+    allows, so readers never see a partial export.
+
+    Attributes:
+        manager (IcebergManager): The manager the catalog is read through.
+        max_workers (int): The number of tables summarised concurrently.
+    """
+
+    def __init__(self, manager, max_workers: int = 8):
+        """
+        Initializes the MetadataExporter instance.
+
+        Args:
+            manager (IcebergManager): The manager the catalog is read through.
+            max_workers (int): The number of tables summarised concurrently.
+        """
+        self.manager = manager
+        self.max_workers = max_workers
+
+    def export(self, path: str, databases: Optional[List[str]] = None) -> CatalogExportReport:
+        """
+        Exports or refreshes the metadata of the tables of the catalog.
+
+        Args:
+            path (str): The Parquet file, a local path or a filesystem URI such as ``s3://bucket/catalog.parquet``.
+            databases (Optional[List[str]]): The databases exported. Defaults to every database; the rows of the other
+                databases in a previous export are kept.
+
+        Returns:
+            CatalogExportReport: The number of tables exported, refreshed, unchanged and removed, and the errors.
+        """
+        filesystem, file_path = _filesystem(path)
+        previous = self._read(filesystem, file_path)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            databases = databases if databases is not None else self._list_databases()
+            tables = [
+                (database_name, table_name) for names in executor.map(self._list_tables, databases) for database_name, table_name in names
+            ]
+            collected = list(executor.map(lambda table: self._collect(table, previous.get(table)), tables))
+
+        exported = set(databases)
+        listed = set(tables)
+        kept = [row for table, row in previous.items() if table[0] not in exported]
+        rows = [row for row, _ in collected]
+        refreshed = sum(1 for _, changed in collected if changed)
+        self._write(filesystem, file_path, sorted(kept + rows, key=lambda row: (row["database_name"], row["table_name"])))
+        return CatalogExportReport(
+            path=path,
+            tables=len(kept) + len(rows),
+            refreshed=refreshed,
+            unchanged=len(kept) + len(rows) - refreshed,
+            removed=sum(1 for table in previous if table[0] in exported and table not in listed),
+            errors={f"{row['database_name']}.{row['table_name']}": row["error"] for row in rows if row.get("error")},
+        )
+
+    def _list_databases(self) -> List[str]:
+        if isinstance(self.manager.connector, PyIcebergConnector):
+            return [".".join(namespace) for namespace in self.manager.connection.list_namespaces()]
+        return [row[0] for row in self._query(self.manager.sql_builder.show_databases(self.manager.catalog_name))]
+
+    def _list_tables(self, database_name: str) -> List[Tuple[str, str]]:
+        if isinstance(self.manager.connector, PyIcebergConnector):
+            return [(database_name, identifier[-1]) for identifier in self.manager.connection.list_tables(database_name)]
+        return [
+            (database_name, row[1]) for row in self._query(self.manager.sql_builder.show_tables(database_name, self.manager.catalog_name))
+        ]
+
+    def _collect(self, table: Tuple[str, str], previous: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        database_name, table_name = table
+        sql_builder = self.manager.sql_builder
+        catalog_name = self.manager.catalog_name
+        try:
+            if isinstance(self.manager.connector, PyIcebergConnector):
+                loaded = self.manager.connector.load_table(database_name, table_name)
+                location = loaded.metadata_location
+                if _unchanged(previous, location):
+                    return previous, False
+                row = self.manager.connector.table_summary(loaded)
+            else:
+                [(location,)] = self._query(sql_builder.select_metadata_location(catalog_name, database_name, table_name))
+                if _unchanged(previous, location):
+                    return previous, False
+                row = self._summarise(database_name, table_name)
+            row.update(database_name=database_name, table_name=table_name, metadata_location=location)
+        except Exception as e:
+            row = {"database_name": database_name, "table_name": table_name, "error": str(e)}
+        return row, True
+
+    def _summarise(self, database_name: str, table_name: str) -> Dict[str, Any]:
+        sql_builder = self.manager.sql_builder
+        names = (self.manager.catalog_name, database_name, table_name)
+        [(snapshot_count, last_updated)] = self._query(sql_builder.select_snapshot_stats(*names))
+        current = self._query(sql_builder.select_current_summary(*names))
+        snapshot_id, summary = (current[0][0], dict(current[0][1] or {})) if current else (None, {})
+        [(partition_count,)] = self._query(sql_builder.select_partition_count(*names))
+        properties = parse_properties(self._query(sql_builder.show_table_properties(*names)))
+        columns, _ = parse_describe(self._query(sql_builder.describe_table(*names)))
+        return {
+            "format_version": int(properties["format-version"]) if "format-version" in properties else None,
+            "current_snapshot_id": snapshot_id,
+            "snapshot_count": snapshot_count,
+            "last_updated": to_utc_datetime(last_updated) if last_updated else None,
+            "data_files": int(summary.get("total-data-files", 0)),
+            "delete_files": int(summary.get("total-delete-files", 0)),
+            "total_bytes": int(summary.get("total-files-size", 0)),
+            "total_records": int(summary.get("total-records", 0)),
+            "partition_count": partition_count,
+            "schema": json.dumps(columns),
+            "properties": properties,
+        }
+
+    def _query(self, query: str) -> list:
+        return self.manager._all_rows(self.manager._query_fresh(query))
+
+    @staticmethod
+    def _read(filesystem: fs.FileSystem, file_path: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        if filesystem.get_file_info(file_path).type != fs.FileType.File:
+            return {}
+        rows = pq.read_table(file_path, filesystem=filesystem, schema=METADATA_SCHEMA).to_pylist()
+        return {(row["database_name"], row["table_name"]): row for row in rows}
+
+    @staticmethod
+    def _write(filesystem: fs.FileSystem, file_path: str, rows: List[Dict[str, Any]]):
+        if isinstance(filesystem, fs.LocalFileSystem):
+            filesystem.create_dir(str(Path(file_path).parent), recursive=True)
+        staging_path = f"{file_path}.inprogress"
+        pq.write_table(pa.Table.from_pylist(rows, schema=METADATA_SCHEMA), staging_path, filesystem=filesystem, compression="zstd")
+        filesystem.move(staging_path, file_path)
+
+
+def _unchanged(previous: Optional[Dict[str, Any]], location: str) -> bool:
+    return previous is not None and previous.get("error") is None and previous.get("metadata_location") == location
+
+
+def _filesystem(path: str) -> Tuple[fs.FileSystem, str]:
+    if "://" in path:
+        return fs.FileSystem.from_uri(path)
+    return fs.LocalFileSystem(), str(Path(path).resolve())
@@ -0,0 +1,99 @@
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..connectors.pyiceberg_connector import PyIcebergConnector
+
+
+class PinnedSession:
+    """
+    A consistent, multi-table view of the lakehouse with every table pinned to one snapshot.
+
+    Every read through the session targets the snapshot a table had when the session was opened, so queries joining
+    several tables see a single point in time even while writers commit. On the PyIceberg connector the loaded table
+    metadata is kept as well, so reads do not resolve the current metadata of the table again.
+
+    Attributes:
+        manager (IcebergManager): The manager the session reads through.
+        snapshots (Dict[Tuple[str, str], Optional[int]]): The pinned snapshot ID of every ``(database_name, table_name)``;
+            None for tables without snapshots.
+    """
+
+    def __init__(self, manager, snapshots: Dict[Tuple[str, str], Optional[int]], tables: Optional[dict] = None):
+        """
+        Initializes the PinnedSession instance.
+
+        Args:
+            manager (IcebergManager): The manager the session reads through.
+            snapshots (Dict[Tuple[str, str], Optional[int]]): The pinned snapshot ID of every table.
+            tables (Optional[dict]): The loaded PyIceberg tables, keyed like ``snapshots``.
+        """
+        self.manager = manager
+        self.snapshots = snapshots
+        self._tables = tables or {}
+
+    def snapshot_id(self, database_name: str, table_name: str) -> Optional[int]:
+        """
+        Returns the pinned snapshot ID of a table.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+
+        Returns:
+            Optional[int]: The snapshot ID, or None if the table had no snapshot.
+
+        Raises:
+            ValueError: If the table is not part of the session.
+        """
+        try:
+            return self.snapshots[(database_name, table_name)]
+        except KeyError:
+            raise ValueError(f"Table {database_name}.{table_name} is not pinned in this session") from None
+
+    def relation(self, database_name: str, table_name: str) -> str:
+        """
+        Builds the SQL relation reading a table at its pinned snapshot, for use in hand-written queries.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+
+        Returns:
+            str: The qualified table name followed by its time travel clause.
+        """
+        snapshot_id = self.snapshot_id(database_name, table_name)
+        sql_builder = self.manager.sql_builder
+        relation = sql_builder.qualified_name(self.manager.catalog_name, database_name, table_name)
+        if snapshot_id is None:
+            return relation
+        return f"{relation} {sql_builder.time_travel(snapshot_id=snapshot_id)}"
+
+    def read_table(
+        self,
+        database_name: str,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        predicate: Optional[str] = None,
+        limit: Optional[int] = None,
+    ):
+        """
+        Reads a table at its pinned snapshot.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            columns (Optional[List[str]]): The columns to read. Defaults to all columns.
+            predicate (Optional[str]): A filter on the rows to read.
+            limit (Optional[int]): The maximum number of rows to read.
+
+        Returns:
+            The rows read, as returned by the connector.
+        """
+        snapshot_id = self.snapshot_id(database_name, table_name)
+        table = self._tables.get((database_name, table_name))
+        if table is not None and isinstance(self.manager.connector, PyIcebergConnector):
+            selected_fields = tuple(columns) if columns else ("*",)
+            return self.manager.connector.scan_table(table, predicate, selected_fields, snapshot_id, limit)
+        return self.manager.read_table(database_name, table_name, columns, predicate, limit, snapshot_id=snapshot_id)
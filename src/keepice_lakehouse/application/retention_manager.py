@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import List
+from typing import Optional
+
+from pyiceberg.expressions import LessThan
+
+from ..connectors.pyiceberg_connector import PyIcebergConnector
+from ..models.models import RetentionPolicyModel
+from ..models.models import RetentionReport
+from ..utils.time_travel import to_utc_datetime
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class RetentionManager:
+    """
+    Applies partition retention policies to Iceberg tables.
+
+    Every policy keeps the rows of a table whose partition source column falls within the last ``retention_days``
+    days. The cutoff is aligned to the start of a UTC day, so on tables partitioned by ``days()``, ``months()`` or
+    ``years()`` of that column the expired rows form whole partitions and are dropped as a metadata-only delete,
+    without reading or rewriting any data file. The snapshots still referencing the dropped files are expired
+    afterwards, so the files can be reclaimed.
+
+    Attributes:
+        manager (IcebergManager): The manager the policies are applied through.
+        max_workers (int): The number of tables processed concurrently.
+    """
+
+    def __init__(self, manager, max_workers: int = 4):
+        """
+        Initializes the RetentionManager instance.
+
+        Args:
+            manager (IcebergManager): The manager the policies are applied through.
+            max_workers (int): The number of tables processed concurrently.
+        """
+        self.manager = manager
+        self.max_workers = max_workers
+
+    @staticmethod
+    def cutoff(policy: RetentionPolicyModel, now: Optional[datetime] = None) -> datetime:
+        """
+        Computes the first instant a policy keeps: the UTC start of the day ``retention_days`` days before ``now``.
+
+        Args:
+            policy (RetentionPolicyModel): The retention policy.
+            now (Optional[datetime]): The reference time. Defaults to the current time.
+
+        Returns:
+            datetime: The cutoff, in UTC.
+        """
+        expired = to_utc_datetime(now or datetime.now(timezone.utc)) - timedelta(days=policy.retention_days)
+        return expired.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def apply_policy(self, policy: RetentionPolicyModel, now: Optional[datetime] = None) -> RetentionReport:
+        """
+        Drops the expired rows of a table, then expires the snapshots committed before the drop.
+
+        Both the cutoff of the rows and the age of the expired snapshots are measured from the same ``now``.
+
+        Args:
+            policy (RetentionPolicyModel): The retention policy.
+            now (Optional[datetime]): The reference time. Defaults to the current time.
+
+        Returns:
+            RetentionReport: The cutoff applied, how the rows were deleted and how many snapshots were expired. Errors
+            are reported in the ``error`` field instead of being raised.
+        """
+        now = to_utc_datetime(now or datetime.now(timezone.utc))
+        cutoff = self.cutoff(policy, now)
+        report = RetentionReport(database_name=policy.database_name, table_name=policy.table_name, cutoff=cutoff)
+        try:
+            report.delete = self.manager.delete_where(policy.database_name, policy.table_name, self._predicate(policy, cutoff))
+            if policy.expire_snapshots and report.delete.mode != "noop":
+                older_than = now - timedelta(days=policy.snapshot_max_age_days)
+                report.snapshots_expired = self.manager.expire_snapshots(policy.database_name, policy.table_name, older_than)
+        except Exception as e:
+            report.error = str(e)
+        return report
+
+    def apply_retention(self, policies: List[RetentionPolicyModel], now: Optional[datetime] = None) -> List[RetentionReport]:
+        """
+        Applies a batch of retention policies, processing up to ``max_workers`` tables concurrently.
+
+        A failure on one table does not stop the others; it is reported in the ``error`` field of its report. The
+        tables are processed in the operation of the caller, e.g. its Spark job group, so cancelling the operation
+        cancels every table of the batch.
+
+        Args:
+            policies (List[RetentionPolicyModel]): The retention policies.
+            now (Optional[datetime]): The reference time shared by every policy. Defaults to the current time.
+
+        Returns:
+            List[RetentionReport]: One report per policy, in the order of ``policies``.
+        """
+        now = now or datetime.now(timezone.utc)
+        if not policies:
+            return []
+        workers = min(self.max_workers, len(policies))
+        with self.manager.connector.operation("apply_retention") as group_id, ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda policy: self._apply_in_operation(group_id, policy, now), policies))
+
+    def _apply_in_operation(self, group_id: Optional[str], policy: RetentionPolicyModel, now: datetime) -> RetentionReport:
+        """Applies a policy from a worker thread within the operation of the batch."""
+        with self.manager.connector.operation("apply_retention", parent_id=group_id):
+            return self.apply_policy(policy, now)
+
+    def _predicate(self, policy: RetentionPolicyModel, cutoff: datetime):
+        if not isinstance(self.manager.connector, PyIcebergConnector):
+            return self.manager.sql_builder.older_than_predicate(policy.partition_column, cutoff, policy.column_type)
+        if policy.column_type == "date":
+            return LessThan(policy.partition_column, (cutoff.date() - date(1970, 1, 1)).days)
+        return LessThan(policy.partition_column, (cutoff - EPOCH) // timedelta(microseconds=1))
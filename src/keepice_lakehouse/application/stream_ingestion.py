@@ -0,0 +1,149 @@
+import uuid
+import warnings
+from typing import Optional
+
+from ..exceptions.exceptions import CompactionError
+from ..models.models import StreamingConfigModel
+
+STREAM_ID_PROPERTY = "keepice.stream-id"
+BATCH_ID_PROPERTY = "keepice.batch-id"
+
+
+class StreamIngestion:
+    """
+    Writes the micro-batches of a Spark structured stream into an Iceberg table with ``foreachBatch``.
+
+    Micro-batches are appended or, given a primary key, merged as CDC changes like ``upsert_delta_table_data`` does.
+    Appends record the stream ID and the micro-batch ID in the snapshot properties of the table, and a micro-batch
+    already committed, replayed after a failure between the commit and the checkpoint, is skipped. Merges need no
+    marker: re-applying the latest change per key leaves the table unchanged. The table is compacted every
+    ``compact_every`` micro-batches; a failed compaction is reported as a warning and does not stop the stream.
+
+    Attributes:
+        manager (IcebergManager): The manager the table is written through.
+        database_name (str): The name of the database containing the target table.
+        table_name (str): The name of the target table.
+        config (StreamingConfigModel): The checkpoint, trigger and compaction settings.
+        primary_key (Optional[str]): The key column of the target table; micro-batches are appended when None.
+        order_col (Optional[str]): The column ordering the changes of a key.
+        source_table_pk (Optional[str]): The key column of the stream. Defaults to ``primary_key``.
+    """
+
+    def __init__(
+        self,
+        manager,
+        database_name: str,
+        table_name: str,
+        config: StreamingConfigModel,
+        primary_key: Optional[str] = None,
+        order_col: Optional[str] = None,
+        source_table_pk: Optional[str] = None,
+    ):
+        """
+        Initializes the StreamIngestion instance.
+
+        Args:
+            manager (IcebergManager): The manager the table is written through.
+            database_name (str): The name of the database containing the target table.
+            table_name (str): The name of the target table.
+            config (StreamingConfigModel): The checkpoint, trigger and compaction settings.
+            primary_key (Optional[str]): The key column of the target table; micro-batches are appended when None.
+            order_col (Optional[str]): The column ordering the changes of a key. Required with ``primary_key``.
+            source_table_pk (Optional[str]): The key column of the stream. Defaults to ``primary_key``.
+
+        Raises:
+            ValueError: If a primary key is given without an order column.
+        """
+        if primary_key and not order_col:
+            raise ValueError("Merging a stream needs the column ordering the changes of a key")
+        self.manager = manager
+        self.database_name = database_name
+        self.table_name = table_name
+        self.config = config
+        self.primary_key = primary_key
+        self.order_col = order_col
+        self.source_table_pk = source_table_pk or primary_key
+        self.stream_id = config.stream_id or config.checkpoint_location
+        self._last_batch_id = None
+
+    def start(self, source_stream):
+        """
+        Starts the stream.
+
+        Args:
+            source_stream (pyspark.sql.DataFrame): A streaming DataFrame.
+
+        Returns:
+            pyspark.sql.streaming.StreamingQuery: The running query.
+        """
+        writer = source_stream.writeStream.foreachBatch(self.process_batch).option("checkpointLocation", self.config.checkpoint_location)
+        if self.config.query_name:
+            writer = writer.queryName(self.config.query_name)
+        if self.config.available_now:
+            writer = writer.trigger(availableNow=True)
+        elif self.config.trigger_interval:
+            writer = writer.trigger(processingTime=self.config.trigger_interval)
+        return writer.start()
+
+    def process_batch(self, batch, batch_id: int):
+        """
+        Writes one micro-batch, then compacts the table when due.
+
+        Args:
+            batch (pyspark.sql.DataFrame): The micro-batch.
+            batch_id (int): The ID of the micro-batch.
+        """
+        if self.primary_key:
+            self._merge(batch)
+        elif batch_id > self.last_committed_batch_id():
+            self._append(batch, batch_id)
+            self._last_batch_id = batch_id
+        if self.config.compact_every and (batch_id + 1) % self.config.compact_every == 0:
+            try:
+                self.manager.compact_table(
+                    self.database_name, self.table_name, self.config.compaction_strategy, self.config.compaction_columns
+                )
+            except CompactionError as e:
+                warnings.warn(f"Compaction of {self.database_name}.{self.table_name} failed: {e}", stacklevel=2)
+
+    def last_committed_batch_id(self) -> int:
+        """
+        Retrieves the ID of the last micro-batch the stream appended to the table.
+
+        Returns:
+            int: The micro-batch ID, -1 when the stream has not committed yet.
+        """
+        if self._last_batch_id is None:
+            query = self.manager.sql_builder.select_last_batch_id(
+                self.manager.catalog_name, self.database_name, self.table_name, self.stream_id
+            )
+            row = self.manager._first_row(self.manager._query_fresh(query))
+            self._last_batch_id = -1 if not row or row[0] is None else int(row[0])
+        return self._last_batch_id
+
+    def _append(self, batch, batch_id: int):
+        writer = (
+            batch.writeTo(self.manager._table_identifier(self.database_name, self.table_name))
+            .option(f"snapshot-property.{STREAM_ID_PROPERTY}", self.stream_id)
+            .option(f"snapshot-property.{BATCH_ID_PROPERTY}", str(batch_id))
+        )
+        self.manager._call_with_retry(writer.append)
+
+    def _merge(self, batch):
+        # The micro-batch belongs to the session of the streaming query, so its view and the merge must use that session.
+        session = batch.sparkSession
+        view_name = f"keepice_batch_{uuid.uuid4().hex}"
+        batch.createOrReplaceTempView(view_name)
+        try:
+            merge_delta_query = self.manager.sql_builder.merge_delta(
+                self.manager.catalog_name,
+                self.database_name,
+                self.table_name,
+                view_name,
+                self.primary_key,
+                self.order_col,
+                self.source_table_pk,
+            )
+            self.manager._call_with_retry(session.sql, merge_delta_query)
+        finally:
+            session.catalog.dropTempView(view_name)
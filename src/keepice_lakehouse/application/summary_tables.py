@@ -0,0 +1,173 @@
+import uuid
+from typing import Dict
+from typing import Optional
+
+from ..models.models import SummaryRefreshReport
+from ..models.models import SummaryTableModel
+
+DEFINITION_PROPERTY = "keepice.summary.definition"
+SOURCE_SNAPSHOT_PROPERTY = "keepice.summary.source-snapshot-id"
+
+# Snapshots that only rewrite existing rows, such as compactions, add no rows to aggregate.
+REWRITE_OPERATIONS = ("replace",)
+
+
+class SummaryTables:
+    """
+    Maintains summary tables: aggregates of a source table, refreshed incrementally.
+
+    The definition of a summary table and the source snapshot it was last refreshed at are stored in its table
+    properties. A refresh reads only the rows appended by the source snapshots committed since, aggregates them per
+    group and merges these partial aggregates into the summary: sums and counts are added, minimums and maximums
+    combined. When a snapshot in between deleted or overwrote rows, or the last refreshed snapshot is no longer an
+    ancestor of the current one, partial aggregates cannot account for the change and the summary is recomputed from
+    the whole source table instead.
+
+    The merge and the property update are separate commits, so the refreshes of one summary table must not run
+    concurrently, and an interrupted refresh should be followed by a full one.
+
+    Attributes:
+        manager (IcebergManager): The manager the tables are read and written through.
+    """
+
+    def __init__(self, manager):
+        """
+        Initializes the SummaryTables instance.
+
+        Args:
+            manager (IcebergManager): The manager the tables are read and written through.
+        """
+        self.manager = manager
+
+    def create(
+        self,
+        database_name: str,
+        table_name: str,
+        summary: SummaryTableModel,
+        location: str,
+        partition_column: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Creates a summary table holding the aggregates of the current snapshot of its source.
+
+        The table, its rows and its properties are committed at once by a ``CREATE TABLE ... AS SELECT``.
+
+        Args:
+            database_name (str): The database of the summary table.
+            table_name (str): The name of the summary table.
+            summary (SummaryTableModel): The definition of the summary.
+            location (str): The storage location of the summary table.
+            partition_column (Optional[str]): A grouping column or partition transform partitioning the summary.
+
+        Returns:
+            Optional[int]: The source snapshot aggregated, None when the source has no snapshot yet.
+        """
+        snapshot_id = self.manager.current_snapshot_id(summary.source_database, summary.source_table)
+        properties = {DEFINITION_PROPERTY: summary.model_dump_json()}
+        if snapshot_id is not None:
+            properties[SOURCE_SNAPSHOT_PROPERTY] = str(snapshot_id)
+        create_query = self.manager.sql_builder.create_table_as(
+            self.manager.catalog_name,
+            database_name,
+            table_name,
+            self._aggregate_query(summary, snapshot_id),
+            location,
+            partition_column=partition_column,
+            properties=properties,
+        )
+        self.manager.connector.query(create_query)
+        return snapshot_id
+
+    def refresh(self, database_name: str, table_name: str, full: bool = False) -> SummaryRefreshReport:
+        """
+        Brings a summary table up to date with the current snapshot of its source.
+
+        Args:
+            database_name (str): The database of the summary table.
+            table_name (str): The name of the summary table.
+            full (bool): Recompute the summary from the whole source table, e.g. after an interrupted refresh.
+
+        Returns:
+            SummaryRefreshReport: How the summary was refreshed and the source snapshots it covers.
+
+        Raises:
+            ValueError: If the table is not a summary table.
+        """
+        properties = self.manager.get_table_metadata(database_name, table_name).properties
+        if DEFINITION_PROPERTY not in properties:
+            raise ValueError(f"{database_name}.{table_name} is not a summary table")
+        summary = SummaryTableModel.model_validate_json(properties[DEFINITION_PROPERTY])
+        previous = int(properties[SOURCE_SNAPSHOT_PROPERTY]) if SOURCE_SNAPSHOT_PROPERTY in properties else None
+        current = self.manager.current_snapshot_id(summary.source_database, summary.source_table)
+        report = SummaryRefreshReport(mode="noop", previous_snapshot_id=previous, source_snapshot_id=current)
+        if current is None or (current == previous and not full):
+            return report
+
+        appended = None if full or previous is None else self._appended_snapshots(summary, previous, current)
+        if appended is None:
+            rows = self.manager.connector.query(self._aggregate_query(summary, current))
+            self.manager.insert_bulk_table_data(rows, database_name, table_name)
+            report.mode = "full"
+        else:
+            if appended:
+                self._merge_appended(database_name, table_name, summary, previous, current)
+            report.mode, report.snapshots = "incremental", appended
+        self.manager.set_table_properties(database_name, table_name, {SOURCE_SNAPSHOT_PROPERTY: str(current)})
+        return report
+
+    def _appended_snapshots(self, summary: SummaryTableModel, previous: int, current: int) -> Optional[int]:
+        """
+        Counts the snapshots from ``previous`` (excluded) to ``current`` that appended rows.
+
+        Returns:
+            Optional[int]: The number of appending snapshots, None when one of the snapshots deleted or overwrote rows
+            or ``previous`` is not an ancestor of ``current``.
+        """
+        lineage_query = self.manager.sql_builder.select_snapshot_lineage(
+            self.manager.catalog_name, summary.source_database, summary.source_table
+        )
+        lineage = {row[0]: (row[1], row[2]) for row in self.manager._all_rows(self.manager._query_fresh(lineage_query))}
+        appended = 0
+        snapshot_id = current
+        while snapshot_id != previous:
+            if snapshot_id not in lineage:
+                return None
+            parent_id, operation = lineage[snapshot_id]
+            if operation == "append":
+                appended += 1
+            elif operation not in REWRITE_OPERATIONS:
+                return None
+            snapshot_id = parent_id
+        return appended
+
+    def _merge_appended(self, database_name: str, table_name: str, summary: SummaryTableModel, previous: int, current: int):
+        source = self.manager._table_identifier(summary.source_database, summary.source_table)
+        appended = (
+            self.manager.connection.read.format("iceberg")
+            .option("start-snapshot-id", str(previous))
+            .option("end-snapshot-id", str(current))
+            .load(source)
+        )
+        view_name = f"keepice_appended_{uuid.uuid4().hex}"
+        appended.createOrReplaceTempView(view_name)
+        try:
+            partial_query = self.manager.sql_builder.select_aggregates(
+                self.manager.sql_builder.relation(view_name), summary.group_by, summary.aggregates, summary.predicate
+            )
+            merge_query = self.manager.sql_builder.merge_aggregates(
+                self.manager.catalog_name, database_name, table_name, partial_query, summary.group_by, self._functions(summary)
+            )
+            self.manager.connector.query(merge_query)
+        finally:
+            self.manager.connection.catalog.dropTempView(view_name)
+
+    def _aggregate_query(self, summary: SummaryTableModel, snapshot_id: Optional[int]) -> str:
+        sql_builder = self.manager.sql_builder
+        relation = sql_builder.qualified_name(self.manager.catalog_name, summary.source_database, summary.source_table)
+        if snapshot_id is not None:
+            relation += f" {sql_builder.time_travel(snapshot_id=snapshot_id)}"
+        return sql_builder.select_aggregates(relation, summary.group_by, summary.aggregates, summary.predicate)
+
+    @staticmethod
+    def _functions(summary: SummaryTableModel) -> Dict[str, str]:
+        return {column: summary.aggregate_function(column) for column in summary.aggregates}
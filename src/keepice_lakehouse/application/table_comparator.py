@@ -0,0 +1,190 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ..connectors.pyiceberg_connector import PyIcebergConnector
+from ..models.models import TableComparisonReport
+from ..utils.table_diff import bucket_of
+from ..utils.table_diff import encode_columns
+from ..utils.table_diff import hash_codes
+
+GROUP = "__group"
+ROW_HASH = "__row_hash"
+
+
+class TableComparator:
+    """
+    Compares two tables without joining them in full.
+
+    Both tables are first summarised in parallel into a row count and an order-insensitive digest of the row hashes
+    per group, a group being a partition or, when no partition columns are given, a bucket of the key hash. Only the
+    groups whose summaries differ are then compared key by key. Hashing is vectorised: ``xxhash64`` aggregations on
+    Spark and Athena, Arrow compute kernels on the PyIceberg connector.
+
+    Attributes:
+        manager (IcebergManager): The manager the tables are read through.
+        buckets (int): The number of key hash buckets used when no partition columns are given.
+        sample_size (int): The maximum number of differing keys reported.
+    """
+
+    def __init__(self, manager, buckets: int = 64, sample_size: int = 20):
+        """
+        Initializes the TableComparator instance.
+
+        Args:
+            manager (IcebergManager): The manager the tables are read through.
+            buckets (int): The number of key hash buckets used when no partition columns are given.
+            sample_size (int): The maximum number of differing keys reported.
+        """
+        self.manager = manager
+        self.buckets = buckets
+        self.sample_size = sample_size
+
+    def compare(
+        self,
+        source: Tuple[str, str],
+        target: Tuple[str, str],
+        keys: List[str],
+        columns: Optional[List[str]] = None,
+        partition_columns: Optional[List[str]] = None,
+    ) -> TableComparisonReport:
+        """
+        Compares the rows of two tables.
+
+        Args:
+            source (Tuple[str, str]): The ``(database_name, table_name)`` of the source table.
+            target (Tuple[str, str]): The ``(database_name, table_name)`` of the target table.
+            keys (List[str]): The columns identifying a row in both tables.
+            columns (Optional[List[str]]): The columns compared. Defaults to every column; required on Athena.
+            partition_columns (Optional[List[str]]): The columns grouping the first comparison pass. Defaults to
+                buckets of the key hash.
+
+        Returns:
+            TableComparisonReport: The row counts, the mismatching groups and the differing keys found in them.
+        """
+        if isinstance(self.manager.connector, PyIcebergConnector):
+            return self._compare_arrow(source, target, keys, columns, partition_columns or [])
+        return self._compare_sql(source, target, keys, columns, partition_columns or [])
+
+    def _compare_sql(self, source, target, keys, columns, partition_columns) -> TableComparisonReport:
+        sql_builder = self.manager.sql_builder
+        catalog_name = self.manager.catalog_name
+        group_expressions = [sql_builder.quote(column) for column in partition_columns] or [sql_builder.hash_bucket(keys, self.buckets)]
+        group_names = partition_columns or ["bucket"]
+        hash_expression = sql_builder.row_hash(columns)
+
+        digests = self._in_parallel(
+            lambda table: {
+                tuple(row[:-2]): (row[-2], row[-1])
+                for row in self._query(sql_builder.select_digests(catalog_name, *table, group_expressions, hash_expression))
+            },
+            source,
+            target,
+        )
+        mismatched = self._mismatched_groups(*digests)
+        report = self._report(digests, group_names, mismatched)
+        if not mismatched:
+            return report
+
+        predicate = sql_builder.group_predicate(group_expressions, mismatched)
+        hashes = self._in_parallel(
+            lambda table: {
+                tuple(row[:-1]): row[-1]
+                for row in self._query(sql_builder.select_row_hashes(catalog_name, *table, keys, hash_expression, predicate))
+            },
+            source,
+            target,
+        )
+        return self._diff_rows(report, keys, *hashes)
+
+    def _compare_arrow(self, source, target, keys, columns, partition_columns) -> TableComparisonReport:
+        connector = self.manager.connector
+        source_data, target_data = self._in_parallel(lambda table: connector.scan(*table), source, target)
+        columns = columns or source_data.column_names
+        used = list(dict.fromkeys([*keys, *columns, *partition_columns]))
+        source_data = source_data.select(used)
+        target_data = target_data.select(used).cast(source_data.schema)
+        source_codes, target_codes = encode_columns(source_data, target_data, used)
+
+        frames = []
+        for data, codes in ((source_data, source_codes), (target_data, target_codes)):
+            row_hashes = hash_codes([codes[column] for column in columns], data.num_rows)
+            if partition_columns:
+                group = hash_codes([codes[column] for column in partition_columns], data.num_rows)
+                frame = data.select(list(dict.fromkeys([*keys, *partition_columns])))
+            else:
+                group = bucket_of(hash_codes([codes[key] for key in keys], data.num_rows), self.buckets)
+                frame = data.select(keys).append_column("bucket", group)
+            frames.append(frame.append_column(GROUP, group).append_column(ROW_HASH, row_hashes))
+
+        group_names = partition_columns or ["bucket"]
+        digests = []
+        group_codes = {}
+        for frame in frames:
+            summary = frame.group_by([*group_names, GROUP]).aggregate([(ROW_HASH, "count"), (ROW_HASH, "sum")])
+            digest = {}
+            for row in summary.to_pylist():
+                values = tuple(row[name] for name in group_names)
+                digest[values] = (row[f"{ROW_HASH}_count"], row[f"{ROW_HASH}_sum"])
+                group_codes[values] = row[GROUP]
+            digests.append(digest)
+        mismatched = self._mismatched_groups(*digests)
+        report = self._report(digests, group_names, mismatched)
+        if not mismatched:
+            return report
+
+        value_set = pa.array([group_codes[values] for values in mismatched], frames[0][GROUP].type)
+        source_rows, target_rows = (frame.filter(pc.is_in(frame[GROUP], value_set=value_set)).select([*keys, ROW_HASH]) for frame in frames)
+        joined = source_rows.join(target_rows, keys=keys, join_type="full outer", left_suffix="_source", right_suffix="_target")
+        source_hash = joined[f"{ROW_HASH}_source"]
+        target_hash = joined[f"{ROW_HASH}_target"]
+        missing_in_target = pc.is_null(target_hash)
+        missing_in_source = pc.is_null(source_hash)
+        changed = pc.fill_null(pc.not_equal(source_hash, target_hash), False)
+        differing = joined.filter(pc.or_(pc.or_(missing_in_target, missing_in_source), changed))
+        report.missing_in_target = pc.sum(missing_in_target).as_py() or 0
+        report.missing_in_source = pc.sum(missing_in_source).as_py() or 0
+        report.mismatched_rows = pc.sum(changed).as_py() or 0
+        report.sample_keys = differing.select(keys).slice(0, self.sample_size).to_pylist()
+        return report
+
+    def _diff_rows(
+        self, report: TableComparisonReport, keys: List[str], source: Dict[tuple, int], target: Dict[tuple, int]
+    ) -> TableComparisonReport:
+        missing_in_target = [key for key in source if key not in target]
+        missing_in_source = [key for key in target if key not in source]
+        changed = [key for key in source if key in target and source[key] != target[key]]
+        report.missing_in_target = len(missing_in_target)
+        report.missing_in_source = len(missing_in_source)
+        report.mismatched_rows = len(changed)
+        differing = (missing_in_target + missing_in_source + changed)[: self.sample_size]
+        report.sample_keys = [dict(zip(keys, key)) for key in differing]
+        return report
+
+    @staticmethod
+    def _mismatched_groups(source: Dict[tuple, tuple], target: Dict[tuple, tuple]) -> List[tuple]:
+        groups = set(source) | set(target)
+        return sorted((group for group in groups if source.get(group) != target.get(group)), key=repr)
+
+    @staticmethod
+    def _report(digests: List[Dict[tuple, tuple]], group_names: List[str], mismatched: List[tuple]) -> TableComparisonReport:
+        source, target = digests
+        return TableComparisonReport(
+            source_rows=sum(count for count, _ in source.values()),
+            target_rows=sum(count for count, _ in target.values()),
+            groups_compared=len(set(source) | set(target)),
+            mismatched_groups=[dict(zip(group_names, group)) for group in mismatched],
+        )
+
+    def _query(self, query: str) -> list:
+        return self.manager._all_rows(self.manager._query_fresh(query))
+
+    @staticmethod
+    def _in_parallel(func, source, target) -> list:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return list(executor.map(func, (source, target)))
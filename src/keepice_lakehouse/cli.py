@@ -0,0 +1,97 @@
+"""
+Command line interface running job manifests.
+
+Usage: ``python -m keepice_lakehouse run jobs.yaml``. A manifest is a JSON or YAML document such as::
+
+    connector: spark_iceberg
+    max_workers: 4
+    steps:
+      - name: load_orders
+        action: upsert
+        params: {source_table: staging.orders, database_name: sales, table_name: orders, primary_key: order_id, order_col: updated_at}
+      - name: compact_orders
+        action: compact
+        depends_on: [load_orders]
+        params: {database_name: sales, table_name: orders}
+
+Each step result is printed as a JSON line as soon as the step finishes, with its status and duration in seconds.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List
+from typing import Optional
+
+import yaml
+from pydantic import ValidationError
+
+from .application.iceberg_manager_factory import IcebergManagerFactory
+from .application.job_runner import JobRunner
+from .models.models import JobManifestModel
+from .models.models import StepResult
+
+
+def load_manifest(path: Path) -> JobManifestModel:
+    """
+    Loads a job manifest from a JSON or YAML file.
+
+    Args:
+        path (Path): The manifest file. Files ending in ``.json`` are read as JSON, any other file as YAML.
+
+    Returns:
+        JobManifestModel: The manifest.
+
+    Raises:
+        ValueError: If the manifest is invalid.
+    """
+    with Path.open(path) as file:
+        data = json.load(file) if path.suffix == ".json" else yaml.safe_load(file)
+    try:
+        return JobManifestModel(**data)
+    except (TypeError, ValidationError) as e:
+        raise ValueError(f"Invalid job manifest {path}: {e}") from e
+
+
+def _print_result(result: StepResult):
+    print(json.dumps(result.model_dump(mode="json"), default=str), flush=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Runs the command line interface.
+
+    Args:
+        argv (Optional[List[str]]): The arguments. Defaults to the arguments of the process.
+
+    Returns:
+        int: The exit code: 0 when every step succeeded, 1 when a step failed or was skipped, 2 on invalid usage.
+    """
+    parser = argparse.ArgumentParser(prog="keepice_lakehouse", description="Runs Iceberg operations described by job manifests.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Run the steps of a JSON or YAML job manifest.")
+    run_parser.add_argument("manifest", type=Path, help="The job manifest file.")
+    run_parser.add_argument("--max-workers", type=int, help="The number of steps run concurrently, overriding the manifest.")
+    args = parser.parse_args(argv)
+    if args.max_workers is not None and args.max_workers < 1:
+        parser.error("--max-workers must be at least 1")
+
+    try:
+        manifest = load_manifest(args.manifest)
+        if args.max_workers is not None:
+            manifest.max_workers = args.max_workers
+        JobRunner.validate(manifest)
+    except (OSError, ValueError) as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    factory = IcebergManagerFactory()
+    try:
+        results = JobRunner(factory, on_result=_print_result).run(manifest)
+    finally:
+        factory.close()
+    failed = [result for result in results if result.status != "succeeded"]
+    total = sum(result.seconds for result in results)
+    print(f"{len(results) - len(failed)}/{len(results)} steps succeeded, {total:.3f}s of step time", file=sys.stderr)
+    return 1 if failed else 0
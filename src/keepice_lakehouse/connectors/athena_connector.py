@@ -1,7 +1,19 @@
+import uuid
+from typing import Literal
+from typing import Optional
+from typing import Tuple
+
+import pyarrow.dataset as ds
+from pyarrow import fs
 from pyathena import connect as athena_connect
 from sqlalchemy import create_engine
 
 from ..models.models import AthenaConfigModel
+from ..utils.enums import SqlDialect
+from ..utils.result_cache import ResultCache
+from ..utils.retry import RetryPolicy
+from ..utils.sql_builder import SqlBuilder
+from ..utils.sql_builder import is_read_only
 from .base_connector import BaseConnector
 
 
@@ -17,11 +29,20 @@ class AthenaConnector(BaseConnector):
         workgroup (str): The Athena workgroup.
         warehouse (str): The data warehouse name.
         __catalog_name (str): The catalog name for Athena.
+        retry_policy (RetryPolicy): The policy used to retry queries failing with transient errors.
+        result_reuse_minutes (Optional[int]): Maximum age of the Athena query results reused for read-only queries.
+            Result reuse is disabled when None.
+        result_cache (Optional[ResultCache]): Local on-disk cache of query results, if configured.
+        export_location (str): The storage location under which ``export`` writes its Parquet files. Defaults to the
+            ``unload/`` folder of the staging directory.
+        export_database (Optional[str]): The database of the transient tables created by ``CTAS`` exports.
 
     Args:
         config (AthenaConfigModel): Configuration model containing necessary connection parameters.
     """
 
+    dialect = SqlDialect.ATHENA
+
     def __init__(self, config: AthenaConfigModel):
         """
         Initializes the AthenaConnector with the given configuration.
@@ -34,6 +55,12 @@ class AthenaConnector(BaseConnector):
         self.workgroup = config.get("workgroup")
         self.warehouse = config.get("warehouse")
         self.__catalog_name = config.get("catalog_name")
+        self.retry_policy = RetryPolicy.from_config(config.get("retry"))
+        self.result_reuse_minutes = config.get("result_reuse_minutes")
+        result_cache_dir = config.get("result_cache_dir")
+        self.result_cache = ResultCache(result_cache_dir, config.get("result_cache_max_entries") or 1000) if result_cache_dir else None
+        self.export_location = config.get("export_location") or f"{self.s3_staging_dir.rstrip('/')}/unload/"
+        self.export_database = config.get("export_database")
 
     @property
     def catalog_name(self):
@@ -52,19 +79,87 @@ class AthenaConnector(BaseConnector):
         Returns:
             sqlalchemy.engine.Engine: SQLAlchemy engine for executing SQL queries.
         """
-        self.connection = athena_connect(s3_staging_dir=self.s3_staging_dir, region_name=self.region_name)
+        self.connection = athena_connect(s3_staging_dir=self.s3_staging_dir, region_name=self.region_name, work_group=self.workgroup)
         return create_engine("awsathena://", creator=lambda: self.connection)
 
-    def query(self, query: str):
+    def query(self, query: str, cache_version: Optional[str] = None, result_reuse: bool = True):
         """
         Executes a SQL query on Athena and returns the result cursor.
 
+        Queries failing with a transient error, such as throttling or an Iceberg commit conflict, are retried according
+        to the connector retry policy. Read-only queries reuse previous Athena results up to ``result_reuse_minutes``
+        old when configured.
+
+        When a local result cache is configured and ``cache_version`` is given, the result of a read-only query is
+        materialised and cached under the query text and version, and later calls with the same query and version are
+        answered from disk without contacting Athena.
+
         Args:
             query (str): The SQL query to be executed.
+            cache_version (Optional[str]): Version of the data read by the query, usually the snapshot IDs of its tables.
+            result_reuse (bool): Whether Athena result reuse may be used for this query.
 
         Returns:
-            pyathena.cursor.Cursor: The cursor with the results of the query.
+            pyathena.cursor.Cursor | CachedResult: The cursor with the results of the query, or the materialised result
+            when the local result cache is used.
         """
+        read_only = is_read_only(query)
+        use_cache = self.result_cache is not None and cache_version is not None and read_only
+        if use_cache:
+            cached = self.result_cache.get(query, cache_version)
+            if cached is not None:
+                return cached
+
+        execute_kwargs = {}
+        if result_reuse and read_only and self.result_reuse_minutes:
+            execute_kwargs = {"result_reuse_enable": True, "result_reuse_minutes": self.result_reuse_minutes}
+
         cursor = self.connection.cursor()
-        cursor.execute(query)
+        self.retry_policy.call(cursor.execute, query, **execute_kwargs)
+
+        if use_cache:
+            return self.result_cache.put(query, cache_version, cursor.description, cursor.fetchall())
         return cursor
+
+    def export(self, query: str, location: Optional[str] = None, method: Literal["unload", "ctas"] = "unload") -> ds.Dataset:
+        """
+        Runs a query writing its result to Parquet files in S3 and returns them as an Arrow dataset.
+
+        Paging large results through ``GetQueryResults`` fetches a thousand rows per call and converts every value;
+        here Athena writes the result in parallel as Parquet, and the dataset reads the files directly, several at a
+        time. ``unload`` runs an ``UNLOAD`` statement. ``ctas`` runs a ``CREATE TABLE ... AS SELECT`` into a transient
+        table of ``export_database`` and drops the table afterwards, keeping its files, for workgroups where ``UNLOAD``
+        is not available.
+
+        The files are not deleted: the caller owns the export location and removes it once the data is read.
+
+        Args:
+            query (str): The query to export.
+            location (Optional[str]): The empty storage location the files are written to. Defaults to a new folder
+                under ``export_location``.
+            method (Literal["unload", "ctas"]): The statement writing the files.
+
+        Returns:
+            pyarrow.dataset.Dataset: The exported rows. ``to_table`` reads the files concurrently and ``to_batches``
+            streams them.
+
+        Raises:
+            ValueError: If ``method`` is ``ctas`` and no ``export_database`` is configured.
+        """
+        if method == "ctas" and not self.export_database:
+            raise ValueError("CTAS exports need an export_database in the Athena configuration")
+        location = location or f"{self.export_location.rstrip('/')}/{uuid.uuid4().hex}/"
+        sql_builder = SqlBuilder(self.dialect)
+        if method == "unload":
+            self.query(sql_builder.unload(query, location))
+        else:
+            table_name = f"keepice_export_{uuid.uuid4().hex}"
+            self.query(sql_builder.create_parquet_table_as(self.export_database, table_name, query, location))
+            self.query(sql_builder.drop_table(None, self.export_database, table_name))
+        filesystem, path = self._export_filesystem(location)
+        return ds.dataset(path, format="parquet", filesystem=filesystem)
+
+    def _export_filesystem(self, location: str) -> Tuple[fs.FileSystem, str]:
+        if location.startswith("s3://"):
+            return fs.S3FileSystem(region=self.region_name), location[len("s3://") :].rstrip("/")
+        return fs.FileSystem.from_uri(location)
@@ -1,4 +1,9 @@
 from abc import abstractmethod
+from contextlib import contextmanager
+from typing import List
+from typing import Optional
+
+from ..utils.enums import SqlDialect
 
 """
 This module defines an abstract base class for connectors.
@@ -21,11 +26,46 @@ class BaseConnector:
     establish connections and execute queries. Subclasses must implement the `connect`
     and `query` methods.
 
+    Attributes:
+        dialect (SqlDialect): The SQL dialect understood by the connector.
+
     Methods:
         connect: Establishes a connection. Must be implemented by subclasses.
         query: Executes a query. Must be implemented by subclasses.
     """
 
+    dialect = SqlDialect.SPARK
+
+    @property
+    def catalog_names(self) -> List[str]:
+        """
+        The names of the catalogs reachable through the connector, the default catalog first.
+
+        Returns:
+            List[str]: The catalog names.
+        """
+        return [self.catalog_name] if self.catalog_name else []
+
+    @contextmanager
+    def operation(self, name: str, description: Optional[str] = None, parent_id: Optional[str] = None):
+        """
+        Scopes the statements of a manager operation. Connectors able to schedule and cancel operations override it.
+
+        Args:
+            name (str): The name of the operation, the manager method.
+            description (Optional[str]): A description of the operation, e.g. with the table it targets.
+            parent_id (Optional[str]): The identifier of a running operation to join from another thread.
+
+        Yields:
+            Optional[str]: The identifier of the operation, None when operations are not tracked.
+        """
+        yield None
+
+    def close(self):
+        """
+        Releases the resources held by the connector itself, such as thread pools. Connections are closed by their owner.
+        """
+
     @abstractmethod
     def connect(self):
         """
@@ -0,0 +1,75 @@
+import re
+from typing import Iterable
+from typing import Iterator
+from typing import List
+
+import pyiceberg
+from pyiceberg.manifest import ManifestEntry
+from pyiceberg.manifest import ManifestFile
+from pyiceberg.typedef import KeyDefaultDict
+
+"""
+This module gives the PyIceberg connector access to the PyIceberg internals it builds on, behind a version check.
+
+PyIceberg has no public API to plan a scan with a custom manifest reader, nor to write data files for a snapshot
+producer of the caller. The connector uses these internals only on the PyIceberg versions it is tested against. On
+other versions scans are planned by ``DataScan.plan_files`` and writes go through ``Transaction.append``, while
+compactions and upserts bounded by ``upsert_memory_bytes`` are unsupported.
+
+Attributes:
+    TESTED_VERSIONS (tuple): The first tested minor version and the first untested one.
+    PRIVATE_APIS (bool): Whether the internals are used by the installed PyIceberg.
+"""
+
+TESTED_VERSIONS = ((0, 12), (0, 13))
+
+
+def is_tested_version(version: str) -> bool:
+    """
+    Tells whether a PyIceberg version is within the tested range.
+
+    Args:
+        version (str): The version, e.g. ``0.12.0``.
+
+    Returns:
+        bool: Whether the connector may use the internals of this version.
+    """
+    numbers = tuple(int(number) for number in re.findall(r"\d+", version)[:2])
+    return TESTED_VERSIONS[0] <= numbers < TESTED_VERSIONS[1]
+
+
+PRIVATE_APIS = False
+if is_tested_version(pyiceberg.__version__):
+    try:
+        from pyiceberg.io.pyarrow import _dataframe_to_data_files
+        from pyiceberg.table import ManifestGroupPlanner
+        from pyiceberg.table import _min_sequence_number
+    except ImportError:
+        pass
+    else:
+        dataframe_to_data_files = _dataframe_to_data_files
+        PRIVATE_APIS = True
+
+if PRIVATE_APIS:
+
+    class CachingManifestPlanner(ManifestGroupPlanner):
+        """
+        Manifest planner reading manifest entries through the connector thread pool and manifest entry cache.
+        """
+
+        def __init__(self, connector, **kwargs):
+            super().__init__(**kwargs)
+            self._connector = connector
+
+        def plan_manifest_entries(self, manifests: Iterable[ManifestFile]) -> Iterator[List[ManifestEntry]]:
+            manifest_evaluators = KeyDefaultDict(self._build_manifest_evaluator)
+            manifests = [manifest for manifest in manifests if manifest_evaluators[manifest.partition_spec_id](manifest)]
+
+            partition_evaluators = KeyDefaultDict(self._build_partition_evaluator)
+            metrics_evaluator = self._build_metrics_evaluator()
+            min_sequence_number = _min_sequence_number(manifests)
+            manifests = [manifest for manifest in manifests if self._check_sequence_number(min_sequence_number, manifest)]
+
+            for manifest, entries in zip(manifests, self._connector.read_manifest_entries(self.io, manifests)):
+                partition_evaluator = partition_evaluators[manifest.partition_spec_id]
+                yield [entry for entry in entries if partition_evaluator(entry.data_file) and metrics_evaluator(entry.data_file)]
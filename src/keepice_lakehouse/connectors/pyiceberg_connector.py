@@ -1,23 +1,1157 @@
+import itertools
+import json
+import threading
+import uuid
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
 from pyiceberg.catalog import load_catalog
+from pyiceberg.conversions import from_bytes
+from pyiceberg.expressions import AlwaysTrue
+from pyiceberg.expressions import And
+from pyiceberg.expressions import BooleanExpression
+from pyiceberg.expressions import GreaterThanOrEqual
+from pyiceberg.expressions import In
+from pyiceberg.expressions import LessThanOrEqual
+from pyiceberg.io import PY_IO_IMPL
+from pyiceberg.io.pyarrow import ArrowScan
+from pyiceberg.manifest import DataFile
+from pyiceberg.manifest import DataFileContent
+from pyiceberg.manifest import ManifestEntry
+from pyiceberg.manifest import ManifestFile
+from pyiceberg.table import FileScanTask
+from pyiceberg.table import Table
+from pyiceberg.table.refs import MAIN_BRANCH
+from pyiceberg.table.snapshots import ancestors_of
+from pyiceberg.table.sorting import SortDirection
+from pyiceberg.transforms import IdentityTransform
 
+from ..exceptions.exceptions import BranchPublishError
+from ..exceptions.exceptions import InvalidTablePropertyError
+from ..exceptions.exceptions import UnsupportedOperationError
+from ..models.models import DeleteReport
+from ..models.models import MetricsWidthReport
 from ..models.models import PyIcebergConfigModel
+from ..utils.clustering import zorder_table
+from ..utils.file_cache import FILE_CACHE_BLOCK_SIZE
+from ..utils.file_cache import FILE_CACHE_DIR
+from ..utils.file_cache import FILE_CACHE_IO_IMPL
+from ..utils.file_cache import FILE_CACHE_MAX_BYTES
+from ..utils.file_cache import CachingFileIO
+from ..utils.manifest_cache import ManifestEntryCache
+from ..utils.retry import RetryPolicy
+from ..utils.spill import HashPartitionSpill
+from ..utils.time_travel import Timestamp
+from ..utils.time_travel import to_timestamp_ms
+from ..utils.time_travel import validate_version
+from . import pyiceberg_compat
 from .base_connector import BaseConnector
 
+ArrowSource = Union[pa.Table, pa.RecordBatch, pa.RecordBatchReader, Iterable[pa.RecordBatch]]
+
+ACTION_COLUMN = "__action"
+DEFAULT_TARGET_FILE_SIZE_BYTES = 512 * 1024 * 1024
+DEFAULT_UPSERT_MEMORY_BYTES = 1024 * 1024 * 1024
+
+# ``warnings.catch_warnings`` swaps the filters of the whole process, so deletes run from several threads take turns.
+_DELETE_WARNINGS_LOCK = threading.Lock()
+
 
 class PyIcebergConnector(BaseConnector):
+    """
+    Connector class for Iceberg catalogs using PyIceberg.
+
+    This class provides methods to load an Iceberg catalog and to write Arrow data to its tables without an SQL engine.
+
+    Attributes:
+        warehouse (str): The warehouse location of the catalog.
+        uri (str): The URI of the catalog.
+        properties (dict): Additional catalog properties, such as the catalog ``type``.
+        target_file_size_bytes (Optional[int]): Size of the in-memory chunks written at once. Defaults to the
+            ``write.target-file-size-bytes`` property of the table.
+        manifest_workers (Optional[int]): Number of threads reading manifests in parallel.
+        manifest_cache (ManifestEntryCache): LRU cache of decoded manifest entries keyed by manifest path.
+        file_cache_dir (Optional[str]): Local directory caching blocks of data, manifest and metadata files read from
+            the warehouse. Disabled when None.
+        file_cache_max_bytes (Optional[int]): Maximum size of the local file cache.
+        file_cache_block_size (Optional[int]): Size of the blocks cached locally.
+        upsert_memory_bytes (Optional[int]): Memory budget of upserts. When set, upserts run as an out-of-core hash join
+            spilling to local disk; see ``upsert``.
+        spill_dir (Optional[str]): Local directory the upsert spill files are created in. Defaults to the system
+            temporary directory.
+        __catalog_name (str): The catalog name.
+        retry_policy (RetryPolicy): The policy used to retry commits failing with transient errors.
+
+    Args:
+        config (PyIcebergConfigModel): Configuration model containing necessary connection parameters.
+    """
+
     def __init__(self, config: PyIcebergConfigModel):
+        """
+        Initializes the PyIcebergConnector with the given configuration.
+
+        Args:
+            config (PyIcebergConfigModel): The configuration model with parameters for the connection.
+        """
         self.warehouse = config.get("warehouse")
         self.uri = config.get("uri")
+        self.properties = config.get("properties") or {}
+        self.target_file_size_bytes = config.get("target_file_size_bytes")
+        self.manifest_workers = config.get("manifest_workers")
+        self.manifest_cache = ManifestEntryCache(config.get("manifest_cache_entries") or 100_000)
+        self.file_cache_dir = config.get("file_cache_dir")
+        self.file_cache_max_bytes = config.get("file_cache_max_bytes")
+        self.file_cache_block_size = config.get("file_cache_block_size")
+        self.upsert_memory_bytes = config.get("upsert_memory_bytes")
+        self.spill_dir = config.get("spill_dir")
+        self._executor = None
+        self._executor_lock = threading.Lock()
         self.__catalog_name = config.get("catalog_name")
+        self.retry_policy = RetryPolicy.from_config(config.get("retry"))
+        self._local = threading.local()
 
     @property
     def catalog_name(self):
+        """
+        The catalog name property.
+
+        Returns:
+            str: The catalog name used by PyIceberg.
+        """
         return self.__catalog_name
 
     def connect(self):
-        self.catalog = load_catalog(catalog_name=self.catalog_name, uri=self.uri)
+        """
+        Loads the Iceberg catalog.
+
+        When ``file_cache_dir`` is set, the FileIO of the catalog and its tables is wrapped in a CachingFileIO, so
+        repeated reads of the same immutable files are served from local disk.
+
+        Returns:
+            pyiceberg.catalog.Catalog: The loaded catalog.
+        """
+        properties = {"uri": self.uri, "warehouse": self.warehouse, **self.properties}
+        if self.file_cache_dir:
+            if PY_IO_IMPL in properties:
+                properties[FILE_CACHE_IO_IMPL] = properties[PY_IO_IMPL]
+            properties[PY_IO_IMPL] = f"{CachingFileIO.__module__}.{CachingFileIO.__name__}"
+            properties[FILE_CACHE_DIR] = self.file_cache_dir
+            if self.file_cache_max_bytes:
+                properties[FILE_CACHE_MAX_BYTES] = str(self.file_cache_max_bytes)
+            if self.file_cache_block_size:
+                properties[FILE_CACHE_BLOCK_SIZE] = str(self.file_cache_block_size)
+        self.catalog = load_catalog(self.catalog_name, **properties)
         return self.catalog
 
     def query(self, query: str):
         # Implement query execution if applicable
         pass
+
+    def load_table(self, database_name: str, table_name: str):
+        """
+        Loads an Iceberg table from the catalog.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+
+        Returns:
+            pyiceberg.table.Table: The loaded table, with the writer properties of ``writer_properties`` when set.
+        """
+        table = self.catalog.load_table((database_name, table_name))
+        overrides = getattr(self._local, "writer_properties", None)
+        if overrides:
+            table.metadata = table.metadata.model_copy(update={"properties": {**table.metadata.properties, **overrides}})
+        return table
+
+    @contextmanager
+    def writer_properties(self, properties: Dict[str, str]):
+        """
+        Overrides table properties for the writes of the calling thread, e.g. the ``write.parquet.*`` settings.
+
+        The properties only replace those of the metadata loaded by the connector: commits apply their changes to the
+        metadata of the catalog, so the table properties stay unchanged.
+
+        Args:
+            properties (Dict[str, str]): The table properties.
+
+        Yields:
+            None
+        """
+        previous = getattr(self._local, "writer_properties", None)
+        self._local.writer_properties = {**(previous or {}), **properties}
+        try:
+            yield
+        finally:
+            self._local.writer_properties = previous
+
+    def resolve_snapshot_id(
+        self,
+        table: Table,
+        snapshot_id: Optional[int] = None,
+        as_of_timestamp: Optional[Timestamp] = None,
+        branch: Optional[str] = None,
+        tag: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Resolves a table version selector to a snapshot ID.
+
+        Args:
+            table (Table): The loaded table.
+            snapshot_id (Optional[int]): A snapshot ID, returned unchanged.
+            as_of_timestamp (Optional[Timestamp]): Select the snapshot current at this time. Naive values are read as UTC.
+            branch (Optional[str]): Select the head of a branch.
+            tag (Optional[str]): Select the snapshot of a tag.
+
+        Returns:
+            Optional[int]: The snapshot ID, or the current snapshot ID when no selector is given.
+
+        Raises:
+            ValueError: If more than one selector is given or the selected version does not exist.
+        """
+        validate_version(snapshot_id, as_of_timestamp, branch, tag)
+        if snapshot_id is not None:
+            return snapshot_id
+        if as_of_timestamp is not None:
+            snapshot = table.snapshot_as_of_timestamp(to_timestamp_ms(as_of_timestamp))
+            if snapshot is None:
+                raise ValueError(f"Table {table.name()} has no snapshot as of {as_of_timestamp}")
+            return snapshot.snapshot_id
+        ref = branch if branch is not None else tag
+        if ref is None:
+            snapshot = table.current_snapshot()
+            return snapshot.snapshot_id if snapshot else None
+        snapshot = table.snapshot_by_name(ref)
+        if snapshot is None:
+            raise ValueError(f"Table {table.name()} has no branch or tag named {ref}")
+        return snapshot.snapshot_id
+
+    def read_manifest_entries(self, io, manifests: List[ManifestFile]) -> List[List[ManifestEntry]]:
+        """
+        Reads the live entries of several manifests in parallel, serving already decoded manifests from the cache.
+
+        Args:
+            io (pyiceberg.io.FileIO): The FileIO of the table.
+            manifests (List[ManifestFile]): The manifests to read.
+
+        Returns:
+            List[List[ManifestEntry]]: The entries of every manifest, in the order of ``manifests``.
+        """
+
+        def read(manifest: ManifestFile) -> List[ManifestEntry]:
+            entries = self.manifest_cache.get(manifest.manifest_path)
+            if entries is None:
+                entries = manifest.fetch_manifest_entry(io, discard_deleted=True)
+                self.manifest_cache.put(manifest.manifest_path, entries)
+            return entries
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.manifest_workers, thread_name_prefix="keepice-manifests")
+            executor = self._executor
+        return list(executor.map(read, manifests))
+
+    def close(self):
+        """
+        Shuts down the thread pool reading manifests. A later read starts a new one.
+        """
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def plan_files(
+        self, database_name: str, table_name: str, row_filter: Optional[BooleanExpression] = None, snapshot_id: Optional[int] = None
+    ) -> List[FileScanTask]:
+        """
+        Plans the files a scan has to read, pruning them with partition and column statistics.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            row_filter (Optional[BooleanExpression]): The rows to read. Defaults to the whole table.
+            snapshot_id (Optional[int]): The snapshot to plan. Defaults to the current snapshot.
+
+        Returns:
+            List[FileScanTask]: The scan tasks with their data and delete files.
+        """
+        table = self.load_table(database_name, table_name)
+        return self._plan_scan(table.scan(row_filter=row_filter or AlwaysTrue(), snapshot_id=snapshot_id))
+
+    def scan(
+        self,
+        database_name: str,
+        table_name: str,
+        row_filter: Optional[BooleanExpression] = None,
+        selected_fields: tuple = ("*",),
+        snapshot_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        as_of_timestamp: Optional[Timestamp] = None,
+        branch: Optional[str] = None,
+        tag: Optional[str] = None,
+    ) -> pa.Table:
+        """
+        Reads a table into Arrow, planning the scan with parallel, cached manifest reads.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            row_filter (Optional[BooleanExpression]): The rows to read. Defaults to the whole table.
+            selected_fields (tuple): The columns to read. Defaults to all columns.
+            snapshot_id (Optional[int]): The snapshot to read. Defaults to the current snapshot.
+            limit (Optional[int]): The maximum number of rows to read.
+            as_of_timestamp (Optional[Timestamp]): Read the snapshot current at this time.
+            branch (Optional[str]): Read the head of a branch.
+            tag (Optional[str]): Read the snapshot of a tag.
+
+        Returns:
+            pa.Table: The rows read.
+        """
+        table = self.load_table(database_name, table_name)
+        snapshot_id = self.resolve_snapshot_id(table, snapshot_id, as_of_timestamp, branch, tag)
+        return self.scan_table(table, row_filter, selected_fields, snapshot_id, limit)
+
+    def scan_table(
+        self,
+        table: Table,
+        row_filter: Optional[BooleanExpression] = None,
+        selected_fields: tuple = ("*",),
+        snapshot_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> pa.Table:
+        """
+        Reads an already loaded table into Arrow, without resolving its metadata again.
+
+        Args:
+            table (Table): The loaded table.
+            row_filter (Optional[BooleanExpression]): The rows to read. Defaults to the whole table.
+            selected_fields (tuple): The columns to read. Defaults to all columns.
+            snapshot_id (Optional[int]): The snapshot to read. Defaults to the current snapshot.
+            limit (Optional[int]): The maximum number of rows to read.
+
+        Returns:
+            pa.Table: The rows read.
+        """
+        table_scan = table.scan(
+            row_filter=row_filter or AlwaysTrue(), selected_fields=selected_fields, snapshot_id=snapshot_id, limit=limit
+        )
+        return ArrowScan(
+            table_scan.table_metadata,
+            table_scan.io,
+            table_scan.projection(),
+            table_scan.row_filter,
+            table_scan.case_sensitive,
+            table_scan.limit,
+        ).to_table(self._plan_scan(table_scan))
+
+    def metadata(self, database_name: str, table_name: str, table_property: str) -> pa.Table:
+        """
+        Reads an Iceberg metadata table.
+
+        The ``files`` metadata is built from the parallel, cached manifest reads; the other metadata tables are read
+        through PyIceberg.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            table_property (str): One of "partitions", "snapshots", "history", "files", "manifests", "refs".
+
+        Returns:
+            pa.Table: The metadata rows.
+
+        Raises:
+            InvalidTablePropertyError: If the metadata table is unknown.
+        """
+        table = self.load_table(database_name, table_name)
+        if table_property == "files":
+            snapshot = table.current_snapshot()
+            manifests = list(snapshot.manifests(table.io)) if snapshot else []
+            data_files = [entry.data_file for entries in self.read_manifest_entries(table.io, manifests) for entry in entries]
+            return pa.table(
+                {
+                    "content": pa.array([data_file.content.value for data_file in data_files], pa.int8()),
+                    "file_path": pa.array([data_file.file_path for data_file in data_files], pa.string()),
+                    "file_format": pa.array([str(data_file.file_format) for data_file in data_files], pa.string()),
+                    "spec_id": pa.array([data_file.spec_id for data_file in data_files], pa.int32()),
+                    "record_count": pa.array([data_file.record_count for data_file in data_files], pa.int64()),
+                    "file_size_in_bytes": pa.array([data_file.file_size_in_bytes for data_file in data_files], pa.int64()),
+                }
+            )
+        if table_property not in {"partitions", "snapshots", "history", "manifests", "refs"}:
+            raise InvalidTablePropertyError(f"Invalid table_property: {table_property}.")
+        return getattr(table.inspect, table_property)()
+
+    def column_bounds(self, database_name: str, table_name: str, columns: List[str]) -> List[Tuple[Any, ...]]:
+        """
+        Reads the path and the lower and upper bound of some columns of every data file of a table from its manifests.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            columns (List[str]): The columns.
+
+        Returns:
+            List[Tuple[Any, ...]]: One ``(file_path, lower, upper, lower, upper, ...)`` row per data file, with the
+            bounds of the columns in order. Bounds the writer did not record are None.
+        """
+        table = self.load_table(database_name, table_name)
+        data_files = self._data_files(table, self._current_manifests(table))
+        fields = [table.schema().find_field(column) for column in columns]
+
+        def decode(values, field):
+            value = (values or {}).get(field.field_id)
+            return None if value is None else from_bytes(field.field_type, value)
+
+        return [
+            (
+                data_file.file_path,
+                *(bound for field in fields for bound in (decode(data_file.lower_bounds, field), decode(data_file.upper_bounds, field))),
+            )
+            for data_file in data_files
+        ]
+
+    def metrics_width(self, database_name: str, table_name: str) -> MetricsWidthReport:
+        """
+        Measures how much column statistics the manifests of a table carry.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+
+        Returns:
+            MetricsWidthReport: The number and size of the manifests and the width of the data file statistics.
+        """
+        table = self.load_table(database_name, table_name)
+        manifests = self._current_manifests(table)
+        data_files = self._data_files(table, manifests)
+        files = max(len(data_files), 1)
+        return MetricsWidthReport(
+            files=len(data_files),
+            manifests=len(manifests),
+            manifest_bytes=sum(manifest.manifest_length for manifest in manifests),
+            value_count_columns=sum(len(data_file.value_counts or {}) for data_file in data_files) / files,
+            bounds_columns=sum(len(data_file.lower_bounds or {}) for data_file in data_files) / files,
+            bounds_bytes=sum(
+                len(bound)
+                for data_file in data_files
+                for bounds in (data_file.lower_bounds, data_file.upper_bounds)
+                for bound in (bounds or {}).values()
+            ),
+        )
+
+    def table_summary(self, table: Table) -> Dict[str, Any]:
+        """
+        Summarises the metadata of a table: snapshots, live files, partitions, schema and properties.
+
+        File and partition counts are taken from the live manifest entries of the current snapshot, read in parallel
+        and cached.
+
+        Args:
+            table (pyiceberg.table.Table): The loaded table.
+
+        Returns:
+            Dict[str, Any]: The summary, with the keys of the catalog metadata export.
+        """
+        metadata = table.metadata
+        snapshot = table.current_snapshot()
+        entries = [entry for entries in self.read_manifest_entries(table.io, self._current_manifests(table)) for entry in entries]
+        data_files = [entry.data_file for entry in entries if entry.data_file.content == DataFileContent.DATA]
+        return {
+            "format_version": metadata.format_version,
+            "current_snapshot_id": snapshot.snapshot_id if snapshot else None,
+            "snapshot_count": len(metadata.snapshots),
+            "last_updated": datetime.fromtimestamp(metadata.last_updated_ms / 1000, timezone.utc),
+            "data_files": len(data_files),
+            "delete_files": len(entries) - len(data_files),
+            "total_bytes": sum(data_file.file_size_in_bytes for data_file in data_files),
+            "total_records": sum(data_file.record_count for data_file in data_files),
+            "partition_count": len({(data_file.spec_id, tuple(data_file.partition)) for data_file in data_files}),
+            "schema": json.dumps([{"name": field.name, "type": str(field.field_type)} for field in table.schema().fields]),
+            "properties": dict(table.properties),
+        }
+
+    @staticmethod
+    def table_definition(table: Table) -> Dict[str, Any]:
+        """
+        Describes the columns, partition spec and properties of a table.
+
+        Args:
+            table (pyiceberg.table.Table): The loaded table.
+
+        Returns:
+            Dict[str, Any]: The ``columns``, ``partition_spec`` and ``properties`` of the table, partition fields
+            rendered like Spark does, e.g. ``days(event_ts)``.
+        """
+        schema = table.schema()
+        partition_spec = []
+        for field in table.spec().fields:
+            source = schema.find_column_name(field.source_id)
+            transform = field.transform
+            if isinstance(transform, IdentityTransform):
+                partition_spec.append(source)
+            elif hasattr(transform, "num_buckets"):
+                partition_spec.append(f"bucket({transform.num_buckets}, {source})")
+            elif hasattr(transform, "width"):
+                partition_spec.append(f"truncate({transform.width}, {source})")
+            else:
+                # Spark names the year, month, day and hour transforms in the plural.
+                name = str(transform)
+                partition_spec.append(f"{name}s({source})" if name in ("year", "month", "day", "hour") else f"{name}({source})")
+        return {
+            "columns": [{"name": field.name, "type": str(field.field_type)} for field in schema.fields],
+            "partition_spec": partition_spec,
+            "properties": dict(table.properties),
+        }
+
+    @staticmethod
+    def _current_manifests(table: Table) -> List[ManifestFile]:
+        snapshot = table.current_snapshot()
+        return list(snapshot.manifests(table.io)) if snapshot else []
+
+    def _data_files(self, table: Table, manifests: List[ManifestFile]) -> List[DataFile]:
+        return [
+            entry.data_file
+            for entries in self.read_manifest_entries(table.io, manifests)
+            for entry in entries
+            if entry.data_file.content == DataFileContent.DATA
+        ]
+
+    def _plan_scan(self, table_scan) -> List[FileScanTask]:
+        snapshot = table_scan.snapshot()
+        if snapshot is None:
+            return []
+        if not pyiceberg_compat.PRIVATE_APIS:
+            return list(table_scan.plan_files())
+        planner = pyiceberg_compat.CachingManifestPlanner(
+            self,
+            table_metadata=table_scan.table_metadata,
+            io=table_scan.io,
+            row_filter=table_scan.row_filter,
+            case_sensitive=table_scan.case_sensitive,
+            options=table_scan.options,
+        )
+        return list(planner.plan_files(snapshot.manifests(table_scan.io)))
+
+    def set_properties(self, database_name: str, table_name: str, properties: Dict[str, str]):
+        """
+        Sets properties of a table.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            properties (Dict[str, str]): The properties to set.
+        """
+
+        def commit():
+            table = self.load_table(database_name, table_name)
+            with table.transaction() as transaction:
+                transaction.set_properties(properties)
+
+        self.retry_policy.call(commit)
+
+    def set_sort_order(self, database_name: str, table_name: str, columns: List[str]):
+        """
+        Replaces the write sort order of a table with an ascending sort on some columns, nulls last.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            columns (List[str]): The sort columns, most significant first.
+        """
+
+        def commit():
+            table = self.load_table(database_name, table_name)
+            with table.update_sort_order() as update:
+                for column in columns:
+                    update.asc(column, IdentityTransform())
+
+        self.retry_policy.call(commit)
+
+    def rewrite_data_files(
+        self,
+        database_name: str,
+        table_name: str,
+        strategy: str = "binpack",
+        columns: Optional[List[str]] = None,
+        row_filter: Optional[Union[str, BooleanExpression]] = None,
+        branch: str = MAIN_BRANCH,
+    ):
+        """
+        Compacts the data files holding the rows matching a filter, optionally clustering the rows.
+
+        The files that may hold matching rows are read in full, their rows reordered and written back in files of the
+        target size, and the old files replaced by the new ones in a single commit. The ``sort`` strategy sorts by
+        ``columns``, or by the table sort order when no columns are given; ``zorder`` interleaves ``columns``;
+        ``binpack`` keeps the rows in scan order. The rows are reordered in memory, so large tables should be compacted
+        a partition at a time through ``row_filter``.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            strategy (str): ``binpack``, ``sort`` or ``zorder``.
+            columns (Optional[List[str]]): The clustering columns of the ``sort`` and ``zorder`` strategies.
+            row_filter (Optional[Union[str, BooleanExpression]]): Restricts the compaction to the files holding
+                matching rows. Defaults to the whole table.
+            branch (str): The branch to compact.
+
+        Raises:
+            ValueError: If the strategy is unknown, or ``zorder`` is given no columns.
+            UnsupportedOperationError: If the installed PyIceberg is outside the tested versions; see pyiceberg_compat.
+        """
+        if strategy not in ("binpack", "sort", "zorder"):
+            raise ValueError(f"Unknown compaction strategy: {strategy}")
+        if strategy == "zorder" and not columns:
+            raise ValueError("The zorder strategy needs at least one column")
+        self._require_private_apis("Compaction")
+
+        def commit():
+            table = self.load_table(database_name, table_name)
+            tasks = self._plan_scan(table.scan(row_filter=row_filter or AlwaysTrue()).use_ref(branch))
+            if not tasks:
+                return
+            data = ArrowScan(table.metadata, table.io, table.schema(), AlwaysTrue()).to_table(tasks)
+            if strategy == "zorder":
+                data = zorder_table(data, columns)
+            elif strategy == "sort":
+                sort_keys = [(column, "ascending") for column in columns] if columns else write_sort_keys(table)
+                data = data.sort_by(sort_keys) if sort_keys else data
+
+            with table.transaction() as transaction:
+                with transaction.update_snapshot(branch=branch).overwrite(commit_uuid=uuid.uuid4()) as rewrite:
+                    for task in tasks:
+                        rewrite.delete_data_file(task.file)
+                    counter = itertools.count(0)
+                    for chunk in iter_chunks(data, self._chunk_bytes(table)):
+                        for data_file in pyiceberg_compat.dataframe_to_data_files(
+                            table_metadata=transaction.table_metadata,
+                            df=chunk,
+                            io=table.io,
+                            write_uuid=rewrite.commit_uuid,
+                            counter=counter,
+                        ):
+                            rewrite.append_data_file(data_file)
+
+        self.retry_policy.call(commit)
+
+    def create_branch(self, database_name: str, table_name: str, branch: str, snapshot_id: Optional[int] = None):
+        """
+        Creates a branch, unless it already exists.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            branch (str): The name of the branch.
+            snapshot_id (Optional[int]): The snapshot the branch starts from. Defaults to the current snapshot.
+
+        Raises:
+            ValueError: If the table has no snapshot to branch from.
+        """
+        table = self.load_table(database_name, table_name)
+        if branch in table.metadata.refs:
+            return
+        snapshot_id = self.resolve_snapshot_id(table, snapshot_id)
+        if snapshot_id is None:
+            raise ValueError(f"Table {table.name()} has no snapshot to branch from")
+        table.manage_snapshots().create_branch(snapshot_id, branch).commit()
+
+    def drop_branch(self, database_name: str, table_name: str, branch: str):
+        table = self.load_table(database_name, table_name)
+        if branch in table.metadata.refs:
+            table.manage_snapshots().remove_branch(branch).commit()
+
+    def create_tag(self, database_name: str, table_name: str, tag: str, snapshot_id: Optional[int] = None):
+        """
+        Tags a snapshot, unless the tag already exists.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            tag (str): The name of the tag.
+            snapshot_id (Optional[int]): The snapshot to tag. Defaults to the current snapshot.
+
+        Raises:
+            ValueError: If the table has no snapshot to tag.
+        """
+        table = self.load_table(database_name, table_name)
+        if tag in table.metadata.refs:
+            return
+        snapshot_id = self.resolve_snapshot_id(table, snapshot_id)
+        if snapshot_id is None:
+            raise ValueError(f"Table {table.name()} has no snapshot to tag")
+        table.manage_snapshots().create_tag(snapshot_id, tag).commit()
+
+    def fast_forward(self, database_name: str, table_name: str, branch: str, to_branch: str = MAIN_BRANCH):
+        """
+        Moves ``to_branch`` to the head of ``branch``, publishing the commits made on it.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            branch (str): The branch whose head becomes the new head of ``to_branch``.
+            to_branch (str): The branch to fast-forward.
+
+        Raises:
+            BranchPublishError: If ``to_branch`` has commits that are not on ``branch``.
+        """
+        table = self.load_table(database_name, table_name)
+        head = table.snapshot_by_name(branch)
+        if head is None:
+            raise BranchPublishError(f"Table {table.name()} has no branch named {branch}.")
+        target = table.snapshot_by_name(to_branch)
+        if target is not None and target.snapshot_id not in {snapshot.snapshot_id for snapshot in ancestors_of(head, table.metadata)}:
+            raise BranchPublishError(f"Cannot fast-forward {to_branch} to {branch}: {to_branch} has diverged.")
+        table.manage_snapshots().create_branch(head.snapshot_id, to_branch).commit()
+
+    def append(self, database_name: str, table_name: str, data: ArrowSource, branch: str = MAIN_BRANCH):
+        """
+        Appends Arrow data to a table in a single commit.
+
+        The data is consumed in chunks of at most ``target_file_size_bytes``, so a record batch stream is never fully
+        held in memory and every chunk is written as files of roughly the target size.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            data (ArrowSource): An Arrow table, record batch, record batch reader or iterable of record batches.
+            branch (str): The branch to commit to.
+        """
+        self._write(database_name, table_name, data, AlwaysTrue(), overwrite=False, branch=branch)
+
+    def overwrite(
+        self,
+        database_name: str,
+        table_name: str,
+        data: ArrowSource,
+        overwrite_filter: Optional[BooleanExpression] = None,
+        branch: str = MAIN_BRANCH,
+    ):
+        """
+        Replaces the rows matching a filter with Arrow data in a single commit.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            data (ArrowSource): An Arrow table, record batch, record batch reader or iterable of record batches.
+            overwrite_filter (Optional[BooleanExpression]): The rows to replace. Defaults to the whole table.
+            branch (str): The branch to commit to.
+        """
+        self._write(database_name, table_name, data, overwrite_filter or AlwaysTrue(), overwrite=True, branch=branch)
+
+    def overwrite_partitions(self, database_name: str, table_name: str, data: ArrowSource, branch: str = MAIN_BRANCH):
+        """
+        Replaces the partitions present in Arrow data, leaving the other partitions untouched, in a single commit.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            data (ArrowSource): An Arrow table, record batch, record batch reader or iterable of record batches.
+            branch (str): The branch to commit to.
+        """
+        data = to_arrow_table(data)
+
+        def commit():
+            table = self.load_table(database_name, table_name)
+            with table.transaction() as transaction:
+                transaction.dynamic_partition_overwrite(data, branch=branch)
+
+        self.retry_policy.call(commit)
+
+    def upsert(
+        self,
+        database_name: str,
+        table_name: str,
+        data: ArrowSource,
+        primary_key: str,
+        order_col: str,
+        source_table_pk: str,
+        branch: str = MAIN_BRANCH,
+    ):
+        """
+        Merges a delta into a table in a single commit.
+
+        The delta is deduplicated on its key keeping the row with the greatest ``order_col``. Rows whose ``__action``
+        column is ``'d'`` delete the matching target rows and the remaining rows replace or insert them. An in-memory
+        delta, an Arrow table or record batch, is merged in memory: the matching target rows are removed through a
+        predicate on the key range of the delta and its keys, which PyIceberg evaluates against the min/max statistics
+        of the manifests, so only the data files that may contain one of the keys are read and rewritten.
+
+        Record batch streams, and every delta when ``upsert_memory_bytes`` is set, are merged as an out-of-core hash
+        join instead, for deltas and tables larger than the memory of the worker: the delta is hash partitioned on its
+        key and spilled to local disk beyond half of the budget (``upsert_memory_bytes``, 1 GiB by default for
+        streams), the key columns of the data files within the key range of the delta are partitioned the same way,
+        and the two sides are joined a partition at a time. Only the data files holding matched keys are rewritten,
+        streamed a record batch at a time. The out-of-core merge writes data files through PyIceberg internals, so
+        outside the tested PyIceberg versions streams are merged in memory and ``upsert_memory_bytes`` is unsupported.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            data (ArrowSource): The delta to merge.
+            primary_key (str): The key column of the target table.
+            order_col (str): The column ordering the changes of a key.
+            source_table_pk (str): The key column of the delta.
+            branch (str): The branch to commit to.
+
+        Raises:
+            UnsupportedOperationError: If ``upsert_memory_bytes`` is set and the installed PyIceberg is outside the
+                tested versions.
+        """
+        if self.upsert_memory_bytes or (pyiceberg_compat.PRIVATE_APIS and not isinstance(data, (pa.Table, pa.RecordBatch))):
+            budget = self.upsert_memory_bytes or DEFAULT_UPSERT_MEMORY_BYTES
+            self._bounded_upsert(database_name, table_name, data, primary_key, order_col, source_table_pk, branch, budget)
+            return
+        delta = deduplicate(to_arrow_table(data), source_table_pk, order_col)
+        if source_table_pk != primary_key:
+            delta = delta.rename_columns([primary_key if name == source_table_pk else name for name in delta.column_names])
+
+        upserts = delta
+        if ACTION_COLUMN in delta.column_names:
+            upserts = delta.filter(pc.fill_null(pc.not_equal(delta[ACTION_COLUMN], "d"), True)).drop_columns([ACTION_COLUMN])
+        keys = delta[primary_key].drop_null()
+        key_filter = None
+        if len(keys):
+            # The key range prunes files even when there are too many keys for PyIceberg to evaluate the set on statistics.
+            bounds = pc.min_max(keys)
+            key_range = And(GreaterThanOrEqual(primary_key, bounds["min"].as_py()), LessThanOrEqual(primary_key, bounds["max"].as_py()))
+            key_filter = And(key_range, In(primary_key, keys.to_pylist()))
+
+        def commit():
+            table = self.load_table(database_name, table_name)
+            with table.transaction() as transaction:
+                if key_filter is not None:
+                    transaction.delete(key_filter, branch=branch)
+                if upserts.num_rows:
+                    transaction.append(upserts, branch=branch)
+
+        self.retry_policy.call(commit)
+
+    def _bounded_upsert(
+        self,
+        database_name: str,
+        table_name: str,
+        data: ArrowSource,
+        primary_key: str,
+        order_col: str,
+        source_table_pk: str,
+        branch: str,
+        budget: int,
+    ):
+        self._require_private_apis("Upserts bounded by upsert_memory_bytes")
+        with HashPartitionSpill(primary_key, budget // 2, spill_dir=self.spill_dir) as delta:
+            key_range = None
+            for chunk in iter_chunks(data, budget // 4):
+                if source_table_pk != primary_key:
+                    chunk = chunk.rename_columns([primary_key if name == source_table_pk else name for name in chunk.column_names])
+                delta.add(chunk)
+                bounds = pc.min_max(chunk[primary_key])
+                if bounds["min"].is_valid:
+                    low, high = bounds["min"].as_py(), bounds["max"].as_py()
+                    key_range = (low, high) if key_range is None else (min(key_range[0], low), max(key_range[1], high))
+
+            def commit():
+                table = self.load_table(database_name, table_name)
+                tasks = []
+                if key_range is not None and table.snapshot_by_name(branch) is not None:
+                    key_filter = And(GreaterThanOrEqual(primary_key, key_range[0]), LessThanOrEqual(primary_key, key_range[1]))
+                    tasks = self._plan_scan(table.scan(row_filter=key_filter).use_ref(branch))
+                matched_keys = self._match_keys(table, tasks, delta, budget // 4)
+
+                def kept_rows() -> Iterator[pa.RecordBatch]:
+                    scan = ArrowScan(table.metadata, table.io, table.schema(), AlwaysTrue())
+                    for index, keys in matched_keys.items():
+                        for batch in scan.to_record_batches([tasks[index]]):
+                            kept = batch.filter(
+                                pc.invert(pc.is_in(batch[primary_key], value_set=keys.cast(batch.schema.field(primary_key).type)))
+                            )
+                            if kept.num_rows:
+                                yield kept
+
+                def upserted_rows() -> Iterator[pa.RecordBatch]:
+                    sort_keys = write_sort_keys(table)
+                    for partition in delta:
+                        rows = deduplicate(partition, primary_key, order_col)
+                        if ACTION_COLUMN in rows.column_names:
+                            rows = rows.filter(pc.fill_null(pc.not_equal(rows[ACTION_COLUMN], "d"), True)).drop_columns([ACTION_COLUMN])
+                        if sort_keys:
+                            rows = rows.sort_by(sort_keys)
+                        yield from rows.to_batches()
+
+                chunk_bytes = min(self._chunk_bytes(table), budget // 4)
+                with table.transaction() as transaction:
+                    with transaction.update_snapshot(branch=branch).overwrite(commit_uuid=uuid.uuid4()) as rewrite:
+                        for index in matched_keys:
+                            rewrite.delete_data_file(tasks[index].file)
+                        counter = itertools.count(0)
+                        for rows in (kept_rows(), upserted_rows()):
+                            for chunk in iter_chunks(rows, chunk_bytes):
+                                for data_file in pyiceberg_compat.dataframe_to_data_files(
+                                    table_metadata=transaction.table_metadata,
+                                    df=chunk,
+                                    io=table.io,
+                                    write_uuid=rewrite.commit_uuid,
+                                    counter=counter,
+                                ):
+                                    rewrite.append_data_file(data_file)
+
+            # The delta is replayed from the spill, so a conflicting commit can be retried even for a stream source.
+            self.retry_policy.call(commit)
+
+    def _match_keys(self, table: Table, tasks: List[FileScanTask], delta: HashPartitionSpill, memory_bytes: int) -> Dict[int, pa.Array]:
+        """
+        Finds the keys of the delta held by every data file, joining the key columns of the files with the delta a
+        hash partition at a time.
+
+        Returns:
+            Dict[int, pa.Array]: The matched keys by index of the data file in ``tasks``, for the files with a match.
+        """
+        primary_key = delta.key
+        with HashPartitionSpill(primary_key, memory_bytes, delta.partitions, self.spill_dir) as probe:
+            scan = ArrowScan(table.metadata, table.io, table.schema().select(primary_key), AlwaysTrue())
+            for index, task in enumerate(tasks):
+                for batch in scan.to_record_batches([task]):
+                    keys = batch.column(primary_key)
+                    probe.add(pa.table({primary_key: keys, "file": pa.repeat(pa.scalar(index, pa.int32()), len(keys))}))
+
+            matches = []
+            for partition in range(delta.partitions):
+                probed = probe.partition(partition)
+                if probed.num_rows == 0:
+                    continue
+                keys = delta.partition(partition)[primary_key].combine_chunks()
+                matches.append(probed.filter(pc.is_in(probed[primary_key], value_set=keys.cast(probed.schema.field(primary_key).type))))
+        if not matches:
+            return {}
+        matches = pa.concat_tables(matches)
+        return {
+            index: matches.filter(pc.equal(matches["file"], index))[primary_key].combine_chunks()
+            for index in pc.unique(matches["file"]).to_pylist()
+        }
+
+    def expire_snapshots(self, database_name: str, table_name: str, older_than: datetime) -> int:
+        """
+        Expires the snapshots committed before a point in time, except branch and tag heads.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            older_than (datetime): Snapshots committed before this instant are expired.
+
+        Returns:
+            int: The number of snapshots expired.
+        """
+
+        def commit() -> int:
+            table = self.load_table(database_name, table_name)
+            before = len(table.metadata.snapshots)
+            table.maintenance.expire_snapshots().older_than(older_than).commit()
+            return before - len(table.metadata.snapshots)
+
+        return self.retry_policy.call(commit)
+
+    def delete_where(
+        self, database_name: str, table_name: str, predicate: Union[str, BooleanExpression], branch: str = MAIN_BRANCH
+    ) -> DeleteReport:
+        """
+        Deletes the rows matching a predicate, rewriting as little data as the table statistics allow.
+
+        Data files whose column statistics prove that every row matches are dropped from the metadata without being
+        read. Only the files that may partially match are rewritten (copy-on-write); PyIceberg cannot write delete
+        files, so tables configured for merge-on-read deletes are rewritten as well, which the report records as
+        ``copy_on_write_fallback``. Files that cannot match are not touched, and nothing is committed when no file can
+        match or no row of the scanned files matches. PyIceberg warns in both cases; the report states them instead.
+
+        Args:
+            database_name (str): The name of the database containing the table.
+            table_name (str): The name of the table.
+            predicate (Union[str, BooleanExpression]): The rows to delete.
+            branch (str): The branch to commit to.
+
+        Returns:
+            DeleteReport: The mode used and the number of files scanned, removed and rewritten.
+        """
+
+        def commit() -> DeleteReport:
+            table = self.load_table(database_name, table_name)
+            start = table.snapshot_by_name(branch)
+            if start is None:
+                return DeleteReport(mode="noop", files_scanned=0, rows_deleted=0)
+            tasks = self._plan_scan(table.scan(row_filter=predicate).use_ref(branch))
+            if not tasks:
+                return DeleteReport(mode="noop", files_scanned=0, rows_deleted=0)
+
+            with _DELETE_WARNINGS_LOCK, warnings.catch_warnings():
+                warnings.filterwarnings("ignore", message="Merge on read is not yet supported")
+                warnings.filterwarnings("ignore", message="Delete operation did not match any records")
+                with table.transaction() as transaction:
+                    transaction.delete(predicate, branch=branch)
+
+            summaries = []
+            for snapshot in ancestors_of(table.snapshot_by_name(branch), table.metadata):
+                if snapshot.snapshot_id == start.snapshot_id:
+                    break
+                summaries.append(snapshot.summary.additional_properties if snapshot.summary else {})
+            report = DeleteReport.from_snapshot_summaries(summaries, files_scanned=len(tasks))
+            report.copy_on_write_fallback = report.mode != "noop" and table.properties.get("write.delete.mode") == "merge-on-read"
+            return report
+
+        return self.retry_policy.call(commit)
+
+    def _write(
+        self,
+        database_name: str,
+        table_name: str,
+        data: ArrowSource,
+        overwrite_filter: BooleanExpression,
+        overwrite: bool,
+        branch: str = MAIN_BRANCH,
+    ):
+        def commit():
+            table = self.load_table(database_name, table_name)
+            chunks = iter_chunks(data, self._chunk_bytes(table))
+            sort_keys = write_sort_keys(table)
+            if sort_keys and isinstance(data, (pa.Table, pa.RecordBatch)):
+                chunks = iter_chunks(to_arrow_table(data).sort_by(sort_keys), self._chunk_bytes(table))
+            elif sort_keys:
+                # A stream is clustered chunk by chunk.
+                chunks = (chunk.sort_by(sort_keys) for chunk in chunks)
+            with table.transaction() as transaction:
+                if overwrite:
+                    transaction.delete(overwrite_filter, branch=branch)
+                if not pyiceberg_compat.PRIVATE_APIS:
+                    for chunk in chunks:
+                        transaction.append(chunk, branch=branch)
+                    return
+                with transaction.update_snapshot(branch=branch).fast_append() as append_files:
+                    counter = itertools.count(0)
+                    for chunk in chunks:
+                        for data_file in pyiceberg_compat.dataframe_to_data_files(
+                            table_metadata=transaction.table_metadata,
+                            df=chunk,
+                            io=table.io,
+                            write_uuid=append_files.commit_uuid,
+                            counter=counter,
+                        ):
+                            append_files.append_data_file(data_file)
+
+        if isinstance(data, (pa.Table, pa.RecordBatch)):
+            self.retry_policy.call(commit)
+        else:
+            # A stream cannot be replayed, so a failed commit is not retried.
+            commit()
+
+    def _chunk_bytes(self, table: Table) -> int:
+        return self.target_file_size_bytes or int(table.properties.get("write.target-file-size-bytes", DEFAULT_TARGET_FILE_SIZE_BYTES))
+
+    @staticmethod
+    def _require_private_apis(operation: str):
+        if not pyiceberg_compat.PRIVATE_APIS:
+            low, high = pyiceberg_compat.TESTED_VERSIONS
+            raise UnsupportedOperationError(
+                f"{operation} need PyIceberg {'.'.join(map(str, low))} up to {'.'.join(map(str, high))} (exclusive) on this connector."
+            )
+
+
+def to_arrow_table(data: ArrowSource) -> pa.Table:
+    """
+    Materialises an Arrow source as a table.
+
+    Args:
+        data (ArrowSource): An Arrow table, record batch, record batch reader or iterable of record batches.
+
+    Returns:
+        pa.Table: The Arrow table.
+    """
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pa.RecordBatch):
+        return pa.Table.from_batches([data])
+    if isinstance(data, pa.RecordBatchReader):
+        return data.read_all()
+    return pa.Table.from_batches(list(data))
+
+
+def iter_chunks(data: ArrowSource, chunk_bytes: int) -> Iterator[pa.Table]:
+    """
+    Groups an Arrow source into tables of at most ``chunk_bytes`` of Arrow memory.
+
+    A single record batch larger than the limit is yielded on its own.
+
+    Args:
+        data (ArrowSource): An Arrow table, record batch, record batch reader or iterable of record batches.
+        chunk_bytes (int): The maximum size of a chunk.
+
+    Yields:
+        pa.Table: The chunks, in source order.
+    """
+    if isinstance(data, pa.Table):
+        batches = data.to_batches()
+    elif isinstance(data, pa.RecordBatch):
+        batches = [data]
+    else:
+        batches = data
+
+    buffered = []
+    buffered_bytes = 0
+    for batch in batches:
+        if buffered and buffered_bytes + batch.nbytes > chunk_bytes:
+            yield pa.Table.from_batches(buffered)
+            buffered, buffered_bytes = [], 0
+        buffered.append(batch)
+        buffered_bytes += batch.nbytes
+    if buffered:
+        yield pa.Table.from_batches(buffered)
+
+
+def write_sort_keys(table: Table) -> List[Tuple[str, str]]:
+    """
+    Returns the Arrow sort keys of the write sort order of a table.
+
+    Only the leading identity fields of the sort order are used, since rows cannot be ordered by a transformed value
+    in Arrow.
+
+    Args:
+        table (Table): The table.
+
+    Returns:
+        List[Tuple[str, str]]: The ``(column, "ascending" | "descending")`` sort keys, empty for unsorted tables.
+    """
+    sort_keys = []
+    for field in table.sort_order().fields:
+        if not isinstance(field.transform, IdentityTransform):
+            break
+        direction = "ascending" if field.direction == SortDirection.ASC else "descending"
+        sort_keys.append((table.schema().find_column_name(field.source_id), direction))
+    return sort_keys
+
+
+def deduplicate(data: pa.Table, key: str, order_col: str) -> pa.Table:
+    """
+    Keeps the row with the greatest ``order_col`` for every key.
+
+    Args:
+        data (pa.Table): The rows to deduplicate.
+        key (str): The key column.
+        order_col (str): The column ordering the rows of a key.
+
+    Returns:
+        pa.Table: One row per key.
+    """
+    if data.num_rows == 0:
+        return data
+    ordered = data.sort_by([(key, "ascending"), (order_col, "descending")])
+    keys = ordered[key].combine_chunks()
+    first = pa.concat_arrays([pa.array([True]), pc.fill_null(pc.not_equal(keys[1:], keys[:-1]), True)])
+    return ordered.filter(first)
@@ -1,9 +1,26 @@
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict
+from typing import List
+from typing import Optional
+
 from pyspark.conf import SparkConf
 from pyspark.sql import SparkSession
 
+from ..exceptions.exceptions import OperationCancelledError
+from ..models.models import AdaptiveTuningConfigModel
+from ..models.models import SchedulerConfigModel
 from ..models.models import SparkIcebergConfigModel
+from ..utils.retry import RetryPolicy
+from ..utils.sql_builder import is_read_only
 from .base_connector import BaseConnector
 
+JOB_GROUP_PROPERTY = "spark.jobGroup.id"
+JOB_DESCRIPTION_PROPERTY = "spark.job.description"
+INTERRUPT_ON_CANCEL_PROPERTY = "spark.job.interruptOnCancel"
+SCHEDULER_POOL_PROPERTY = "spark.scheduler.pool"
+
 
 class SparkConnector(BaseConnector):
     """
@@ -16,6 +33,15 @@ class SparkConnector(BaseConnector):
         __master (str): The master URL for the Spark cluster.
         __spark_config (dict): Additional Spark configuration properties.
         __catalog_name (str): The catalog name for Spark.
+        catalogs (Dict[str, Dict[str, str]]): Additional Iceberg catalogs registered on the same session, with their
+            catalog properties (``type``, ``warehouse``, ``uri``...). The catalog class defaults to
+            ``org.apache.iceberg.spark.SparkCatalog`` and can be overridden with the ``impl`` property.
+        retry_policy (RetryPolicy): The policy used to retry statements failing with transient errors.
+        adaptive (Optional[AdaptiveTuningConfigModel]): When set, writes tune the session settings from the sizes of
+            their source and target; see ``tuned``. The settings apply to the whole session, so adaptive tuning is
+            meant for sessions running one operation at a time.
+        scheduler (SchedulerConfigModel): The scheduler pools and timeouts of the manager operations; see
+            ``operation``.
 
     Args:
         config (SparkIcebergConfigModel): Configuration model containing necessary connection parameters.
@@ -32,6 +58,18 @@ class SparkConnector(BaseConnector):
         self.__master = config.get("master")
         self.__spark_config = config.get("config")
         self.__catalog_name = config.get("catalog_name")
+        self.catalogs = config.get("catalogs") or {}
+        self.retry_policy = RetryPolicy.from_config(config.get("retry"))
+        adaptive = config.get("adaptive")
+        self.adaptive = AdaptiveTuningConfigModel(**adaptive) if adaptive else None
+        self._tuning_lock = threading.RLock()
+        scheduler = config.get("scheduler")
+        self.scheduler = SchedulerConfigModel(**scheduler) if scheduler else SchedulerConfigModel()
+        self._operation_lock = threading.Lock()
+        self._operations: Dict[str, str] = {}
+        self._cancelled: Dict[str, str] = {}
+        self._properties: Dict[str, Dict[str, str]] = {}
+        self._local = threading.local()
 
     @property
     def catalog_name(self):
@@ -43,15 +81,47 @@ class SparkConnector(BaseConnector):
         """
         return self.__catalog_name
 
+    @property
+    def catalog_names(self) -> List[str]:
+        """
+        The names of the catalogs reachable through the session, the default catalog first.
+
+        Returns:
+            List[str]: The catalog names.
+        """
+        names = [self.__catalog_name] if self.__catalog_name else []
+        return names + [name for name in self.catalogs if name not in names]
+
+    def catalog_config(self) -> Dict[str, str]:
+        """
+        Renders the additional catalogs as ``spark.sql.catalog.*`` session properties.
+
+        Returns:
+            Dict[str, str]: The Spark properties.
+        """
+        spark_config = {}
+        for name, properties in self.catalogs.items():
+            properties = dict(properties)
+            spark_config[f"spark.sql.catalog.{name}"] = properties.pop("impl", "org.apache.iceberg.spark.SparkCatalog")
+            for key, value in properties.items():
+                spark_config[f"spark.sql.catalog.{name}.{key}"] = value
+        return spark_config
+
     def connect(self):
         """
         Establishes a connection to the Spark cluster and creates a SparkSession.
 
+        Every catalog in ``catalogs`` is registered on the session, so a single session serves all of them. When
+        operations are assigned to scheduler pools, the FAIR scheduler is enabled unless ``spark.scheduler.mode`` is
+        configured.
+
         Returns:
             pyspark.sql.SparkSession: Spark session for executing SQL queries.
         """
         conf = SparkConf().setAppName(self.__app_name).setMaster(self.__master)
-        for key, value in self.__spark_config.items():
+        if self.scheduler.pools or self.scheduler.default_pool:
+            conf.set("spark.scheduler.mode", "FAIR")
+        for key, value in {**self.catalog_config(), **self.__spark_config}.items():
             conf.set(key, value)
         self.session = SparkSession.builder.config(conf=conf).getOrCreate()
         return self.session
@@ -60,10 +130,204 @@ class SparkConnector(BaseConnector):
         """
         Executes a SQL query on Spark and returns the result DataFrame.
 
+        Read-only queries failing with a transient error are retried according to the connector retry policy. Other
+        statements are rerun only after an Iceberg commit conflict, which leaves the table unchanged; see
+        ``RetryPolicy.call_write``.
+
         Args:
             query (str): The SQL query to be executed.
 
         Returns:
             pyspark.sql.DataFrame: The DataFrame with the results of the query.
+
+        Raises:
+            OperationCancelledError: If the operation running the query was cancelled.
+        """
+        group_id = getattr(self._local, "group_id", None)
+        if group_id is not None and group_id in self._cancelled:
+            raise OperationCancelledError(f"{self._operations.get(group_id, group_id)} {self._cancelled[group_id]}")
+        if is_read_only(query):
+            return self.retry_policy.call(self.session.sql, query)
+        return self.retry_policy.call_write(self.session.sql, query)
+
+    @contextmanager
+    def operation(self, name: str, description: Optional[str] = None, parent_id: Optional[str] = None):
+        """
+        Runs the Spark jobs of a manager operation in a job group of its own.
+
+        The job group, its description and the scheduler pool the operation is assigned to are set as local
+        properties of the calling thread, so operations running concurrently on the session are scheduled in their
+        own pools and show up by name in the Spark UI. The jobs of a group are cancelled by ``cancel``, or once the
+        timeout of the operation elapses, and the statements the operation runs afterwards are rejected. Operations
+        started within an operation run in its job group.
+
+        Local properties are not inherited by the threads an operation starts, so its worker threads join its job
+        group by passing it as ``parent_id``.
+
+        Jobs of the DataFrames returned by the operation and evaluated later run outside of the group.
+
+        Args:
+            name (str): The name of the operation, the manager method; it selects the pool and the timeout.
+            description (Optional[str]): A description of the operation. Defaults to its name.
+            parent_id (Optional[str]): The job group of a running operation to join from another thread. Defaults to
+                the operation of the calling thread, if any.
+
+        Yields:
+            str: The job group of the operation.
+
+        Raises:
+            OperationCancelledError: If the operation failed after it was cancelled.
+        """
+        current_id = getattr(self._local, "group_id", None)
+        if current_id is not None:
+            yield current_id
+            return
+        with self._operation_lock:
+            parent_properties = self._properties.get(parent_id)
+        if parent_properties is not None:
+            with self._joined(parent_id, parent_properties):
+                yield parent_id
+            return
+        group_id = f"keepice-{name}-{uuid.uuid4().hex}"
+        description = description or name
+        timeout = self.scheduler.timeouts.get(name, self.scheduler.default_timeout)
+        properties = {
+            JOB_GROUP_PROPERTY: group_id,
+            JOB_DESCRIPTION_PROPERTY: description,
+            INTERRUPT_ON_CANCEL_PROPERTY: "true",
+            SCHEDULER_POOL_PROPERTY: self.scheduler.pools.get(name, self.scheduler.default_pool),
+        }
+        context = self.session.sparkContext
+        previous = {key: context.getLocalProperty(key) for key in properties}
+        for key, value in properties.items():
+            context.setLocalProperty(key, value)
+        with self._operation_lock:
+            self._operations[group_id] = description
+            self._properties[group_id] = properties
+        self._local.group_id = group_id
+        timer = None
+        if timeout:
+            timer = threading.Timer(timeout, self._cancel, (group_id, f"was cancelled after {timeout:g} seconds"))
+            timer.daemon = True
+            timer.start()
+        try:
+            yield group_id
+        except Exception as e:
+            if group_id in self._cancelled:
+                raise OperationCancelledError(f"{description} {self._cancelled[group_id]}") from e
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self._local.group_id = None
+            with self._operation_lock:
+                self._operations.pop(group_id, None)
+                self._cancelled.pop(group_id, None)
+                self._properties.pop(group_id, None)
+            for key, value in previous.items():
+                context.setLocalProperty(key, value)
+
+    @contextmanager
+    def _joined(self, group_id: str, properties: Dict[str, str]):
+        """Runs the Spark jobs of the calling thread in the job group of a running operation."""
+        context = self.session.sparkContext
+        previous = {key: context.getLocalProperty(key) for key in properties}
+        for key, value in properties.items():
+            context.setLocalProperty(key, value)
+        self._local.group_id = group_id
+        try:
+            yield
+        except Exception as e:
+            if group_id in self._cancelled:
+                raise OperationCancelledError(f"{properties[JOB_DESCRIPTION_PROPERTY]} {self._cancelled[group_id]}") from e
+            raise
+        finally:
+            self._local.group_id = None
+            for key, value in previous.items():
+                context.setLocalProperty(key, value)
+
+    def running_operations(self) -> Dict[str, str]:
+        """
+        Lists the operations running on the session.
+
+        Returns:
+            Dict[str, str]: The description of every running operation, by job group.
+        """
+        with self._operation_lock:
+            return dict(self._operations)
+
+    def cancel(self, group_id: str) -> bool:
+        """
+        Cancels the running Spark jobs of an operation.
+
+        Cancelled jobs fail the statement waiting on them, and the operation fails with an
+        ``OperationCancelledError``.
+
+        Args:
+            group_id (str): The job group of the operation.
+
+        Returns:
+            bool: Whether the operation was running.
+        """
+        return self._cancel(group_id, "was cancelled")
+
+    def _cancel(self, group_id: str, reason: str) -> bool:
+        with self._operation_lock:
+            if group_id not in self._operations:
+                return False
+            self._cancelled.setdefault(group_id, reason)
+        self.session.sparkContext.cancelJobGroup(group_id)
+        return True
+
+    @contextmanager
+    def tuned(self, settings: Dict[str, str]):
+        """
+        Applies Spark SQL settings for the duration of a statement, then restores the previous values.
+
+        Settings are session wide, so tuned statements of one session run one at a time; tuned statements can nest
+        within the same thread.
+
+        Args:
+            settings (Dict[str, str]): The Spark SQL settings.
+
+        Yields:
+            None
+        """
+        if not settings:
+            yield
+            return
+        with self._tuning_lock:
+            previous = {key: self.session.conf.get(key, None) for key in settings}
+            for key, value in settings.items():
+                self.session.conf.set(key, value)
+            try:
+                yield
+            finally:
+                for key, value in previous.items():
+                    if value is None:
+                        self.session.conf.unset(key)
+                    else:
+                        self.session.conf.set(key, value)
+
+    @staticmethod
+    def estimated_size(dataframe) -> Optional[int]:
+        """
+        Reads the size Spark estimates for a DataFrame from the statistics of its optimized plan.
+
+        The statistics are read through the JVM DataFrame, so DataFrames without one, such as Spark Connect
+        DataFrames, have no estimate.
+
+        Args:
+            dataframe (pyspark.sql.DataFrame): The DataFrame.
+
+        Returns:
+            Optional[int]: The estimated size in bytes, or None when Spark has no estimate.
         """
-        return self.session.sql(query)
+        if not hasattr(dataframe, "_jdf"):
+            return None
+        try:
+            size = int(dataframe._jdf.queryExecution().optimizedPlan().stats().sizeInBytes().toString())
+        except Exception:
+            return None
+        # Spark falls back to Long.MaxValue when it cannot estimate a plan.
+        return size if size < 2**63 - 1 else None
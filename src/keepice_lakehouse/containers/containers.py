@@ -1,11 +1,33 @@
+from typing import Dict
+
 from dependency_injector import containers
 from dependency_injector import providers
 
 from ..connectors.athena_connector import AthenaConnector
+from ..connectors.base_connector import BaseConnector
 from ..connectors.pyiceberg_connector import PyIcebergConnector
 from ..connectors.spark_connector import SparkConnector
 from ..utils.enums import ConnectorType
 
+CONNECTOR_CLASSES = {
+    ConnectorType.SPARK_ICEBERG: SparkConnector,
+    ConnectorType.ATHENA: AthenaConnector,
+    ConnectorType.PYICEBERG: PyIcebergConnector,
+}
+
+
+def create_named_connectors(config: Dict[str, dict]) -> Dict[str, BaseConnector]:
+    """
+    Creates the connectors of the named connector instances.
+
+    Args:
+        config (Dict[str, dict]): The configuration of every instance, including its connector ``type``.
+
+    Returns:
+        Dict[str, BaseConnector]: The connectors keyed by instance name.
+    """
+    return {name: CONNECTOR_CLASSES[ConnectorType(instance["type"])](instance) for name, instance in (config or {}).items()}
+
 
 class ConnectorsContainer(containers.DeclarativeContainer):
     config = providers.Configuration()
@@ -16,6 +38,8 @@ class ConnectorsContainer(containers.DeclarativeContainer):
 
     pyiceberg_config = providers.Singleton(PyIcebergConnector, config=config.connectors.pyiceberg)
 
+    named_connectors = providers.Singleton(create_named_connectors, config=config.connectors.instances)
+
     connector_map = providers.Dict(
         {
             ConnectorType.SPARK_ICEBERG: spark_iceberg_config,
@@ -21,3 +21,13 @@ def create_iceberg_manager(connector_type: ConnectorType, container: ConnectorsC
 
     connector = connector_provider()
     return IcebergManager(connector)
+
+
+@inject
+def create_named_iceberg_manager(instance_name: str, container: ConnectorsContainer = Provide[ConnectorsContainer]) -> IcebergManager:
+    connectors = container.named_connectors()
+
+    if instance_name not in connectors:
+        raise ValueError(f"Unknown connector instance: {instance_name}")
+
+    return IcebergManager(connectors[instance_name])
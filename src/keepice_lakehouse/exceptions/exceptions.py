@@ -35,3 +35,52 @@ class InvalidTablePropertyError(IcebergManagerError):
 
     def __init__(self, message: str):
         super().__init__(f"Invalid Table Property: {message}")
+
+
+class UnsupportedOperationError(IcebergManagerError):
+    """Exception raised for operations not supported by the configured connector."""
+
+    def __init__(self, message: str):
+        super().__init__(f"Unsupported Operation: {message}")
+
+
+class BranchPublishError(IcebergManagerError):
+    """Exception raised when a branch cannot be published to another branch."""
+
+    def __init__(self, message: str):
+        super().__init__(f"Branch Publish Error: {message}")
+
+
+class DataDeletionError(IcebergManagerError):
+    """Exception raised for errors in deleting table rows."""
+
+    def __init__(self, message: str):
+        super().__init__(f"Data Deletion Error: {message}")
+
+
+class SnapshotExpirationError(IcebergManagerError):
+    """Exception raised for errors in expiring table snapshots."""
+
+    def __init__(self, message: str):
+        super().__init__(f"Snapshot Expiration Error: {message}")
+
+
+class CompactionError(IcebergManagerError):
+    """Exception raised for errors in compacting table data files."""
+
+    def __init__(self, message: str):
+        super().__init__(f"Compaction Error: {message}")
+
+
+class SummaryRefreshError(IcebergManagerError):
+    """Exception raised for errors in creating or refreshing summary tables."""
+
+    def __init__(self, message: str):
+        super().__init__(f"Summary Refresh Error: {message}")
+
+
+class OperationCancelledError(IcebergManagerError):
+    """Exception raised when an operation is cancelled, on request or for running longer than its timeout."""
+
+    def __init__(self, message: str):
+        super().__init__(f"Operation Cancelled Error: {message}")
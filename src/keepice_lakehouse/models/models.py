@@ -1,7 +1,60 @@
+import re
+from datetime import datetime
+from typing import Annotated
+from typing import Any
 from typing import Dict
+from typing import List
+from typing import Literal
 from typing import Optional
+from typing import Union
 
 from pydantic import BaseModel
+from pydantic import Field
+from pydantic import ValidationInfo
+from pydantic import field_validator
+
+METRICS_MODE_PATTERN = re.compile(r"none|counts|full|truncate\(\d+\)")
+AGGREGATE_PATTERN = re.compile(r"\s*(sum|count|min|max)\s*\(((?!\s*distinct\b)[^()]*(?:\([^()]*\)[^()]*)*)\)\s*", re.IGNORECASE)
+
+
+class RetryConfigModel(BaseModel):
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+    jitter: bool = True
+    retryable_errors: Optional[List[str]] = None
+
+
+class AdaptiveTuningConfigModel(BaseModel):
+    """
+    Bounds of the Spark settings tuned per write from the sizes of its source and target tables.
+
+    Shuffles get about one partition per ``target_partition_bytes`` of input, between ``min_shuffle_partitions`` and
+    ``max_shuffle_partitions``. Sources up to ``broadcast_max_bytes`` are broadcast to joins; larger sources disable
+    broadcasts. A shuffle partition is split as skewed when it exceeds ``skew_factor`` times the median partition size
+    and ``skew_factor`` times ``target_partition_bytes``.
+    """
+
+    target_partition_bytes: int = Field(default=128 * 1024 * 1024, gt=0)
+    min_shuffle_partitions: int = Field(default=1, gt=0)
+    max_shuffle_partitions: int = Field(default=10000, gt=0)
+    broadcast_max_bytes: int = Field(default=64 * 1024 * 1024, ge=0)
+    skew_factor: int = Field(default=5, gt=0)
+
+
+class SchedulerConfigModel(BaseModel):
+    """
+    Scheduling of the manager operations run on a shared Spark session.
+
+    Every operation runs its Spark jobs in a job group of its own. ``pools`` assigns operations, by manager method name,
+    to FAIR scheduler pools, and the others run in ``default_pool`` when set. ``timeouts`` cancels an operation still
+    running after that many seconds, falling back to ``default_timeout``.
+    """
+
+    default_pool: Optional[str] = None
+    pools: Dict[str, str] = {}
+    default_timeout: Optional[float] = Field(default=None, gt=0)
+    timeouts: Dict[str, float] = {}
 
 
 class SparkIcebergConfigModel(BaseModel):
@@ -9,6 +62,10 @@ class SparkIcebergConfigModel(BaseModel):
     master: str
     config: Dict[str, str]
     catalog_name: Optional[str] = None
+    catalogs: Dict[str, Dict[str, str]] = {}
+    retry: Optional[RetryConfigModel] = None
+    adaptive: Optional[AdaptiveTuningConfigModel] = None
+    scheduler: Optional[SchedulerConfigModel] = None
 
 
 class AthenaConfigModel(BaseModel):
@@ -17,19 +74,523 @@ class AthenaConfigModel(BaseModel):
     workgroup: str
     catalog_name: Optional[str] = None
     warehouse: Optional[str] = None
+    retry: Optional[RetryConfigModel] = None
+    result_reuse_minutes: Optional[int] = None
+    result_cache_dir: Optional[str] = None
+    result_cache_max_entries: Optional[int] = None
+    export_location: Optional[str] = None
+    export_database: Optional[str] = None
 
 
 class PyIcebergConfigModel(BaseModel):
     catalog_name: str
     warehouse: str
     uri: str
+    properties: Dict[str, str] = {}
+    target_file_size_bytes: Optional[int] = None
+    manifest_workers: Optional[int] = None
+    manifest_cache_entries: Optional[int] = None
+    file_cache_dir: Optional[str] = None
+    file_cache_max_bytes: Optional[int] = None
+    file_cache_block_size: Optional[int] = None
+    upsert_memory_bytes: Optional[int] = Field(None, gt=0)
+    spill_dir: Optional[str] = None
+    retry: Optional[RetryConfigModel] = None
+
+
+class SparkIcebergInstanceModel(SparkIcebergConfigModel):
+    type: Literal["spark_iceberg"]
+
+
+class AthenaInstanceModel(AthenaConfigModel):
+    type: Literal["athena"]
+
+
+class PyIcebergInstanceModel(PyIcebergConfigModel):
+    type: Literal["pyiceberg"]
+
+
+ConnectorInstanceModel = Annotated[
+    Union[SparkIcebergInstanceModel, AthenaInstanceModel, PyIcebergInstanceModel], Field(discriminator="type")
+]
 
 
 class ConnectorsConfigModel(BaseModel):
     spark_iceberg: Optional[SparkIcebergConfigModel] = None
     athena: Optional[AthenaConfigModel] = None
     pyiceberg: Optional[PyIcebergConfigModel] = None
+    instances: Dict[str, ConnectorInstanceModel] = {}
+
+
+class RetentionPolicyModel(BaseModel):
+    database_name: str
+    table_name: str
+    partition_column: str
+    retention_days: int
+    column_type: Literal["timestamp", "date"] = "timestamp"
+    expire_snapshots: bool = True
+    snapshot_max_age_days: int = 0
+
+
+class ColumnMetricsConfigModel(BaseModel):
+    """
+    Column statistics written by Iceberg: the metrics modes of the manifests and the Parquet bloom filters.
+
+    Metrics modes are ``none``, ``counts``, ``truncate(n)`` or ``full``. ``default_mode`` applies to the columns
+    without a mode of their own.
+    """
+
+    default_mode: Optional[str] = None
+    column_modes: Dict[str, str] = {}
+    bloom_filter_columns: List[str] = []
+    bloom_filter_fpp: Optional[float] = None
+    bloom_filter_max_bytes: Optional[int] = None
+
+    @field_validator("default_mode")
+    @classmethod
+    def validate_default_mode(cls, mode: Optional[str]) -> Optional[str]:
+        if mode is not None and not METRICS_MODE_PATTERN.fullmatch(mode):
+            raise ValueError(f"Invalid metrics mode: {mode}")
+        return mode
+
+    @field_validator("column_modes")
+    @classmethod
+    def validate_column_modes(cls, modes: Dict[str, str]) -> Dict[str, str]:
+        for mode in modes.values():
+            cls.validate_default_mode(mode)
+        return modes
+
+    def table_properties(self) -> Dict[str, str]:
+        """
+        Renders the configuration as Iceberg table properties.
+
+        Returns:
+            Dict[str, str]: The ``write.metadata.metrics.*`` and ``write.parquet.bloom-filter-*`` properties.
+        """
+        properties = {}
+        if self.default_mode is not None:
+            properties["write.metadata.metrics.default"] = self.default_mode
+        for column, mode in self.column_modes.items():
+            properties[f"write.metadata.metrics.column.{column}"] = mode
+        for column in self.bloom_filter_columns:
+            properties[f"write.parquet.bloom-filter-enabled.column.{column}"] = "true"
+            if self.bloom_filter_fpp is not None:
+                properties[f"write.parquet.bloom-filter-fpp.column.{column}"] = str(self.bloom_filter_fpp)
+        if self.bloom_filter_columns and self.bloom_filter_max_bytes is not None:
+            properties["write.parquet.bloom-filter-max-bytes"] = str(self.bloom_filter_max_bytes)
+        return properties
+
+
+class ParquetWriterConfigModel(BaseModel):
+    """
+    Parquet writer settings of the data files of a table.
+
+    ``codec`` and ``compression_level`` trade storage for CPU: ``zstd`` at a low level is the usual default, ``snappy``
+    and ``lz4`` write and decode faster but compress less. Row groups are bounded by ``row_group_size_bytes`` on
+    Spark and by ``row_group_rows`` on PyIceberg; larger row groups compress better, smaller ones skip more precisely.
+    ``dict_size_bytes`` is the dictionary page size beyond which a column chunk falls back from dictionary to plain
+    encoding, and ``0`` disables dictionary encoding.
+    """
+
+    codec: Optional[Literal["zstd", "snappy", "lz4", "gzip", "brotli", "uncompressed"]] = None
+    compression_level: Optional[int] = None
+    row_group_size_bytes: Optional[int] = Field(default=None, gt=0)
+    row_group_rows: Optional[int] = Field(default=None, gt=0)
+    page_size_bytes: Optional[int] = Field(default=None, gt=0)
+    page_row_limit: Optional[int] = Field(default=None, gt=0)
+    dict_size_bytes: Optional[int] = Field(default=None, ge=0)
+
+    @field_validator("compression_level")
+    @classmethod
+    def validate_compression_level(cls, level: Optional[int], info: ValidationInfo) -> Optional[int]:
+        if level is not None and info.data.get("codec") not in ("zstd", "gzip", "brotli"):
+            raise ValueError(f"A compression level needs the zstd, gzip or brotli codec, not {info.data.get('codec')}")
+        return level
+
+    def table_properties(self) -> Dict[str, str]:
+        """
+        Renders the settings as Iceberg table properties.
+
+        Returns:
+            Dict[str, str]: The ``write.parquet.*`` properties of the settings given.
+        """
+        names = {
+            "codec": "write.parquet.compression-codec",
+            "compression_level": "write.parquet.compression-level",
+            "row_group_size_bytes": "write.parquet.row-group-size-bytes",
+            "row_group_rows": "write.parquet.row-group-limit",
+            "page_size_bytes": "write.parquet.page-size-bytes",
+            "page_row_limit": "write.parquet.page-row-limit",
+            "dict_size_bytes": "write.parquet.dict-size-bytes",
+        }
+        return {names[field]: str(value) for field, value in self.model_dump(exclude_none=True).items()}
+
+
+class ParquetBenchmarkResult(BaseModel):
+    """
+    Size and speed of a sample of a table written under one set of Parquet writer settings.
+
+    Throughputs are in bytes of the sample in memory per second, so the candidates of a benchmark compare directly.
+    """
+
+    name: str
+    settings: ParquetWriterConfigModel
+    rows: int
+    file_bytes: int
+    compression_ratio: float
+    row_groups: int
+    write_seconds: float
+    scan_seconds: float
+    write_bytes_per_second: float
+    scan_bytes_per_second: float
+
+
+class StreamingConfigModel(BaseModel):
+    """
+    Settings of a streaming ingestion into an Iceberg table.
+
+    ``stream_id`` identifies the stream in the snapshot properties of the table and defaults to the checkpoint
+    location. Micro-batches run every ``trigger_interval`` (e.g. ``"1 minute"``), as fast as possible when unset, or
+    over the available data only and then stop when ``available_now`` is set. Every ``compact_every`` micro-batches,
+    the small files written by the stream are compacted with ``compaction_strategy``.
+    """
+
+    checkpoint_location: str
+    stream_id: Optional[str] = None
+    query_name: Optional[str] = None
+    trigger_interval: Optional[str] = None
+    available_now: bool = False
+    compact_every: Optional[int] = Field(default=None, gt=0)
+    compaction_strategy: Literal["binpack", "sort", "zorder"] = "binpack"
+    compaction_columns: List[str] = []
+
+
+class SummaryTableModel(BaseModel):
+    """
+    Definition of a summary table: aggregates of a source table grouped by some of its columns.
+
+    ``aggregates`` maps every output column to a ``sum``, ``count``, ``min`` or ``max`` aggregate, e.g.
+    ``{"revenue": "sum(amount)", "orders": "count(*)"}``, without ``DISTINCT``. These aggregates can be computed over new rows only and
+    combined with the stored values, which is what makes incremental refreshes possible; averages are derived from a
+    sum and a count at query time. ``predicate`` restricts the source rows aggregated.
+    """
+
+    source_database: str
+    source_table: str
+    group_by: List[str] = []
+    aggregates: Dict[str, str] = Field(min_length=1)
+    predicate: Optional[str] = None
+
+    @field_validator("aggregates")
+    @classmethod
+    def validate_aggregates(cls, aggregates: Dict[str, str]) -> Dict[str, str]:
+        for column, expression in aggregates.items():
+            if not AGGREGATE_PATTERN.fullmatch(expression):
+                raise ValueError(f"Aggregate of {column} must be a sum, count, min or max without DISTINCT: {expression}")
+        return aggregates
+
+    def aggregate_function(self, column: str) -> str:
+        """
+        Returns the aggregate function of an output column.
+
+        Args:
+            column (str): The output column.
+
+        Returns:
+            str: ``sum``, ``count``, ``min`` or ``max``.
+        """
+        return AGGREGATE_PATTERN.fullmatch(self.aggregates[column]).group(1).lower()
+
+
+class WriteModePolicyModel(BaseModel):
+    """
+    Thresholds of the write mode advisor.
+
+    The snapshots of the last ``window_days`` days are inspected. Row-level commits (merges, updates and deletes that
+    rewrite rows) that would rewrite ``rewrite_fraction_threshold`` of the table bytes on average, or that happen more
+    than ``frequent_commits_per_day`` times a day, favour merge-on-read, unless the table is read at least
+    ``read_heavy_ratio`` times per row-level commit. Under merge-on-read, compactions are scheduled so that the delete
+    files stay below ``max_delete_file_ratio`` delete files per data file.
+    """
+
+    window_days: int = Field(default=7, gt=0)
+    rewrite_fraction_threshold: float = Field(default=0.1, gt=0)
+    frequent_commits_per_day: float = Field(default=24.0, gt=0)
+    read_heavy_ratio: float = Field(default=10.0, gt=0)
+    max_delete_file_ratio: float = Field(default=0.1, gt=0)
 
 
 class ConfigModel(BaseModel):
     connectors: ConnectorsConfigModel
+    retention: List[RetentionPolicyModel] = []
+
+
+class DeleteReport(BaseModel):
+    """
+    Outcome of a ``delete_where`` operation.
+
+    ``mode`` is ``metadata`` when only whole data files were dropped, ``copy-on-write`` when data files were rewritten,
+    ``merge-on-read`` when delete files were added and ``noop`` when nothing matched. A ``noop`` with scanned files
+    means the statistics of the files could not rule out the predicate but none of their rows matched.
+    ``copy_on_write_fallback`` is set when the table is configured for merge-on-read deletes but the connector, unable
+    to write delete files, rewrote the data files instead.
+    """
+
+    mode: Literal["metadata", "copy-on-write", "merge-on-read", "noop"]
+    files_scanned: Optional[int] = None
+    files_removed: int = 0
+    files_rewritten: int = 0
+    delete_files_added: int = 0
+    rows_deleted: Optional[int] = None
+    copy_on_write_fallback: bool = False
+
+    @classmethod
+    def from_snapshot_summaries(cls, summaries: List[Dict[str, str]], files_scanned: Optional[int] = None) -> "DeleteReport":
+        """
+        Builds the report of a delete from the summaries of the snapshots it committed.
+
+        Args:
+            summaries (List[Dict[str, str]]): The Iceberg snapshot summaries.
+            files_scanned (Optional[int]): The number of data files the predicate could match, when known.
+
+        Returns:
+            DeleteReport: The report.
+        """
+
+        def total(key: str) -> int:
+            return sum(int(summary.get(key, 0)) for summary in summaries)
+
+        removed = total("deleted-data-files")
+        added = total("added-data-files")
+        delete_files = total("added-delete-files")
+        rows_deleted = total("deleted-records") - total("added-records") + total("added-position-deletes") + total("added-equality-deletes")
+        if delete_files:
+            mode = "merge-on-read"
+        elif added:
+            mode = "copy-on-write"
+        elif removed:
+            mode = "metadata"
+        else:
+            mode = "noop"
+        return cls(
+            mode=mode,
+            files_scanned=files_scanned,
+            files_removed=removed - min(removed, added),
+            files_rewritten=min(removed, added),
+            delete_files_added=delete_files,
+            rows_deleted=rows_deleted,
+        )
+
+
+class RetentionReport(BaseModel):
+    """
+    Outcome of applying a retention policy to a table. ``error`` is set when the policy could not be applied.
+    """
+
+    database_name: str
+    table_name: str
+    cutoff: datetime
+    delete: Optional[DeleteReport] = None
+    snapshots_expired: Optional[int] = None
+    error: Optional[str] = None
+
+
+class SkippingReport(BaseModel):
+    """
+    How well the min/max statistics of some columns let queries skip the data files of a table.
+
+    ``files_read_fraction`` holds, per column, the mean fraction of files an equality lookup on a value of the column
+    reads: ``1 / files`` when the column is perfectly clustered, close to 1 when it is unclustered.
+    """
+
+    files: int
+    files_read_fraction: Dict[str, float]
+
+
+class ClusteringReport(BaseModel):
+    """
+    Outcome of a compaction, with the file skipping effectiveness of the clustered columns before and after. The
+    skipping reports are None when the connector does not expose file statistics.
+    """
+
+    strategy: Literal["binpack", "sort", "zorder"]
+    columns: List[str]
+    before: Optional[SkippingReport] = None
+    after: Optional[SkippingReport] = None
+
+
+class MetricsWidthReport(BaseModel):
+    """
+    How much column statistics the manifests of a table carry.
+
+    ``value_count_columns`` and ``bounds_columns`` are the mean number of columns per data file with value counts and
+    with lower/upper bounds; ``bounds_bytes`` is the total size of the lower and upper bounds of all data files.
+    """
+
+    files: int
+    manifests: int
+    manifest_bytes: int
+    value_count_columns: float
+    bounds_columns: float
+    bounds_bytes: int
+
+
+class TableComparisonReport(BaseModel):
+    """
+    Outcome of comparing two tables.
+
+    Rows are grouped by partition, or by bucket of the key hash when no partition columns are given. ``mismatched_groups``
+    holds the values of the groups whose row count or digest differ; only those groups are compared key by key.
+    ``sample_keys`` holds up to a configured number of keys of the differing rows.
+    """
+
+    source_rows: int
+    target_rows: int
+    groups_compared: int
+    mismatched_groups: List[Dict[str, Any]] = []
+    missing_in_target: int = 0
+    missing_in_source: int = 0
+    mismatched_rows: int = 0
+    sample_keys: List[Dict[str, Any]] = []
+
+    @property
+    def matches(self) -> bool:
+        return not self.mismatched_groups
+
+
+class JobStepModel(BaseModel):
+    """
+    One step of a job manifest: an ``IcebergManager`` operation and its arguments.
+
+    ``connector`` defaults to the connector of the manifest. A step starts once every step named in ``depends_on`` has
+    succeeded; steps without pending dependencies run concurrently.
+    """
+
+    name: str
+    action: Literal[
+        "create_database",
+        "create_table",
+        "drop_table",
+        "insert_bulk",
+        "insert_incremental",
+        "overwrite_partitions",
+        "upsert",
+        "delete_where",
+        "compact",
+        "expire_snapshots",
+        "apply_retention",
+        "set_table_properties",
+        "configure_metrics",
+        "create_branch",
+        "create_tag",
+        "publish_branch",
+        "drop_branch",
+        "current_snapshot_id",
+        "list_tables",
+        "skipping_report",
+        "metrics_width_report",
+        "compare_tables",
+        "create_summary_table",
+        "refresh_summary_table",
+        "advise_write_modes",
+    ]
+    connector: Optional[str] = None
+    depends_on: List[str] = []
+    params: Dict[str, Any] = {}
+
+
+class JobManifestModel(BaseModel):
+    """
+    A batch of steps run by the command line interface over one manager per connector.
+    """
+
+    connector: str
+    max_workers: int = Field(default=4, gt=0)
+    steps: List[JobStepModel]
+
+
+class StepResult(BaseModel):
+    """
+    Outcome of a job step. ``result`` holds the JSON-compatible return value of the operation, if any; ``error`` is set
+    when the step failed, and ``skipped`` steps did not run because a dependency did not succeed.
+    """
+
+    name: str
+    action: str
+    status: Literal["succeeded", "failed", "skipped"]
+    seconds: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+
+
+class TableMetadataModel(BaseModel):
+    """
+    Schema, partition spec and properties of a table, as of the metadata file at ``metadata_location``.
+
+    Columns hold the ``name`` and ``type`` of every top-level column; partition fields are rendered like Spark does,
+    e.g. ``region`` or ``days(event_ts)``.
+    """
+
+    metadata_location: Optional[str] = None
+    columns: List[Dict[str, str]]
+    partition_spec: List[str] = []
+    properties: Dict[str, str] = {}
+
+
+class SummaryRefreshReport(BaseModel):
+    """
+    Outcome of a summary table refresh.
+
+    ``incremental`` refreshes aggregated only the rows appended by the ``snapshots`` source snapshots committed after
+    ``previous_snapshot_id``; ``full`` refreshes recomputed the summary from the whole source table at
+    ``source_snapshot_id``; ``noop`` refreshes found no new snapshot.
+    """
+
+    mode: Literal["noop", "incremental", "full"]
+    previous_snapshot_id: Optional[int] = None
+    source_snapshot_id: Optional[int] = None
+    snapshots: int = 0
+
+
+class WriteModeAdvice(BaseModel):
+    """
+    Write modes recommended for a table from its recent snapshot history.
+
+    ``mean_rewrite_fraction`` is the mean fraction of the table bytes a row-level commit rewrote, or would have
+    rewritten under copy-on-write, estimated from the delete files of merge-on-read commits. ``delete_file_ratio`` is
+    the number of delete files per data file of the current snapshot. ``recommended`` holds the
+    ``write.update.mode``, ``write.merge.mode`` and ``write.delete.mode`` properties; ``compaction_interval_hours``
+    the recommended compaction cadence under merge-on-read, and ``compact_now`` whether the delete files already
+    exceed the tolerated ratio. ``applied`` is set when the recommended properties were written to the table.
+    """
+
+    database_name: str
+    table_name: str
+    snapshots: int
+    row_level_commits: int
+    commits_per_day: float
+    mean_rewrite_fraction: float
+    delete_file_ratio: float
+    current: Dict[str, str]
+    recommended: Dict[str, str]
+    compaction_interval_hours: Optional[float] = None
+    compact_now: bool = False
+    applied: bool = False
+    reasons: List[str] = []
+
+
+class CatalogExportReport(BaseModel):
+    """
+    Outcome of a catalog metadata export.
+
+    ``refreshed`` tables had their metadata collected because their metadata location changed or they were new;
+    ``unchanged`` tables kept the rows of the previous export. ``errors`` maps the ``database.table`` names whose
+    metadata could not be collected to the error.
+    """
+
+    path: str
+    tables: int
+    refreshed: int
+    unchanged: int
+    removed: int
+    errors: Dict[str, str] = {}
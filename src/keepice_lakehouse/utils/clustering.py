@@ -0,0 +1,83 @@
+from bisect import bisect_left
+from bisect import bisect_right
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+def zorder_values(data: pa.Table, columns: List[str]) -> pa.Array:
+    """
+    Computes the Z-order value of every row of an Arrow table over several columns.
+
+    Every column is mapped to its dense rank, scaled to the bits available per column, and the bits of the columns
+    are interleaved, so rows close in every column get close Z-order values.
+
+    Args:
+        data (pa.Table): The table.
+        columns (List[str]): The Z-order columns, between 1 and 64.
+
+    Returns:
+        pa.Array: The unsigned 64-bit Z-order values.
+    """
+    bits = 64 // len(columns)
+    scale = (1 << bits) - 1
+    ranks = []
+    for column in columns:
+        rank = pc.subtract(pc.rank(data[column], tiebreaker="dense"), pa.scalar(1, pa.uint64()))
+        top = pc.max(rank).as_py() or 0
+        if top > scale:
+            rank = pc.cast(pc.floor(pc.multiply(pc.cast(rank, pa.float64()), scale / top)), pa.uint64())
+        ranks.append(rank)
+    one = pa.scalar(1, pa.uint64())
+    z = pa.array([0] * data.num_rows, pa.uint64())
+    for bit in range(bits - 1, -1, -1):
+        for rank in ranks:
+            z = pc.bit_wise_or(pc.shift_left(z, one), pc.bit_wise_and(pc.shift_right(rank, pa.scalar(bit, pa.uint64())), one))
+    return z
+
+
+def zorder_table(data: pa.Table, columns: List[str]) -> pa.Table:
+    """
+    Sorts an Arrow table by the Z-order of several columns.
+
+    Args:
+        data (pa.Table): The table to sort.
+        columns (List[str]): The Z-order columns.
+
+    Returns:
+        pa.Table: The sorted table.
+    """
+    if not columns:
+        return data
+    return data.take(pc.sort_indices(zorder_values(data, columns)))
+
+
+def files_read_fraction(bounds: List[Tuple[Optional[Any], Optional[Any]]]) -> float:
+    """
+    Estimates how well the min/max statistics of a column let queries skip files.
+
+    Returns the mean fraction of files an equality lookup has to read when it looks up a value of one of the files:
+    a lookup reads every file whose ``[lower, upper]`` range contains the value. Files without bounds are always read.
+    Perfectly clustered data scores ``1 / number of files``; unclustered data scores close to 1.
+
+    Args:
+        bounds (List[Tuple[Optional[Any], Optional[Any]]]): The lower and upper bound of the column in every file.
+
+    Returns:
+        float: The fraction, 0.0 when there are no files.
+    """
+    if not bounds:
+        return 0.0
+    known = [(lower, upper) for lower, upper in bounds if lower is not None and upper is not None]
+    unknown = len(bounds) - len(known)
+    lowers = sorted(lower for lower, _ in known)
+    uppers = sorted(upper for _, upper in known)
+    overlapping = unknown * len(bounds)
+    for lower, upper in known:
+        # Files whose range intersects [lower, upper], plus the files without bounds.
+        overlapping += len(known) - (len(lowers) - bisect_right(lowers, upper)) - bisect_left(uppers, lower) + unknown
+    return overlapping / len(bounds) ** 2
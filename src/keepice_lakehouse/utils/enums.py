@@ -16,3 +16,16 @@ class ConnectorType(Enum):
     SPARK_ICEBERG = "spark_iceberg"
     ATHENA = "athena"
     PYICEBERG = "pyiceberg"
+
+
+class SqlDialect(Enum):
+    """
+    Enumeration for the SQL dialects spoken by the connectors.
+
+    Attributes:
+        SPARK (str): Spark SQL, quoting identifiers with backticks.
+        ATHENA (str): Athena, using Hive syntax for DDL and Trino syntax for DML.
+    """
+
+    SPARK = "spark"
+    ATHENA = "athena"
@@ -0,0 +1,402 @@
+import contextlib
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import ClassVar
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+from pyiceberg.io import PY_IO_IMPL
+from pyiceberg.io import WAREHOUSE
+from pyiceberg.io import FileIO
+from pyiceberg.io import InputFile
+from pyiceberg.io import OutputFile
+from pyiceberg.io import load_file_io
+
+FILE_CACHE_DIR = "keepice.file-cache.dir"
+FILE_CACHE_MAX_BYTES = "keepice.file-cache.max-bytes"
+FILE_CACHE_BLOCK_SIZE = "keepice.file-cache.block-size"
+FILE_CACHE_IO_IMPL = "keepice.file-cache.io-impl"
+
+DEFAULT_MAX_BYTES = 10 * 1024**3
+DEFAULT_BLOCK_SIZE = 4 * 1024**2
+
+# Iceberg never rewrites these files in place, unlike mutable markers such as version-hint.text.
+IMMUTABLE_SUFFIXES = (".parquet", ".orc", ".avro", ".puffin", ".metadata.json")
+
+# The block index of the cached length of a file, stored next to its blocks.
+LENGTH_INDEX = -1
+
+
+class BlockCache:
+    """
+    Local disk cache of fixed-size file blocks with LRU eviction.
+
+    Files are cached block by block, so only the byte ranges actually read, such as Parquet footers and the column
+    chunks of the accessed row groups, are stored. Blocks are read back through ``mmap``. The total size of the cached
+    blocks and file lengths is kept below ``max_bytes`` by evicting the least recently used ones. The length of a file
+    is evicted with its last block, and the directory of a file is removed once it holds nothing.
+
+    Attributes:
+        directory (Path): The directory holding the cached blocks.
+        max_bytes (int): The maximum number of bytes cached.
+        block_size (int): The size of a cached block.
+    """
+
+    _shared: ClassVar[Dict[Tuple[str, int, int], "BlockCache"]] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Initializes the BlockCache instance, indexing the blocks already present in its directory.
+
+        Args:
+            directory (str): The directory holding the cached blocks.
+            max_bytes (int): The maximum number of bytes cached.
+            block_size (int): The size of a cached block.
+        """
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self._blocks = OrderedDict()
+        self._size = 0
+        self._lengths = {}
+        self._file_blocks = {}
+        self._lock = threading.Lock()
+        for path in sorted([*self.directory.glob("*/*.block"), *self.directory.glob("*/length")], key=lambda path: path.stat().st_mtime):
+            file_key = path.parent.name
+            if path.name == "length":
+                try:
+                    self._lengths[file_key] = int(path.read_text())
+                except ValueError:
+                    path.unlink()
+                    continue
+                block = (file_key, LENGTH_INDEX)
+            else:
+                block = (file_key, int(path.stem))
+                self._file_blocks[file_key] = self._file_blocks.get(file_key, 0) + 1
+            self._blocks[block] = path.stat().st_size
+            self._size += self._blocks[block]
+        for path in self.directory.iterdir():
+            if path.is_dir() and path.name not in self._lengths and path.name not in self._file_blocks:
+                _remove_directory(path)
+        self._evict()
+
+    @classmethod
+    def shared(cls, directory: str, max_bytes: int = DEFAULT_MAX_BYTES, block_size: int = DEFAULT_BLOCK_SIZE) -> "BlockCache":
+        """
+        Returns the process-wide cache for a directory, so every FileIO using it shares one LRU accounting.
+
+        Args:
+            directory (str): The directory holding the cached blocks.
+            max_bytes (int): The maximum number of bytes cached.
+            block_size (int): The size of a cached block.
+
+        Returns:
+            BlockCache: The shared cache.
+        """
+        key = (str(Path(directory).expanduser().resolve()), max_bytes, block_size)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(directory, max_bytes, block_size)
+            return cls._shared[key]
+
+    @property
+    def size(self) -> int:
+        """
+        The number of bytes currently cached.
+        """
+        return self._size
+
+    @staticmethod
+    def file_key(location: str) -> str:
+        return hashlib.sha256(location.encode()).hexdigest()
+
+    def length(self, location: str) -> Optional[int]:
+        """
+        Returns the cached length of a file, if known.
+
+        Args:
+            location (str): The location of the file.
+
+        Returns:
+            Optional[int]: The length in bytes, or None if unknown.
+        """
+        key = self.file_key(location)
+        with self._lock:
+            if key not in self._lengths:
+                return None
+            self._blocks.move_to_end((key, LENGTH_INDEX))
+            return self._lengths[key]
+
+    def set_length(self, location: str, length: int):
+        key = self.file_key(location)
+        self._store((key, LENGTH_INDEX), str(length).encode())
+        self._evict()
+
+    def read(self, location: str, index: int, start: int, end: int) -> Optional[bytes]:
+        """
+        Reads a byte range of a cached block.
+
+        Args:
+            location (str): The location of the file.
+            index (int): The index of the block in the file.
+            start (int): The offset of the range within the block.
+            end (int): The end offset, exclusive, of the range within the block.
+
+        Returns:
+            Optional[bytes]: The bytes, or None if the block is not cached.
+        """
+        block = (self.file_key(location), index)
+        with self._lock:
+            if block not in self._blocks:
+                return None
+            self._blocks.move_to_end(block)
+        try:
+            with self._block_path(*block).open("rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return b""
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[start:end]
+        except OSError:
+            with self._lock:
+                if block in self._blocks:
+                    self._remove(block)
+            return None
+
+    def write(self, location: str, index: int, data: bytes):
+        """
+        Caches a block, evicting the least recently used blocks beyond ``max_bytes``.
+
+        Args:
+            location (str): The location of the file.
+            index (int): The index of the block in the file.
+            data (bytes): The content of the block.
+        """
+        self._store((self.file_key(location), index), data)
+        self._evict()
+
+    def clear(self):
+        """
+        Removes every cached block and file length.
+        """
+        with self._lock:
+            while self._blocks:
+                self._remove(next(iter(self._blocks)))
+
+    def _block_path(self, file_key: str, index: int) -> Path:
+        if index == LENGTH_INDEX:
+            return self.directory / file_key / "length"
+        return self.directory / file_key / f"{index}.block"
+
+    def _store(self, block: Tuple[str, int], data: bytes):
+        """Writes a block or file length next to its final path, then moves it in place under the lock."""
+        if len(data) > self.max_bytes:
+            return
+        tmp_path = self.directory / f"{block[0]}.{block[1]}.{threading.get_ident()}.tmp"
+        tmp_path.write_bytes(data)
+        with self._lock:
+            path = self._block_path(*block)
+            path.parent.mkdir(exist_ok=True)
+            tmp_path.replace(path)
+            if block[1] == LENGTH_INDEX:
+                self._lengths[block[0]] = int(data)
+            elif block not in self._blocks:
+                self._file_blocks[block[0]] = self._file_blocks.get(block[0], 0) + 1
+            self._size += len(data) - self._blocks.pop(block, 0)
+            self._blocks[block] = len(data)
+
+    def _remove(self, block: Tuple[str, int]):
+        """Removes a cached block, with the length and directory of its file after its last block. Holds the lock."""
+        file_key, index = block
+        self._size -= self._blocks.pop(block)
+        self._block_path(file_key, index).unlink(missing_ok=True)
+        if index == LENGTH_INDEX:
+            self._lengths.pop(file_key, None)
+        else:
+            self._file_blocks[file_key] -= 1
+            if self._file_blocks[file_key] == 0:
+                del self._file_blocks[file_key]
+                if (file_key, LENGTH_INDEX) in self._blocks:
+                    self._remove((file_key, LENGTH_INDEX))
+        if file_key not in self._file_blocks and file_key not in self._lengths:
+            _remove_directory(self.directory / file_key)
+
+    def _evict(self):
+        with self._lock:
+            while self._size > self.max_bytes and self._blocks:
+                self._remove(next(iter(self._blocks)))
+
+
+class CachingInputStream:
+    """
+    Seekable input stream serving reads from the block cache and fetching missing blocks from the wrapped file.
+
+    The wrapped stream is opened only when a block is missing, so fully cached reads never reach object storage.
+    """
+
+    def __init__(self, input_file: "CachingInputFile"):
+        self._input_file = input_file
+        self._cache = input_file.cache
+        self._position = 0
+        self._stream = None
+        self.closed = False
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            self._position = offset
+        elif whence == os.SEEK_CUR:
+            self._position += offset
+        elif whence == os.SEEK_END:
+            self._position = len(self._input_file) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        length = len(self._input_file)
+        end = length if size is None or size < 0 else min(length, self._position + size)
+        block_size = self._cache.block_size
+        location = self._input_file.location
+        chunks = []
+        while self._position < end:
+            index, block_start = divmod(self._position, block_size)
+            block_end = min(end - index * block_size, block_size)
+            data = self._cache.read(location, index, block_start, block_end)
+            if data is None:
+                block = self._fetch_block(index)
+                self._cache.write(location, index, block)
+                data = block[block_start:block_end]
+            if not data:
+                break
+            chunks.append(data)
+            self._position += len(data)
+        return b"".join(chunks)
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self.closed = True
+
+    def __enter__(self) -> "CachingInputStream":
+        return self
+
+    def __exit__(self, exctype, excinst, exctb):
+        self.close()
+
+    def _fetch_block(self, index: int) -> bytes:
+        if self._stream is None:
+            self._stream = self._input_file.wrapped.open(seekable=True)
+        block_size = self._cache.block_size
+        self._stream.seek(index * block_size)
+        chunks = []
+        remaining = min(block_size, len(self._input_file) - index * block_size)
+        while remaining > 0:
+            chunk = self._stream.read(remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+
+class CachingInputFile(InputFile):
+    """
+    Input file reading through a BlockCache.
+
+    Attributes:
+        wrapped (InputFile): The input file of the wrapped FileIO.
+        cache (BlockCache): The block cache.
+    """
+
+    def __init__(self, wrapped: InputFile, cache: BlockCache):
+        super().__init__(wrapped.location)
+        self.wrapped = wrapped
+        self.cache = cache
+
+    def __len__(self) -> int:
+        length = self.cache.length(self.location)
+        if length is None:
+            length = len(self.wrapped)
+            self.cache.set_length(self.location, length)
+        return length
+
+    def exists(self) -> bool:
+        return self.cache.length(self.location) is not None or self.wrapped.exists()
+
+    def open(self, seekable: bool = True) -> CachingInputStream:
+        return CachingInputStream(self)
+
+
+class CachingFileIO(FileIO):
+    """
+    FileIO adding a local disk cache in front of another FileIO.
+
+    Reads of immutable Iceberg files (data files, manifests, manifest lists and metadata JSON files) go through a shared
+    BlockCache; every other read and all writes and deletes are delegated unchanged. PyIceberg instantiates this class
+    through the ``py-io-impl`` catalog property and configures it with the ``keepice.file-cache.*`` properties; the
+    wrapped FileIO is inferred from the warehouse location unless ``keepice.file-cache.io-impl`` is set.
+
+    Attributes:
+        wrapped (FileIO): The FileIO performing the actual reads and writes.
+        cache (BlockCache): The block cache.
+    """
+
+    def __init__(self, properties: Optional[dict] = None, wrapped: Optional[FileIO] = None, cache: Optional[BlockCache] = None):
+        """
+        Initializes the CachingFileIO instance.
+
+        Args:
+            properties (Optional[dict]): The catalog or table properties.
+            wrapped (Optional[FileIO]): The FileIO to wrap. Loaded from the properties when None.
+            cache (Optional[BlockCache]): The block cache. The shared cache of ``keepice.file-cache.dir`` when None.
+        """
+        properties = dict(properties or {})
+        super().__init__(properties)
+        if wrapped is None:
+            wrapped_properties = {key: value for key, value in properties.items() if key != PY_IO_IMPL}
+            if properties.get(FILE_CACHE_IO_IMPL):
+                wrapped_properties[PY_IO_IMPL] = properties[FILE_CACHE_IO_IMPL]
+            wrapped = load_file_io(wrapped_properties, properties.get(WAREHOUSE))
+        if cache is None:
+            cache = BlockCache.shared(
+                properties[FILE_CACHE_DIR],
+                int(properties.get(FILE_CACHE_MAX_BYTES, DEFAULT_MAX_BYTES)),
+                int(properties.get(FILE_CACHE_BLOCK_SIZE, DEFAULT_BLOCK_SIZE)),
+            )
+        self.wrapped = wrapped
+        self.cache = cache
+
+    def new_input(self, location: str) -> InputFile:
+        input_file = self.wrapped.new_input(location)
+        if not location.endswith(IMMUTABLE_SUFFIXES):
+            return input_file
+        return CachingInputFile(input_file, self.cache)
+
+    def new_output(self, location: str) -> OutputFile:
+        return self.wrapped.new_output(location)
+
+    def delete(self, location: Union[str, InputFile, OutputFile]):
+        self.wrapped.delete(location)
+
+
+def _remove_directory(path: Path):
+    """Removes the directory of a file once it holds no cached block, leaving it if another writer refilled it."""
+    with contextlib.suppress(OSError):
+        path.rmdir()
@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+from typing import Generic
+from typing import List
+from typing import Optional
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class ManifestEntryCache(Generic[T]):
+    """
+    Thread-safe LRU cache of decoded manifest entries keyed by manifest path.
+
+    Iceberg manifests are immutable once written, so entries cached under a path never go stale. The cache is bounded by
+    the total number of entries it holds; the least recently used manifests are evicted first.
+
+    Attributes:
+        max_entries (int): The maximum number of manifest entries held across all manifests.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups not found in the cache.
+    """
+
+    def __init__(self, max_entries: int = 100_000):
+        """
+        Initializes the ManifestEntryCache instance.
+
+        Args:
+            max_entries (int): The maximum number of manifest entries held across all manifests.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._manifests = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, manifest_path: str) -> Optional[List[T]]:
+        """
+        Looks up the entries of a manifest.
+
+        Args:
+            manifest_path (str): The path of the manifest.
+
+        Returns:
+            Optional[List[T]]: The cached entries, or None if the manifest is not cached.
+        """
+        with self._lock:
+            entries = self._manifests.get(manifest_path)
+            if entries is None:
+                self.misses += 1
+                return None
+            self._manifests.move_to_end(manifest_path)
+            self.hits += 1
+            return entries
+
+    def put(self, manifest_path: str, entries: List[T]):
+        """
+        Caches the entries of a manifest, evicting the least recently used manifests beyond ``max_entries``.
+
+        Manifests larger than the whole cache are not cached.
+
+        Args:
+            manifest_path (str): The path of the manifest.
+            entries (List[T]): The decoded entries.
+        """
+        if len(entries) > self.max_entries:
+            return
+        with self._lock:
+            previous = self._manifests.pop(manifest_path, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._manifests[manifest_path] = entries
+            self._size += len(entries)
+            while self._size > self.max_entries:
+                _, evicted = self._manifests.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        """
+        Removes every cached manifest.
+        """
+        with self._lock:
+            self._manifests.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._size
@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+from typing import Hashable
+from typing import Optional
+
+
+class TableMetadataCache:
+    """
+    Thread-safe LRU cache of values derived from table metadata, such as schemas and DDL, keyed by table.
+
+    Every value is stored with the location of the metadata file it was derived from. Iceberg writes a new metadata
+    file for every commit, schema, partition spec or property change, so a value is valid exactly as long as the
+    location of the current metadata file is unchanged; no time-to-live is needed.
+
+    Attributes:
+        max_tables (int): The maximum number of values held.
+        hits (int): The number of lookups answered from the cache.
+        misses (int): The number of lookups not found in the cache or found stale.
+    """
+
+    def __init__(self, max_tables: int = 1024):
+        """
+        Initializes the TableMetadataCache instance.
+
+        Args:
+            max_tables (int): The maximum number of values held.
+        """
+        self.max_tables = max_tables
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, metadata_location: str) -> Optional[Any]:
+        """
+        Looks up a value, provided it was derived from the given metadata file.
+
+        Args:
+            key (Hashable): The key of the value, e.g. the kind of value and the qualified table name.
+            metadata_location (str): The location of the current metadata file of the table.
+
+        Returns:
+            Optional[Any]: The cached value, or None if it is not cached or was derived from another metadata file.
+        """
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is None or cached[0] != metadata_location:
+                self.misses += 1
+                return None
+            self._values.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+    def put(self, key: Hashable, metadata_location: str, value: Any):
+        """
+        Caches a value, evicting the least recently used values beyond ``max_tables``.
+
+        Args:
+            key (Hashable): The key of the value.
+            metadata_location (str): The location of the metadata file the value was derived from.
+            value (Any): The value.
+        """
+        with self._lock:
+            self._values[key] = (metadata_location, value)
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_tables:
+                self._values.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes every cached value.
+        """
+        with self._lock:
+            self._values.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._values)
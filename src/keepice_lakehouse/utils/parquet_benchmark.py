@@ -0,0 +1,99 @@
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..models.models import ParquetBenchmarkResult
+from ..models.models import ParquetWriterConfigModel
+
+
+def writer_options(settings: ParquetWriterConfigModel, sample: pa.Table) -> Dict[str, Any]:
+    """
+    Translates Parquet writer settings to the options of ``pyarrow.parquet.write_table``.
+
+    Unset settings keep the defaults of the Iceberg writers: ``zstd``, 1 MB pages, 20,000 rows per page, 2 MB
+    dictionary pages and 128 MB row groups. A byte bound on row groups is converted to rows from the average row size
+    of the sample.
+
+    Args:
+        settings (ParquetWriterConfigModel): The writer settings.
+        sample (pa.Table): The rows to write.
+
+    Returns:
+        Dict[str, Any]: The writer options.
+    """
+    codec = settings.codec or "zstd"
+    options = {
+        "compression": "none" if codec == "uncompressed" else codec,
+        "compression_level": settings.compression_level,
+        "data_page_size": settings.page_size_bytes or 1024 * 1024,
+        "write_batch_size": settings.page_row_limit or 20000,
+        "dictionary_pagesize_limit": 2 * 1024 * 1024 if settings.dict_size_bytes is None else settings.dict_size_bytes,
+        "use_dictionary": settings.dict_size_bytes != 0,
+    }
+    if settings.row_group_rows:
+        options["row_group_size"] = settings.row_group_rows
+    else:
+        row_bytes = sample.nbytes / sample.num_rows if sample.num_rows else 1
+        options["row_group_size"] = max(int((settings.row_group_size_bytes or 128 * 1024 * 1024) / max(row_bytes, 1)), 1)
+    return options
+
+
+def benchmark_parquet(
+    sample: pa.Table,
+    candidates: Dict[str, ParquetWriterConfigModel],
+    directory: Optional[str] = None,
+    repeats: int = 1,
+) -> List[ParquetBenchmarkResult]:
+    """
+    Writes a sample under every candidate set of Parquet writer settings and measures the files and their speed.
+
+    Every candidate writes the sample to one local file, which is then scanned back in full. With several ``repeats``
+    the fastest write and scan are kept, which filters out the noise of a shared machine. The files are deleted
+    afterwards.
+
+    Args:
+        sample (pa.Table): The rows to write, usually a sample of a table.
+        candidates (Dict[str, ParquetWriterConfigModel]): The settings compared, by name.
+        directory (Optional[str]): The directory the files are written in. Defaults to the system temporary directory.
+        repeats (int): The number of times every candidate is written and scanned.
+
+    Returns:
+        List[ParquetBenchmarkResult]: The result of every candidate, in the order given.
+    """
+    results = []
+    with tempfile.TemporaryDirectory(prefix="keepice-parquet-", dir=directory) as workdir:
+        for index, (name, settings) in enumerate(candidates.items()):
+            path = Path(workdir) / f"{index}.parquet"
+            options = writer_options(settings, sample)
+            write_seconds = scan_seconds = float("inf")
+            for _ in range(max(repeats, 1)):
+                started = time.perf_counter()
+                pq.write_table(sample, str(path), **options)
+                write_seconds = min(write_seconds, time.perf_counter() - started)
+                started = time.perf_counter()
+                pq.read_table(str(path))
+                scan_seconds = min(scan_seconds, time.perf_counter() - started)
+            file_bytes = path.stat().st_size
+            results.append(
+                ParquetBenchmarkResult(
+                    name=name,
+                    settings=settings,
+                    rows=sample.num_rows,
+                    file_bytes=file_bytes,
+                    compression_ratio=sample.nbytes / file_bytes,
+                    row_groups=pq.ParquetFile(str(path)).metadata.num_row_groups,
+                    write_seconds=write_seconds,
+                    scan_seconds=scan_seconds,
+                    write_bytes_per_second=sample.nbytes / max(write_seconds, 1e-9),
+                    scan_bytes_per_second=sample.nbytes / max(scan_seconds, 1e-9),
+                )
+            )
+            path.unlink()
+    return results
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+DESCRIPTION_METADATA_KEY = b"keepice.description"
+
+
+class CachedResult:
+    """
+    A materialised query result exposing the subset of the DB-API cursor interface used by callers.
+
+    Attributes:
+        description (Optional[Sequence]): The DB-API description of the result columns.
+        rows (List[tuple]): The result rows.
+        from_cache (bool): Whether the result was read from the local cache.
+    """
+
+    def __init__(self, description: Optional[Sequence], rows: List[tuple], from_cache: bool = False):
+        self.description = description
+        self.rows = rows
+        self.from_cache = from_cache
+        self._position = 0
+
+    @property
+    def rowcount(self) -> int:
+        return len(self.rows)
+
+    def fetchone(self) -> Optional[tuple]:
+        if self._position >= len(self.rows):
+            return None
+        row = self.rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchmany(self, size: int = 1) -> List[tuple]:
+        rows = self.rows[self._position : self._position + size]
+        self._position += len(rows)
+        return rows
+
+    def fetchall(self) -> List[tuple]:
+        rows = self.rows[self._position :]
+        self._position = len(self.rows)
+        return rows
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+
+class ResultCache:
+    """
+    Local on-disk cache of query results.
+
+    Entries are keyed by the query text and a version string, typically the snapshot IDs of the tables the query reads.
+    Iceberg snapshots are immutable, so an entry stays valid for as long as the version is current and becomes
+    unreachable as soon as any of the tables commits a new snapshot. The oldest entries are evicted once the cache holds
+    more than ``max_entries`` results.
+
+    Results are stored as Arrow IPC files, which hold data only, so reading an entry cannot run code planted in the
+    directory. Results whose rows Arrow cannot represent are returned without being cached. The least recently used
+    order of the entries is kept in memory, loaded once from the modification times of the files, so storing a result
+    does not list the directory.
+
+    Attributes:
+        directory (Path): The directory holding the cached results.
+        max_entries (int): The maximum number of results kept on disk.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 1000):
+        """
+        Initializes the ResultCache instance, creating its directory if needed and indexing the results it holds.
+
+        Args:
+            directory (str): The directory holding the cached results.
+            max_entries (int): The maximum number of results kept on disk.
+        """
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict((path.name, None) for path in sorted(self._files(), key=self._mtime))
+        self._evict()
+
+    @staticmethod
+    def key(query: str, version: str) -> str:
+        """
+        Computes the cache key of a query at a given version.
+
+        Args:
+            query (str): The query text.
+            version (str): The version of the data the query reads.
+
+        Returns:
+            str: The hexadecimal cache key.
+        """
+        return hashlib.sha256(f"{version}\0{query}".encode()).hexdigest()
+
+    def get(self, query: str, version: str) -> Optional[CachedResult]:
+        """
+        Reads a cached result.
+
+        Args:
+            query (str): The query text.
+            version (str): The version of the data the query reads.
+
+        Returns:
+            Optional[CachedResult]: The cached result, or None on a cache miss.
+        """
+        path = self._path(query, version)
+        try:
+            with pa.OSFile(str(path)) as source:
+                table = ipc.open_file(source).read_all()
+            description = json.loads(table.schema.metadata[DESCRIPTION_METADATA_KEY])
+        except (OSError, ValueError, KeyError, TypeError, pa.ArrowException):
+            with self._lock:
+                self._entries.pop(path.name, None)
+            return None
+        with self._lock:
+            self._entries[path.name] = None
+            self._entries.move_to_end(path.name)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        description = None if description is None else [tuple(column) for column in description]
+        rows = list(zip(*(column.to_pylist() for column in table.columns)))
+        return CachedResult(description, rows, from_cache=True)
+
+    def put(self, query: str, version: str, description: Optional[Sequence], rows: List[tuple]) -> CachedResult:
+        """
+        Stores a result, evicting the least recently used entries beyond ``max_entries``.
+
+        Args:
+            query (str): The query text.
+            version (str): The version of the data the query reads.
+            description (Optional[Sequence]): The DB-API description of the result columns.
+            rows (List[tuple]): The result rows.
+
+        Returns:
+            CachedResult: The stored result.
+        """
+        result = CachedResult(description, rows)
+        try:
+            table = self._to_table(description, rows)
+        except (ValueError, TypeError, pa.ArrowException):
+            return result
+        path = self._path(query, version)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with pa.OSFile(str(tmp_path), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        tmp_path.replace(path)
+        with self._lock:
+            self._entries[path.name] = None
+            self._entries.move_to_end(path.name)
+            self._evict()
+        return result
+
+    def clear(self):
+        """
+        Removes every cached result.
+        """
+        with self._lock:
+            for path in self._files():
+                path.unlink(missing_ok=True)
+            self._entries.clear()
+
+    def _path(self, query: str, version: str) -> Path:
+        return self.directory / f"{self.key(query, version)}.arrow"
+
+    def _files(self) -> List[Path]:
+        return list(self.directory.glob("*.arrow"))
+
+    @staticmethod
+    def _mtime(path: Path) -> float:
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    @staticmethod
+    def _to_table(description: Optional[Sequence], rows: List[tuple]) -> pa.Table:
+        """Converts a result to an Arrow table, its description kept as JSON in the schema metadata."""
+        width = len(rows[0]) if rows else len(description or ())
+        if width == 0 and rows:
+            raise ValueError("Results without columns are not cached.")
+        arrays = [pa.array([row[index] for row in rows]) for index in range(width)]
+        metadata = {DESCRIPTION_METADATA_KEY: json.dumps(None if description is None else [list(column) for column in description])}
+        return pa.Table.from_arrays(arrays, names=[str(index) for index in range(width)], metadata=metadata)
+
+    def _evict(self):
+        """Removes the least recently used entries beyond ``max_entries``; the caller holds the lock or owns the cache."""
+        while len(self._entries) > self.max_entries:
+            name, _ = self._entries.popitem(last=False)
+            (self.directory / name).unlink(missing_ok=True)
@@ -0,0 +1,210 @@
+import random
+import time
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+
+DEFAULT_RETRYABLE_ERRORS = (
+    "CommitFailedException",
+    "ICEBERG_COMMIT_ERROR",
+    "TooManyRequestsException",
+    "ThrottlingException",
+)
+
+# Errors raised when a commit lost against a concurrent one. The table is left unchanged, so the write can be rerun.
+COMMIT_CONFLICT_ERRORS = (
+    "CommitFailedException",
+    "ICEBERG_COMMIT_ERROR",
+)
+
+
+class RetryPolicy:
+    """
+    Retry policy with exponential backoff and full jitter.
+
+    Errors are classified by name: an exception is retried when the name of any class in its hierarchy, or its message,
+    contains one of the configured retryable error names. The exception chain (``__cause__``/``__context__``) is also
+    inspected, so errors wrapped by Py4J or PyAthena are still recognised. Writes are retried through ``call_write``,
+    which only retries commit conflicts.
+
+    Attributes:
+        max_attempts (int): Total number of attempts, including the first one.
+        base_delay (float): Delay in seconds before the first retry.
+        max_delay (float): Upper bound in seconds for a single backoff delay.
+        jitter (bool): Whether to randomise each delay between zero and its exponential bound.
+        retryable_errors (tuple): Exception names or error codes that are considered transient.
+        configured (bool): Whether the policy was configured explicitly, rather than defaulted for a connector without a
+            ``retry`` section.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        jitter: bool = True,
+        retryable_errors: Optional[Iterable[str]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+        configured: bool = True,
+    ):
+        """
+        Initializes the RetryPolicy instance.
+
+        Args:
+            max_attempts (int): Total number of attempts, including the first one. Must be at least 1.
+            base_delay (float): Delay in seconds before the first retry.
+            max_delay (float): Upper bound in seconds for a single backoff delay.
+            jitter (bool): Whether to randomise each delay between zero and its exponential bound.
+            retryable_errors (Optional[Iterable[str]]): Exception names or error codes to retry. Defaults to
+                Iceberg commit conflicts and AWS throttling errors.
+            sleep (Callable[[float], None]): Function used to wait between attempts.
+            configured (bool): Whether the policy was configured explicitly.
+
+        Raises:
+            ValueError: If max_attempts is lower than 1.
+        """
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retryable_errors = tuple(retryable_errors) if retryable_errors is not None else DEFAULT_RETRYABLE_ERRORS
+        self.configured = configured
+        self._sleep = sleep
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "RetryPolicy":
+        """
+        Builds a RetryPolicy from a connector ``retry`` configuration section.
+
+        Args:
+            config (Optional[dict]): The ``retry`` section of a connector configuration. Defaults are used when None,
+                and the policy is then not ``configured``.
+
+        Returns:
+            RetryPolicy: The configured retry policy.
+        """
+        if not config:
+            return cls(configured=False)
+        return cls(**{key: value for key, value in config.items() if value is not None})
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """
+        Checks whether an error, or any error in its chain, is transient.
+
+        Args:
+            error (BaseException): The error raised by the operation.
+
+        Returns:
+            bool: True if the error should be retried.
+        """
+        return _matches(error, self.retryable_errors)
+
+    def is_commit_conflict(self, error: BaseException) -> bool:
+        """
+        Checks whether an error, or any error in its chain, is a retryable commit conflict.
+
+        Args:
+            error (BaseException): The error raised by the write.
+
+        Returns:
+            bool: True if the write lost a commit race and may be rerun.
+        """
+        return _matches(error, [name for name in self.retryable_errors if name in COMMIT_CONFLICT_ERRORS])
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Computes the delay before the given retry.
+
+        Args:
+            attempt (int): The number of the attempt that just failed, starting at 1.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)  # noqa: S311
+        return delay
+
+    def call(self, func: Callable, *args, **kwargs):
+        """
+        Calls a function, retrying it while it fails with a transient error.
+
+        Args:
+            func (Callable): The function to call.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            The value returned by the function.
+
+        Raises:
+            Exception: The last error raised by the function, when it is not transient or attempts are exhausted.
+        """
+        return self._call(self.is_retryable, func, *args, **kwargs)
+
+    def call_write(self, func: Callable, *args, **kwargs):
+        """
+        Calls a single-statement write, retrying it only while its commit conflicts with a concurrent one.
+
+        A conflicting commit leaves the table unchanged, so the whole statement can be rerun. Other transient errors,
+        such as throttling, are raised, since they may follow a successful commit and a rerun would apply the write
+        twice. Writes made of several statements must be retried statement by statement.
+
+        Args:
+            func (Callable): The function running the write.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            The value returned by the function.
+
+        Raises:
+            Exception: The last error raised by the function, when it is not a commit conflict or attempts are exhausted.
+        """
+        return self._call(self.is_commit_conflict, func, *args, **kwargs)
+
+    def _call(self, retryable: Callable[[BaseException], bool], func: Callable, *args, **kwargs):
+        attempt = 1
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_attempts or not retryable(e):
+                    raise
+                self._sleep(self.backoff(attempt))
+                attempt += 1
+
+    def commit_properties(self) -> Dict[str, str]:
+        """
+        Translates the policy into Iceberg commit retry table properties.
+
+        Iceberg retries a conflicting commit by re-applying the already written files on top of the refreshed metadata,
+        so engines honouring these properties retry only the commit instead of re-running the whole write.
+
+        Returns:
+            Dict[str, str]: The ``commit.retry.*`` table properties.
+        """
+        return {
+            "commit.retry.num-retries": str(self.max_attempts - 1),
+            "commit.retry.min-wait-ms": str(int(self.base_delay * 1000)),
+            "commit.retry.max-wait-ms": str(int(self.max_delay * 1000)),
+        }
+
+
+def _matches(error: BaseException, error_names: Iterable[str]) -> bool:
+    """Checks whether the class names or message of an error, or of any error in its chain, contain one of the names."""
+    seen = set()
+    current = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        names = [klass.__name__ for klass in type(current).__mro__]
+        message = str(current)
+        for error_name in error_names:
+            if error_name in names or error_name in message:
+                return True
+        current = current.__cause__ or current.__context__
+    return False
@@ -0,0 +1,44 @@
+from typing import Dict
+from typing import Optional
+
+from ..models.models import AdaptiveTuningConfigModel
+
+
+def statement_settings(source_bytes: Optional[int], target_bytes: Optional[int], config: AdaptiveTuningConfigModel) -> Dict[str, str]:
+    """
+    Computes the Spark SQL settings of a write from the sizes of its source and target.
+
+    The number of shuffle partitions follows the bytes shuffled by a merge, the source and the target, so a 10 MB delta
+    is not spread over hundreds of tiny tasks and a backfill is not squeezed into too few. Adaptive query execution
+    then coalesces small partitions towards the advisory size and splits skewed ones. Small sources are broadcast to
+    the join with the target; large sources disable broadcasts, which could otherwise exhaust the driver when the size
+    estimate of an intermediate result is off.
+
+    Args:
+        source_bytes (Optional[int]): The size of the source, None when unknown.
+        target_bytes (Optional[int]): The size of the target table, None when unknown.
+        config (AdaptiveTuningConfigModel): The bounds of the settings.
+
+    Returns:
+        Dict[str, str]: The Spark SQL settings, empty when both sizes are unknown.
+    """
+    known = [size for size in (source_bytes, target_bytes) if size is not None]
+    if not known:
+        return {}
+    shuffled = sum(known)
+    partitions = -(-shuffled // config.target_partition_bytes)
+    partitions = min(max(partitions, config.min_shuffle_partitions), config.max_shuffle_partitions)
+    settings = {
+        "spark.sql.adaptive.enabled": "true",
+        "spark.sql.adaptive.coalescePartitions.enabled": "true",
+        "spark.sql.shuffle.partitions": str(partitions),
+        "spark.sql.adaptive.advisoryPartitionSizeInBytes": str(config.target_partition_bytes),
+        "spark.sql.adaptive.skewJoin.enabled": "true",
+        "spark.sql.adaptive.skewJoin.skewedPartitionFactor": str(config.skew_factor),
+        "spark.sql.adaptive.skewJoin.skewedPartitionThresholdInBytes": str(config.skew_factor * config.target_partition_bytes),
+    }
+    if source_bytes is not None:
+        threshold = str(config.broadcast_max_bytes) if source_bytes <= config.broadcast_max_bytes else "-1"
+        settings["spark.sql.autoBroadcastJoinThreshold"] = threshold
+        settings["spark.sql.adaptive.autoBroadcastJoinThreshold"] = threshold
+    return settings
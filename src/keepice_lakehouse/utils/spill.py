@@ -0,0 +1,198 @@
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+
+from .table_diff import HASH_MULTIPLIER
+from .table_diff import SHIFT
+
+DEFAULT_PARTITIONS = 64
+
+# 2**64 divided by the golden ratio, as a signed 64 bit integer; multiplying by it spreads sequential keys.
+_FIBONACCI_MULTIPLIER = -7046029254386353131
+
+
+def _byte_hashes(values: pa.Array) -> pa.Array:
+    """Hashes the bytes of every binary value into an unsigned 64-bit hash, deterministically across processes."""
+    data = values.buffers()[2] or pa.py_buffer(b"")
+    offsets = pa.Array.from_buffers(pa.int64(), len(values) + 1, [None, values.buffers()[1]], offset=values.offset)
+    start = offsets[0]
+    lists = pa.LargeListArray.from_arrays(
+        pc.subtract(offsets, start), pa.Array.from_buffers(pa.uint8(), len(data), [None, data])[start.as_py() :]
+    )
+    parents = pc.list_parent_indices(lists)
+    byte_values = lists.flatten()
+    # Every byte is mixed with its position in its value, and the mixed bytes of a value are summed as a difference of
+    # prefix sums, so the hash of every value is computed without a per-value loop.
+    indices = pc.subtract(pc.cumulative_sum(pc.fill_null(pa.nulls(len(byte_values), pa.int64()), 1)), 1)
+    positions = pc.cast(pc.subtract(indices, pc.take(lists.offsets, parents)), pa.uint64())
+    terms = pc.multiply(
+        pc.bit_wise_xor(pc.multiply(pc.add(positions, pa.scalar(1, pa.uint64())), HASH_MULTIPLIER), pc.cast(byte_values, pa.uint64())),
+        HASH_MULTIPLIER,
+    )
+    terms = pc.bit_wise_xor(terms, pc.shift_right(terms, SHIFT))
+    prefix = pa.concat_arrays([pa.array([0], pa.uint64()), pc.cumulative_sum(terms)])
+    sums = pc.subtract(pc.take(prefix, lists.offsets[1:]), pc.take(prefix, lists.offsets[:-1]))
+    hashes = pc.multiply(pc.bit_wise_xor(sums, pc.cast(pc.binary_length(values), pa.uint64())), HASH_MULTIPLIER)
+    return pc.bit_wise_xor(hashes, pc.shift_right(hashes, SHIFT))
+
+
+def hash_partitions(keys, partitions: int) -> pa.Array:
+    """
+    Assigns every key to one of ``partitions`` partitions by hash.
+
+    Integer keys are hashed with Fibonacci hashing. Other keys are hashed over the bytes of their value, strings and
+    binaries as they are and other types as their string representation. Both hashes are vectorised and deterministic
+    across processes, and equal keys always land in the same partition, whatever their integer width or string type.
+    Null keys are assigned to partition 0.
+
+    Args:
+        keys (Union[pa.Array, pa.ChunkedArray]): The keys.
+        partitions (int): The number of partitions, a power of two.
+
+    Returns:
+        pa.Array: The ``int64`` partition of every key.
+    """
+    if partitions == 1:
+        return pa.array([0] * len(keys), pa.int64())
+    if isinstance(keys, pa.ChunkedArray):
+        keys = keys.combine_chunks()
+    bits = partitions.bit_length() - 1
+    if pa.types.is_integer(keys.type):
+        hashed = pc.multiply(pc.cast(keys, pa.int64()), pa.scalar(_FIBONACCI_MULTIPLIER, pa.int64()))
+        return pc.fill_null(pc.bit_wise_and(pc.shift_right(hashed, 64 - bits), partitions - 1), 0)
+    if not (pa.types.is_string(keys.type) or pa.types.is_large_string(keys.type) or pa.types.is_binary(keys.type)):
+        keys = pc.cast(keys, pa.large_string())
+    hashes = _byte_hashes(pc.cast(keys, pa.large_binary()))
+    indices = pc.cast(pc.shift_right(hashes, pa.scalar(64 - bits, pa.uint64())), pa.int64())
+    return pc.if_else(keys.is_valid(), indices, pa.scalar(0, pa.int64()))
+
+
+class HashPartitionSpill:
+    """
+    Hash partitions Arrow data on a key column, spilling the partitions to local disk beyond a memory budget.
+
+    Rows are buffered in memory per partition. When the buffered rows exceed ``memory_bytes`` every buffer is appended
+    to the Arrow IPC file of its partition and released, so the resident size stays bounded whatever the size of the
+    input. Partitions are read back memory-mapped, one at a time, so only the pages actually touched are loaded.
+
+    Attributes:
+        key (str): The key column.
+        partitions (int): The number of partitions, a power of two.
+        memory_bytes (int): The maximum size of the rows buffered in memory.
+        spilled_bytes (int): The number of bytes written to disk.
+    """
+
+    def __init__(self, key: str, memory_bytes: int, partitions: int = DEFAULT_PARTITIONS, spill_dir: Optional[str] = None):
+        """
+        Initializes the HashPartitionSpill instance.
+
+        Args:
+            key (str): The key column.
+            memory_bytes (int): The maximum size of the rows buffered in memory.
+            partitions (int): The number of partitions, a power of two.
+            spill_dir (Optional[str]): The directory the spill files are created in. Defaults to the system temporary
+                directory.
+
+        Raises:
+            ValueError: If ``partitions`` is not a power of two.
+        """
+        if partitions < 1 or partitions & (partitions - 1):
+            raise ValueError(f"The number of partitions must be a power of two: {partitions}")
+        self.key = key
+        self.partitions = partitions
+        self.memory_bytes = memory_bytes
+        self.spilled_bytes = 0
+        self._spill_dir = spill_dir
+        self._directory = None
+        self._schema = None
+        self._buffers: Dict[int, List[pa.RecordBatch]] = {}
+        self._buffered_bytes = 0
+        self._writers: Dict[int, ipc.RecordBatchFileWriter] = {}
+
+    def add(self, data: pa.Table):
+        """
+        Adds rows, spilling every partition to disk when the buffered rows exceed the memory budget.
+
+        Args:
+            data (pa.Table): The rows.
+        """
+        if data.num_rows == 0:
+            return
+        self._schema = self._schema or data.schema
+        if data.schema != self._schema:
+            data = data.cast(self._schema)
+        indices = hash_partitions(data[self.key], self.partitions)
+        for partition in pc.unique(indices).to_pylist():
+            rows = data.filter(pc.equal(indices, partition)).combine_chunks()
+            self._buffers.setdefault(partition, []).extend(rows.to_batches())
+            self._buffered_bytes += rows.nbytes
+        if self._buffered_bytes > self.memory_bytes:
+            self._spill()
+
+    def partition(self, index: int) -> pa.Table:
+        """
+        Reads back the rows of a partition, once every row was added.
+
+        Args:
+            index (int): The partition.
+
+        Returns:
+            pa.Table: The rows, memory-mapped when spilled; empty when no row was added.
+        """
+        batches = []
+        if index in self._writers:
+            self._writers.pop(index).close()
+        path = self._path(index)
+        if path is not None and path.exists():
+            with pa.memory_map(str(path)) as source:
+                batches.extend(ipc.open_file(source).read_all().to_batches())
+        batches.extend(self._buffers.get(index, []))
+        if self._schema is None:
+            return pa.table({})
+        return pa.Table.from_batches(batches, schema=self._schema)
+
+    def __iter__(self) -> Iterator[pa.Table]:
+        for index in range(self.partitions):
+            yield self.partition(index)
+
+    def close(self):
+        """
+        Releases the buffers and deletes the spill files.
+        """
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+        self._buffers.clear()
+        self._buffered_bytes = 0
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+    def __enter__(self) -> "HashPartitionSpill":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _spill(self):
+        if self._directory is None:
+            self._directory = Path(tempfile.mkdtemp(prefix="keepice-spill-", dir=self._spill_dir))
+        for index, batches in self._buffers.items():
+            if index not in self._writers:
+                self._writers[index] = ipc.new_file(str(self._path(index)), self._schema)
+            for batch in batches:
+                self._writers[index].write_batch(batch)
+                self.spilled_bytes += batch.nbytes
+        self._buffers.clear()
+        self._buffered_bytes = 0
+
+    def _path(self, index: int) -> Optional[Path]:
+        return self._directory / f"{index}.arrow" if self._directory is not None else None
@@ -0,0 +1,1073 @@
+import re
+from datetime import date
+from datetime import datetime
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..exceptions.exceptions import UnsupportedOperationError
+from .enums import SqlDialect
+from .time_travel import Timestamp
+from .time_travel import to_utc_datetime
+from .time_travel import validate_version
+
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_TRANSFORM_PATTERN = re.compile(r"^\s*([A-Za-z_][A-Za-z0-9_]*)\s*\((.*)\)\s*$")
+_READ_ONLY_PATTERN = re.compile(r"^\s*(SELECT|WITH|SHOW|DESCRIBE|EXPLAIN|VALUES)\b", re.IGNORECASE)
+
+
+def is_read_only(query: str) -> bool:
+    """
+    Tells whether a statement only reads, from its leading keyword.
+
+    Args:
+        query (str): The statement.
+
+    Returns:
+        bool: True for queries such as ``SELECT`` or ``SHOW``, False for statements that may write.
+    """
+    return bool(_READ_ONLY_PATTERN.match(query))
+
+
+def split_table_identifier(identifier: str) -> Tuple[Optional[str], str, str]:
+    """
+    Splits a ``catalog.database.table`` or ``database.table`` identifier.
+
+    Args:
+        identifier (str): The table identifier.
+
+    Returns:
+        Tuple[Optional[str], str, str]: The catalog name, None for two part identifiers, the database and the table.
+
+    Raises:
+        ValueError: If the identifier is not a two or three part name.
+    """
+    parts = [part.strip().strip('`"') for part in identifier.split(".")]
+    if len(parts) == 2:
+        return None, parts[0], parts[1]
+    if len(parts) == 3:
+        return parts[0], parts[1], parts[2]
+    raise ValueError(f"Invalid table identifier: {identifier}. Expected catalog.database.table or database.table")
+
+
+def parse_describe(rows) -> Tuple[List[Dict[str, str]], List[str]]:
+    """
+    Parses the result of a ``DESCRIBE`` statement into the columns and the partition fields of a table.
+
+    Args:
+        rows: The result rows, either ``(col_name, data_type, comment)`` or a single tab separated value.
+
+    Returns:
+        Tuple[List[Dict[str, str]], List[str]]: The ``name`` and ``type`` of every column, and the partition fields
+        such as ``days(event_ts)``.
+    """
+    columns = []
+    partition_fields = []
+    section = "columns"
+    for row in rows:
+        values = [value.strip() if isinstance(value, str) else value for value in _split_row(row)]
+        name = values[0] if values else ""
+        if not name:
+            section = None
+        elif name == "# col_name":
+            continue
+        elif name.startswith("#"):
+            section = "partitions" if name.lower().startswith("# partition") else None
+        elif section == "columns":
+            columns.append({"name": name, "type": values[1]})
+        elif section == "partitions":
+            # Spark lists the transforms as ``Part 0 | days(event_ts)``, Hive style engines the partition columns.
+            partition_fields.append(values[1] if name.startswith("Part ") and len(values) > 1 else name)
+    return columns, partition_fields
+
+
+def parse_properties(rows) -> Dict[str, str]:
+    """
+    Parses the result of a ``SHOW TBLPROPERTIES`` statement.
+
+    Args:
+        rows: The result rows, either ``(key, value)`` or a single tab separated value.
+
+    Returns:
+        Dict[str, str]: The table properties.
+    """
+    properties = {}
+    for row in rows:
+        values = _split_row(row)
+        if len(values) >= 2:
+            properties[values[0].strip()] = values[1].strip()
+    return properties
+
+
+def _split_row(row) -> List:
+    values = list(row)
+    if len(values) == 1 and isinstance(values[0], str):
+        return values[0].split("\t")
+    return values
+
+
+def _split_top_level(expression: str) -> List[str]:
+    """
+    Splits an expression on the commas outside of parentheses.
+    """
+    parts = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(expression):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(expression[start:index])
+            start = index + 1
+    parts.append(expression[start:])
+    return [part.strip() for part in parts]
+
+
+class SqlBuilder:
+    """
+    Builds canonical SQL statements for Iceberg operations.
+
+    Identifiers are quoted according to the dialect and literals are escaped, so values supplied by callers cannot alter
+    the structure of a statement. Every statement is rendered on a single line with single spaces and no trailing
+    semicolon, which makes the text of identical operations byte-identical. This allows statements to be used as cache
+    keys and lets Athena reuse query results, which requires an exact match of the query string.
+
+    Spark quotes every identifier with backticks. Athena follows Hive for DDL statements (backticks) and Trino for DML
+    statements (double quotes).
+
+    Attributes:
+        dialect (SqlDialect): The SQL dialect of the target engine.
+    """
+
+    def __init__(self, dialect: SqlDialect = SqlDialect.SPARK):
+        """
+        Initializes the SqlBuilder instance.
+
+        Args:
+            dialect (SqlDialect): The SQL dialect of the target engine.
+        """
+        self.dialect = dialect
+
+    def quote(self, identifier: str, ddl: bool = False) -> str:
+        """
+        Quotes a single identifier.
+
+        Args:
+            identifier (str): The identifier to quote.
+            ddl (bool): Whether the identifier is used in a DDL statement.
+
+        Returns:
+            str: The quoted identifier.
+        """
+        quote_char = '"' if self.dialect == SqlDialect.ATHENA and not ddl else "`"
+        return f"{quote_char}{identifier.replace(quote_char, quote_char * 2)}{quote_char}"
+
+    def qualified_name(self, *parts: Optional[str], ddl: bool = False) -> str:
+        """
+        Builds a quoted, dot separated name, skipping empty parts such as an unset catalog.
+
+        Args:
+            *parts (Optional[str]): The name parts, e.g. catalog, database and table.
+            ddl (bool): Whether the name is used in a DDL statement.
+
+        Returns:
+            str: The qualified name.
+        """
+        return ".".join(self.quote(part, ddl=ddl) for part in parts if part)
+
+    def relation(self, name: str) -> str:
+        """
+        Quotes a possibly dotted relation name such as a temporary view or ``database.table``.
+
+        Args:
+            name (str): The relation name.
+
+        Returns:
+            str: The quoted relation name.
+        """
+        return self.qualified_name(*name.split("."))
+
+    @staticmethod
+    def literal(value) -> str:
+        """
+        Renders a value as a SQL literal.
+
+        Args:
+            value: The value to render. Strings are single quoted with embedded quotes escaped; dates and datetimes are
+                rendered as typed ``DATE`` and ``TIMESTAMP`` literals.
+
+        Returns:
+            str: The SQL literal.
+        """
+        if value is None:
+            return "NULL"
+        if isinstance(value, bool):
+            return "TRUE" if value else "FALSE"
+        if isinstance(value, (int, float)):
+            return str(value)
+        if isinstance(value, datetime):
+            return f"TIMESTAMP '{value.strftime('%Y-%m-%d %H:%M:%S.%f')}'"
+        if isinstance(value, date):
+            return f"DATE '{value.isoformat()}'"
+        return "'{}'".format(str(value).replace("'", "''"))
+
+    def partition_expression(self, expression: str) -> str:
+        """
+        Quotes the column references of a partition expression, supporting transforms such as ``days(ts)`` or
+        ``bucket(16, id)`` and comma separated lists of columns and transforms such as ``days(ts), region``.
+
+        Args:
+            expression (str): A column name, a partition transform or a comma separated list of them.
+
+        Returns:
+            str: The partition expression with quoted columns.
+        """
+        return ", ".join(self._partition_field(field) for field in _split_top_level(expression))
+
+    def _partition_field(self, expression: str) -> str:
+        match = _TRANSFORM_PATTERN.match(expression)
+        if match is None:
+            return self.quote(expression.strip(), ddl=True)
+        transform, arguments = match.groups()
+        rendered = [
+            self.quote(argument, ddl=True) if _IDENTIFIER_PATTERN.match(argument) else argument
+            for argument in (argument.strip() for argument in arguments.split(","))
+        ]
+        return f"{transform.lower()}({', '.join(rendered)})"
+
+    def show_databases(self, catalog_name: Optional[str] = None) -> str:
+        return f"SHOW DATABASES IN {self.quote(catalog_name, ddl=True)}" if catalog_name else "SHOW DATABASES"
+
+    def show_tables(self, database_name: str, catalog_name: Optional[str] = None) -> str:
+        return f"SHOW TABLES IN {self.qualified_name(catalog_name, database_name, ddl=True)}"
+
+    def show_table_properties(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        return f"SHOW TBLPROPERTIES {self.qualified_name(catalog_name, database_name, table_name, ddl=True)}"
+
+    def describe_table(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        return f"DESCRIBE {self.qualified_name(catalog_name, database_name, table_name, ddl=True)}"
+
+    def create_database(self, database_name: str) -> str:
+        return f"CREATE DATABASE IF NOT EXISTS {self.quote(database_name, ddl=True)}"
+
+    def show_create_table(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        return f"SHOW CREATE TABLE {self.qualified_name(catalog_name, database_name, table_name, ddl=True)}"
+
+    def create_table(
+        self,
+        catalog_name: Optional[str],
+        database_name: str,
+        table_name: str,
+        columns: Dict[str, str],
+        location: str,
+        partition_column: Optional[str] = None,
+        properties: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        Builds a ``CREATE TABLE IF NOT EXISTS`` statement for an Iceberg table.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            columns (Dict[str, str]): Column names and their types.
+            location (str): The storage location of the table.
+            partition_column (Optional[str]): A column name or partition transform.
+            properties (Optional[Dict[str, str]]): Table properties, rendered sorted by key.
+
+        Returns:
+            str: The statement.
+        """
+        column_str = ", ".join(f"{self.quote(column, ddl=True)} {data_type.strip()}" for column, data_type in columns.items())
+        statement = (
+            f"CREATE TABLE IF NOT EXISTS {self.qualified_name(catalog_name, database_name, table_name, ddl=True)} ({column_str}) "
+            f"USING iceberg"
+        )
+        if partition_column is not None:
+            statement += f" PARTITIONED BY ({self.partition_expression(partition_column)})"
+        statement += f" LOCATION {self.literal(location)}"
+        if properties:
+            statement += f" TBLPROPERTIES ({self._properties(properties)})"
+        return statement
+
+    def create_table_as(
+        self,
+        catalog_name: Optional[str],
+        database_name: str,
+        table_name: str,
+        query: str,
+        location: str,
+        partition_column: Optional[str] = None,
+        properties: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        Builds a ``CREATE TABLE ... AS SELECT`` statement for an Iceberg table, committed with its rows and properties.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            query (str): The query producing the rows of the table.
+            location (str): The storage location of the table.
+            partition_column (Optional[str]): A column name or partition transform.
+            properties (Optional[Dict[str, str]]): Table properties, rendered sorted by key.
+
+        Returns:
+            str: The statement.
+        """
+        statement = f"CREATE TABLE {self.qualified_name(catalog_name, database_name, table_name, ddl=True)} USING iceberg"
+        if partition_column is not None:
+            statement += f" PARTITIONED BY ({self.partition_expression(partition_column)})"
+        statement += f" LOCATION {self.literal(location)}"
+        if properties:
+            statement += f" TBLPROPERTIES ({self._properties(properties)})"
+        return f"{statement} AS {query}"
+
+    def unload(self, query: str, location: str, compression: str = "SNAPPY") -> str:
+        """
+        Builds an Athena ``UNLOAD`` statement writing the result of a query to Parquet files.
+
+        Args:
+            query (str): The query producing the rows.
+            location (str): The empty storage location the files are written to.
+            compression (str): The Parquet compression codec.
+
+        Returns:
+            str: The statement.
+
+        Raises:
+            UnsupportedOperationError: On Spark, which has no ``UNLOAD`` statement.
+        """
+        if self.dialect != SqlDialect.ATHENA:
+            raise UnsupportedOperationError("UNLOAD is only supported on Athena.")
+        return f"UNLOAD ({query}) TO {self.literal(location)} WITH (format = 'PARQUET', compression = {self.literal(compression)})"
+
+    def create_parquet_table_as(self, database_name: str, table_name: str, query: str, location: str, compression: str = "SNAPPY") -> str:
+        """
+        Builds an Athena ``CREATE TABLE ... AS SELECT`` statement writing the result of a query to an external Parquet
+        table.
+
+        Args:
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            query (str): The query producing the rows.
+            location (str): The empty storage location the files are written to.
+            compression (str): The Parquet compression codec.
+
+        Returns:
+            str: The statement.
+
+        Raises:
+            UnsupportedOperationError: On Spark, where ``create_table_as`` creates Iceberg tables instead.
+        """
+        if self.dialect != SqlDialect.ATHENA:
+            raise UnsupportedOperationError("External Parquet tables are only created on Athena.")
+        options = f"format = 'PARQUET', write_compression = {self.literal(compression)}, external_location = {self.literal(location)}"
+        return f"CREATE TABLE {self.qualified_name(database_name, table_name, ddl=True)} WITH ({options}) AS {query}"
+
+    def write_ordered_by(self, catalog_name: Optional[str], database_name: str, table_name: str, columns: List[str]) -> str:
+        """
+        Builds the statement setting the write sort order of a table, so every write clusters its rows.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            columns (List[str]): The sort columns, most significant first.
+
+        Returns:
+            str: The statement.
+
+        Raises:
+            UnsupportedOperationError: On Athena, which cannot set the sort order of Iceberg tables.
+        """
+        if self.dialect == SqlDialect.ATHENA:
+            raise UnsupportedOperationError("Athena cannot set the write sort order of Iceberg tables.")
+        column_str = ", ".join(self.quote(column, ddl=True) for column in columns)
+        return f"ALTER TABLE {self.qualified_name(catalog_name, database_name, table_name, ddl=True)} WRITE ORDERED BY {column_str}"
+
+    def rewrite_data_files(
+        self,
+        catalog_name: Optional[str],
+        database_name: str,
+        table_name: str,
+        strategy: str = "binpack",
+        columns: Optional[List[str]] = None,
+        predicate: Optional[str] = None,
+    ) -> str:
+        """
+        Builds the statement compacting the data files of a table.
+
+        Spark calls the ``rewrite_data_files`` procedure. The ``sort`` strategy sorts by ``columns``, or by the table
+        sort order when no columns are given, and ``zorder`` interleaves ``columns``; both rewrite every selected file.
+        Athena runs ``OPTIMIZE``, which only supports bin-packing.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            strategy (str): ``binpack``, ``sort`` or ``zorder``.
+            columns (Optional[List[str]]): The clustering columns of the ``sort`` and ``zorder`` strategies.
+            predicate (Optional[str]): Restricts the compaction to the files holding matching rows.
+
+        Returns:
+            str: The statement.
+
+        Raises:
+            UnsupportedOperationError: If the dialect does not support the strategy.
+            ValueError: If the strategy is unknown, or ``zorder`` is given no columns.
+        """
+        if strategy not in ("binpack", "sort", "zorder"):
+            raise ValueError(f"Unknown compaction strategy: {strategy}")
+        if strategy == "zorder" and not columns:
+            raise ValueError("The zorder strategy needs at least one column")
+        if self.dialect == SqlDialect.ATHENA:
+            if strategy != "binpack":
+                raise UnsupportedOperationError(f"Athena cannot compact with the {strategy} strategy.")
+            statement = f"OPTIMIZE {self.qualified_name(catalog_name, database_name, table_name)} REWRITE DATA USING BIN_PACK"
+            return f"{statement} WHERE {predicate}" if predicate else statement
+
+        arguments = [
+            f"table => {self.literal(f'{database_name}.{table_name}')}",
+            f"strategy => {self.literal(strategy.replace('zorder', 'sort'))}",
+        ]
+        if strategy == "zorder":
+            arguments.append(f"sort_order => {self.literal('zorder(' + ', '.join(columns) + ')')}")
+        elif strategy == "sort" and columns:
+            arguments.append(f"sort_order => {self.literal(', '.join(f'{column} ASC NULLS LAST' for column in columns))}")
+        if strategy != "binpack":
+            arguments.append("options => map('rewrite-all', 'true')")
+        if predicate:
+            arguments.append(f"where => {self.literal(predicate)}")
+        return f"CALL {self.qualified_name(catalog_name, 'system', 'rewrite_data_files')}({', '.join(arguments)})"
+
+    def select_column_bounds(self, catalog_name: Optional[str], database_name: str, table_name: str, columns: List[str]) -> str:
+        """
+        Builds a query returning the path and the lower and upper bound of some columns of every data file of a table.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            columns (List[str]): The columns.
+
+        Returns:
+            str: The statement, with the file path followed by a lower and an upper bound column per column, in order.
+
+        Raises:
+            UnsupportedOperationError: On Athena, whose ``$files`` table only exposes the bounds as serialized values.
+        """
+        if self.dialect == SqlDialect.ATHENA:
+            raise UnsupportedOperationError("Athena does not expose readable column bounds.")
+        bounds = "".join(
+            f", readable_metrics.{self.quote(column)}.lower_bound, readable_metrics.{self.quote(column)}.upper_bound" for column in columns
+        )
+        return f"SELECT file_path{bounds} FROM {self.metadata_table(catalog_name, database_name, table_name, 'files')} WHERE content = 0"
+
+    def set_table_properties(self, catalog_name: Optional[str], database_name: str, table_name: str, properties: Dict[str, str]) -> str:
+        return f"ALTER TABLE {self.qualified_name(catalog_name, database_name, table_name, ddl=True)} SET TBLPROPERTIES ({self._properties(properties)})"
+
+    def select_metrics_width(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        """
+        Builds a query returning the number of data files of a table, the number of columns with value counts and with
+        bounds summed over the files, and the total size of the bounds.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+
+        Returns:
+            str: The statement.
+
+        Raises:
+            UnsupportedOperationError: On Athena, whose ``$files`` table only exposes the bounds as serialized values.
+        """
+        if self.dialect == SqlDialect.ATHENA:
+            raise UnsupportedOperationError("Athena does not expose the size of column bounds.")
+        bounds_bytes = " + ".join(
+            f"coalesce(aggregate(map_values({bounds}), 0L, (total, bound) -> total + octet_length(bound)), 0)"
+            for bounds in ("lower_bounds", "upper_bounds")
+        )
+        return (
+            f"SELECT count(*), coalesce(sum(greatest(size(value_counts), 0)), 0), coalesce(sum(greatest(size(lower_bounds), 0)), 0), "
+            f"coalesce(sum({bounds_bytes}), 0) FROM {self.metadata_table(catalog_name, database_name, table_name, 'files')} WHERE content = 0"
+        )
+
+    def select_manifest_sizes(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        return f"SELECT count(*), coalesce(sum(length), 0) FROM {self.metadata_table(catalog_name, database_name, table_name, 'manifests')}"
+
+    def row_hash(self, columns: Optional[List[str]] = None) -> str:
+        """
+        Builds an expression hashing the values of some columns of a row into a 64-bit integer.
+
+        Spark uses ``xxhash64``. Athena hashes a delimited text rendering of the values with ``xxhash64``.
+
+        Args:
+            columns (Optional[List[str]]): The columns. Defaults to every column on Spark.
+
+        Returns:
+            str: The expression.
+
+        Raises:
+            ValueError: On Athena when no columns are given.
+        """
+        if self.dialect == SqlDialect.ATHENA:
+            if not columns:
+                raise ValueError("Athena needs the columns to hash")
+            values = ", ".join(f"coalesce(cast({self.quote(column)} AS varchar), '\\N')" for column in columns)
+            return f"from_big_endian_64(xxhash64(to_utf8(concat_ws('|', {values}))))"
+        return f"xxhash64({', '.join(self.quote(column) for column in columns) if columns else '*'})"
+
+    def hash_bucket(self, columns: List[str], buckets: int) -> str:
+        """
+        Builds an expression assigning a row to one of ``buckets`` buckets by the hash of some columns.
+
+        Args:
+            columns (List[str]): The columns, typically the key of the table.
+            buckets (int): The number of buckets.
+
+        Returns:
+            str: The expression.
+        """
+        if self.dialect == SqlDialect.ATHENA:
+            return f"abs({self.row_hash(columns)} % {buckets})"
+        return f"pmod({self.row_hash(columns)}, {buckets})"
+
+    def select_digests(
+        self,
+        catalog_name: Optional[str],
+        database_name: str,
+        table_name: str,
+        group_expressions: List[str],
+        hash_expression: str,
+    ) -> str:
+        """
+        Builds a query returning the number of rows and an order-insensitive digest of the row hashes of every group.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            group_expressions (List[str]): The grouping expressions, e.g. partition columns. None for a single group.
+            hash_expression (str): The row hash, see ``row_hash``.
+
+        Returns:
+            str: The statement, with the group values followed by the row count and the digest.
+        """
+        groups = ", ".join(group_expressions)
+        statement = (
+            f"SELECT {groups + ', ' if groups else ''}count(*), coalesce(sum(cast({hash_expression} AS decimal(38, 0))), 0) "
+            f"FROM {self.qualified_name(catalog_name, database_name, table_name)}"
+        )
+        return f"{statement} GROUP BY {groups}" if groups else statement
+
+    def select_row_hashes(
+        self,
+        catalog_name: Optional[str],
+        database_name: str,
+        table_name: str,
+        keys: List[str],
+        hash_expression: str,
+        predicate: Optional[str] = None,
+    ) -> str:
+        """
+        Builds a query returning the key and the row hash of the rows matching a predicate.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            keys (List[str]): The key columns.
+            hash_expression (str): The row hash, see ``row_hash``.
+            predicate (Optional[str]): The rows to return. Defaults to every row.
+
+        Returns:
+            str: The statement, with the key columns followed by the row hash.
+        """
+        key_str = ", ".join(self.quote(key) for key in keys)
+        statement = f"SELECT {key_str}, {hash_expression} FROM {self.qualified_name(catalog_name, database_name, table_name)}"
+        return f"{statement} WHERE {predicate}" if predicate else statement
+
+    def group_predicate(self, group_expressions: List[str], groups: List[tuple]) -> str:
+        """
+        Builds a predicate matching the rows of some groups.
+
+        Args:
+            group_expressions (List[str]): The grouping expressions.
+            groups (List[tuple]): The values of the grouping expressions of every group.
+
+        Returns:
+            str: The predicate.
+        """
+
+        def condition(expression: str, value) -> str:
+            return f"{expression} IS NULL" if value is None else f"{expression} = {self.literal(value)}"
+
+        return " OR ".join(f"({' AND '.join(condition(e, v) for e, v in zip(group_expressions, group))})" for group in groups)
+
+    def drop_table(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        return f"DROP TABLE {self.qualified_name(catalog_name, database_name, table_name, ddl=True)}"
+
+    def metadata_table(self, catalog_name: Optional[str], database_name: str, table_name: str, table_property: str) -> str:
+        """
+        Builds the name of an Iceberg metadata table, ``table$property`` on Athena and ``table.property`` on Spark.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            table_property (str): The metadata table, e.g. ``snapshots``.
+
+        Returns:
+            str: The qualified metadata table name.
+        """
+        if self.dialect == SqlDialect.ATHENA:
+            return self.qualified_name(catalog_name, database_name, f"{table_name}${table_property}")
+        return self.qualified_name(catalog_name, database_name, table_name, table_property)
+
+    def select_metadata(self, catalog_name: Optional[str], database_name: str, table_name: str, table_property: str) -> str:
+        """
+        Builds a query over an Iceberg metadata table such as ``snapshots`` or ``files``.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            table_property (str): The metadata table to read.
+
+        Returns:
+            str: The statement.
+        """
+        return f"SELECT * FROM {self.metadata_table(catalog_name, database_name, table_name, table_property)}"
+
+    def select_current_snapshot(self, catalog_name: Optional[str], database_name: str, table_name: str, ref: str = "main") -> str:
+        """
+        Builds a query returning the snapshot ID a branch or tag of a table points to.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            ref (str): The branch or tag. Defaults to the ``main`` branch.
+
+        Returns:
+            str: The statement.
+        """
+        refs = self.metadata_table(catalog_name, database_name, table_name, "refs")
+        return f"SELECT snapshot_id FROM {refs} WHERE name = {self.literal(ref)}"
+
+    def select_last_batch_id(self, catalog_name: Optional[str], database_name: str, table_name: str, stream_id: str) -> str:
+        """
+        Builds a query returning the greatest micro-batch ID a stream committed to a table, read from the
+        ``keepice.stream-id`` and ``keepice.batch-id`` properties of the snapshot summaries.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            stream_id (str): The identifier of the stream.
+
+        Returns:
+            str: The statement.
+        """
+        snapshots = self.metadata_table(catalog_name, database_name, table_name, "snapshots")
+        return (
+            f"SELECT max(cast(summary['keepice.batch-id'] AS bigint)) FROM {snapshots} "
+            f"WHERE summary['keepice.stream-id'] = {self.literal(stream_id)}"
+        )
+
+    def select_metadata_location(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        """
+        Builds a query returning the location of the current metadata file of a table, the last entry of its metadata
+        log. The location changes with every commit and every schema or property change.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+
+        Returns:
+            str: The statement.
+        """
+        entries = self.metadata_table(catalog_name, database_name, table_name, "metadata_log_entries")
+        return f"SELECT file FROM {entries} ORDER BY timestamp DESC LIMIT 1"
+
+    def select_snapshot_stats(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        snapshots = self.metadata_table(catalog_name, database_name, table_name, "snapshots")
+        return f"SELECT count(*), max(committed_at) FROM {snapshots}"
+
+    def select_current_summary(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        snapshots = self.metadata_table(catalog_name, database_name, table_name, "snapshots")
+        refs = self.metadata_table(catalog_name, database_name, table_name, "refs")
+        return f"SELECT s.snapshot_id, s.summary FROM {snapshots} s JOIN {refs} r ON s.snapshot_id = r.snapshot_id WHERE r.name = 'main'"
+
+    def select_partition_count(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        return f"SELECT count(*) FROM {self.metadata_table(catalog_name, database_name, table_name, 'partitions')}"
+
+    def select_table_size(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        """
+        Builds a query returning the total size and record count of the data files of a table, read from the summary
+        of its current snapshot, so no manifest has to be scanned.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+
+        Returns:
+            str: The statement.
+        """
+        snapshots = self.metadata_table(catalog_name, database_name, table_name, "snapshots")
+        refs = self.metadata_table(catalog_name, database_name, table_name, "refs")
+        return (
+            f"SELECT s.summary['total-files-size'], s.summary['total-records'] FROM {snapshots} s "
+            f"JOIN {refs} r ON s.snapshot_id = r.snapshot_id WHERE r.name = 'main'"
+        )
+
+    def older_than_predicate(self, column: str, cutoff: Timestamp, column_type: str = "timestamp") -> str:
+        """
+        Builds a predicate selecting the rows whose ``column`` is before ``cutoff``.
+
+        Args:
+            column (str): A timestamp or date column.
+            cutoff (Timestamp): The first instant kept. Naive values are read as UTC.
+            column_type (str): ``timestamp`` or ``date``.
+
+        Returns:
+            str: The predicate.
+        """
+        cutoff = to_utc_datetime(cutoff)
+        if column_type == "date":
+            return f"{self.quote(column)} < DATE {self.literal(cutoff.strftime('%Y-%m-%d'))}"
+        return f"{self.quote(column)} < TIMESTAMP {self.literal(cutoff.strftime('%Y-%m-%d %H:%M:%S.%f'))}"
+
+    def expire_snapshots(self, catalog_name: Optional[str], database_name: str, table_name: str, older_than: Timestamp) -> str:
+        """
+        Builds the statement expiring the snapshots of a table older than a point in time.
+
+        Spark calls the ``expire_snapshots`` procedure, keeping at least the current snapshot. Athena runs ``VACUUM``,
+        which expires snapshots according to the ``vacuum_max_snapshot_age_seconds`` table property instead.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            older_than (Timestamp): Snapshots committed before this instant are expired.
+
+        Returns:
+            str: The statement.
+        """
+        if self.dialect == SqlDialect.ATHENA:
+            return f"VACUUM {self.qualified_name(catalog_name, database_name, table_name)}"
+        procedure = self.qualified_name(catalog_name, "system", "expire_snapshots")
+        timestamp = to_utc_datetime(older_than).strftime("%Y-%m-%d %H:%M:%S.%f")
+        return (
+            f"CALL {procedure}(table => {self.literal(f'{database_name}.{table_name}')}, "
+            f"older_than => TIMESTAMP {self.literal(timestamp)}, retain_last => 1)"
+        )
+
+    def select_snapshot_summary(self, catalog_name: Optional[str], database_name: str, table_name: str, snapshot_id: int) -> str:
+        snapshots = self.metadata_table(catalog_name, database_name, table_name, "snapshots")
+        return f"SELECT summary FROM {snapshots} WHERE snapshot_id = {int(snapshot_id)}"
+
+    def time_travel(
+        self,
+        snapshot_id: Optional[int] = None,
+        as_of_timestamp: Optional[Timestamp] = None,
+        branch: Optional[str] = None,
+        tag: Optional[str] = None,
+    ) -> str:
+        """
+        Builds the clause selecting a table version, e.g. ``VERSION AS OF 123`` on Spark or ``FOR VERSION AS OF 123`` on
+        Athena.
+
+        Args:
+            snapshot_id (Optional[int]): The snapshot to read.
+            as_of_timestamp (Optional[Timestamp]): Read the snapshot current at this time. Naive values are read as UTC.
+            branch (Optional[str]): The branch to read.
+            tag (Optional[str]): The tag to read.
+
+        Returns:
+            str: The clause, or an empty string when no version is selected.
+
+        Raises:
+            ValueError: If more than one version selector is given.
+            UnsupportedOperationError: If branches or tags are read on Athena.
+        """
+        validate_version(snapshot_id, as_of_timestamp, branch, tag)
+        prefix = "FOR " if self.dialect == SqlDialect.ATHENA else ""
+        if snapshot_id is not None:
+            return f"{prefix}VERSION AS OF {int(snapshot_id)}"
+        if as_of_timestamp is not None:
+            timestamp = to_utc_datetime(as_of_timestamp).strftime("%Y-%m-%d %H:%M:%S.%f")
+            if self.dialect == SqlDialect.ATHENA:
+                return f"FOR TIMESTAMP AS OF TIMESTAMP {self.literal(timestamp + ' UTC')}"
+            return f"TIMESTAMP AS OF {self.literal(timestamp)}"
+        ref = branch if branch is not None else tag
+        if ref is None:
+            return ""
+        if self.dialect == SqlDialect.ATHENA:
+            raise UnsupportedOperationError("Athena cannot read Iceberg branches or tags.")
+        return f"VERSION AS OF {self.literal(ref)}"
+
+    def select_table(
+        self,
+        catalog_name: Optional[str],
+        database_name: str,
+        table_name: str,
+        columns: Optional[List[str]] = None,
+        predicate: Optional[str] = None,
+        limit: Optional[int] = None,
+        snapshot_id: Optional[int] = None,
+        as_of_timestamp: Optional[Timestamp] = None,
+        branch: Optional[str] = None,
+        tag: Optional[str] = None,
+    ) -> str:
+        """
+        Builds a query reading a table, optionally at a snapshot, point in time, branch or tag.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            columns (Optional[List[str]]): The columns to read. Defaults to all columns.
+            predicate (Optional[str]): A filter on the rows to read.
+            limit (Optional[int]): The maximum number of rows to read.
+            snapshot_id (Optional[int]): The snapshot to read.
+            as_of_timestamp (Optional[Timestamp]): Read the snapshot current at this time.
+            branch (Optional[str]): The branch to read.
+            tag (Optional[str]): The tag to read.
+
+        Returns:
+            str: The statement.
+        """
+        projection = ", ".join(self.quote(column) for column in columns) if columns else "*"
+        statement = f"SELECT {projection} FROM {self.qualified_name(catalog_name, database_name, table_name)}"
+        version = self.time_travel(snapshot_id, as_of_timestamp, branch, tag)
+        if version:
+            statement += f" {version}"
+        if predicate:
+            statement += f" WHERE {predicate}"
+        if limit is not None:
+            statement += f" LIMIT {int(limit)}"
+        return statement
+
+    def branch_identifier(self, branch: Optional[str]) -> Optional[str]:
+        """
+        Returns the table name suffix writing to a branch, ``branch_<name>`` on Spark.
+
+        Args:
+            branch (Optional[str]): The branch to write to.
+
+        Returns:
+            Optional[str]: The suffix, or None when writing to the main branch.
+
+        Raises:
+            UnsupportedOperationError: If a branch is given on Athena.
+        """
+        if branch is None:
+            return None
+        if self.dialect == SqlDialect.ATHENA:
+            raise UnsupportedOperationError("Athena cannot write to Iceberg branches.")
+        return f"branch_{branch}"
+
+    def create_branch(
+        self, catalog_name: Optional[str], database_name: str, table_name: str, branch: str, snapshot_id: Optional[int] = None
+    ) -> str:
+        self.branch_identifier(branch)
+        statement = (
+            f"ALTER TABLE {self.qualified_name(catalog_name, database_name, table_name, ddl=True)} "
+            f"CREATE BRANCH IF NOT EXISTS {self.quote(branch, ddl=True)}"
+        )
+        if snapshot_id is not None:
+            statement += f" AS OF VERSION {int(snapshot_id)}"
+        return statement
+
+    def drop_branch(self, catalog_name: Optional[str], database_name: str, table_name: str, branch: str) -> str:
+        self.branch_identifier(branch)
+        return (
+            f"ALTER TABLE {self.qualified_name(catalog_name, database_name, table_name, ddl=True)} "
+            f"DROP BRANCH IF EXISTS {self.quote(branch, ddl=True)}"
+        )
+
+    def create_tag(
+        self, catalog_name: Optional[str], database_name: str, table_name: str, tag: str, snapshot_id: Optional[int] = None
+    ) -> str:
+        if self.dialect == SqlDialect.ATHENA:
+            raise UnsupportedOperationError("Athena cannot create Iceberg tags.")
+        statement = (
+            f"ALTER TABLE {self.qualified_name(catalog_name, database_name, table_name, ddl=True)} "
+            f"CREATE TAG IF NOT EXISTS {self.quote(tag, ddl=True)}"
+        )
+        if snapshot_id is not None:
+            statement += f" AS OF VERSION {int(snapshot_id)}"
+        return statement
+
+    def fast_forward(self, catalog_name: Optional[str], database_name: str, table_name: str, branch: str, to_branch: str = "main") -> str:
+        """
+        Builds the Spark procedure call fast-forwarding a branch, ``main`` by default, to the head of another branch.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the table.
+            database_name (str): The database of the table.
+            table_name (str): The name of the table.
+            branch (str): The branch whose head becomes the new head of ``to_branch``.
+            to_branch (str): The branch to fast-forward.
+
+        Returns:
+            str: The statement.
+        """
+        self.branch_identifier(branch)
+        procedure = self.qualified_name(catalog_name, "system", "fast_forward")
+        return (
+            f"CALL {procedure}(table => {self.literal(f'{database_name}.{table_name}')}, "
+            f"branch => {self.literal(to_branch)}, to => {self.literal(branch)})"
+        )
+
+    def delete_from(
+        self,
+        catalog_name: Optional[str],
+        database_name: str,
+        table_name: str,
+        predicate: Optional[str] = None,
+        branch: Optional[str] = None,
+    ) -> str:
+        statement = f"DELETE FROM {self.qualified_name(catalog_name, database_name, table_name, self.branch_identifier(branch))}"
+        if predicate:
+            statement += f" WHERE {predicate}"
+        return statement
+
+    def insert_select(
+        self, catalog_name: Optional[str], database_name: str, table_name: str, source_table: str, branch: Optional[str] = None
+    ) -> str:
+        target = self.qualified_name(catalog_name, database_name, table_name, self.branch_identifier(branch))
+        return f"INSERT INTO {target} SELECT * FROM {self.relation(source_table)}"
+
+    def merge_delta(
+        self,
+        catalog_name: Optional[str],
+        database_name: str,
+        table_name: str,
+        source_table: str,
+        primary_key: str,
+        order_col: str,
+        source_table_pk: str,
+        branch: Optional[str] = None,
+    ) -> str:
+        """
+        Builds a ``MERGE INTO`` statement applying the latest change per key of a CDC source.
+
+        The source is deduplicated on its key keeping the row with the greatest ``order_col``, and its ``__action``
+        column decides whether matched rows are deleted (``'d'``) or updated (``'u'``).
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the target table.
+            database_name (str): The database of the target table.
+            table_name (str): The name of the target table.
+            source_table (str): The relation holding the changes.
+            primary_key (str): The key column of the target table.
+            order_col (str): The column ordering the changes of a key.
+            source_table_pk (str): The key column of the source relation.
+            branch (Optional[str]): The branch to merge into. Defaults to the main branch.
+
+        Returns:
+            str: The statement.
+        """
+        target = self.qualified_name(catalog_name, database_name, table_name, self.branch_identifier(branch))
+        source_key = self.quote(source_table_pk)
+        action = f"temp_table.{self.quote('__action')}"
+        return (
+            f"MERGE INTO {target} AS iceberg_table USING ("
+            f"SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY {source_key} ORDER BY {self.quote(order_col)} DESC) AS row_rank "
+            f"FROM {self.relation(source_table)}) WHERE row_rank = 1"
+            f") AS temp_table ON iceberg_table.{self.quote(primary_key)} = temp_table.{source_key} "
+            f"WHEN MATCHED AND {action} = 'd' THEN DELETE "
+            f"WHEN MATCHED AND {action} = 'u' THEN UPDATE SET * "
+            f"WHEN NOT MATCHED AND {action} != 'd' THEN INSERT *"
+        )
+
+    def select_aggregates(self, relation: str, group_by: List[str], aggregates: Dict[str, str], predicate: Optional[str] = None) -> str:
+        """
+        Builds a query aggregating a relation by some of its columns.
+
+        Args:
+            relation (str): The relation aggregated, e.g. a qualified table name with a time travel clause or a view.
+            group_by (List[str]): The grouping columns.
+            aggregates (Dict[str, str]): The aggregate expression of every output column.
+            predicate (Optional[str]): A filter on the rows aggregated.
+
+        Returns:
+            str: The statement.
+        """
+        groups = [self.quote(column) for column in group_by]
+        projection = groups + [f"{expression.strip()} AS {self.quote(column)}" for column, expression in aggregates.items()]
+        statement = f"SELECT {', '.join(projection)} FROM {relation}"
+        if predicate:
+            statement += f" WHERE {predicate}"
+        if groups:
+            statement += f" GROUP BY {', '.join(groups)}"
+        return statement
+
+    def merge_aggregates(
+        self,
+        catalog_name: Optional[str],
+        database_name: str,
+        table_name: str,
+        source_query: str,
+        group_by: List[str],
+        functions: Dict[str, str],
+    ) -> str:
+        """
+        Builds a ``MERGE INTO`` statement folding partial aggregates into a summary table.
+
+        Groups are matched null-safely. Sums and counts of matched groups are added, minimums and maximums combined;
+        new groups are inserted.
+
+        Args:
+            catalog_name (Optional[str]): The catalog of the summary table.
+            database_name (str): The database of the summary table.
+            table_name (str): The name of the summary table.
+            source_query (str): The query producing the partial aggregates, one row per group.
+            group_by (List[str]): The grouping columns.
+            functions (Dict[str, str]): The aggregate function, ``sum``, ``count``, ``min`` or ``max``, of every
+                aggregate column.
+
+        Returns:
+            str: The statement.
+
+        Raises:
+            UnsupportedOperationError: On Athena, which cannot read the rows appended by a range of snapshots.
+        """
+        if self.dialect == SqlDialect.ATHENA:
+            raise UnsupportedOperationError("Summary tables are not supported on Athena.")
+        target = self.qualified_name(catalog_name, database_name, table_name)
+        condition = " AND ".join(f"summary.{self.quote(column)} <=> partial.{self.quote(column)}" for column in group_by) or "true"
+        combined = {
+            "sum": "coalesce(summary.{0} + partial.{0}, summary.{0}, partial.{0})",
+            "count": "summary.{0} + partial.{0}",
+            "min": "least(summary.{0}, partial.{0})",
+            "max": "greatest(summary.{0}, partial.{0})",
+        }
+        assignments = ", ".join(
+            f"summary.{self.quote(column)} = {combined[function].format(self.quote(column))}" for column, function in functions.items()
+        )
+        return (
+            f"MERGE INTO {target} AS summary USING ({source_query}) AS partial ON {condition} "
+            f"WHEN MATCHED THEN UPDATE SET {assignments} "
+            f"WHEN NOT MATCHED THEN INSERT *"
+        )
+
+    def select_snapshot_history(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        snapshots = self.metadata_table(catalog_name, database_name, table_name, "snapshots")
+        return f"SELECT committed_at, operation, summary FROM {snapshots} ORDER BY committed_at"
+
+    def select_snapshot_lineage(self, catalog_name: Optional[str], database_name: str, table_name: str) -> str:
+        snapshots = self.metadata_table(catalog_name, database_name, table_name, "snapshots")
+        return f"SELECT snapshot_id, parent_id, operation FROM {snapshots}"
+
+    def _properties(self, properties: Dict[str, str]) -> str:
+        return ", ".join(f"{self.literal(key)} = {self.literal(str(value))}" for key, value in sorted(properties.items()))
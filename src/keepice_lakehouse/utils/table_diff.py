@@ -0,0 +1,86 @@
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+HASH_MULTIPLIER = pa.scalar(0x9E3779B97F4A7C15, pa.uint64())
+NULL_CODE = pa.scalar(0x2545F4914F6CDD1D, pa.uint64())
+SHIFT = pa.scalar(31, pa.uint64())
+INTEGER_LIKE = (pa.types.is_integer, pa.types.is_boolean, pa.types.is_date, pa.types.is_time, pa.types.is_timestamp, pa.types.is_duration)
+
+
+def _integer_view(array: pa.Array) -> pa.Array:
+    if pa.types.is_boolean(array.type):
+        return pc.cast(array, pa.uint64())
+    if pa.types.is_integer(array.type) and array.type.bit_width == 64:
+        return array.view(pa.uint64())
+    if pa.types.is_integer(array.type):
+        return pc.cast(pc.cast(array, pa.int64()), pa.uint64(), safe=False)
+    signed = pa.int32() if array.type.bit_width == 32 else pa.int64()
+    return pc.cast(pc.cast(array.view(signed), pa.int64()), pa.uint64(), safe=False)
+
+
+def encode_columns(source: pa.Table, target: pa.Table, columns: List[str]) -> Tuple[Dict[str, pa.Array], Dict[str, pa.Array]]:
+    """
+    Encodes columns of two tables as unsigned 64-bit codes that are equal exactly when the values are equal.
+
+    Integer, boolean and temporal values are used as they are. Other values are encoded jointly, as their index among
+    the distinct values of both tables, so the codes of one table are comparable with the codes of the other.
+
+    Args:
+        source (pa.Table): The first table.
+        target (pa.Table): The second table, with the same types as the first for ``columns``.
+        columns (List[str]): The columns to encode.
+
+    Returns:
+        Tuple[Dict[str, pa.Array], Dict[str, pa.Array]]: The codes of the columns of each table, nulls kept.
+    """
+    source_codes = {}
+    target_codes = {}
+    for column in columns:
+        source_values = source[column].combine_chunks()
+        target_values = target[column].combine_chunks()
+        data_type = source_values.type
+        if any(check(data_type) for check in INTEGER_LIKE):
+            source_codes[column] = _integer_view(source_values)
+            target_codes[column] = _integer_view(target_values)
+        else:
+            value_set = pc.unique(pa.chunked_array([source_values, target_values], data_type))
+            source_codes[column] = pc.cast(pc.index_in(source_values, value_set=value_set), pa.uint64())
+            target_codes[column] = pc.cast(pc.index_in(target_values, value_set=value_set), pa.uint64())
+    return source_codes, target_codes
+
+
+def hash_codes(codes: List[pa.Array], length: int) -> pa.Array:
+    """
+    Combines column codes into one unsigned 64-bit hash per row.
+
+    Args:
+        codes (List[pa.Array]): The codes of the columns, in order.
+        length (int): The number of rows.
+
+    Returns:
+        pa.Array: The row hashes.
+    """
+    hashes = pa.array([0] * length, pa.uint64())
+    for column_codes in codes:
+        hashes = pc.multiply(pc.bit_wise_xor(hashes, pc.fill_null(column_codes, NULL_CODE)), HASH_MULTIPLIER)
+        hashes = pc.bit_wise_xor(hashes, pc.shift_right(hashes, SHIFT))
+    return hashes
+
+
+def bucket_of(hashes: pa.Array, buckets: int) -> pa.Array:
+    """
+    Maps hashes to buckets.
+
+    Args:
+        hashes (pa.Array): Unsigned 64-bit hashes.
+        buckets (int): The number of buckets.
+
+    Returns:
+        pa.Array: The bucket of every hash, between 0 and ``buckets - 1``.
+    """
+    count = pa.scalar(buckets, pa.uint64())
+    return pc.cast(pc.subtract(hashes, pc.multiply(pc.divide(hashes, count), count)), pa.int64())
@@ -0,0 +1,64 @@
+from datetime import datetime
+from datetime import timezone
+from typing import Optional
+from typing import Union
+
+Timestamp = Union[datetime, str, int]
+
+
+def validate_version(
+    snapshot_id: Optional[int] = None,
+    as_of_timestamp: Optional[Timestamp] = None,
+    branch: Optional[str] = None,
+    tag: Optional[str] = None,
+):
+    """
+    Checks that at most one table version selector is given.
+
+    Args:
+        snapshot_id (Optional[int]): A snapshot ID.
+        as_of_timestamp (Optional[Timestamp]): A point in time.
+        branch (Optional[str]): A branch name.
+        tag (Optional[str]): A tag name.
+
+    Raises:
+        ValueError: If more than one selector is given.
+    """
+    selectors = {"snapshot_id": snapshot_id, "as_of_timestamp": as_of_timestamp, "branch": branch, "tag": tag}
+    given = [name for name, value in selectors.items() if value is not None]
+    if len(given) > 1:
+        raise ValueError(f"Only one of snapshot_id, as_of_timestamp, branch or tag can be given, got {', '.join(given)}")
+
+
+def to_utc_datetime(value: Timestamp) -> datetime:
+    """
+    Converts a timestamp to an aware UTC datetime.
+
+    Args:
+        value (Timestamp): A datetime, an ISO 8601 string or epoch milliseconds. Naive values are read as UTC.
+
+    Returns:
+        datetime: The UTC datetime.
+    """
+    if isinstance(value, int):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def to_timestamp_ms(value: Timestamp) -> int:
+    """
+    Converts a timestamp to epoch milliseconds, the unit of Iceberg snapshot timestamps.
+
+    Args:
+        value (Timestamp): A datetime, an ISO 8601 string or epoch milliseconds. Naive values are read as UTC.
+
+    Returns:
+        int: The epoch milliseconds.
+    """
+    if isinstance(value, int):
+        return value
+    return int(to_utc_datetime(value).timestamp() * 1000)
@@ -0,0 +1,131 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..models.models import WriteModeAdvice
+from ..models.models import WriteModePolicyModel
+
+COPY_ON_WRITE = "copy-on-write"
+MERGE_ON_READ = "merge-on-read"
+WRITE_MODE_PROPERTIES = ("write.update.mode", "write.merge.mode", "write.delete.mode")
+
+MIN_COMPACTION_INTERVAL_HOURS = 1.0
+MAX_COMPACTION_INTERVAL_HOURS = 7 * 24.0
+
+
+def advise_write_modes(
+    database_name: str,
+    table_name: str,
+    snapshots: List[Tuple[datetime, str, Dict[str, str]]],
+    properties: Dict[str, str],
+    policy: WriteModePolicyModel,
+    reads_per_write: Optional[float] = None,
+    now: Optional[datetime] = None,
+) -> WriteModeAdvice:
+    """
+    Recommends the row-level write modes of a table and a compaction cadence from its snapshot history.
+
+    Copy-on-write rewrites every data file holding a changed row, so its cost grows with the share of the table a
+    merge touches; merge-on-read writes small delete files instead, which every scan then has to apply until a
+    compaction removes them. Row-level commits are the ``overwrite`` and ``delete`` snapshots that wrote data or delete
+    files; full overwrites and metadata-only deletes cost the same in both modes and are ignored. The bytes a commit
+    rewrote are taken from its ``removed-files-size``; for merge-on-read commits they are estimated as one average
+    data file per delete file added.
+
+    Args:
+        database_name (str): The name of the database containing the table.
+        table_name (str): The name of the table.
+        snapshots (List[Tuple[datetime, str, Dict[str, str]]]): The commit time, operation and summary of every
+            snapshot, oldest first.
+        properties (Dict[str, str]): The table properties.
+        policy (WriteModePolicyModel): The thresholds of the advice.
+        reads_per_write (Optional[float]): The number of scans of the table per row-level commit, when known from
+            query logs. Iceberg does not record reads.
+        now (Optional[datetime]): The end of the inspected window. Defaults to the current time.
+
+    Returns:
+        WriteModeAdvice: The telemetry, the current and recommended modes and the compaction cadence.
+    """
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=policy.window_days)
+    recent = [(operation, summary) for committed_at, operation, summary in snapshots if committed_at >= cutoff]
+    fractions = [fraction for operation, summary in recent if (fraction := _rewrite_fraction(operation, summary)) is not None]
+    latest = snapshots[-1][2] if snapshots else {}
+    data_files = _number(latest, "total-data-files")
+    delete_file_ratio = _number(latest, "total-delete-files") / data_files if data_files else 0.0
+    commits_per_day = len(fractions) / policy.window_days
+    mean_fraction = sum(fractions) / len(fractions) if fractions else 0.0
+
+    reasons = []
+    mode = COPY_ON_WRITE
+    if not fractions:
+        reasons.append(f"No row-level commits in the last {policy.window_days} days; copy-on-write keeps scans free of delete files.")
+    elif reads_per_write is not None and reads_per_write >= policy.read_heavy_ratio:
+        reasons.append(f"The table is read {reads_per_write:g} times per row-level commit; delete files would slow every scan.")
+    elif mean_fraction >= policy.rewrite_fraction_threshold or commits_per_day >= policy.frequent_commits_per_day:
+        mode = MERGE_ON_READ
+        reasons.append(
+            f"Row-level commits rewrite {mean_fraction:.1%} of the table on average, {commits_per_day:.1f} times a day; "
+            "merge-on-read writes only the changed rows."
+        )
+    else:
+        reasons.append(f"Row-level commits rewrite {mean_fraction:.1%} of the table on average; copy-on-write keeps scans fast.")
+
+    interval = None
+    if mode == MERGE_ON_READ and mean_fraction:
+        # Every commit adds delete files for about ``mean_fraction`` of the data files.
+        interval = policy.max_delete_file_ratio / (commits_per_day * mean_fraction) * 24
+        interval = min(max(interval, MIN_COMPACTION_INTERVAL_HOURS), MAX_COMPACTION_INTERVAL_HOURS)
+        reasons.append(f"Compact every {interval:.0f} hours to keep below {policy.max_delete_file_ratio:g} delete files per data file.")
+    compact_now = delete_file_ratio > policy.max_delete_file_ratio
+    if compact_now:
+        reasons.append(f"The table has {delete_file_ratio:.2f} delete files per data file; compact it now.")
+
+    return WriteModeAdvice(
+        database_name=database_name,
+        table_name=table_name,
+        snapshots=len(recent),
+        row_level_commits=len(fractions),
+        commits_per_day=commits_per_day,
+        mean_rewrite_fraction=mean_fraction,
+        delete_file_ratio=delete_file_ratio,
+        current={name: properties.get(name, COPY_ON_WRITE) for name in WRITE_MODE_PROPERTIES},
+        recommended=dict.fromkeys(WRITE_MODE_PROPERTIES, mode),
+        compaction_interval_hours=interval,
+        compact_now=compact_now,
+        reasons=reasons,
+    )
+
+
+def _rewrite_fraction(operation: str, summary: Dict[str, str]) -> Optional[float]:
+    """
+    Returns the fraction of the table bytes a row-level commit rewrote, or None when the snapshot is not a row-level
+    commit.
+    """
+    if operation not in ("overwrite", "delete"):
+        return None
+    added_files = _number(summary, "added-data-files")
+    deleted_files = _number(summary, "deleted-data-files")
+    delete_files = _number(summary, "added-delete-files")
+    files_before = _number(summary, "total-data-files") - added_files + deleted_files
+    if not added_files and not delete_files:
+        return None
+    if not delete_files and files_before and deleted_files == files_before:
+        return None
+    total_bytes = _number(summary, "total-files-size")
+    bytes_before = total_bytes - _number(summary, "added-files-size") + _number(summary, "removed-files-size")
+    if bytes_before <= 0:
+        return None
+    if delete_files:
+        data_files = _number(summary, "total-data-files")
+        rewritten = delete_files * total_bytes / data_files if data_files else bytes_before
+    else:
+        rewritten = _number(summary, "removed-files-size")
+    return min(rewritten / bytes_before, 1.0)
+
+
+def _number(summary: Dict[str, str], key: str) -> float:
+    return float(summary.get(key) or 0)
@@ -1,14 +1,29 @@
+from datetime import datetime
+from datetime import timezone
 from unittest.mock import MagicMock
+from unittest.mock import patch
 
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
+from pyspark.sql import Row
 
 from keepice_lakehouse.application.iceberg_manager import IcebergManager
+from keepice_lakehouse.application.iceberg_manager import parse_summary
+from keepice_lakehouse.connectors.pyiceberg_connector import PyIcebergConnector
 from keepice_lakehouse.connectors.spark_connector import SparkConnector
 from keepice_lakehouse.exceptions.exceptions import DatabaseCreationError
 from keepice_lakehouse.exceptions.exceptions import InvalidTablePropertyError
 from keepice_lakehouse.exceptions.exceptions import MetadataRetrievalError
 from keepice_lakehouse.exceptions.exceptions import TableCreationError
 from keepice_lakehouse.exceptions.exceptions import TableDropError
+from keepice_lakehouse.exceptions.exceptions import UnsupportedOperationError
+from keepice_lakehouse.models.models import AdaptiveTuningConfigModel
+from keepice_lakehouse.models.models import ColumnMetricsConfigModel
+from keepice_lakehouse.models.models import DeleteReport
+from keepice_lakehouse.models.models import ParquetWriterConfigModel
+from keepice_lakehouse.models.models import PyIcebergConfigModel
+from keepice_lakehouse.utils.retry import RetryPolicy
 
 
 @pytest.fixture
@@ -151,6 +166,52 @@ def test_upsert_delta_table_data(mock_connector):
     mock_connector.query.assert_called_once()
 
 
+def test_upsert_delta_table_data_tunes_the_merge_from_table_sizes(mock_connector):
+    """Test an adaptive connector tunes the merge from the snapshot summaries of the source and target."""
+    mock_connector.adaptive = AdaptiveTuningConfigModel(target_partition_bytes=1000)
+    sizes = {"`staging`.`delta`": ("3000", "10"), "`test_catalog`.`test_db`.`test_table`": ("7000", "70")}
+    mock_connector.query.side_effect = lambda query: MagicMock(
+        first=MagicMock(return_value=next((size for table, size in sizes.items() if table in query), None))
+    )
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.upsert_delta_table_data("staging.delta", "test_db", "test_table", "id", "timestamp")
+
+    settings = mock_connector.tuned.call_args.args[0]
+    assert settings["spark.sql.shuffle.partitions"] == "10"
+    assert settings["spark.sql.autoBroadcastJoinThreshold"] == str(64 * 1024 * 1024)
+    assert mock_connector.query.call_args.args[0].startswith("MERGE INTO")
+
+
+def test_dataframes_without_a_size_estimate_are_written_untuned(mock_connector):
+    """Test a DataFrame Spark cannot estimate, e.g. over Spark Connect, is written without tuning the session."""
+    mock_connector.adaptive = AdaptiveTuningConfigModel(target_partition_bytes=1000)
+    mock_connector.estimated_size.return_value = None
+    source = MagicMock(spec=["writeTo"])
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.insert_incremental_table_data(source, "test_db", "test_table")
+
+    mock_connector.estimated_size.assert_called_once_with(source)
+    mock_connector.tuned.assert_not_called()
+    source.writeTo.return_value.append.assert_called_once()
+
+
+def test_untuned_manager_leaves_the_session_settings_alone(mock_connector):
+    """Test the untuned copy of an adaptive manager shares the connection but skips the session tuning."""
+    mock_connector.adaptive = AdaptiveTuningConfigModel(target_partition_bytes=1000)
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    untuned = iceberg_manager.untuned()
+    untuned.upsert_delta_table_data("staging.delta", "test_db", "test_table", "id", "timestamp")
+
+    assert untuned.connection is iceberg_manager.connection
+    assert untuned.untuned() is untuned
+    assert iceberg_manager.adaptive_tuning
+    mock_connector.tuned.assert_not_called()
+    assert mock_connector.query.call_args.args[0].startswith("MERGE INTO")
+
+
 def test_close_connection(mock_connector):
     """Test close method."""
     mock_connector.connect.return_value.stop = MagicMock()
@@ -159,3 +220,538 @@ def test_close_connection(mock_connector):
     iceberg_manager.close()
 
     mock_connector.connect.return_value.stop.assert_called_once()
+    mock_connector.close.assert_called_once()
+
+
+def test_create_table_with_commit_retry_properties(mock_connector):
+    """Test create_table adds commit retry properties from the connector retry policy."""
+    mock_connector.retry_policy = RetryPolicy(max_attempts=4)
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.create_table("test_db", "test_table", {"id": "INT"}, "s3://path/to/data", table_properties={"format-version": "2"})
+
+    query = mock_connector.query.call_args.args[0]
+    assert "'commit.retry.num-retries' = '3'" in query
+    assert "'format-version' = '2'" in query
+
+
+def test_create_table_without_retry_section_keeps_iceberg_commit_defaults(mock_connector):
+    """Test the default retry policy of a connector without a retry section adds no commit retry properties."""
+    mock_connector.retry_policy = RetryPolicy.from_config(None)
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.create_table("test_db", "test_table", {"id": "INT"}, "s3://path/to/data")
+
+    assert "commit.retry" not in mock_connector.query.call_args.args[0]
+
+
+def test_cached_query_versions_by_snapshot(mock_connector):
+    """Test cached_query keys the connector result cache by the current snapshot of each table."""
+    mock_connector.result_cache = MagicMock()
+    mock_connector.query.return_value.fetchone.return_value = (123,)
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.cached_query("SELECT count(*) FROM test_db.test_table", [("test_db", "test_table")])
+
+    mock_connector.query.assert_called_with("SELECT count(*) FROM test_db.test_table", cache_version="test_db.test_table@123")
+
+
+def test_cached_query_without_result_cache(mock_connector):
+    """Test cached_query when the connector has no result cache."""
+    mock_connector.result_cache = None
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    with pytest.raises(UnsupportedOperationError):
+        iceberg_manager.cached_query("SELECT 1", [("test_db", "test_table")])
+
+
+def test_insert_incremental_table_data_from_dataframe(mock_connector):
+    """Test insert_incremental_table_data appends a DataFrame source through DataFrameWriterV2."""
+    source = MagicMock()
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.insert_incremental_table_data(source, "test_db", "test_table", persist=True)
+
+    source.writeTo.assert_called_once_with("`test_catalog`.`test_db`.`test_table`")
+    source.writeTo.return_value.append.assert_called_once()
+    source.persist.assert_called_once()
+    source.unpersist.assert_called_once()
+    mock_connector.query.assert_not_called()
+
+
+@patch("pyspark.sql.functions.lit")
+def test_insert_bulk_table_data_from_dataframe(mock_lit, mock_connector):
+    """Test insert_bulk_table_data replaces the table contents in a single overwrite."""
+    source = MagicMock()
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.insert_bulk_table_data(source, "test_db", "test_table")
+
+    mock_lit.assert_called_once_with(True)
+    source.writeTo.return_value.overwrite.assert_called_once_with(mock_lit.return_value)
+    mock_connector.query.assert_not_called()
+
+
+def test_insert_incremental_table_data_from_arrow_table(mock_connector):
+    """Test insert_incremental_table_data converts Arrow sources to DataFrames."""
+    source = pa.table({"id": [1, 2]})
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.insert_incremental_table_data(source, "test_db", "test_table")
+
+    session = mock_connector.connect.return_value
+    session.createDataFrame.assert_called_once_with(source)
+    session.createDataFrame.return_value.writeTo.return_value.append.assert_called_once()
+
+
+@patch("keepice_lakehouse.application.iceberg_manager.Window")
+@patch("keepice_lakehouse.application.iceberg_manager.F")
+def test_upsert_delta_table_data_from_dataframe(mock_functions, mock_window, mock_connector):
+    """Test upsert_delta_table_data merges the latest change per key of a DataFrame source through mergeInto."""
+    source = MagicMock()
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.upsert_delta_table_data(source, "test_db", "test_table", "id", "timestamp", branch="audit")
+
+    mock_window.partitionBy.assert_called_once_with(mock_functions.col.return_value)
+    assert [call.args[0] for call in mock_functions.col.call_args_list] == [
+        "`id`",
+        "`timestamp`",
+        "row_rank",
+        "temp_table.`__action`",
+        "`branch_audit`.`id`",
+        "temp_table.`id`",
+    ]
+    delta = source.withColumn.return_value.where.return_value.alias
+    delta.assert_called_once_with("temp_table")
+    assert delta.return_value.mergeInto.call_args.args[0] == "`test_catalog`.`test_db`.`test_table`.`branch_audit`"
+    writer = delta.return_value.mergeInto.return_value
+    writer = writer.whenMatched.return_value.delete.return_value.whenMatched.return_value.updateAll.return_value
+    writer.whenNotMatched.return_value.insertAll.return_value.merge.assert_called_once_with()
+    mock_connector.query.assert_not_called()
+
+
+def test_upsert_delta_table_data_from_dataframe_without_merge_into(mock_connector):
+    """Test upsert_delta_table_data merges a DataFrame source through a private temporary view before Spark 4."""
+    source = MagicMock(spec=["writeTo", "createOrReplaceTempView", "persist", "unpersist"])
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.upsert_delta_table_data(source, "test_db", "test_table", "id", "timestamp", persist=True)
+
+    view_name = source.createOrReplaceTempView.call_args.args[0]
+    assert f"`{view_name}`" in mock_connector.query.call_args.args[0]
+    mock_connector.connect.return_value.catalog.dropTempView.assert_called_once_with(view_name)
+    source.unpersist.assert_called_once()
+
+
+def test_write_dataframe_unsupported_connector(mock_connector):
+    """Test DataFrame sources are rejected by connectors without a Spark session."""
+    mock_connector.connect.return_value = MagicMock(spec=[])
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    with pytest.raises(UnsupportedOperationError):
+        iceberg_manager.insert_incremental_table_data(MagicMock(), "test_db", "test_table")
+
+
+def test_write_arrow_through_pyiceberg_connector():
+    """Test Arrow sources are written natively by the PyIceberg connector."""
+    connector = MagicMock(spec=PyIcebergConnector)
+    connector.catalog_name = "test_catalog"
+    source = pa.table({"id": [1]})
+    iceberg_manager = IcebergManager(connector=connector)
+
+    iceberg_manager.insert_incremental_table_data(source, "test_db", "test_table")
+    iceberg_manager.insert_bulk_table_data(source, "test_db", "test_table")
+    iceberg_manager.upsert_delta_table_data(source, "test_db", "test_table", "id", "ts")
+
+    connector.append.assert_called_once_with("test_db", "test_table", source, branch="main")
+    connector.overwrite.assert_called_once_with("test_db", "test_table", source, branch="main")
+    connector.upsert.assert_called_once_with("test_db", "test_table", source, "id", "ts", "id", branch="main")
+
+
+def test_read_table_at_snapshot(mock_connector):
+    """Test read_table runs a time travel query."""
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.read_table("test_db", "test_table", ["id"], snapshot_id=42)
+
+    mock_connector.query.assert_called_once_with("SELECT `id` FROM `test_catalog`.`test_db`.`test_table` VERSION AS OF 42")
+
+
+def test_pinned_session_reads_pinned_snapshots(mock_connector):
+    """Test a pinned session resolves snapshots once and reads every table at them."""
+    mock_connector.query.return_value.first.return_value = (7,)
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    with iceberg_manager.pinned_session([("test_db", "t1"), ("test_db", "t2")]) as session:
+        mock_connector.query.reset_mock()
+        session.read_table("test_db", "t1")
+        relation = session.relation("test_db", "t2")
+
+    mock_connector.query.assert_called_once_with("SELECT * FROM `test_catalog`.`test_db`.`t1` VERSION AS OF 7")
+    assert relation == "`test_catalog`.`test_db`.`t2` VERSION AS OF 7"
+    with pytest.raises(ValueError, match="not pinned"):
+        session.snapshot_id("test_db", "other")
+
+
+def test_write_audit_publish_publishes_on_success(mock_connector):
+    """Test write_audit_publish fast-forwards main to the audit branch and drops it."""
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    with iceberg_manager.write_audit_publish("test_db", "test_table", "audit") as branch:
+        iceberg_manager.insert_incremental_table_data("staging.src", "test_db", "test_table", branch=branch)
+
+    assert [call.args[0] for call in mock_connector.query.call_args_list] == [
+        "ALTER TABLE `test_catalog`.`test_db`.`test_table` CREATE BRANCH IF NOT EXISTS `audit`",
+        "INSERT INTO `test_catalog`.`test_db`.`test_table`.`branch_audit` SELECT * FROM `staging`.`src`",
+        "CALL `test_catalog`.`system`.`fast_forward`(table => 'test_db.test_table', branch => 'main', to => 'audit')",
+        "ALTER TABLE `test_catalog`.`test_db`.`test_table` DROP BRANCH IF EXISTS `audit`",
+    ]
+
+
+def test_write_audit_publish_discards_on_failure(mock_connector):
+    """Test a failing audit drops the branch without publishing it."""
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    with pytest.raises(RuntimeError), iceberg_manager.write_audit_publish("test_db", "test_table", "audit"):
+        raise RuntimeError("audit failed")
+
+    statements = [call.args[0] for call in mock_connector.query.call_args_list]
+    assert not any("fast_forward" in statement for statement in statements)
+    assert "DROP BRANCH" in statements[-1]
+
+
+def test_resolve_routes_to_catalog(mock_connector):
+    """Test catalog-qualified identifiers target their catalog on the same connection."""
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    manager, database_name, table_name = iceberg_manager.resolve("curated.test_db.test_table")
+    manager.drop_table(database_name, table_name)
+
+    assert manager.connection is iceberg_manager.connection
+    assert iceberg_manager.resolve("test_db.test_table")[0] is iceberg_manager
+    mock_connector.query.assert_called_once_with(query="DROP TABLE `curated`.`test_db`.`test_table`")
+    mock_connector.connect.assert_called_once()
+
+
+def test_delete_where_reports_snapshot_summary(mock_connector):
+    """Test delete_where runs a DELETE and reports the summary of the committed snapshot."""
+    result = MagicMock()
+    result.first.side_effect = [
+        (1,),
+        (2,),
+        ({"deleted-data-files": "3", "deleted-records": "30", "added-delete-files": "1", "added-position-deletes": "5"},),
+    ]
+    result.collect.return_value = [(2, 1, "delete"), (1, None, "append")]
+    mock_connector.query.return_value = result
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    report = iceberg_manager.delete_where("test_db", "test_table", "day < '2024-01-01'")
+
+    assert mock_connector.query.call_args_list[1].args[0] == "DELETE FROM `test_catalog`.`test_db`.`test_table` WHERE day < '2024-01-01'"
+    assert report.mode == "merge-on-read"
+    assert (report.files_removed, report.delete_files_added, report.rows_deleted) == (3, 1, 35)
+
+
+def test_delete_where_reports_its_own_snapshot_after_concurrent_commits(mock_connector):
+    """Test the report is read from the child of the snapshot current before the delete, not the new head."""
+    result = MagicMock()
+    result.first.side_effect = [(1,), (3,), ({"deleted-data-files": "2", "deleted-records": "20"},)]
+    result.collect.return_value = [(3, 2, "append"), (2, 1, "delete"), (1, None, "append")]
+    mock_connector.query.return_value = result
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    report = iceberg_manager.delete_where("test_db", "test_table", "day < '2024-01-01'")
+
+    assert mock_connector.query.call_args_list[-1].args[0].endswith("WHERE snapshot_id = 2")
+    assert (report.mode, report.files_removed, report.rows_deleted) == ("metadata", 2, 20)
+
+
+def test_delete_where_ignores_concurrent_appends(mock_connector):
+    """Test a delete committing nothing is a no-op even when another writer moved the head."""
+    result = MagicMock()
+    result.first.side_effect = [(1,), (2,)]
+    result.collect.return_value = [(2, 1, "append"), (1, None, "append")]
+    mock_connector.query.return_value = result
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    assert iceberg_manager.delete_where("test_db", "test_table", "id = 1").mode == "noop"
+
+
+def test_delete_where_without_new_snapshot_is_noop(mock_connector):
+    """Test a delete that commits nothing is reported as a no-op."""
+    mock_connector.query.return_value.first.return_value = (1,)
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    assert iceberg_manager.delete_where("test_db", "test_table", "id = 1").mode == "noop"
+
+
+def test_delete_report_from_copy_on_write_summary():
+    """Test rewritten files are told apart from removed files."""
+    report = DeleteReport.from_snapshot_summaries(
+        [{"deleted-data-files": "2", "added-data-files": "1", "deleted-records": "20", "added-records": "15"}], files_scanned=4
+    )
+
+    assert (report.mode, report.files_removed, report.files_rewritten, report.rows_deleted) == ("copy-on-write", 1, 1, 5)
+
+
+def test_parse_summary_from_map_string():
+    assert parse_summary("{added-data-files=1, deleted-records=3}") == {"added-data-files": "1", "deleted-records": "3"}
+
+
+def test_create_table_with_sort_order(mock_connector):
+    """Test a sort order is declared right after the table is created."""
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.create_table("test_db", "test_table", {"customer_id": "bigint"}, "s3://bucket/path", sort_order=["customer_id"])
+
+    assert (
+        mock_connector.query.call_args_list[-1].args[0]
+        == "ALTER TABLE `test_catalog`.`test_db`.`test_table` WRITE ORDERED BY `customer_id`"
+    )
+
+
+def test_compact_table_reports_skipping_before_and_after(mock_connector):
+    """Test a Z-order compaction reports the file skipping effectiveness of its columns."""
+    unclustered = [("f1", 0, 99, 0, 9), ("f2", 1, 98, 0, 9)]
+    clustered = [("f3", 0, 49, 0, 4), ("f4", 50, 99, 5, 9)]
+    mock_connector.query.return_value.collect.side_effect = [unclustered, clustered]
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    report = iceberg_manager.compact_table("test_db", "test_table", "zorder", ["customer_id", "store_id"])
+
+    assert "sort_order => 'zorder(customer_id, store_id)'" in mock_connector.query.call_args_list[1].args[0]
+    assert report.before.files_read_fraction == {"customer_id": 1.0, "store_id": 1.0}
+    assert report.after.files_read_fraction == {"customer_id": 0.5, "store_id": 0.5}
+
+
+def test_configure_metrics_sets_table_properties(mock_connector):
+    """Test metrics modes and bloom filters are set as table properties."""
+    iceberg_manager = IcebergManager(connector=mock_connector)
+    metrics = ColumnMetricsConfigModel(
+        default_mode="truncate(16)", column_modes={"customer_id": "full"}, bloom_filter_columns=["customer_id"]
+    )
+
+    iceberg_manager.configure_metrics("test_db", "test_table", metrics)
+
+    mock_connector.query.assert_called_once_with(
+        "ALTER TABLE `test_catalog`.`test_db`.`test_table` SET TBLPROPERTIES ("
+        "'write.metadata.metrics.column.customer_id' = 'full', 'write.metadata.metrics.default' = 'truncate(16)', "
+        "'write.parquet.bloom-filter-enabled.column.customer_id' = 'true')"
+    )
+
+
+def test_invalid_metrics_mode():
+    """Test unknown metrics modes are rejected."""
+    with pytest.raises(ValueError, match="Invalid metrics mode: truncate"):
+        ColumnMetricsConfigModel(column_modes={"id": "truncate"})
+
+
+def test_metrics_width_report(mock_connector):
+    """Test the metrics width report averages the statistics over the data files."""
+    mock_connector.query.return_value.first.side_effect = [(4, 40, 20, 640), (2, 16384)]
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    report = iceberg_manager.metrics_width_report("test_db", "test_table")
+
+    assert (report.files, report.manifests, report.manifest_bytes) == (4, 2, 16384)
+    assert (report.value_count_columns, report.bounds_columns, report.bounds_bytes) == (10, 5, 640)
+
+
+def test_get_table_metadata_is_cached_until_the_metadata_location_changes(mock_connector):
+    """Test DESCRIBE and SHOW TBLPROPERTIES run again only after the metadata location changed."""
+    locations = iter(["s3://lake/t/v1.metadata.json", "s3://lake/t/v1.metadata.json", "s3://lake/t/v2.metadata.json"])
+    rows = {"DESCRIBE": [("id", "bigint", None)], "SHOW": [("owner", "sales")]}
+
+    def query(query):
+        statement = query.split()[0]
+        if statement == "SELECT":
+            return MagicMock(first=MagicMock(return_value=(next(locations),)))
+        return MagicMock(collect=MagicMock(return_value=rows[statement]))
+
+    mock_connector.query.side_effect = query
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    first = iceberg_manager.get_table_metadata("test_db", "test_table")
+    second = iceberg_manager.get_table_metadata("test_db", "test_table")
+    third = iceberg_manager.get_table_metadata("test_db", "test_table")
+
+    assert second is first
+    assert third.metadata_location == "s3://lake/t/v2.metadata.json"
+    assert (first.columns, first.properties) == ([{"name": "id", "type": "bigint"}], {"owner": "sales"})
+    assert [call.args[0].split()[0] for call in mock_connector.query.call_args_list] == [
+        "SELECT",
+        "DESCRIBE",
+        "SHOW",
+        "SELECT",
+        "SELECT",
+        "DESCRIBE",
+        "SHOW",
+    ]
+
+
+def test_get_table_ddl_is_cached_until_the_metadata_location_changes(mock_connector):
+    """Test SHOW CREATE TABLE runs only when no DDL of the current metadata file is cached."""
+    mock_connector.query.return_value.first.side_effect = [("v1",), ("v1",), ("v2",)]
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    for _ in range(3):
+        iceberg_manager.get_table_ddl("test_db", "test_table")
+
+    queries = [call.kwargs.get("query", call.args[0] if call.args else None) for call in mock_connector.query.call_args_list]
+    assert queries.count("SHOW CREATE TABLE `test_catalog`.`test_db`.`test_table`") == 2
+    assert iceberg_manager.metadata_cache.hits == 1
+
+
+def test_get_table_metadata_through_pyiceberg_connector(tmp_path):
+    """Test the PyIceberg connector describes the columns, partition spec and properties of the loaded table."""
+    connector = PyIcebergConnector(
+        {
+            "catalog_name": "test_catalog",
+            "uri": f"sqlite:///{tmp_path}/catalog.db",
+            "warehouse": f"file://{tmp_path}",
+            "properties": {"type": "sql"},
+        }
+    )
+    catalog = connector.connect()
+    catalog.create_namespace("test_db")
+    schema = pa.schema([pa.field("id", pa.int64()), pa.field("region", pa.string())])
+    table = catalog.create_table("test_db.orders", schema=schema, properties={"owner": "sales"})
+    with table.update_spec() as update:
+        update.add_identity("region")
+    iceberg_manager = IcebergManager(connector=connector)
+
+    metadata = iceberg_manager.get_table_metadata("test_db", "orders")
+
+    assert metadata.columns == [{"name": "id", "type": "long"}, {"name": "region", "type": "string"}]
+    assert (metadata.partition_spec, metadata.properties["owner"]) == (["region"], "sales")
+    assert metadata.metadata_location == connector.load_table("test_db", "orders").metadata_location
+    assert iceberg_manager.get_table_metadata("test_db", "orders") is metadata
+
+
+def test_advise_write_modes_applies_recommended_properties(mock_connector):
+    """Test the advice is computed from the snapshots metadata table and applied when it differs."""
+    merge = {
+        "added-data-files": "5",
+        "deleted-data-files": "5",
+        "total-data-files": "10",
+        "added-files-size": "50",
+        "removed-files-size": "50",
+        "total-files-size": "100",
+    }
+    history = [(datetime.now(timezone.utc), "overwrite", merge)]
+
+    def query(query=None, **kwargs):
+        query = query or kwargs["query"]
+        if "committed_at" in query:
+            return MagicMock(collect=MagicMock(return_value=history))
+        return MagicMock(first=MagicMock(return_value=("s3://lake/t/v1.metadata.json",)), collect=MagicMock(return_value=[]))
+
+    mock_connector.query.side_effect = query
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    advice = iceberg_manager.advise_write_modes("test_db", "test_table", apply=True)
+
+    assert (advice.row_level_commits, advice.mean_rewrite_fraction, advice.applied) == (1, 0.5, True)
+    mock_connector.query.assert_called_with(
+        "ALTER TABLE `test_catalog`.`test_db`.`test_table` SET TBLPROPERTIES ("
+        "'write.delete.mode' = 'merge-on-read', 'write.merge.mode' = 'merge-on-read', 'write.update.mode' = 'merge-on-read')"
+    )
+
+
+def test_operations_run_in_described_job_groups(mock_connector):
+    """Test every operation runs as a connector operation described by its method and table."""
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.drop_table("test_db", table_name="orders")
+    iceberg_manager.list_databases()
+
+    mock_connector.operation.assert_any_call("drop_table", "drop_table test_db.orders")
+    mock_connector.operation.assert_called_with("list_databases", "list_databases")
+
+
+def test_cancel_operation_is_not_supported_on_pyiceberg(tmp_path):
+    """Test the PyIceberg connector, which runs no Spark jobs, cannot cancel operations."""
+    connector = PyIcebergConnector(
+        PyIcebergConfigModel(
+            catalog_name="test_catalog",
+            warehouse=f"file://{tmp_path}/warehouse",
+            uri=f"sqlite:///{tmp_path}/catalog.db",
+            properties={"type": "sql"},
+        ).model_dump(mode="json")
+    )
+    iceberg_manager = IcebergManager(connector=connector)
+
+    with pytest.raises(UnsupportedOperationError):
+        iceberg_manager.cancel_operation("keepice-list_tables-1")
+
+
+def test_create_table_with_parquet_settings(mock_connector):
+    """Test create_table renders the Parquet writer settings as table properties."""
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    iceberg_manager.create_table(
+        "test_db", "test_table", {"id": "INT"}, "s3://path/to/data", parquet=ParquetWriterConfigModel(codec="zstd", compression_level=3)
+    )
+
+    query = mock_connector.query.call_args[0][0]
+    assert "TBLPROPERTIES ('write.parquet.compression-codec' = 'zstd', 'write.parquet.compression-level' = '3')" in query
+
+
+def test_parquet_writes_set_the_spark_compression_per_write(mock_connector):
+    """Test Spark writes take the codec and level from the session, and reject the other settings."""
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    with iceberg_manager.parquet_writes(ParquetWriterConfigModel(codec="zstd", compression_level=9)):
+        iceberg_manager.insert_incremental_table_data("src_db.src_table", "test_db", "test_table")
+
+    mock_connector.tuned.assert_called_once_with(
+        {"spark.sql.iceberg.compression-codec": "zstd", "spark.sql.iceberg.compression-level": "9"}
+    )
+    with pytest.raises(UnsupportedOperationError, match="page_size_bytes"):
+        with iceberg_manager.parquet_writes(ParquetWriterConfigModel(page_size_bytes=8192)):
+            pass
+
+
+def test_parquet_writes_and_benchmark_through_pyiceberg_connector(tmp_path):
+    """Test PyIceberg writes apply per-write settings without changing the table, and a sample is benchmarked."""
+    connector = PyIcebergConnector(
+        {
+            "catalog_name": "test_catalog",
+            "uri": f"sqlite:///{tmp_path}/catalog.db",
+            "warehouse": f"file://{tmp_path}",
+            "properties": {"type": "sql"},
+        }
+    )
+    catalog = connector.connect()
+    catalog.create_namespace("test_db")
+    schema = pa.schema([pa.field("id", pa.int64()), pa.field("region", pa.string())])
+    catalog.create_table("test_db.orders", schema=schema)
+    iceberg_manager = IcebergManager(connector=connector)
+    data = pa.table({"id": [1, 2, 3], "region": ["eu", "us", "eu"]}, schema=schema)
+
+    with iceberg_manager.parquet_writes(ParquetWriterConfigModel(codec="snappy", row_group_rows=2)):
+        iceberg_manager.insert_incremental_table_data(data, "test_db", "orders")
+    results = iceberg_manager.benchmark_parquet(
+        "test_db", "orders", {"default": ParquetWriterConfigModel(), "gzip": ParquetWriterConfigModel(codec="gzip")}, sample_rows=2
+    )
+
+    table = connector.load_table("test_db", "orders")
+    [task] = table.scan().plan_files()
+    metadata = pq.ParquetFile(task.file.file_path.removeprefix("file://")).metadata
+    assert (metadata.num_row_groups, metadata.row_group(0).column(0).compression) == (2, "SNAPPY")
+    assert "write.parquet.compression-codec" not in table.properties
+    assert [(result.name, result.rows) for result in results] == [("default", 2), ("gzip", 2)]
+
+
+def test_benchmark_parquet_samples_spark_3_dataframes(mock_connector):
+    """Test a sample DataFrame without toArrow, as on Spark 3, is converted through its rows."""
+    sample = MagicMock(spec=["collect"])
+    sample.collect.return_value = [Row(id=1, region="eu"), Row(id=2, region="us")]
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    with patch.object(IcebergManager, "read_table", return_value=sample) as read_table:
+        [result] = iceberg_manager.benchmark_parquet("test_db", "orders", {"default": ParquetWriterConfigModel()}, sample_rows=2)
+
+    read_table.assert_called_once_with("test_db", "orders", predicate=None, limit=2)
+    assert (result.name, result.rows) == ("default", 2)
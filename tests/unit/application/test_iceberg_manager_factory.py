@@ -118,3 +118,59 @@ def test_initialization_invalid_config(mock_yaml_load, mock_path_open, mock_find
         # Test that IcebergManagerFactory raises a ValueError due to invalid config
         with pytest.raises(ValueError):
             IcebergManagerFactory()
+
+
+@pytest.fixture
+def instances_config():
+    """Fixture to provide a configuration with named connector instances."""
+    return {
+        "connectors": {
+            "instances": {
+                "lakehouse": {
+                    "type": "spark_iceberg",
+                    "app_name": "test_app",
+                    "master": "local[*]",
+                    "config": {},
+                    "catalog_name": "raw",
+                    "catalogs": {"raw": {"type": "hadoop"}, "curated": {"type": "hadoop"}},
+                },
+                "reporting": {
+                    "type": "athena",
+                    "region_name": "us-west-2",
+                    "s3_staging_dir": "s3://results/",
+                    "workgroup": "primary",
+                    "catalog_name": "sandbox",
+                },
+            }
+        }
+    }
+
+
+@patch("keepice_lakehouse.connectors.spark_connector.SparkSession")
+@patch("keepice_lakehouse.application.iceberg_manager_factory.find_config_folder")
+@patch("yaml.safe_load")
+def test_route_shares_one_session_per_instance(mock_yaml_load, mock_find_config_folder, mock_spark_session, instances_config, tmp_path):
+    """Test identifiers of several catalogs of one Spark instance are routed to a single shared session."""
+    (tmp_path / "connectors_config.yaml").touch()
+    mock_find_config_folder.return_value = tmp_path
+    mock_yaml_load.return_value = instances_config
+    factory = IcebergManagerFactory()
+
+    raw_manager, database_name, table_name = factory.route("raw.sales.orders")
+    curated_manager, _, _ = factory.route("curated.sales.orders")
+
+    assert (database_name, table_name) == ("sales", "orders")
+    assert raw_manager.catalog_name == "raw"
+    assert curated_manager.catalog_name == "curated"
+    assert raw_manager.connector is curated_manager.connector
+    mock_spark_session.builder.config.return_value.getOrCreate.assert_called_once()
+    with pytest.raises(ValueError, match="No connector instance serves catalog unknown"):
+        factory.route("unknown.sales.orders")
+    with pytest.raises(ValueError, match="has no catalog"):
+        factory.route("sales.orders")
+
+    factory.close()
+    factory.route("raw.sales.orders")
+
+    mock_spark_session.builder.config.return_value.getOrCreate.return_value.stop.assert_called_once_with()
+    assert mock_spark_session.builder.config.return_value.getOrCreate.call_count == 2
@@ -0,0 +1,174 @@
+import json
+import threading
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from keepice_lakehouse.application.iceberg_manager import IcebergManager
+from keepice_lakehouse.application.job_runner import JobRunner
+from keepice_lakehouse.cli import main
+from keepice_lakehouse.models.models import ColumnMetricsConfigModel
+from keepice_lakehouse.models.models import JobManifestModel
+from keepice_lakehouse.models.models import SkippingReport
+
+
+def _manager():
+    """Returns a mocked manager whose untuned copy is itself."""
+    manager = MagicMock(spec=IcebergManager)
+    manager.untuned.return_value = manager
+    return manager
+
+
+@pytest.fixture
+def mock_factory():
+    """Fixture to provide a mocked IcebergManagerFactory returning one mocked manager per connector."""
+    factory = MagicMock()
+    factory.get_manager.side_effect = lambda connector_name: _manager()
+    factory.is_shared.return_value = False
+    return factory
+
+
+def test_run_reuses_one_manager_per_connector_and_runs_independent_steps_concurrently(mock_factory):
+    """Test independent steps overlap, share the manager of their connector and have their arguments validated."""
+    barrier = threading.Barrier(2, timeout=5)
+    manager = _manager()
+    manager.insert_bulk_table_data.side_effect = lambda **kwargs: barrier.wait()
+    manager.skipping_report.return_value = SkippingReport(files=2, files_read_fraction={"id": 0.5})
+    mock_factory.get_manager.side_effect = None
+    mock_factory.get_manager.return_value = manager
+    manifest = JobManifestModel(
+        connector="spark_iceberg",
+        steps=[
+            {"name": "load_a", "action": "insert_bulk", "params": {"source_table": "s.a", "database_name": "db", "table_name": "a"}},
+            {"name": "load_b", "action": "insert_bulk", "params": {"source_table": "s.b", "database_name": "db", "table_name": "b"}},
+            {
+                "name": "metrics",
+                "action": "configure_metrics",
+                "depends_on": ["load_a"],
+                "params": {"database_name": "db", "table_name": "a", "metrics": {"default_mode": "counts"}},
+            },
+            {
+                "name": "report",
+                "action": "skipping_report",
+                "depends_on": ["metrics", "load_b"],
+                "params": {"database_name": "db", "table_name": "a", "columns": ["id"]},
+            },
+        ],
+    )
+
+    results = JobRunner(mock_factory).run(manifest)
+
+    assert [result.status for result in results] == ["succeeded"] * 4
+    assert results[3].result == {"files": 2, "files_read_fraction": {"id": 0.5}}
+    assert all(result.seconds >= 0 for result in results)
+    mock_factory.get_manager.assert_called_once_with("spark_iceberg")
+    manager.configure_metrics.assert_called_once_with(
+        database_name="db", table_name="a", metrics=ColumnMetricsConfigModel(default_mode="counts")
+    )
+    manager.close.assert_called_once_with()
+
+
+def test_run_leaves_the_shared_managers_of_named_instances_open(mock_factory):
+    """Test the managers shared by the factory are not closed by the runner."""
+    mock_factory.is_shared.side_effect = lambda connector_name: connector_name == "lakehouse"
+    managers = {}
+    mock_factory.get_manager.side_effect = lambda connector_name: managers.setdefault(connector_name, _manager())
+    manifest = JobManifestModel(
+        connector="lakehouse",
+        steps=[
+            {"name": "tables", "action": "list_tables", "params": {"database_name": "db"}},
+            {"name": "other", "action": "list_tables", "connector": "pyiceberg", "params": {"database_name": "db"}},
+        ],
+    )
+
+    JobRunner(mock_factory).run(manifest)
+
+    managers["lakehouse"].close.assert_not_called()
+    managers["pyiceberg"].close.assert_called_once_with()
+
+
+def test_run_disables_adaptive_tuning_only_for_concurrent_steps(mock_factory):
+    """Test steps run on untuned managers when several workers share the session, and the originals are closed."""
+    manager = MagicMock(spec=IcebergManager)
+    mock_factory.get_manager.side_effect = None
+    mock_factory.get_manager.return_value = manager
+    steps = [{"name": "list", "action": "list_tables", "params": {"database_name": "db"}}]
+
+    JobRunner(mock_factory).run(JobManifestModel(connector="spark_iceberg", steps=steps, max_workers=2))
+    JobRunner(mock_factory).run(JobManifestModel(connector="spark_iceberg", steps=steps, max_workers=1))
+
+    manager.untuned.assert_called_once_with()
+    manager.untuned.return_value.list_tables.assert_called_once_with(database_name="db")
+    manager.list_tables.assert_called_once_with(database_name="db")
+    assert manager.close.call_count == 2
+
+
+def test_run_skips_the_dependents_of_a_failed_step(mock_factory):
+    """Test a failure skips the steps depending on it while the other steps still run."""
+    calls = []
+    mock_factory.get_manager.side_effect = None
+    mock_factory.get_manager.return_value = _manager()
+    mock_factory.get_manager.return_value.drop_table.side_effect = Exception("boom")
+    mock_factory.get_manager.return_value.create_database.side_effect = lambda **kwargs: calls.append(kwargs)
+    manifest = JobManifestModel(
+        connector="athena",
+        steps=[
+            {"name": "drop", "action": "drop_table", "params": {"database_name": "db", "table_name": "t"}},
+            {"name": "after_drop", "action": "list_tables", "depends_on": ["drop"], "params": {"database_name": "db"}},
+            {"name": "transitive", "action": "list_tables", "depends_on": ["after_drop"], "params": {"database_name": "db"}},
+            {"name": "create", "action": "create_database", "params": {"database_name": "other"}},
+        ],
+    )
+
+    drop, after_drop, transitive, create = JobRunner(mock_factory).run(manifest)
+
+    assert (drop.status, drop.error) == ("failed", "Exception: boom")
+    assert (after_drop.status, transitive.status, create.status) == ("skipped", "skipped", "succeeded")
+    assert calls == [{"database_name": "other"}]
+
+
+@pytest.mark.parametrize(
+    ("steps", "message"),
+    [
+        ([{"name": "a", "action": "list_tables"}, {"name": "a", "action": "list_tables"}], "Duplicate step name"),
+        ([{"name": "a", "action": "list_tables", "depends_on": ["b"]}], "unknown steps: b"),
+        (
+            [{"name": "a", "action": "list_tables", "depends_on": ["b"]}, {"name": "b", "action": "list_tables", "depends_on": ["a"]}],
+            "Circular dependencies",
+        ),
+    ],
+)
+def test_validate_rejects_unschedulable_manifests(steps, message):
+    """Test duplicate names, unknown dependencies and cycles are rejected before anything runs."""
+    with pytest.raises(ValueError, match=message):
+        JobRunner.validate(JobManifestModel(connector="pyiceberg", steps=steps))
+
+
+@patch("keepice_lakehouse.cli.IcebergManagerFactory")
+def test_main_runs_a_yaml_manifest_and_prints_step_timings(mock_factory_class, mock_factory, tmp_path, capsys):
+    """Test the CLI prints one JSON line per step and exits non-zero when a step fails."""
+    mock_factory_class.return_value = mock_factory
+    manifest = tmp_path / "jobs.yaml"
+    manifest.write_text(
+        "connector: pyiceberg\n"
+        "steps:\n"
+        "  - {name: tables, action: list_tables, params: {database_name: db}}\n"
+        "  - {name: bad, action: expire_snapshots, params: {database_name: db}}\n"
+    )
+
+    exit_code = main(["run", str(manifest), "--max-workers", "2"])
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert exit_code == 1
+    assert {line["name"]: line["status"] for line in lines} == {"tables": "succeeded", "bad": "failed"}
+    assert all(isinstance(line["seconds"], float) for line in lines)
+
+
+def test_main_rejects_an_invalid_manifest(tmp_path, capsys):
+    """Test an invalid manifest is reported without creating any manager."""
+    manifest = tmp_path / "jobs.json"
+    manifest.write_text(json.dumps({"connector": "pyiceberg", "steps": [{"name": "a", "action": "vacuum"}]}))
+
+    assert main(["run", str(manifest)]) == 2
+    assert "Invalid job manifest" in capsys.readouterr().err
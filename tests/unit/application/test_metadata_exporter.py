@@ -0,0 +1,124 @@
+import json
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import MagicMock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from keepice_lakehouse.application.iceberg_manager import IcebergManager
+from keepice_lakehouse.connectors.athena_connector import AthenaConnector
+from keepice_lakehouse.connectors.pyiceberg_connector import PyIcebergConnector
+from keepice_lakehouse.connectors.spark_connector import SparkConnector
+from keepice_lakehouse.exceptions.exceptions import UnsupportedOperationError
+from keepice_lakehouse.models.models import PyIcebergConfigModel
+from keepice_lakehouse.utils.enums import SqlDialect
+
+SCHEMA = pa.schema([pa.field("id", pa.int64()), pa.field("name", pa.string())])
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Fixture to provide an IcebergManager over a local SQL catalog with two tables."""
+    config = PyIcebergConfigModel(
+        catalog_name="test_catalog",
+        warehouse=f"file://{tmp_path}/warehouse",
+        uri=f"sqlite:///{tmp_path}/catalog.db",
+        properties={"type": "sql"},
+    )
+    connector = PyIcebergConnector(config.model_dump(mode="json"))
+    catalog = connector.connect()
+    catalog.create_namespace("test_db")
+    catalog.create_table("test_db.orders", schema=SCHEMA, properties={"owner": "sales"})
+    catalog.create_table("test_db.customers", schema=SCHEMA)
+    return IcebergManager(connector)
+
+
+def test_export_catalog_metadata_refreshes_only_changed_tables(manager, tmp_path):
+    """Test a second export summarises again only the tables whose metadata location changed."""
+    path = str(tmp_path / "export" / "catalog.parquet")
+    manager.connector.append("test_db", "orders", pa.table({"id": [1, 2], "name": ["a", "b"]}, schema=SCHEMA))
+
+    first = manager.export_catalog_metadata(path)
+    manager.connector.append("test_db", "customers", pa.table({"id": [3], "name": ["c"]}, schema=SCHEMA))
+    manager.connection.drop_table("test_db.orders")
+    second = manager.export_catalog_metadata(path)
+
+    assert (first.tables, first.refreshed, first.unchanged, first.errors) == (2, 2, 0, {})
+    assert (second.tables, second.refreshed, second.unchanged, second.removed) == (1, 1, 0, 1)
+    [customers] = pq.read_table(path).to_pylist()
+    assert (customers["table_name"], customers["data_files"], customers["total_records"], customers["snapshot_count"]) == (
+        "customers",
+        1,
+        1,
+        1,
+    )
+    assert customers["partition_count"] == 1
+    assert json.loads(customers["schema"]) == [{"name": "id", "type": "long"}, {"name": "name", "type": "string"}]
+    assert customers["metadata_location"] == manager.connector.load_table("test_db", "customers").metadata_location
+
+
+def test_export_catalog_metadata_keeps_unchanged_rows(manager, tmp_path):
+    """Test unchanged tables keep the rows of the previous export, including their properties."""
+    path = str(tmp_path / "catalog.parquet")
+    manager.export_catalog_metadata(path)
+    manager.connector.append("test_db", "orders", pa.table({"id": [1], "name": ["a"]}, schema=SCHEMA))
+
+    report = manager.export_catalog_metadata(path, databases=["test_db"])
+
+    rows = {row["table_name"]: row for row in pq.read_table(path).to_pylist()}
+    assert (report.refreshed, report.unchanged) == (1, 1)
+    assert ("owner", "sales") in rows["orders"]["properties"]
+    assert (rows["orders"]["total_records"], rows["customers"]["current_snapshot_id"]) == (1, None)
+
+
+def test_export_catalog_metadata_summarises_spark_tables(tmp_path):
+    """Test the Spark path reads the metadata tables and records per-table errors."""
+    connector = MagicMock(spec=SparkConnector)
+    connector.catalog_name = "lake"
+    connector.dialect = SqlDialect.SPARK
+    connector.query.side_effect = lambda query: MagicMock(collect=MagicMock(return_value=_spark_rows(query)))
+    iceberg_manager = IcebergManager(connector=connector)
+    path = str(tmp_path / "catalog.parquet")
+
+    report = iceberg_manager.export_catalog_metadata(path)
+
+    rows = {row["table_name"]: row for row in pq.read_table(path).to_pylist()}
+    assert report.errors == {"db.broken": "no metadata"}
+    orders = rows["orders"]
+    assert (orders["format_version"], orders["snapshot_count"], orders["data_files"], orders["total_bytes"]) == (2, 3, 4, 4096)
+    assert (orders["partition_count"], orders["metadata_location"]) == (7, "s3://lake/orders/v3.metadata.json")
+    assert json.loads(orders["schema"]) == [{"name": "id", "type": "bigint"}]
+
+
+def test_export_catalog_metadata_is_not_supported_on_athena():
+    """Test Athena, which does not expose metadata locations, is rejected."""
+    connector = MagicMock(spec=AthenaConnector)
+    connector.catalog_name = "awsdatacatalog"
+    iceberg_manager = IcebergManager(connector=connector)
+
+    with pytest.raises(UnsupportedOperationError):
+        iceberg_manager.export_catalog_metadata("catalog.parquet")
+
+
+def _spark_rows(query):
+    if query == "SHOW DATABASES IN `lake`":
+        return [("db",)]
+    if query == "SHOW TABLES IN `lake`.`db`":
+        return [("db", "orders", False), ("db", "broken", False)]
+    if "`broken`" in query:
+        raise Exception("no metadata")
+    if "metadata_log_entries" in query:
+        return [("s3://lake/orders/v3.metadata.json",)]
+    if "max(committed_at)" in query:
+        return [(3, datetime(2024, 4, 1, 12, tzinfo=timezone.utc))]
+    if "s.summary" in query:
+        return [(42, {"total-data-files": "4", "total-files-size": "4096", "total-records": "10"})]
+    if "`partitions`" in query:
+        return [(7,)]
+    if query.startswith("SHOW TBLPROPERTIES"):
+        return [("format-version", "2"), ("owner", "sales")]
+    if query.startswith("DESCRIBE"):
+        return [("id", "bigint", None), ("", "", ""), ("# Partitioning", "", "")]
+    raise AssertionError(query)
@@ -0,0 +1,114 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from unittest.mock import MagicMock
+
+import pyarrow as pa
+import pytest
+
+from keepice_lakehouse.application.iceberg_manager import IcebergManager
+from keepice_lakehouse.application.retention_manager import RetentionManager
+from keepice_lakehouse.connectors.pyiceberg_connector import PyIcebergConnector
+from keepice_lakehouse.connectors.spark_connector import SparkConnector
+from keepice_lakehouse.models.models import DeleteReport
+from keepice_lakehouse.models.models import PyIcebergConfigModel
+from keepice_lakehouse.models.models import RetentionPolicyModel
+
+NOW = datetime(2024, 4, 10, 15, 30, tzinfo=timezone.utc)
+SCHEMA = pa.schema([pa.field("id", pa.int64()), pa.field("event_ts", pa.timestamp("us"))])
+
+
+@pytest.fixture
+def mock_connector():
+    """Fixture to provide a mocked BaseConnector."""
+    connector = MagicMock(spec=SparkConnector)
+    connector.catalog_name = "test_catalog"
+    return connector
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Fixture to provide an IcebergManager over a local SQL catalog with an events table."""
+    config = PyIcebergConfigModel(
+        catalog_name="test_catalog",
+        warehouse=f"file://{tmp_path}/warehouse",
+        uri=f"sqlite:///{tmp_path}/catalog.db",
+        properties={"type": "sql"},
+    )
+    connector = PyIcebergConnector(config.model_dump(mode="json"))
+    catalog = connector.connect()
+    catalog.create_namespace("test_db")
+    catalog.create_table("test_db.events", schema=SCHEMA)
+    return IcebergManager(connector)
+
+
+def test_cutoff_is_aligned_to_day_start():
+    """Test the cutoff is the UTC start of the day retention_days before now."""
+    policy = RetentionPolicyModel(database_name="db", table_name="t", partition_column="event_ts", retention_days=90)
+
+    assert RetentionManager.cutoff(policy, NOW) == datetime(2024, 1, 11, tzinfo=timezone.utc)
+
+
+def test_apply_retention_drops_expired_partitions_from_metadata(manager):
+    """Test expired daily files are dropped without being rewritten and the old snapshots are expired."""
+    for age in (9, 5, 1):
+        event_ts = datetime.now(timezone.utc) - timedelta(days=age)
+        manager.connector.append("test_db", "events", pa.table({"id": [age], "event_ts": [event_ts]}, schema=SCHEMA))
+    policy = RetentionPolicyModel(database_name="test_db", table_name="events", partition_column="event_ts", retention_days=3)
+
+    [report] = manager.apply_retention([policy], now=datetime.now(timezone.utc))
+
+    table = manager.connector.load_table("test_db", "events")
+    assert report.error is None
+    assert (report.delete.mode, report.delete.files_removed, report.delete.files_rewritten, report.delete.rows_deleted) == (
+        "metadata",
+        2,
+        0,
+        2,
+    )
+    assert report.snapshots_expired == 3
+    assert len(table.metadata.snapshots) == 1
+    assert table.scan().to_arrow()["id"].to_pylist() == [1]
+
+
+def test_apply_retention_reports_errors_per_table(mock_connector):
+    """Test a failing table is reported without stopping the other tables of the batch."""
+    mock_connector.query.side_effect = lambda *args, **kwargs: _query(*args)
+    iceberg_manager = IcebergManager(connector=mock_connector)
+    policies = [
+        RetentionPolicyModel(database_name="db", table_name="missing", partition_column="event_date", retention_days=7, column_type="date"),
+        RetentionPolicyModel(database_name="db", table_name="events", partition_column="event_ts", retention_days=7),
+    ]
+
+    missing, events = iceberg_manager.apply_retention(policies, now=NOW)
+
+    assert "missing table" in missing.error
+    assert events.error is None
+    assert events.delete.mode == "noop"
+    assert events.snapshots_expired is None
+
+
+def test_apply_retention_runs_tables_in_the_batch_operation(mock_connector):
+    """Test worker threads join the operation of the batch and expire snapshots relative to the same instant."""
+    mock_connector.operation.return_value.__enter__.return_value = "keepice-apply_retention-1"
+    iceberg_manager = IcebergManager(connector=mock_connector)
+    iceberg_manager.delete_where = MagicMock(return_value=DeleteReport(mode="metadata"))
+    iceberg_manager.expire_snapshots = MagicMock(return_value=None)
+    policies = [
+        RetentionPolicyModel(database_name="db", table_name=name, partition_column="event_ts", retention_days=7, snapshot_max_age_days=1)
+        for name in ("events", "clicks")
+    ]
+
+    iceberg_manager.apply_retention(policies, now=NOW)
+
+    assert [call.kwargs for call in mock_connector.operation.call_args_list].count({"parent_id": "keepice-apply_retention-1"}) == 2
+    iceberg_manager.expire_snapshots.assert_any_call("db", "events", datetime(2024, 4, 9, 15, 30, tzinfo=timezone.utc))
+    iceberg_manager.expire_snapshots.assert_any_call("db", "clicks", datetime(2024, 4, 9, 15, 30, tzinfo=timezone.utc))
+
+
+def _query(query):
+    if "`missing`" in query:
+        raise Exception("missing table")
+    result = MagicMock()
+    result.first.return_value = (1,)
+    return result
@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock
+
+import pyarrow as pa
+import pytest
+
+from keepice_lakehouse.application.iceberg_manager import IcebergManager
+from keepice_lakehouse.application.stream_ingestion import StreamIngestion
+from keepice_lakehouse.connectors.spark_connector import SparkConnector
+from keepice_lakehouse.exceptions.exceptions import CompactionError
+from keepice_lakehouse.exceptions.exceptions import UnsupportedOperationError
+from keepice_lakehouse.models.models import StreamingConfigModel
+
+
+@pytest.fixture
+def mock_connector():
+    """Fixture to provide a mocked BaseConnector."""
+    connector = MagicMock(spec=SparkConnector)
+    connector.catalog_name = "test_catalog"
+    return connector
+
+
+def test_append_skips_micro_batches_already_committed(mock_connector):
+    """Test a replayed micro-batch is skipped and new ones are committed with the stream and batch IDs."""
+    mock_connector.query.return_value.first.return_value = (3,)
+    manager = IcebergManager(connector=mock_connector)
+    ingestion = StreamIngestion(manager, "test_db", "events", StreamingConfigModel(checkpoint_location="s3://checkpoints/events"))
+    replayed = MagicMock()
+    batch = MagicMock()
+
+    ingestion.process_batch(replayed, 3)
+    ingestion.process_batch(batch, 4)
+
+    replayed.writeTo.assert_not_called()
+    batch.writeTo.assert_called_once_with("`test_catalog`.`test_db`.`events`")
+    writer = batch.writeTo.return_value
+    writer.option.assert_called_once_with("snapshot-property.keepice.stream-id", "s3://checkpoints/events")
+    writer.option.return_value.option.assert_called_once_with("snapshot-property.keepice.batch-id", "4")
+    writer.option.return_value.option.return_value.append.assert_called_once_with()
+    assert "summary['keepice.stream-id'] = 's3://checkpoints/events'" in mock_connector.query.call_args.args[0]
+    assert mock_connector.query.call_count == 1
+
+
+def test_merge_uses_the_micro_batch_session_and_compacts_periodically(mock_connector):
+    """Test micro-batches are merged through their own session and the table is compacted every two batches."""
+    manager = IcebergManager(connector=mock_connector)
+    manager.compact_table = MagicMock(side_effect=[None, CompactionError("conflict")])
+    config = StreamingConfigModel(
+        checkpoint_location="s3://checkpoints/orders", compact_every=2, compaction_strategy="sort", compaction_columns=["id"]
+    )
+    ingestion = StreamIngestion(manager, "test_db", "orders", config, primary_key="id", order_col="updated_at")
+    batch = MagicMock()
+
+    for batch_id in range(3):
+        ingestion.process_batch(batch, batch_id)
+    with pytest.warns(UserWarning, match="Compaction of test_db.orders failed"):
+        ingestion.process_batch(batch, 3)
+
+    merge_query = batch.sparkSession.sql.call_args.args[0]
+    view_name = batch.createOrReplaceTempView.call_args.args[0]
+    assert merge_query.startswith("MERGE INTO `test_catalog`.`test_db`.`orders`")
+    assert f"`{view_name}`" in merge_query
+    assert batch.sparkSession.catalog.dropTempView.call_count == 4
+    assert manager.compact_table.call_count == 2
+    manager.compact_table.assert_called_with("test_db", "orders", "sort", ["id"])
+    mock_connector.query.assert_not_called()
+
+
+def test_stream_upsert_delta_table_data_starts_a_checkpointed_query(mock_connector):
+    """Test the streaming query is started with its checkpoint, name and trigger."""
+    stream = MagicMock()
+    manager = IcebergManager(connector=mock_connector)
+    config = StreamingConfigModel(checkpoint_location="s3://checkpoints/orders", query_name="orders_cdc", trigger_interval="30 seconds")
+
+    query = manager.stream_upsert_delta_table_data(stream, "test_db", "orders", "id", "updated_at", config)
+
+    writer = stream.writeStream.foreachBatch.return_value
+    writer.option.assert_called_once_with("checkpointLocation", "s3://checkpoints/orders")
+    writer.option.return_value.queryName.assert_called_once_with("orders_cdc")
+    writer.option.return_value.queryName.return_value.trigger.assert_called_once_with(processingTime="30 seconds")
+    assert query is writer.option.return_value.queryName.return_value.trigger.return_value.start.return_value
+
+
+def test_stream_incremental_table_data_rejects_batch_sources(mock_connector):
+    """Test a source that is not a streaming DataFrame is rejected."""
+    manager = IcebergManager(connector=mock_connector)
+
+    with pytest.raises(UnsupportedOperationError):
+        manager.stream_incremental_table_data(
+            pa.table({"id": [1]}), "test_db", "events", StreamingConfigModel(checkpoint_location="s3://checkpoints/orders")
+        )
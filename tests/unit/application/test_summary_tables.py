@@ -0,0 +1,137 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from keepice_lakehouse.application.iceberg_manager import IcebergManager
+from keepice_lakehouse.application.summary_tables import DEFINITION_PROPERTY
+from keepice_lakehouse.application.summary_tables import SOURCE_SNAPSHOT_PROPERTY
+from keepice_lakehouse.connectors.athena_connector import AthenaConnector
+from keepice_lakehouse.connectors.spark_connector import SparkConnector
+from keepice_lakehouse.exceptions.exceptions import SummaryRefreshError
+from keepice_lakehouse.exceptions.exceptions import UnsupportedOperationError
+from keepice_lakehouse.models.models import SummaryTableModel
+
+SUMMARY = SummaryTableModel(
+    source_database="sales", source_table="orders", group_by=["day"], aggregates={"revenue": "sum(amount)", "orders": "count(*)"}
+)
+
+
+@pytest.fixture
+def mock_connector():
+    """Fixture to provide a mocked BaseConnector."""
+    connector = MagicMock(spec=SparkConnector)
+    connector.catalog_name = "test_catalog"
+    return connector
+
+
+def spark_results(mock_connector, lineage, current=3, previous=1):
+    """Returns a query handler answering the metadata queries of a refresh."""
+    properties = [(DEFINITION_PROPERTY, SUMMARY.model_dump_json()), (SOURCE_SNAPSHOT_PROPERTY, str(previous))]
+
+    def query(query=None, **kwargs):
+        query = query or kwargs["query"]
+        if "metadata_log_entries" in query:
+            return MagicMock(first=MagicMock(return_value=("s3://lake/daily/v1.metadata.json",)))
+        if query.startswith("SHOW TBLPROPERTIES"):
+            return MagicMock(collect=MagicMock(return_value=properties))
+        if query.startswith("DESCRIBE"):
+            return MagicMock(collect=MagicMock(return_value=[("day", "date", None)]))
+        if "`refs`" in query:
+            return MagicMock(first=MagicMock(return_value=(current,)))
+        if "parent_id" in query:
+            return MagicMock(collect=MagicMock(return_value=lineage))
+        return mock_connector.query.return_value
+
+    return query
+
+
+def test_refresh_merges_aggregates_of_appended_snapshots(mock_connector):
+    """Test only the rows appended since the last refresh are aggregated and merged into the summary."""
+    mock_connector.query.side_effect = spark_results(mock_connector, [(3, 2, "append"), (2, 1, "replace"), (1, None, "append")])
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    report = iceberg_manager.refresh_summary_table("sales", "daily")
+
+    reader = iceberg_manager.connection.read.format.return_value
+    reader.option.assert_called_once_with("start-snapshot-id", "1")
+    reader.option.return_value.option.assert_called_once_with("end-snapshot-id", "3")
+    reader.option.return_value.option.return_value.load.assert_called_once_with("`test_catalog`.`sales`.`orders`")
+    queries = [call.args[0] for call in mock_connector.query.call_args_list if call.args]
+    merge = next(query for query in queries if query.startswith("MERGE INTO"))
+    assert "ON summary.`day` <=> partial.`day`" in merge
+    assert "summary.`revenue` = coalesce(summary.`revenue` + partial.`revenue`, summary.`revenue`, partial.`revenue`)" in merge
+    assert queries[-1] == "ALTER TABLE `test_catalog`.`sales`.`daily` SET TBLPROPERTIES ('keepice.summary.source-snapshot-id' = '3')"
+    assert (report.mode, report.previous_snapshot_id, report.source_snapshot_id, report.snapshots) == ("incremental", 1, 3, 1)
+
+
+@patch("pyspark.sql.functions.lit")
+def test_refresh_recomputes_after_deletes(mock_lit, mock_connector):
+    """Test a snapshot deleting source rows makes the refresh recompute the summary from the whole source."""
+    mock_connector.query.side_effect = spark_results(mock_connector, [(3, 2, "append"), (2, 1, "delete"), (1, None, "append")])
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    report = iceberg_manager.refresh_summary_table("sales", "daily")
+
+    queries = [call.args[0] for call in mock_connector.query.call_args_list if call.args]
+    assert (
+        "SELECT `day`, sum(amount) AS `revenue`, count(*) AS `orders` FROM `test_catalog`.`sales`.`orders` VERSION AS OF 3 GROUP BY `day`"
+        in queries
+    )
+    assert not any(query.startswith("MERGE INTO") for query in queries)
+    iceberg_manager.connection.read.format.assert_not_called()
+    aggregated = mock_connector.query.return_value
+    aggregated.writeTo.assert_called_once_with("`test_catalog`.`sales`.`daily`")
+    aggregated.writeTo.return_value.overwrite.assert_called_once_with(mock_lit.return_value)
+    assert report.mode == "full"
+
+
+def test_refresh_without_new_snapshots_is_a_noop(mock_connector):
+    """Test nothing is read or written when the source has not changed."""
+    mock_connector.query.side_effect = spark_results(mock_connector, [], current=1)
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    report = iceberg_manager.refresh_summary_table("sales", "daily")
+
+    assert report.mode == "noop"
+    assert not any(call.args and call.args[0].startswith(("MERGE", "ALTER")) for call in mock_connector.query.call_args_list)
+
+
+def test_create_summary_table_records_definition_and_snapshot(mock_connector):
+    """Test the summary is created from the current source snapshot with its definition in the table properties."""
+    mock_connector.query.return_value.first.return_value = (7,)
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    assert iceberg_manager.create_summary_table("sales", "daily", SUMMARY, "s3://lake/daily", partition_column="day") == 7
+
+    create = mock_connector.query.call_args.args[0]
+    assert create.startswith("CREATE TABLE `test_catalog`.`sales`.`daily` USING iceberg PARTITIONED BY (`day`) LOCATION 's3://lake/daily'")
+    assert "'keepice.summary.source-snapshot-id' = '7'" in create
+    assert create.endswith(
+        "AS SELECT `day`, sum(amount) AS `revenue`, count(*) AS `orders` FROM `test_catalog`.`sales`.`orders` VERSION AS OF 7 GROUP BY `day`"
+    )
+
+
+def test_refresh_rejects_other_tables(mock_connector):
+    """Test a table without a summary definition is rejected."""
+    mock_connector.query.return_value.first.return_value = ("s3://lake/orders/v1.metadata.json",)
+    mock_connector.query.return_value.collect.return_value = []
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    with pytest.raises(SummaryRefreshError, match="not a summary table"):
+        iceberg_manager.refresh_summary_table("sales", "orders")
+
+
+def test_summary_tables_are_not_supported_on_athena():
+    """Test Athena, which cannot read the rows appended by a range of snapshots, is rejected."""
+    connector = MagicMock(spec=AthenaConnector)
+    connector.catalog_name = "awsdatacatalog"
+
+    with pytest.raises(UnsupportedOperationError):
+        IcebergManager(connector=connector).refresh_summary_table("sales", "daily")
+
+
+def test_summary_aggregates_must_be_decomposable():
+    """Test aggregates that cannot be combined from partial results are rejected."""
+    with pytest.raises(ValueError, match="sum, count, min or max"):
+        SummaryTableModel(source_database="sales", source_table="orders", aggregates={"average": "avg(amount)"})
@@ -0,0 +1,95 @@
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pyarrow as pa
+import pytest
+
+from keepice_lakehouse.application.iceberg_manager import IcebergManager
+from keepice_lakehouse.connectors.pyiceberg_connector import PyIcebergConnector
+from keepice_lakehouse.connectors.spark_connector import SparkConnector
+from keepice_lakehouse.models.models import PyIcebergConfigModel
+
+SCHEMA = pa.schema([pa.field("id", pa.int64()), pa.field("region", pa.string()), pa.field("amount", pa.float64())])
+
+
+@pytest.fixture
+def mock_connector():
+    """Fixture to provide a mocked BaseConnector."""
+    connector = MagicMock(spec=SparkConnector)
+    connector.catalog_name = "test_catalog"
+    return connector
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Fixture to provide an IcebergManager over a local SQL catalog with a source and a target table."""
+    config = PyIcebergConfigModel(
+        catalog_name="test_catalog",
+        warehouse=f"file://{tmp_path}/warehouse",
+        uri=f"sqlite:///{tmp_path}/catalog.db",
+        properties={"type": "sql"},
+    )
+    connector = PyIcebergConnector(config.model_dump(mode="json"))
+    catalog = connector.connect()
+    catalog.create_namespace("test_db")
+    catalog.create_table("test_db.source", schema=SCHEMA)
+    catalog.create_table("test_db.target", schema=SCHEMA)
+    return IcebergManager(connector)
+
+
+def orders(ids, regions, amounts):
+    return pa.table({"id": ids, "region": regions, "amount": amounts}, schema=SCHEMA)
+
+
+def test_compare_identical_tables(manager):
+    """Test tables holding the same rows in another order match."""
+    manager.connector.append("test_db", "source", orders([1, 2, 3], ["eu", "eu", "us"], [1.0, 2.0, 3.0]))
+    manager.connector.append("test_db", "target", orders([3, 2, 1], ["us", "eu", "eu"], [3.0, 2.0, 1.0]))
+
+    report = manager.compare_tables(("test_db", "source"), ("test_db", "target"), ["id"])
+
+    assert report.matches
+    assert (report.source_rows, report.target_rows) == (3, 3)
+
+
+def test_compare_drills_into_mismatching_partitions(manager):
+    """Test only the mismatching partitions are compared key by key."""
+    manager.connector.append("test_db", "source", orders([1, 2, 3, 4], ["eu", "eu", "us", "us"], [1.0, 2.0, 3.0, 4.0]))
+    manager.connector.append("test_db", "target", orders([1, 2, 3, 5], ["eu", "eu", "us", "us"], [1.0, 2.0, 30.0, 5.0]))
+
+    report = manager.compare_tables(("test_db", "source"), ("test_db", "target"), ["id"], partition_columns=["region"])
+
+    assert not report.matches
+    assert report.mismatched_groups == [{"region": "us"}]
+    assert (report.missing_in_target, report.missing_in_source, report.mismatched_rows) == (1, 1, 1)
+    assert sorted(key["id"] for key in report.sample_keys) == [3, 4, 5]
+
+
+def test_compare_with_spark_digests(mock_connector):
+    """Test the digests are aggregated with xxhash64 and only the mismatching bucket is drilled into."""
+    digests = {
+        "source": [(0, 10, Decimal(100)), (1, 5, Decimal(50))],
+        "target": [(0, 10, Decimal(100)), (1, 5, Decimal(51))],
+    }
+    row_hashes = {"source": [(7, 1), (8, 2)], "target": [(7, 1), (8, 3)]}
+
+    def query(statement, **kwargs):
+        table = "source" if "`source`" in statement else "target"
+        result = MagicMock()
+        result.collect.return_value = digests[table] if "GROUP BY" in statement else row_hashes[table]
+        return result
+
+    mock_connector.query.side_effect = query
+    iceberg_manager = IcebergManager(connector=mock_connector)
+
+    report = iceberg_manager.compare_tables(("test_db", "source"), ("test_db", "target"), ["id"], columns=["id", "amount"])
+
+    statements = [call.args[0] for call in mock_connector.query.call_args_list]
+    assert (
+        "SELECT pmod(xxhash64(`id`), 64), count(*), coalesce(sum(cast(xxhash64(`id`, `amount`) AS decimal(38, 0))), 0) "
+        "FROM `test_catalog`.`test_db`.`source` GROUP BY pmod(xxhash64(`id`), 64)"
+    ) in statements
+    assert any(statement.endswith("WHERE (pmod(xxhash64(`id`), 64) = 1)") for statement in statements)
+    assert report.mismatched_groups == [{"bucket": 1}]
+    assert report.mismatched_rows == 1
+    assert report.sample_keys == [{"id": 8}]
@@ -1,7 +1,11 @@
+import re
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import pyarrow as pa
+import pyarrow.parquet as pq
 import pytest
+from pyarrow import fs
 
 from keepice_lakehouse.connectors.athena_connector import AthenaConnector
 from keepice_lakehouse.models.models import AthenaConfigModel
@@ -41,7 +45,7 @@ def test_connect(mock_athena_connect, config):
     connector.connect()
 
     # Verify that athena_connect was called with the correct parameters
-    mock_athena_connect.assert_called_once_with(s3_staging_dir="s3://my-bucket/path/", region_name="us-west-2")
+    mock_athena_connect.assert_called_once_with(s3_staging_dir="s3://my-bucket/path/", region_name="us-west-2", work_group="primary")
 
 
 @patch("keepice_lakehouse.connectors.athena_connector.athena_connect")
@@ -66,3 +70,111 @@ def test_query(mock_athena_connect, config):
 
     # Verify that the method returns the cursor
     assert cursor == mock_cursor
+
+
+@patch("keepice_lakehouse.connectors.athena_connector.athena_connect")
+def test_query_retries_throttling(mock_athena_connect, config):
+    """Test the query method of AthenaConnector retries throttled queries."""
+    mock_cursor = MagicMock()
+    mock_cursor.execute.side_effect = [Exception("TooManyRequestsException: Rate exceeded"), None]
+    mock_athena_connect.return_value.cursor.return_value = mock_cursor
+
+    connector = AthenaConnector(config.model_dump(mode="json"))
+    connector.retry_policy.base_delay = 0
+    connector.connect()
+
+    assert connector.query("SELECT 1") == mock_cursor
+    assert mock_cursor.execute.call_count == 2
+
+
+@patch("keepice_lakehouse.connectors.athena_connector.athena_connect")
+def test_query_result_reuse_only_for_read_only_queries(mock_athena_connect, config):
+    """Test the query method of AthenaConnector enables result reuse on read-only queries."""
+    mock_cursor = MagicMock()
+    mock_athena_connect.return_value.cursor.return_value = mock_cursor
+
+    connector = AthenaConnector({**config.model_dump(mode="json"), "result_reuse_minutes": 30})
+    connector.connect()
+
+    connector.query("SELECT * FROM my_table")
+    mock_cursor.execute.assert_called_with("SELECT * FROM my_table", result_reuse_enable=True, result_reuse_minutes=30)
+
+    connector.query("DELETE FROM my_table")
+    mock_cursor.execute.assert_called_with("DELETE FROM my_table")
+
+
+@patch("keepice_lakehouse.connectors.athena_connector.athena_connect")
+def test_query_local_result_cache(mock_athena_connect, config, tmp_path):
+    """Test the query method of AthenaConnector serves repeated queries from the local result cache."""
+    mock_cursor = MagicMock()
+    mock_cursor.description = [("total", "bigint")]
+    mock_cursor.fetchall.return_value = [(42,)]
+    mock_athena_connect.return_value.cursor.return_value = mock_cursor
+
+    connector = AthenaConnector({**config.model_dump(mode="json"), "result_cache_dir": str(tmp_path)})
+    connector.connect()
+
+    first = connector.query("SELECT count(*) FROM t", cache_version="db.t@1")
+    second = connector.query("SELECT count(*) FROM t", cache_version="db.t@1")
+    connector.query("SELECT count(*) FROM t", cache_version="db.t@2")
+
+    assert first.fetchall() == [(42,)]
+    assert second.from_cache
+    assert second.fetchall() == [(42,)]
+    assert mock_cursor.execute.call_count == 2
+
+
+def _unload_files(statement, *args, **kwargs):
+    """Stands in for Athena, writing the rows of an UNLOAD or CTAS statement as Parquet files."""
+    match = re.search(r"TO '([^']+)'|external_location = '([^']+)'", statement)
+    if match is None:
+        return
+    filesystem, path = fs.FileSystem.from_uri(match.group(1) or match.group(2))
+    filesystem.create_dir(path)
+    pq.write_table(pa.table({"id": [1, 2]}), f"{path}/20240101_000000_00001_part0", filesystem=filesystem)
+    pq.write_table(pa.table({"id": [3]}), f"{path}/20240101_000000_00001_part1", filesystem=filesystem)
+
+
+@patch("keepice_lakehouse.connectors.athena_connector.athena_connect")
+def test_export_unloads_to_parquet(mock_athena_connect, config, tmp_path):
+    """Test the export method of AthenaConnector unloads the query and reads the files back as a dataset."""
+    mock_cursor = MagicMock()
+    mock_cursor.execute.side_effect = _unload_files
+    mock_athena_connect.return_value.cursor.return_value = mock_cursor
+
+    connector = AthenaConnector({**config.model_dump(mode="json"), "export_location": f"file://{tmp_path}/unload"})
+    connector.connect()
+    dataset = connector.export("SELECT id FROM my_table")
+
+    [statement] = [call.args[0] for call in mock_cursor.execute.call_args_list]
+    assert statement.startswith("UNLOAD (SELECT id FROM my_table) TO ")
+    assert f"'file://{tmp_path}/unload/" in statement
+    assert sorted(dataset.to_table()["id"].to_pylist()) == [1, 2, 3]
+    assert len(dataset.files) == 2
+
+
+@patch("keepice_lakehouse.connectors.athena_connector.athena_connect")
+def test_export_ctas_drops_the_transient_table(mock_athena_connect, config, tmp_path):
+    """Test CTAS exports create a transient external table and drop it, keeping its files."""
+    mock_cursor = MagicMock()
+    mock_cursor.execute.side_effect = _unload_files
+    mock_athena_connect.return_value.cursor.return_value = mock_cursor
+
+    connector = AthenaConnector({**config.model_dump(mode="json"), "export_database": "scratch"})
+    connector.connect()
+    dataset = connector.export("SELECT id FROM my_table", location=f"file://{tmp_path}/export/", method="ctas")
+
+    create, drop = (call.args[0] for call in mock_cursor.execute.call_args_list)
+    table_name = re.search(r"`scratch`\.`(keepice_export_\w+)`", create).group(1)
+    assert drop.startswith("DROP TABLE ")
+    assert drop.endswith(f"`scratch`.`{table_name}`")
+    assert dataset.count_rows() == 3
+
+
+def test_export_ctas_needs_an_export_database(config):
+    """Test CTAS exports are rejected without an export database."""
+    connector = AthenaConnector(config.model_dump(mode="json"))
+
+    assert connector.export_location == "s3://my-bucket/path/unload/"
+    with pytest.raises(ValueError, match="export_database"):
+        connector.export("SELECT 1", method="ctas")
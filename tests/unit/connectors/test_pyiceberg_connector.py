@@ -0,0 +1,345 @@
+from unittest.mock import patch
+
+import pyarrow as pa
+import pytest
+from pyiceberg.expressions import EqualTo
+
+from keepice_lakehouse.connectors import pyiceberg_compat
+from keepice_lakehouse.connectors.pyiceberg_connector import DEFAULT_UPSERT_MEMORY_BYTES
+from keepice_lakehouse.connectors.pyiceberg_connector import PyIcebergConnector
+from keepice_lakehouse.connectors.pyiceberg_connector import deduplicate
+from keepice_lakehouse.connectors.pyiceberg_connector import iter_chunks
+from keepice_lakehouse.exceptions.exceptions import BranchPublishError
+from keepice_lakehouse.exceptions.exceptions import UnsupportedOperationError
+from keepice_lakehouse.models.models import ColumnMetricsConfigModel
+from keepice_lakehouse.models.models import PyIcebergConfigModel
+from keepice_lakehouse.utils.clustering import files_read_fraction
+from keepice_lakehouse.utils.file_cache import CachingFileIO
+
+SCHEMA = pa.schema([pa.field("id", pa.int64()), pa.field("value", pa.string()), pa.field("ts", pa.int64())])
+
+
+@pytest.fixture
+def connector(tmp_path):
+    """Fixture to provide a PyIcebergConnector over a local SQL catalog with an empty table."""
+    config = PyIcebergConfigModel(
+        catalog_name="test_catalog",
+        warehouse=f"file://{tmp_path}/warehouse",
+        uri=f"sqlite:///{tmp_path}/catalog.db",
+        properties={"type": "sql"},
+    )
+    connector = PyIcebergConnector(config.model_dump(mode="json"))
+    catalog = connector.connect()
+    catalog.create_namespace("test_db")
+    catalog.create_table("test_db.test_table", schema=SCHEMA)
+    return connector
+
+
+def read_rows(connector):
+    return sorted(connector.load_table("test_db", "test_table").scan().to_arrow().to_pylist(), key=lambda row: row["id"])
+
+
+def test_append_record_batch_stream(connector):
+    """Test appending a record batch stream commits every chunk in a single snapshot."""
+    batches = [pa.record_batch([[i], [f"v{i}"], [0]], schema=SCHEMA) for i in range(3)]
+    connector.target_file_size_bytes = 1
+
+    connector.append("test_db", "test_table", iter(batches))
+
+    table = connector.load_table("test_db", "test_table")
+    assert [row["id"] for row in read_rows(connector)] == [0, 1, 2]
+    assert len(table.inspect.files()) == 3
+    assert len(table.history()) == 1
+
+
+def test_overwrite_replaces_contents(connector):
+    """Test overwrite replaces the whole table."""
+    connector.append("test_db", "test_table", pa.table({"id": [1, 2], "value": ["a", "b"], "ts": [0, 0]}, schema=SCHEMA))
+
+    connector.overwrite("test_db", "test_table", pa.table({"id": [3], "value": ["c"], "ts": [0]}, schema=SCHEMA))
+
+    assert read_rows(connector) == [{"id": 3, "value": "c", "ts": 0}]
+
+
+def test_upsert_merges_latest_change_per_key(connector):
+    """Test upsert updates, inserts and deletes rows according to the deduplicated delta."""
+    connector.append("test_db", "test_table", pa.table({"id": [1, 2, 3], "value": ["a", "b", "c"], "ts": [0, 0, 0]}, schema=SCHEMA))
+    delta = pa.table(
+        {
+            "id": [1, 1, 2, 4],
+            "value": ["old", "new", None, "d"],
+            "ts": [1, 2, 1, 1],
+            "__action": ["u", "u", "d", "u"],
+        }
+    )
+
+    connector.upsert("test_db", "test_table", delta, "id", "ts", "id")
+
+    assert read_rows(connector) == [
+        {"id": 1, "value": "new", "ts": 2},
+        {"id": 3, "value": "c", "ts": 0},
+        {"id": 4, "value": "d", "ts": 1},
+    ]
+
+
+def test_bounded_upsert_spills_and_rewrites_only_matched_files(connector, tmp_path):
+    """Test the out-of-core upsert spills the delta and rewrites only the data files holding matched keys."""
+    for start in (0, 100, 200):
+        rows = {"id": list(range(start, start + 100)), "value": ["old"] * 100, "ts": [0] * 100}
+        connector.append("test_db", "test_table", pa.table(rows, schema=SCHEMA))
+    untouched = set(connector.load_table("test_db", "test_table").inspect.files()["file_path"].to_pylist())
+    connector.upsert_memory_bytes = 4096
+    connector.spill_dir = str(tmp_path)
+    batches = [
+        pa.record_batch(
+            {"key": [105, 150, 150, 300], "value": ["new", "stale", "new", "new"], "ts": [1, 1, 2, 1], "__action": ["u", "u", "u", "u"]}
+        ),
+        pa.record_batch({"key": [120, 301], "value": [None, "new"], "ts": [1, 1], "__action": ["d", "u"]}),
+    ]
+
+    connector.upsert("test_db", "test_table", iter(batches * 20), "id", "ts", "key")
+
+    rows = {row["id"]: row["value"] for row in read_rows(connector)}
+    files = set(connector.load_table("test_db", "test_table").inspect.files()["file_path"].to_pylist())
+    assert len(rows) == 301
+    assert (rows[105], rows[150], rows[300], rows[301], rows[104], 120 in rows) == ("new", "new", "new", "new", "old", False)
+    assert len(untouched - files) == 1
+    assert list(tmp_path.glob("keepice-spill-*")) == []
+
+
+def test_upsert_rewrites_only_files_within_the_key_range(connector):
+    """Test an in-memory delta rewrites only the data files whose key statistics may hold one of its keys."""
+    for start in (0, 100, 200):
+        rows = {"id": list(range(start, start + 100)), "value": ["old"] * 100, "ts": [0] * 100}
+        connector.append("test_db", "test_table", pa.table(rows, schema=SCHEMA))
+    untouched = set(connector.load_table("test_db", "test_table").inspect.files()["file_path"].to_pylist())
+    delta = pa.table({"id": list(range(100, 120)), "value": ["new"] * 20, "ts": [1] * 20}, schema=SCHEMA)
+
+    connector.upsert("test_db", "test_table", delta, "id", "ts", "id")
+
+    rows = {row["id"]: row["value"] for row in read_rows(connector)}
+    files = set(connector.load_table("test_db", "test_table").inspect.files()["file_path"].to_pylist())
+    assert (len(rows), rows[99], rows[100], rows[119], rows[120]) == (300, "old", "new", "new", "old")
+    assert len(untouched - files) == 1
+
+
+def test_upsert_merges_record_batch_streams_out_of_core(connector):
+    """Test a record batch stream is merged through the bounded path even without a memory budget."""
+    batches = [pa.record_batch([[i], [f"v{i}"], [1]], schema=SCHEMA) for i in range(3)]
+
+    with patch.object(PyIcebergConnector, "_bounded_upsert", autospec=True) as bounded_upsert:
+        connector.upsert("test_db", "test_table", iter(batches), "id", "ts", "id")
+
+    assert bounded_upsert.call_args.args[-1] == DEFAULT_UPSERT_MEMORY_BYTES
+
+
+def test_untested_pyiceberg_versions_use_public_apis(connector, monkeypatch):
+    """Test appends and scans fall back to public PyIceberg APIs outside the tested versions."""
+    monkeypatch.setattr(pyiceberg_compat, "PRIVATE_APIS", False)
+
+    connector.append("test_db", "test_table", pa.table({"id": [1, 2], "value": ["a", "b"], "ts": [0, 0]}, schema=SCHEMA))
+
+    assert connector.scan("test_db", "test_table", row_filter=EqualTo("id", 2)).to_pylist() == [{"id": 2, "value": "b", "ts": 0}]
+    assert connector.manifest_cache.misses == 0
+    with pytest.raises(UnsupportedOperationError, match="Compaction"):
+        connector.rewrite_data_files("test_db", "test_table")
+
+
+def test_is_tested_version():
+    assert pyiceberg_compat.is_tested_version("0.12.1")
+    assert not pyiceberg_compat.is_tested_version("0.13.0rc1")
+    assert not pyiceberg_compat.is_tested_version("0.11.0")
+
+
+def test_iter_chunks_bounds_chunk_size():
+    batch = pa.record_batch([[1, 2]], names=["id"])
+
+    chunks = list(iter_chunks([batch, batch, batch], chunk_bytes=batch.nbytes * 2))
+
+    assert [chunk.num_rows for chunk in chunks] == [4, 2]
+
+
+def test_deduplicate_keeps_latest_row():
+    data = pa.table({"id": [2, 1, 1], "ts": [5, 1, 3]})
+
+    assert deduplicate(data, "id", "ts").to_pylist() == [{"id": 1, "ts": 3}, {"id": 2, "ts": 5}]
+
+
+def test_scan_reuses_cached_manifest_entries(connector):
+    """Test scans plan files in parallel and decode every manifest only once."""
+    for i in range(3):
+        connector.append("test_db", "test_table", pa.table({"id": [i], "value": [f"v{i}"], "ts": [0]}, schema=SCHEMA))
+
+    first = connector.scan("test_db", "test_table", row_filter=EqualTo("id", 1))
+    misses = connector.manifest_cache.misses
+    second = connector.scan("test_db", "test_table", row_filter=EqualTo("id", 1))
+
+    assert first.to_pylist() == second.to_pylist() == [{"id": 1, "value": "v1", "ts": 0}]
+    assert misses == 3
+    assert connector.manifest_cache.misses == misses
+    assert len(connector.plan_files("test_db", "test_table", row_filter=EqualTo("id", 1))) == 1
+
+
+def test_close_shuts_down_the_manifest_thread_pool(connector):
+    """Test close releases the manifest readers and a later scan starts new ones."""
+    connector.append("test_db", "test_table", pa.table({"id": [1], "value": ["a"], "ts": [0]}, schema=SCHEMA))
+    connector.scan("test_db", "test_table")
+    executor = connector._executor
+
+    connector.close()
+
+    assert executor._shutdown
+    assert connector._executor is None
+    assert connector.scan("test_db", "test_table").num_rows == 1
+
+
+def test_metadata_files(connector):
+    """Test the files metadata is built from the manifest entries."""
+    connector.append("test_db", "test_table", pa.table({"id": [1, 2], "value": ["a", "b"], "ts": [0, 0]}, schema=SCHEMA))
+
+    files = connector.metadata("test_db", "test_table", "files")
+
+    assert files.column("record_count").to_pylist() == [2]
+    assert connector.metadata("test_db", "test_table", "snapshots").num_rows == 1
+
+
+def test_file_cache_wraps_table_io(tmp_path):
+    """Test configuring file_cache_dir reads tables through the local file cache."""
+    config = PyIcebergConfigModel(
+        catalog_name="test_catalog",
+        warehouse=f"file://{tmp_path}/warehouse",
+        uri=f"sqlite:///{tmp_path}/catalog.db",
+        properties={"type": "sql"},
+        file_cache_dir=str(tmp_path / "cache"),
+    )
+    connector = PyIcebergConnector(config.model_dump(mode="json"))
+    catalog = connector.connect()
+    catalog.create_namespace("test_db")
+    catalog.create_table("test_db.test_table", schema=SCHEMA)
+    connector.append("test_db", "test_table", pa.table({"id": [1], "value": ["a"], "ts": [0]}, schema=SCHEMA))
+
+    table = connector.load_table("test_db", "test_table")
+
+    assert isinstance(table.io, CachingFileIO)
+    assert connector.scan("test_db", "test_table").to_pylist() == [{"id": 1, "value": "a", "ts": 0}]
+    assert any((tmp_path / "cache").glob("*/*.block"))
+
+
+def test_scan_at_snapshot_and_tag(connector):
+    """Test scans select a past snapshot by ID, tag or timestamp."""
+    connector.append("test_db", "test_table", pa.table({"id": [1], "value": ["a"], "ts": [0]}, schema=SCHEMA))
+    first = connector.load_table("test_db", "test_table").current_snapshot()
+    connector.create_tag("test_db", "test_table", "v1")
+    connector.append("test_db", "test_table", pa.table({"id": [2], "value": ["b"], "ts": [0]}, schema=SCHEMA))
+
+    assert connector.scan("test_db", "test_table").num_rows == 2
+    assert connector.scan("test_db", "test_table", snapshot_id=first.snapshot_id).num_rows == 1
+    assert connector.scan("test_db", "test_table", tag="v1").num_rows == 1
+    assert connector.scan("test_db", "test_table", as_of_timestamp=first.timestamp_ms).num_rows == 1
+    with pytest.raises(ValueError, match="no branch or tag"):
+        connector.scan("test_db", "test_table", tag="missing")
+
+
+def test_branch_writes_are_published_by_fast_forward(connector):
+    """Test writes to a branch are invisible on main until the branch is fast-forwarded."""
+    connector.append("test_db", "test_table", pa.table({"id": [1], "value": ["a"], "ts": [0]}, schema=SCHEMA))
+    connector.create_branch("test_db", "test_table", "audit")
+
+    connector.append("test_db", "test_table", pa.table({"id": [2], "value": ["b"], "ts": [0]}, schema=SCHEMA), branch="audit")
+
+    assert [row["id"] for row in read_rows(connector)] == [1]
+    assert connector.scan("test_db", "test_table", branch="audit").num_rows == 2
+
+    connector.fast_forward("test_db", "test_table", "audit")
+
+    assert [row["id"] for row in read_rows(connector)] == [1, 2]
+
+
+def test_fast_forward_rejects_diverged_main(connector):
+    """Test a branch cannot be published once main has commits the branch does not have."""
+    connector.append("test_db", "test_table", pa.table({"id": [1], "value": ["a"], "ts": [0]}, schema=SCHEMA))
+    connector.create_branch("test_db", "test_table", "audit")
+    connector.append("test_db", "test_table", pa.table({"id": [2], "value": ["b"], "ts": [0]}, schema=SCHEMA))
+
+    with pytest.raises(BranchPublishError):
+        connector.fast_forward("test_db", "test_table", "audit")
+
+
+def test_delete_where_drops_matching_files_without_rewrite(connector):
+    """Test files fully covered by the predicate are dropped and partially matching files rewritten."""
+    connector.append("test_db", "test_table", pa.table({"id": [1, 2], "value": ["a", "b"], "ts": [0, 0]}, schema=SCHEMA))
+    connector.append("test_db", "test_table", pa.table({"id": [3, 4], "value": ["c", "d"], "ts": [0, 0]}, schema=SCHEMA))
+
+    metadata_only = connector.delete_where("test_db", "test_table", "id <= 2")
+    rewrite = connector.delete_where("test_db", "test_table", EqualTo("id", 3))
+    noop = connector.delete_where("test_db", "test_table", "id = 100")
+
+    assert (metadata_only.mode, metadata_only.files_scanned, metadata_only.files_removed, metadata_only.rows_deleted) == (
+        "metadata",
+        1,
+        1,
+        2,
+    )
+    assert (rewrite.mode, rewrite.files_rewritten, rewrite.files_removed, rewrite.rows_deleted) == ("copy-on-write", 1, 0, 1)
+    assert noop.mode == "noop"
+    assert [row["id"] for row in read_rows(connector)] == [4]
+
+
+def test_delete_where_reports_copy_on_write_fallback_and_unmatched_rows(connector):
+    """Test the report states the merge-on-read fallback and a scan matching no rows, without PyIceberg warnings."""
+    connector.append("test_db", "test_table", pa.table({"id": [1, 2], "value": ["a", "c"], "ts": [0, 0]}, schema=SCHEMA))
+    connector.set_properties("test_db", "test_table", {"write.delete.mode": "merge-on-read"})
+
+    unmatched = connector.delete_where("test_db", "test_table", "value = 'b'")
+    fallback = connector.delete_where("test_db", "test_table", "id = 1")
+
+    assert (unmatched.mode, unmatched.files_scanned, unmatched.rows_deleted, unmatched.copy_on_write_fallback) == ("noop", 1, 0, False)
+    assert (fallback.mode, fallback.files_rewritten, fallback.rows_deleted, fallback.copy_on_write_fallback) == (
+        "copy-on-write",
+        1,
+        1,
+        True,
+    )
+
+
+def test_writes_follow_table_sort_order(connector):
+    """Test appended rows are sorted by the write sort order of the table."""
+    connector.set_sort_order("test_db", "test_table", ["id"])
+
+    connector.append("test_db", "test_table", pa.table({"id": [3, 1, 2], "value": ["c", "a", "b"], "ts": [0, 0, 0]}, schema=SCHEMA))
+
+    assert connector.load_table("test_db", "test_table").scan().to_arrow()["id"].to_pylist() == [1, 2, 3]
+
+
+def test_rewrite_data_files_clusters_rows_into_tight_files(connector):
+    """Test a sort compaction turns overlapping files into files with disjoint id ranges."""
+    for offset in range(4):
+        ids = list(range(offset, 400, 4))
+        connector.append("test_db", "test_table", pa.table({"id": ids, "value": ["v"] * 100, "ts": [0] * 100}, schema=SCHEMA))
+    with connector.load_table("test_db", "test_table").transaction() as transaction:
+        transaction.set_properties({"write.target-file-size-bytes": "1024"})
+
+    before = files_read_fraction([row[1:] for row in connector.column_bounds("test_db", "test_table", ["id"])])
+    connector.rewrite_data_files("test_db", "test_table", "sort", ["id"])
+    bounds = connector.column_bounds("test_db", "test_table", ["id"])
+
+    assert before == 1.0
+    assert len(bounds) > 4
+    assert files_read_fraction([row[1:] for row in bounds]) < 0.3
+    assert [row["id"] for row in read_rows(connector)] == list(range(400))
+
+
+def test_metrics_modes_narrow_manifest_statistics(connector):
+    """Test columns lowered to counts carry no bounds in the manifests."""
+    data = pa.table({"id": [1, 2], "value": ["a", "b"], "ts": [0, 0]}, schema=SCHEMA)
+    connector.append("test_db", "test_table", data)
+    full = connector.metrics_width("test_db", "test_table")
+    metrics = ColumnMetricsConfigModel(default_mode="counts", column_modes={"id": "full"})
+    connector.set_properties("test_db", "test_table", metrics.table_properties())
+
+    connector.overwrite("test_db", "test_table", data)
+    narrow = connector.metrics_width("test_db", "test_table")
+
+    assert (full.files, full.value_count_columns, full.bounds_columns) == (1, 3, 3)
+    assert (narrow.files, narrow.value_count_columns, narrow.bounds_columns) == (1, 3, 1)
+    assert narrow.bounds_bytes < full.bounds_bytes
@@ -1,8 +1,12 @@
+import threading
 import unittest
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import pytest
+
 from keepice_lakehouse.connectors.spark_connector import SparkConnector
+from keepice_lakehouse.exceptions.exceptions import OperationCancelledError
 from keepice_lakehouse.models.models import SparkIcebergConfigModel
 
 
@@ -44,3 +48,128 @@ class TestSparkConnector(unittest.TestCase):
         query = "SELECT * FROM table"
         connector.query(query)
         mock_session.sql.assert_called_with(query)
+
+    @patch("keepice_lakehouse.connectors.spark_connector.SparkConf")
+    @patch("keepice_lakehouse.connectors.spark_connector.SparkSession")
+    def test_connect_registers_catalogs(self, mock_spark_session, mock_spark_conf):
+        input = {
+            "app_name": "test_app",
+            "master": "local",
+            "config": {"spark.some.config.option": "some-value"},
+            "catalog_name": "raw",
+            "catalogs": {"raw": {"type": "hadoop", "warehouse": "s3://raw/"}, "curated": {"type": "glue"}},
+        }
+        config = SparkIcebergConfigModel(**input)
+
+        connector = SparkConnector(config.model_dump(mode="json"))
+        connector.connect()
+
+        conf = mock_spark_conf.return_value.setAppName.return_value.setMaster.return_value
+        conf.set.assert_any_call("spark.sql.catalog.raw", "org.apache.iceberg.spark.SparkCatalog")
+        conf.set.assert_any_call("spark.sql.catalog.raw.warehouse", "s3://raw/")
+        conf.set.assert_any_call("spark.sql.catalog.curated.type", "glue")
+        assert connector.catalog_names == ["raw", "curated"]
+
+    def test_tuned_restores_previous_settings(self):
+        input = {
+            "app_name": "test_app",
+            "master": "local",
+            "config": {},
+            "adaptive": {"target_partition_bytes": 64},
+        }
+        config = SparkIcebergConfigModel(**input)
+        connector = SparkConnector(config.model_dump(mode="json"))
+        connector.session = MagicMock()
+        values = {"spark.sql.shuffle.partitions": "200"}
+        connector.session.conf.get.side_effect = lambda key, default: values.get(key, default)
+
+        with connector.tuned({"spark.sql.shuffle.partitions": "4", "spark.sql.adaptive.enabled": "true"}):
+            connector.session.conf.set.assert_any_call("spark.sql.shuffle.partitions", "4")
+
+        assert connector.adaptive.target_partition_bytes == 64
+        connector.session.conf.set.assert_called_with("spark.sql.shuffle.partitions", "200")
+        connector.session.conf.unset.assert_called_once_with("spark.sql.adaptive.enabled")
+
+    def test_estimated_size_requires_a_jvm_dataframe(self):
+        dataframe = MagicMock()
+        dataframe._jdf.queryExecution.return_value.optimizedPlan.return_value.stats.return_value.sizeInBytes.return_value.toString.return_value = "4096"
+
+        assert SparkConnector.estimated_size(dataframe) == 4096
+        assert SparkConnector.estimated_size(MagicMock(spec=["sparkSession", "writeTo"])) is None
+
+    def test_operation_runs_in_a_job_group_and_pool(self):
+        input = {
+            "app_name": "test_app",
+            "master": "local",
+            "config": {},
+            "scheduler": {"default_pool": "batch", "pools": {"list_tables": "metadata"}},
+        }
+        config = SparkIcebergConfigModel(**input)
+        connector = SparkConnector(config.model_dump(mode="json"))
+        connector.session = MagicMock()
+        properties = {"spark.scheduler.pool": "previous"}
+        context = connector.session.sparkContext
+        context.getLocalProperty.side_effect = properties.get
+        context.setLocalProperty.side_effect = properties.__setitem__
+
+        with connector.operation("list_tables", "list_tables db") as group_id:
+            assert properties["spark.jobGroup.id"] == group_id
+            assert (properties["spark.job.description"], properties["spark.scheduler.pool"]) == ("list_tables db", "metadata")
+            assert connector.running_operations() == {group_id: "list_tables db"}
+            with connector.operation("get_table_ddl") as nested_id:
+                assert nested_id == group_id
+                assert properties["spark.scheduler.pool"] == "metadata"
+
+        assert properties == {
+            "spark.jobGroup.id": None,
+            "spark.job.description": None,
+            "spark.job.interruptOnCancel": None,
+            "spark.scheduler.pool": "previous",
+        }
+        assert connector.running_operations() == {}
+        assert not connector.cancel(group_id)
+
+    def test_operation_timeout_cancels_the_job_group(self):
+        input = {"app_name": "test_app", "master": "local", "config": {}, "scheduler": {"timeouts": {"compact_table": 0.01}}}
+        config = SparkIcebergConfigModel(**input)
+        connector = SparkConnector(config.model_dump(mode="json"))
+        connector.session = MagicMock()
+        cancelled = threading.Event()
+        connector.session.sparkContext.cancelJobGroup.side_effect = lambda group_id: cancelled.set()
+
+        def compact():
+            with connector.operation("compact_table", "compact_table db.t"):
+                assert cancelled.wait(5)
+                connector.query("CALL system.rewrite_data_files('db.t')")
+
+        with pytest.raises(OperationCancelledError, match=r"compact_table db\.t was cancelled after 0\.01 seconds"):
+            compact()
+
+        connector.session.sql.assert_not_called()
+
+    def test_worker_threads_join_the_job_group_of_their_operation(self):
+        config = SparkIcebergConfigModel(app_name="test_app", master="local", config={})
+        connector = SparkConnector(config.model_dump(mode="json"))
+        connector.session = MagicMock()
+        context = connector.session.sparkContext
+        results = []
+
+        def work(parent_id):
+            try:
+                with connector.operation("delete_where", parent_id=parent_id) as group_id:
+                    results.append(group_id)
+                    connector.cancel(parent_id)
+                    connector.query("DELETE FROM db.t WHERE id = 1")
+            except OperationCancelledError as e:
+                results.append(e)
+
+        with connector.operation("apply_retention") as parent_id:
+            worker = threading.Thread(target=work, args=(parent_id,))
+            worker.start()
+            worker.join()
+
+        assert results[0] == parent_id
+        assert isinstance(results[1], OperationCancelledError)
+        assert [call.args for call in context.setLocalProperty.call_args_list].count(("spark.jobGroup.id", parent_id)) == 2
+        context.cancelJobGroup.assert_called_once_with(parent_id)
+        connector.session.sql.assert_not_called()
@@ -5,6 +5,7 @@ import pytest
 
 from keepice_lakehouse.application.iceberg_manager_factory import create_iceberg_manager
 from keepice_lakehouse.containers.containers import ConnectorsContainer
+from keepice_lakehouse.containers.wiring import create_named_iceberg_manager
 from keepice_lakehouse.utils.enums import ConnectorType
 
 
@@ -52,3 +53,11 @@ def test_create_iceberg_manager_with_invalid_connector_type(mocker, mock_contain
     """Test create_iceberg_manager with an invalid connector type."""
     with pytest.raises(ValueError, match="Unknown connector type: unknown_connector"):
         create_iceberg_manager("unknown_connector", container=mock_container)
+
+
+def test_create_named_iceberg_manager_with_unknown_instance(mock_container):
+    """Test create_named_iceberg_manager with an undeclared instance name."""
+    mock_container.named_connectors.return_value = {}
+
+    with pytest.raises(ValueError, match="Unknown connector instance: raw"):
+        create_named_iceberg_manager("raw", container=mock_container)
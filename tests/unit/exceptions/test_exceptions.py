@@ -3,6 +3,7 @@ from keepice_lakehouse.exceptions.exceptions import InvalidTablePropertyError
 from keepice_lakehouse.exceptions.exceptions import MetadataRetrievalError
 from keepice_lakehouse.exceptions.exceptions import TableCreationError
 from keepice_lakehouse.exceptions.exceptions import TableDropError
+from keepice_lakehouse.exceptions.exceptions import UnsupportedOperationError
 
 
 def test_database_creation_error():
@@ -43,3 +44,11 @@ def test_invalid_table_property_error():
 
     assert isinstance(error, InvalidTablePropertyError)
     assert str(error) == f"Invalid Table Property: {message}"
+
+
+def test_unsupported_operation_error():
+    message = "The operation is not supported."
+    error = UnsupportedOperationError(message)
+
+    assert isinstance(error, UnsupportedOperationError)
+    assert str(error) == f"Unsupported Operation: {message}"
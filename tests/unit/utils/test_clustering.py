@@ -0,0 +1,26 @@
+import pyarrow as pa
+
+from keepice_lakehouse.utils.clustering import files_read_fraction
+from keepice_lakehouse.utils.clustering import zorder_table
+from keepice_lakehouse.utils.clustering import zorder_values
+
+
+def test_zorder_values_interleave_column_ranks():
+    data = pa.table({"x": [30, 10, 20, 0], "y": [0, 1, 1, 0]})
+
+    # Ranks x = 3, 1, 2, 0 and y = 0, 1, 1, 0 interleave to 0b1010, 0b0011, 0b1001 and 0b0000.
+    assert zorder_values(data, ["x", "y"]).to_pylist() == [10, 3, 9, 0]
+    assert zorder_table(data, ["x", "y"])["x"].to_pylist() == [0, 10, 20, 30]
+
+
+def test_zorder_values_of_single_column_follow_its_order():
+    data = pa.table({"x": ["b", None, "a"]})
+
+    assert zorder_values(data, ["x"]).to_pylist() == [1, 2, 0]
+
+
+def test_files_read_fraction():
+    assert files_read_fraction([]) == 0.0
+    assert files_read_fraction([(0, 9), (10, 19), (20, 29), (30, 39)]) == 0.25
+    assert files_read_fraction([(0, 39), (1, 38)]) == 1.0
+    assert files_read_fraction([(0, 9), (5, 14), (20, 29), (None, None)]) == (3 + 3 + 2 + 4) / 16
@@ -0,0 +1,113 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from pyiceberg.io.pyarrow import PyArrowFileIO
+
+from keepice_lakehouse.utils.file_cache import BlockCache
+from keepice_lakehouse.utils.file_cache import CachingFileIO
+from keepice_lakehouse.utils.file_cache import CachingInputFile
+
+
+class CountingFileIO(PyArrowFileIO):
+    """PyArrowFileIO counting the streams opened on data files."""
+
+    def __init__(self):
+        super().__init__()
+        self.opened = 0
+
+    def new_input(self, location):
+        input_file = super().new_input(location)
+        original_open = input_file.open
+
+        def counting_open(seekable=True):
+            self.opened += 1
+            return original_open(seekable=seekable)
+
+        input_file.open = counting_open
+        return input_file
+
+
+@pytest.fixture
+def parquet_file(tmp_path):
+    path = tmp_path / "data.parquet"
+    pq.write_table(pa.table({"id": list(range(1000)), "value": [str(i) for i in range(1000)]}), path)
+    return f"file://{path}"
+
+
+def test_repeated_reads_are_served_from_cache(tmp_path, parquet_file):
+    """Test the second read of a file does not open the wrapped file."""
+    wrapped = CountingFileIO()
+    io = CachingFileIO(wrapped=wrapped, cache=BlockCache(str(tmp_path / "cache"), block_size=1024))
+
+    with io.new_input(parquet_file).open() as stream:
+        first = pq.read_table(stream)
+    opened = wrapped.opened
+    with io.new_input(parquet_file).open() as stream:
+        second = pq.read_table(stream)
+
+    assert opened == 1
+    assert wrapped.opened == opened
+    assert first.equals(second)
+
+
+def test_cache_survives_new_instance(tmp_path, parquet_file):
+    """Test blocks written by one cache are indexed by a new cache over the same directory."""
+    with CachingFileIO(wrapped=PyArrowFileIO(), cache=BlockCache(str(tmp_path / "cache"))).new_input(parquet_file).open() as stream:
+        expected = stream.read()
+    wrapped = CountingFileIO()
+    io = CachingFileIO(wrapped=wrapped, cache=BlockCache(str(tmp_path / "cache")))
+
+    with io.new_input(parquet_file).open() as stream:
+        assert stream.read() == expected
+    assert wrapped.opened == 0
+
+
+def test_ranged_reads(tmp_path, parquet_file):
+    """Test reads spanning block boundaries and relative seeks return the original bytes."""
+    with PyArrowFileIO().new_input(parquet_file).open() as stream:
+        expected = stream.read()
+    io = CachingFileIO(wrapped=PyArrowFileIO(), cache=BlockCache(str(tmp_path / "cache"), block_size=100))
+
+    with io.new_input(parquet_file).open() as stream:
+        stream.seek(90)
+        assert stream.read(25) == expected[90:115]
+        stream.seek(-10, 2)
+        assert stream.read() == expected[-10:]
+        assert stream.tell() == len(expected)
+
+
+def test_eviction_bounds_cache_size(tmp_path, parquet_file):
+    """Test the least recently used blocks are evicted beyond max_bytes."""
+    cache = BlockCache(str(tmp_path / "cache"), max_bytes=300, block_size=100)
+    io = CachingFileIO(wrapped=PyArrowFileIO(), cache=cache)
+
+    with io.new_input(parquet_file).open() as stream:
+        stream.read()
+
+    assert cache.size <= 300
+    assert len(list((tmp_path / "cache").glob("*/*.block"))) == 3
+
+
+def test_eviction_removes_lengths_and_directories(tmp_path):
+    """Test file lengths count against max_bytes and leave with the last block of their file and its directory."""
+    cache = BlockCache(str(tmp_path / "cache"), max_bytes=110, block_size=100)
+    cache.set_length("s3://bucket/a.parquet", 250)
+    cache.write("s3://bucket/a.parquet", 0, b"a" * 100)
+    assert cache.size == 103
+
+    cache.write("s3://bucket/b.parquet", 0, b"b" * 100)
+    cache.set_length("s3://bucket/b.parquet", 100)
+
+    assert cache.length("s3://bucket/a.parquet") is None
+    assert cache.size == 103
+    assert [path.name for path in (tmp_path / "cache").iterdir()] == [BlockCache.file_key("s3://bucket/b.parquet")]
+    reopened = BlockCache(str(tmp_path / "cache"), max_bytes=110, block_size=100)
+    assert (reopened.size, reopened.length("s3://bucket/b.parquet")) == (103, 100)
+
+
+def test_mutable_files_are_not_cached(tmp_path):
+    """Test files that may be rewritten in place bypass the cache."""
+    io = CachingFileIO(wrapped=PyArrowFileIO(), cache=BlockCache(str(tmp_path / "cache")))
+
+    assert not isinstance(io.new_input(f"file://{tmp_path}/metadata/version-hint.text"), CachingInputFile)
+    assert isinstance(io.new_input(f"file://{tmp_path}/metadata/00001-abc.metadata.json"), CachingInputFile)
@@ -0,0 +1,29 @@
+from keepice_lakehouse.utils.manifest_cache import ManifestEntryCache
+
+
+def test_get_and_put():
+    cache = ManifestEntryCache(max_entries=10)
+    cache.put("s3://bucket/m1.avro", [1, 2])
+
+    assert cache.get("s3://bucket/m1.avro") == [1, 2]
+    assert cache.get("s3://bucket/m2.avro") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evicts_least_recently_used_manifests():
+    cache = ManifestEntryCache(max_entries=4)
+    cache.put("m1", [1, 2])
+    cache.put("m2", [3])
+    cache.get("m1")
+    cache.put("m3", [4, 5])
+
+    assert cache.get("m2") is None
+    assert cache.get("m1") == [1, 2]
+    assert len(cache) == 4
+
+
+def test_skips_manifests_larger_than_cache():
+    cache = ManifestEntryCache(max_entries=1)
+    cache.put("m1", [1, 2])
+
+    assert cache.get("m1") is None
@@ -0,0 +1,24 @@
+from keepice_lakehouse.utils.metadata_cache import TableMetadataCache
+
+
+def test_get_returns_values_of_the_current_metadata_file():
+    cache = TableMetadataCache()
+    cache.put("db.t", "s3://lake/t/v1.metadata.json", "schema v1")
+
+    assert cache.get("db.t", "s3://lake/t/v1.metadata.json") == "schema v1"
+    assert cache.get("db.t", "s3://lake/t/v2.metadata.json") is None
+    assert cache.get("db.other", "s3://lake/t/v1.metadata.json") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_evicts_least_recently_used_tables():
+    cache = TableMetadataCache(max_tables=2)
+    cache.put("t1", "v1", 1)
+    cache.put("t2", "v1", 2)
+    cache.get("t1", "v1")
+    cache.put("t3", "v1", 3)
+
+    assert cache.get("t2", "v1") is None
+    assert (cache.get("t1", "v1"), cache.get("t3", "v1")) == (1, 3)
+    cache.clear()
+    assert len(cache) == 0
@@ -0,0 +1,48 @@
+import pyarrow as pa
+import pytest
+
+from keepice_lakehouse.models.models import ParquetWriterConfigModel
+from keepice_lakehouse.utils.parquet_benchmark import benchmark_parquet
+from keepice_lakehouse.utils.parquet_benchmark import writer_options
+
+SAMPLE = pa.table({"id": list(range(20000)), "region": [f"region-{index % 8}" for index in range(20000)]})
+
+
+def test_writer_options_convert_row_group_bytes_to_rows():
+    options = writer_options(
+        ParquetWriterConfigModel(codec="uncompressed", row_group_size_bytes=SAMPLE.nbytes // 4, dict_size_bytes=0), SAMPLE
+    )
+
+    assert (options["compression"], options["use_dictionary"], options["compression_level"]) == ("none", False, None)
+    assert options["row_group_size"] == 5000
+
+
+def test_benchmark_parquet_reports_every_candidate(tmp_path):
+    results = benchmark_parquet(
+        SAMPLE,
+        {
+            "zstd": ParquetWriterConfigModel(codec="zstd", compression_level=9),
+            "plain": ParquetWriterConfigModel(codec="uncompressed", dict_size_bytes=0, row_group_rows=5000),
+        },
+        directory=str(tmp_path),
+        repeats=2,
+    )
+
+    zstd, plain = results
+    assert (zstd.name, plain.name) == ("zstd", "plain")
+    assert zstd.file_bytes < plain.file_bytes
+    assert (zstd.row_groups, plain.row_groups, plain.rows) == (1, 4, 20000)
+    assert zstd.compression_ratio == pytest.approx(SAMPLE.nbytes / zstd.file_bytes)
+    assert zstd.write_bytes_per_second > 0
+    assert plain.scan_bytes_per_second > 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_compression_level_needs_a_leveled_codec():
+    assert ParquetWriterConfigModel(codec="zstd", compression_level=3, page_size_bytes=8192).table_properties() == {
+        "write.parquet.compression-codec": "zstd",
+        "write.parquet.compression-level": "3",
+        "write.parquet.page-size-bytes": "8192",
+    }
+    with pytest.raises(ValueError, match="compression level"):
+        ParquetWriterConfigModel(codec="snappy", compression_level=3)
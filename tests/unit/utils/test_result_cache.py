@@ -0,0 +1,69 @@
+import os
+import pickle
+from datetime import datetime
+from datetime import timezone
+from decimal import Decimal
+
+from keepice_lakehouse.utils.result_cache import ResultCache
+
+
+def test_get_returns_stored_result(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("SELECT 1", "db.t@1", [("x", "int")], [(1,), (2,)])
+
+    result = cache.get("SELECT 1", "db.t@1")
+
+    assert result.from_cache
+    assert result.description == [("x", "int")]
+    assert result.fetchone() == (1,)
+    assert result.fetchall() == [(2,)]
+    assert cache.get("SELECT 1", "db.t@2") is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_entries=2)
+    cache.put("SELECT 1", "v", None, [(1,)])
+    cache.put("SELECT 2", "v", None, [(2,)])
+    cache.get("SELECT 1", "v")
+    cache.put("SELECT 3", "v", None, [(3,)])
+
+    assert cache.get("SELECT 2", "v") is None
+    assert cache.get("SELECT 1", "v").fetchall() == [(1,)]
+    assert cache.get("SELECT 3", "v").fetchall() == [(3,)]
+
+
+def test_indexes_existing_entries_by_modification_time(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("SELECT 1", "v", None, [(1,)])
+    cache.put("SELECT 2", "v", None, [(2,)])
+    os.utime(cache._path("SELECT 2", "v"), (0, 0))
+
+    cache = ResultCache(str(tmp_path), max_entries=1)
+
+    assert cache.get("SELECT 2", "v") is None
+    assert cache.get("SELECT 1", "v").fetchall() == [(1,)]
+
+
+def test_stores_results_as_arrow_data(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    rows = [(Decimal("1.50"), datetime(2024, 1, 1, 12, tzinfo=timezone.utc), "a", None), (None, None, "b", None)]
+    description = [("price", "decimal", None, None, 10, 2, "UNKNOWN"), ("ts", "timestamp"), ("name", "varchar"), ("note", "varchar")]
+    cache.put("SELECT *", "v", description, rows)
+    cache._path("SELECT other", "v").write_bytes(pickle.dumps(([("x", "int")], [(1,)])))
+
+    result = cache.get("SELECT *", "v")
+
+    assert result.description == description
+    assert result.fetchall() == rows
+    assert cache.get("SELECT other", "v") is None
+    assert not cache.put("SELECT mixed", "v", None, [(1,), ("a",)]).from_cache
+    assert cache.get("SELECT mixed", "v") is None
+
+
+def test_clear(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("SELECT 1", "v", None, [(1,)])
+
+    cache.clear()
+
+    assert cache.get("SELECT 1", "v") is None
@@ -0,0 +1,83 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from keepice_lakehouse.utils.retry import RetryPolicy
+
+
+class CommitFailedException(Exception):
+    pass
+
+
+def test_retries_transient_error_until_success():
+    sleep = MagicMock()
+    policy = RetryPolicy(max_attempts=3, base_delay=1, jitter=False, sleep=sleep)
+    func = MagicMock(side_effect=[CommitFailedException("conflict"), CommitFailedException("conflict"), "ok"])
+
+    assert policy.call(func, "arg") == "ok"
+    assert func.call_count == 3
+    assert [call.args[0] for call in sleep.call_args_list] == [1, 2]
+
+
+def test_raises_after_max_attempts():
+    policy = RetryPolicy(max_attempts=2, base_delay=0, sleep=MagicMock())
+    func = MagicMock(side_effect=CommitFailedException("conflict"))
+
+    with pytest.raises(CommitFailedException):
+        policy.call(func)
+    assert func.call_count == 2
+
+
+def test_does_not_retry_other_errors():
+    policy = RetryPolicy(max_attempts=5, sleep=MagicMock())
+    func = MagicMock(side_effect=ValueError("bad input"))
+
+    with pytest.raises(ValueError, match="bad input"):
+        policy.call(func)
+    assert func.call_count == 1
+
+
+def test_call_write_retries_only_commit_conflicts():
+    policy = RetryPolicy(max_attempts=3, base_delay=0, sleep=MagicMock())
+    write = MagicMock(side_effect=[CommitFailedException("conflict"), "ok"])
+    throttled = MagicMock(side_effect=Exception("ThrottlingException: Rate exceeded"))
+
+    assert policy.call_write(write) == "ok"
+    with pytest.raises(Exception, match="ThrottlingException"):
+        policy.call_write(throttled)
+    assert throttled.call_count == 1
+
+
+def test_is_retryable_inspects_message_and_chain():
+    policy = RetryPolicy()
+
+    wrapped = RuntimeError("query failed")
+    wrapped.__cause__ = Exception("An error occurred (TooManyRequestsException) when calling StartQueryExecution")
+
+    assert policy.is_retryable(Exception("org.apache.iceberg.exceptions.CommitFailedException: Cannot commit"))
+    assert policy.is_retryable(wrapped)
+    assert not policy.is_retryable(RuntimeError("syntax error"))
+
+
+def test_backoff_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=False)
+
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [1, 2, 4, 5, 5]
+
+
+def test_from_config_and_commit_properties():
+    policy = RetryPolicy.from_config({"max_attempts": 4, "base_delay": 0.1, "max_delay": 2.0, "retryable_errors": None})
+
+    assert policy.max_attempts == 4
+    assert policy.configured
+    assert not RetryPolicy.from_config(None).configured
+    assert policy.commit_properties() == {
+        "commit.retry.num-retries": "3",
+        "commit.retry.min-wait-ms": "100",
+        "commit.retry.max-wait-ms": "2000",
+    }
+
+
+def test_invalid_max_attempts():
+    with pytest.raises(ValueError, match="max_attempts must be at least 1"):
+        RetryPolicy(max_attempts=0)
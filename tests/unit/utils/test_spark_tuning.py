@@ -0,0 +1,31 @@
+from keepice_lakehouse.models.models import AdaptiveTuningConfigModel
+from keepice_lakehouse.utils.spark_tuning import statement_settings
+
+MB = 1024 * 1024
+GB = 1024 * MB
+
+
+def test_small_delta_gets_few_partitions_and_a_broadcast():
+    """Test a 10 MB delta merged into a 1 GB table gets a handful of partitions and is broadcast."""
+    settings = statement_settings(10 * MB, GB, AdaptiveTuningConfigModel())
+
+    assert settings["spark.sql.shuffle.partitions"] == "9"
+    assert settings["spark.sql.autoBroadcastJoinThreshold"] == str(64 * MB)
+    assert settings["spark.sql.adaptive.skewJoin.enabled"] == "true"
+    assert settings["spark.sql.adaptive.skewJoin.skewedPartitionThresholdInBytes"] == str(5 * 128 * MB)
+
+
+def test_backfill_is_bounded_and_disables_broadcasts():
+    """Test a 500 GB backfill is capped at the maximum partition count and never broadcast."""
+    config = AdaptiveTuningConfigModel(max_shuffle_partitions=2000)
+
+    settings = statement_settings(500 * GB, 0, config)
+
+    assert settings["spark.sql.shuffle.partitions"] == "2000"
+    assert settings["spark.sql.adaptive.autoBroadcastJoinThreshold"] == "-1"
+
+
+def test_unknown_sizes_leave_the_session_untouched():
+    """Test no setting is changed when neither size is known, and broadcasts are left alone without a source size."""
+    assert statement_settings(None, None, AdaptiveTuningConfigModel()) == {}
+    assert "spark.sql.autoBroadcastJoinThreshold" not in statement_settings(None, GB, AdaptiveTuningConfigModel())
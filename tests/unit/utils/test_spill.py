@@ -0,0 +1,36 @@
+import pyarrow as pa
+import pytest
+
+from keepice_lakehouse.utils.spill import HashPartitionSpill
+from keepice_lakehouse.utils.spill import hash_partitions
+
+
+def test_hash_partitions_agree_across_key_types():
+    assert hash_partitions(pa.array([1, 2, None], pa.int32()), 8) == hash_partitions(pa.chunked_array([[1, 2, None]], pa.int64()), 8)
+    assert hash_partitions(pa.array(["a", "b"]), 8) == hash_partitions(pa.array(["a", "b"], pa.large_string()), 8)
+    assert hash_partitions(pa.array(range(1000)), 8).to_pylist().count(0) > 50
+
+
+def test_hash_partitions_of_string_keys_are_deterministic():
+    keys = pa.array(["apple", "banana", None, "", "ab", "ba", "cherry"])
+
+    assert hash_partitions(keys, 8).to_pylist() == [4, 3, 0, 0, 5, 5, 2]
+    assert hash_partitions(pa.chunked_array([keys[:3], keys[3:]]), 8) == hash_partitions(keys, 8)
+    assert hash_partitions(keys.slice(4), 8).to_pylist() == [5, 5, 2]
+    assert hash_partitions(pa.array(["ab", "ba"]), 1 << 20).to_pylist() == [758236, 669972]
+    assert min(hash_partitions(pa.array([f"key-{i}" for i in range(1000)]), 8).value_counts().field("counts").to_pylist()) > 50
+
+
+def test_spills_beyond_memory_budget(tmp_path):
+    with HashPartitionSpill("id", memory_bytes=1024, partitions=4, spill_dir=str(tmp_path)) as spill:
+        for start in range(0, 1000, 100):
+            spill.add(pa.table({"id": list(range(start, start + 100))}))
+
+        assert spill.spilled_bytes > 0
+        assert sorted(key for partition in spill for key in partition["id"].to_pylist()) == list(range(1000))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_partitions_must_be_a_power_of_two():
+    with pytest.raises(ValueError, match="power of two"):
+        HashPartitionSpill("id", memory_bytes=1024, partitions=6)
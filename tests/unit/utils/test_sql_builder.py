@@ -0,0 +1,220 @@
+from datetime import date
+
+import pytest
+
+from keepice_lakehouse.exceptions.exceptions import UnsupportedOperationError
+from keepice_lakehouse.utils.enums import SqlDialect
+from keepice_lakehouse.utils.sql_builder import SqlBuilder
+from keepice_lakehouse.utils.sql_builder import parse_describe
+from keepice_lakehouse.utils.sql_builder import parse_properties
+
+
+@pytest.fixture
+def spark_builder():
+    return SqlBuilder(SqlDialect.SPARK)
+
+
+@pytest.fixture
+def athena_builder():
+    return SqlBuilder(SqlDialect.ATHENA)
+
+
+def test_quote_escapes_quote_characters(spark_builder, athena_builder):
+    assert spark_builder.quote("my`col") == "`my``col`"
+    assert athena_builder.quote('my"col') == '"my""col"'
+    assert athena_builder.quote("my_col", ddl=True) == "`my_col`"
+
+
+def test_literal():
+    assert SqlBuilder.literal("it's") == "'it''s'"
+    assert SqlBuilder.literal(3) == "3"
+    assert SqlBuilder.literal(None) == "NULL"
+    assert SqlBuilder.literal(True) == "TRUE"
+
+
+def test_qualified_name_skips_missing_catalog(spark_builder):
+    assert spark_builder.qualified_name(None, "db", "tbl") == "`db`.`tbl`"
+
+
+def test_partition_expression(spark_builder):
+    assert spark_builder.partition_expression("id") == "`id`"
+    assert spark_builder.partition_expression("DAYS( event_ts )") == "days(`event_ts`)"
+    assert spark_builder.partition_expression("bucket(16, id)") == "bucket(16, `id`)"
+    assert spark_builder.partition_expression("a, b") == "`a`, `b`"
+    assert spark_builder.partition_expression("days(ts), region") == "days(`ts`), `region`"
+    assert spark_builder.partition_expression("bucket(16, id), truncate(4, name)") == "bucket(16, `id`), truncate(4, `name`)"
+
+
+def test_create_table_is_canonical(spark_builder):
+    statement = spark_builder.create_table(
+        "cat", "db", "tbl", {"id": "INT", "name": "STRING"}, "s3://bucket/tbl", "id", {"b": "2", "a": "1"}
+    )
+
+    assert statement == (
+        "CREATE TABLE IF NOT EXISTS `cat`.`db`.`tbl` (`id` INT, `name` STRING) USING iceberg "
+        "PARTITIONED BY (`id`) LOCATION 's3://bucket/tbl' TBLPROPERTIES ('a' = '1', 'b' = '2')"
+    )
+    assert statement == spark_builder.create_table(
+        "cat", "db", "tbl", {"id": "INT", "name": "STRING"}, "s3://bucket/tbl", "id", {"a": "1", "b": "2"}
+    )
+
+
+def test_select_metadata_per_dialect(spark_builder, athena_builder):
+    assert spark_builder.select_metadata("cat", "db", "tbl", "snapshots") == "SELECT * FROM `cat`.`db`.`tbl`.`snapshots`"
+    assert athena_builder.select_metadata("cat", "db", "tbl", "snapshots") == 'SELECT * FROM "cat"."db"."tbl$snapshots"'
+
+
+def test_insert_select_quotes_source(athena_builder):
+    assert athena_builder.insert_select("cat", "db", "tbl", "staging.src") == 'INSERT INTO "cat"."db"."tbl" SELECT * FROM "staging"."src"'
+
+
+def test_merge_delta_uses_source_key(spark_builder):
+    statement = spark_builder.merge_delta("cat", "db", "tbl", "src", "id", "ts", "src_id")
+
+    assert "PARTITION BY `src_id` ORDER BY `ts` DESC" in statement
+    assert "ON iceberg_table.`id` = temp_table.`src_id`" in statement
+    assert "\n" not in statement
+
+
+def test_time_travel_per_dialect(spark_builder, athena_builder):
+    assert spark_builder.time_travel(snapshot_id=123) == "VERSION AS OF 123"
+    assert spark_builder.time_travel(tag="v1") == "VERSION AS OF 'v1'"
+    assert spark_builder.time_travel(as_of_timestamp="2024-01-01T00:00:00") == "TIMESTAMP AS OF '2024-01-01 00:00:00.000000'"
+    assert athena_builder.time_travel(snapshot_id=123) == "FOR VERSION AS OF 123"
+    assert athena_builder.time_travel(as_of_timestamp="2024-01-01T01:00:00+01:00") == (
+        "FOR TIMESTAMP AS OF TIMESTAMP '2024-01-01 00:00:00.000000 UTC'"
+    )
+    assert spark_builder.time_travel() == ""
+
+
+def test_time_travel_rejects_several_versions(spark_builder):
+    with pytest.raises(ValueError, match="snapshot_id, tag"):
+        spark_builder.time_travel(snapshot_id=1, tag="v1")
+
+
+def test_athena_rejects_branches(athena_builder):
+    with pytest.raises(UnsupportedOperationError):
+        athena_builder.time_travel(branch="audit")
+    with pytest.raises(UnsupportedOperationError):
+        athena_builder.insert_select("cat", "db", "tbl", "src", branch="audit")
+
+
+def test_select_table_at_branch(spark_builder):
+    statement = spark_builder.select_table("cat", "db", "tbl", ["id"], "id > 1", 10, branch="audit")
+
+    assert statement == "SELECT `id` FROM `cat`.`db`.`tbl` VERSION AS OF 'audit' WHERE id > 1 LIMIT 10"
+
+
+def test_branch_statements(spark_builder):
+    assert spark_builder.insert_select("cat", "db", "tbl", "src", branch="audit") == (
+        "INSERT INTO `cat`.`db`.`tbl`.`branch_audit` SELECT * FROM `src`"
+    )
+    assert spark_builder.create_branch("cat", "db", "tbl", "audit") == "ALTER TABLE `cat`.`db`.`tbl` CREATE BRANCH IF NOT EXISTS `audit`"
+    assert (
+        spark_builder.create_tag("cat", "db", "tbl", "v1", 5)
+        == "ALTER TABLE `cat`.`db`.`tbl` CREATE TAG IF NOT EXISTS `v1` AS OF VERSION 5"
+    )
+    assert spark_builder.fast_forward("cat", "db", "tbl", "audit") == (
+        "CALL `cat`.`system`.`fast_forward`(table => 'db.tbl', branch => 'main', to => 'audit')"
+    )
+
+
+def test_retention_statements(spark_builder, athena_builder):
+    assert spark_builder.older_than_predicate("day", "2024-01-11", "date") == "`day` < DATE '2024-01-11'"
+    assert athena_builder.older_than_predicate("ts", "2024-01-11") == "\"ts\" < TIMESTAMP '2024-01-11 00:00:00.000000'"
+    assert spark_builder.expire_snapshots("cat", "db", "tbl", "2024-01-11") == (
+        "CALL `cat`.`system`.`expire_snapshots`(table => 'db.tbl', older_than => TIMESTAMP '2024-01-11 00:00:00.000000', retain_last => 1)"
+    )
+    assert athena_builder.expire_snapshots("cat", "db", "tbl", "2024-01-11") == 'VACUUM "cat"."db"."tbl"'
+
+
+def test_clustering_statements(spark_builder, athena_builder):
+    assert spark_builder.write_ordered_by("cat", "db", "tbl", ["customer_id", "ts"]) == (
+        "ALTER TABLE `cat`.`db`.`tbl` WRITE ORDERED BY `customer_id`, `ts`"
+    )
+    assert spark_builder.rewrite_data_files("cat", "db", "tbl", "zorder", ["a", "b"], "day = 1") == (
+        "CALL `cat`.`system`.`rewrite_data_files`(table => 'db.tbl', strategy => 'sort', sort_order => 'zorder(a, b)', "
+        "options => map('rewrite-all', 'true'), where => 'day = 1')"
+    )
+    assert athena_builder.rewrite_data_files("cat", "db", "tbl") == 'OPTIMIZE "cat"."db"."tbl" REWRITE DATA USING BIN_PACK'
+    assert spark_builder.select_column_bounds("cat", "db", "tbl", ["a"]) == (
+        "SELECT file_path, readable_metrics.`a`.lower_bound, readable_metrics.`a`.upper_bound FROM `cat`.`db`.`tbl`.`files` WHERE content = 0"
+    )
+    with pytest.raises(UnsupportedOperationError):
+        athena_builder.rewrite_data_files("cat", "db", "tbl", "sort", ["a"])
+    with pytest.raises(ValueError, match="at least one column"):
+        spark_builder.rewrite_data_files("cat", "db", "tbl", "zorder")
+
+
+def test_comparison_statements(spark_builder, athena_builder):
+    assert spark_builder.row_hash() == "xxhash64(*)"
+    assert athena_builder.hash_bucket(["id"], 16) == (
+        "abs(from_big_endian_64(xxhash64(to_utf8(concat_ws('|', coalesce(cast(\"id\" AS varchar), '\\N'))))) % 16)"
+    )
+    assert spark_builder.select_digests("cat", "db", "tbl", [], "xxhash64(*)") == (
+        "SELECT count(*), coalesce(sum(cast(xxhash64(*) AS decimal(38, 0))), 0) FROM `cat`.`db`.`tbl`"
+    )
+    assert spark_builder.group_predicate(["`day`", "`region`"], [(date(2024, 1, 1), None)]) == (
+        "(`day` = DATE '2024-01-01' AND `region` IS NULL)"
+    )
+    with pytest.raises(ValueError, match="Athena needs the columns"):
+        athena_builder.row_hash()
+
+
+def test_select_table_size_reads_the_current_snapshot_summary(spark_builder):
+    query = spark_builder.select_table_size("cat", "db", "t")
+
+    assert query.startswith("SELECT s.summary['total-files-size'], s.summary['total-records'] FROM `cat`.`db`.`t`.`snapshots` s")
+    assert query.endswith("JOIN `cat`.`db`.`t`.`refs` r ON s.snapshot_id = r.snapshot_id WHERE r.name = 'main'")
+
+
+def test_select_last_batch_id_filters_the_stream(athena_builder):
+    assert athena_builder.select_last_batch_id("cat", "db", "t", "it's") == (
+        "SELECT max(cast(summary['keepice.batch-id'] AS bigint)) FROM \"cat\".\"db\".\"t$snapshots\" WHERE summary['keepice.stream-id'] = 'it''s'"
+    )
+
+
+def test_parse_describe_reads_spark_partitioning():
+    rows = [
+        ("id", "bigint", None),
+        ("event_ts", "timestamp", None),
+        ("", "", ""),
+        ("# Partitioning", "", ""),
+        ("Part 0", "days(event_ts)", ""),
+        ("Part 1", "bucket(16, id)", ""),
+    ]
+
+    assert parse_describe(rows) == (
+        [{"name": "id", "type": "bigint"}, {"name": "event_ts", "type": "timestamp"}],
+        ["days(event_ts)", "bucket(16, id)"],
+    )
+
+
+def test_parse_describe_and_properties_read_athena_rows():
+    rows = [("id                  \tbigint              \t",), ("region              \tstring              \t",), ("",)]
+    rows += [("# Partition Information",), ("# col_name            \tdata_type           \tcomment",), ("region              \tstring",)]
+
+    assert parse_describe(rows) == ([{"name": "id", "type": "bigint"}, {"name": "region", "type": "string"}], ["region"])
+    assert parse_properties([("format-version\t2",), ("owner\tsales",)]) == {"format-version": "2", "owner": "sales"}
+
+
+def test_merge_aggregates_combines_partial_aggregates(spark_builder):
+    partial = spark_builder.select_aggregates("`v`", [], {"low": "min(ts)", "high": "max(ts)", "n": "count(*)"}, "amount > 0")
+
+    assert spark_builder.merge_aggregates("cat", "db", "s", partial, [], {"low": "min", "high": "max", "n": "count"}) == (
+        "MERGE INTO `cat`.`db`.`s` AS summary USING (SELECT min(ts) AS `low`, max(ts) AS `high`, count(*) AS `n` FROM `v` WHERE amount > 0) "
+        "AS partial ON true WHEN MATCHED THEN UPDATE SET summary.`low` = least(summary.`low`, partial.`low`), "
+        "summary.`high` = greatest(summary.`high`, partial.`high`), summary.`n` = summary.`n` + partial.`n` WHEN NOT MATCHED THEN INSERT *"
+    )
+
+
+def test_export_statements(spark_builder, athena_builder):
+    assert athena_builder.unload('SELECT * FROM "db"."t"', "s3://bucket/unload/1/") == (
+        "UNLOAD (SELECT * FROM \"db\".\"t\") TO 's3://bucket/unload/1/' WITH (format = 'PARQUET', compression = 'SNAPPY')"
+    )
+    assert athena_builder.create_parquet_table_as("scratch", "e1", "SELECT 1 AS x", "s3://bucket/unload/1/") == (
+        "CREATE TABLE `scratch`.`e1` WITH (format = 'PARQUET', write_compression = 'SNAPPY', "
+        "external_location = 's3://bucket/unload/1/') AS SELECT 1 AS x"
+    )
+    with pytest.raises(UnsupportedOperationError):
+        spark_builder.unload("SELECT 1", "s3://bucket/unload/1/")
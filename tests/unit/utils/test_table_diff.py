@@ -0,0 +1,22 @@
+import pyarrow as pa
+
+from keepice_lakehouse.utils.table_diff import bucket_of
+from keepice_lakehouse.utils.table_diff import encode_columns
+from keepice_lakehouse.utils.table_diff import hash_codes
+
+
+def test_equal_rows_hash_equally_across_tables():
+    source = pa.table({"id": [1, 2, 3], "name": ["a", "b", None], "score": [1.5, 2.5, 3.5]})
+    target = pa.table({"id": [3, 1, 2], "name": [None, "a", "x"], "score": [3.5, 1.5, 2.5]})
+
+    source_codes, target_codes = encode_columns(source, target, ["id", "name", "score"])
+    source_hashes = hash_codes(list(source_codes.values()), 3).to_pylist()
+    target_hashes = hash_codes(list(target_codes.values()), 3).to_pylist()
+
+    assert target_hashes[0] == source_hashes[2]
+    assert target_hashes[1] == source_hashes[0]
+    assert target_hashes[2] != source_hashes[1]
+
+
+def test_bucket_of():
+    assert bucket_of(pa.array([0, 65, 2**64 - 1], pa.uint64()), 64).to_pylist() == [0, 1, 63]
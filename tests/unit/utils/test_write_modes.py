@@ -0,0 +1,85 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+from keepice_lakehouse.models.models import WriteModePolicyModel
+from keepice_lakehouse.utils.write_modes import advise_write_modes
+
+NOW = datetime(2024, 5, 8, tzinfo=timezone.utc)
+
+
+def summary(**values):
+    return {key.replace("_", "-"): str(value) for key, value in values.items()}
+
+
+def cow_merge(hours_ago, removed_bytes):
+    """A copy-on-write merge on a 100 file, 1000 byte table."""
+    return (
+        NOW - timedelta(hours=hours_ago),
+        "overwrite",
+        summary(
+            added_data_files=10,
+            deleted_data_files=10,
+            total_data_files=100,
+            added_files_size=removed_bytes,
+            removed_files_size=removed_bytes,
+            total_files_size=1000,
+        ),
+    )
+
+
+def test_heavy_copy_on_write_merges_switch_to_merge_on_read():
+    snapshots = [(NOW - timedelta(days=30), "append", summary(added_data_files=100, total_data_files=100, total_files_size=1000))]
+    snapshots += [cow_merge(hours, removed_bytes=400) for hours in range(0, 48, 4)]
+
+    advice = advise_write_modes("db", "t", snapshots, {}, WriteModePolicyModel(), now=NOW)
+
+    assert (advice.snapshots, advice.row_level_commits, round(advice.mean_rewrite_fraction, 6)) == (12, 12, 0.4)
+    assert advice.current == dict.fromkeys(["write.update.mode", "write.merge.mode", "write.delete.mode"], "copy-on-write")
+    assert set(advice.recommended.values()) == {"merge-on-read"}
+    # 12 commits a week each adding delete files for 40% of the data files: 0.1 / (12 / 7 * 0.4) days.
+    assert round(advice.compaction_interval_hours, 1) == 3.5
+    assert not advice.compact_now
+
+
+def test_read_heavy_tables_keep_copy_on_write():
+    snapshots = [cow_merge(hours, removed_bytes=400) for hours in range(0, 48, 4)]
+
+    advice = advise_write_modes("db", "t", snapshots, {}, WriteModePolicyModel(), reads_per_write=50, now=NOW)
+
+    assert set(advice.recommended.values()) == {"copy-on-write"}
+    assert advice.compaction_interval_hours is None
+    assert "read 50 times" in advice.reasons[0]
+
+
+def test_merge_on_read_commits_are_estimated_from_delete_files():
+    snapshots = [
+        (
+            NOW - timedelta(hours=1),
+            "overwrite",
+            summary(added_delete_files=30, total_delete_files=30, total_data_files=100, added_files_size=10, total_files_size=1010),
+        )
+    ]
+
+    advice = advise_write_modes("db", "t", snapshots, {"write.merge.mode": "merge-on-read"}, WriteModePolicyModel(), now=NOW)
+
+    assert round(advice.mean_rewrite_fraction, 3) == 0.303
+    assert advice.delete_file_ratio == 0.3
+    assert advice.compact_now
+    assert advice.current["write.merge.mode"] == "merge-on-read"
+
+
+def test_full_overwrites_and_old_commits_are_ignored():
+    snapshots = [
+        cow_merge(24 * 10, removed_bytes=900),
+        (
+            NOW,
+            "overwrite",
+            summary(added_data_files=5, deleted_data_files=100, total_data_files=5, total_files_size=50, removed_files_size=1000),
+        ),
+    ]
+
+    advice = advise_write_modes("db", "t", snapshots, {}, WriteModePolicyModel(), now=NOW)
+
+    assert (advice.snapshots, advice.row_level_commits) == (1, 0)
+    assert set(advice.recommended.values()) == {"copy-on-write"}